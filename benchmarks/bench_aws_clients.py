@@ -0,0 +1,80 @@
+# benchmarks/bench_aws_clients.py
+# Client construction and describe_* traffic with and without src/aws_clients.py.
+#
+# clients:   builds the clients a CI run's scripts create (sagemaker, sagemaker-runtime, s3, sts,
+#            featurestore-runtime), once per script as before (a fresh boto3 Session each) vs
+#            through the shared registry. No network calls are made.
+# describes: replays the endpoint -> config -> model lookups of register_model.py,
+#            monitor_setup.py, pipeline_up.py, deploy_canary.py and enable_data_capture.py
+#            against a counting fake, each script as a fresh process sharing DESCRIBE_CACHE_FILE.
+#
+#   python benchmarks/bench_aws_clients.py --scripts 5
+import argparse, json, os, tempfile, time
+
+import synthetic  # noqa: F401  (puts src/ on sys.path)
+
+import boto3
+
+import aws_clients
+
+SERVICES = ("sagemaker", "sagemaker-runtime", "s3", "sts", "sagemaker-featurestore-runtime")
+LOOKUPS = {  # script -> describe calls it made on its own
+    "register_model": 3, "monitor_setup": 3, "pipeline_up": 3, "deploy_canary": 2, "enable_data_capture": 2}
+
+
+class CountingSageMaker:
+    def __init__(self):
+        self.calls = 0
+
+    def describe_endpoint(self, EndpointName):
+        self.calls += 1
+        return {"EndpointName": EndpointName, "EndpointConfigName": "ec-1", "EndpointStatus": "InService"}
+
+    def describe_endpoint_config(self, EndpointConfigName):
+        self.calls += 1
+        return {"EndpointConfigName": EndpointConfigName,
+                "ProductionVariants": [{"VariantName": "AllTraffic", "ModelName": "m-1"}]}
+
+    def describe_model(self, ModelName):
+        self.calls += 1
+        return {"ModelName": ModelName, "ExecutionRoleArn": "arn:aws:iam::0:role/r",
+                "PrimaryContainer": {"Image": "xgb", "ModelDataUrl": "s3://b/model.tar.gz"}}
+
+
+def bench_clients(scripts):
+    t0 = time.perf_counter()
+    for _ in range(scripts):
+        b3 = boto3.Session(region_name="us-east-1")
+        for service in SERVICES:
+            b3.client(service)
+    before = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(scripts):
+        for service in SERVICES:
+            aws_clients.client(service, "us-east-1")
+    after = time.perf_counter() - t0
+    return {"clients_per_script": len(SERVICES), "scripts": scripts,
+            "per_script_sessions_s": round(before, 3), "shared_registry_s": round(after, 3),
+            "clients_created": aws_clients.counters["clients_created"]}
+
+
+def bench_describes(endpoint="titanic-xgboost-endpoint"):
+    sm = CountingSageMaker()
+    for script, n in LOOKUPS.items():  # before: every script walks (part of) the chain itself
+        ep = sm.describe_endpoint(EndpointName=endpoint)
+        cfg = sm.describe_endpoint_config(EndpointConfigName=ep["EndpointConfigName"])
+        if n == 3:
+            sm.describe_model(ModelName=cfg["ProductionVariants"][0]["ModelName"])
+    before, sm.calls = sm.calls, 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "describe_cache.json")
+        for script in LOOKUPS:  # a new cache per script = a new process reading the shared file
+            aws_clients.DescribeCache(sm, path=path).resolve(endpoint)
+    return {"scripts": len(LOOKUPS), "describe_calls_before": before, "describe_calls_shared_cache": sm.calls}
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--scripts", type=int, default=5, help="scripts (processes) a CI run executes")
+    args = p.parse_args()
+    print(json.dumps({"clients": bench_clients(args.scripts), "describes": bench_describes()}, indent=2))
@@ -0,0 +1,63 @@
+# benchmarks/bench_batch_score.py
+# Throughput and scaling of src/batch_score.py on synthetic test.csv-shaped files.
+#
+# Trains a small model on synthetic rows once, writes a raw CSV of each --rows size, and
+# runs batch_score.py with every --workers count as a separate process (peak RSS from
+# ru_maxrss covers the worker processes). Speedup is relative to the 1-worker run.
+#
+#   python benchmarks/bench_batch_score.py --rows 1000000,10000000 --workers 1,2,4,8
+import argparse, json, os, subprocess, sys, tempfile, time
+
+from synthetic import SRC, make_raw_frame, write_raw_csv
+
+
+def run(cmd):
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    out = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    if status != 0:
+        raise RuntimeError(f"{' '.join(cmd)} exited with status {status}")
+    return wall, usage.ru_maxrss / 1024.0, json.loads(out.splitlines()[0])
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", default="1000000")
+    p.add_argument("--workers", default=",".join(str(2 ** i) for i in range(4) if 2 ** i <= (os.cpu_count() or 1)))
+    p.add_argument("--engine", default="xgboost")
+    p.add_argument("--shard-mb", type=float, default=64)
+    p.add_argument("--workdir", default=None)
+    p.add_argument("--out", default=None)
+    args = p.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-batch-score-")
+    model_dir = os.path.join(workdir, "model")
+    train = os.path.join(workdir, "train.csv")
+    make_raw_frame(20_000).to_csv(train, index=False)
+    subprocess.run([sys.executable, os.path.join(SRC, "train.py"), "--train", train, "--model-dir", model_dir],
+                   check=True, stdout=subprocess.DEVNULL)
+    script = os.path.join(SRC, "batch_score.py")
+    results = []
+    for n in [int(float(r)) for r in args.rows.split(",")]:
+        data = write_raw_csv(os.path.join(workdir, f"test_{n}.csv"), n, seed=1, with_target=False)
+        base = None
+        for w in [int(x) for x in args.workers.split(",")]:
+            wall, rss, stats = run([sys.executable, script, data, "--model", model_dir, "--workers", str(w),
+                                    "--engine", args.engine, "--shard-mb", str(args.shard_mb),
+                                    "--out", os.path.join(workdir, "scores.csv")])
+            base = base or stats["rows_per_sec"]
+            r = {"rows": n, "workers": w, "shards": stats["shards"], "wall_s": round(wall, 2),
+                 "rows_per_sec": round(stats["rows_per_sec"]), "speedup": round(stats["rows_per_sec"] / base, 2),
+                 "peak_rss_mb": round(rss, 1)}
+            results.append(r)
+            print(f"rows={n:>11}  workers={w:>3}  {r['rows_per_sec']:>10} rows/s  x{r['speedup']:<5} "
+                  f"wall={wall:8.2f}s  peak_rss={rss:8.1f} MB", flush=True)
+        os.remove(data)
+    if args.out:
+        json.dump(results, open(args.out, "w"), indent=2)
+
+
+if __name__ == "__main__":
+    main()
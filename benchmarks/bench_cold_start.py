@@ -0,0 +1,94 @@
+# benchmarks/bench_cold_start.py
+# Time-to-first-prediction and RSS of the serving handlers per serverless memory size.
+#
+# For every --mem size (MemorySizeInMB values serverless accepts) and every variant, spawns a
+# fresh interpreter whose address space is capped at that size (RLIMIT_AS, a conservative
+# stand-in for the serverless memory limit) and runs `serving_bundle.py probe` in it:
+# import the handler, model_fn, one raw-record request. Variants:
+#   json/inference        train.py's xgboost-model.json with the full handler (what deploy.py ships)
+#   ubj/inference         the bundle's binary UBJSON booster with the full handler
+#   bundle/inference_lite the bundle's memory-mapped node tables with the cold-start handler
+#   bundle/lite-nowarmup  as above with WARMUP=0
+# Reports the median over --repeat runs and the smallest size whose p-max TTFP meets --slo-ms.
+# The page cache is warm after the first run, and CPU share (which serverless scales with
+# memory) is not emulated, so absolute numbers are lower bounds for a real cold start.
+#
+#   python benchmarks/bench_cold_start.py --model model/ --mem 1024,2048,3072 --slo-ms 1000
+import argparse, json, os, resource, shutil, statistics, subprocess, sys, tempfile, time
+
+from synthetic import SRC, make_raw_frame
+
+SERVERLESS_MEM_MB = (1024, 2048, 3072, 4096, 5120, 6144)
+
+
+def spawn_probe(handler, model_dir, mem_mb, env=None):
+    limit = int(mem_mb) * 1024 * 1024
+    started = time.time()
+    proc = subprocess.run(
+        [sys.executable, os.path.join(SRC, "serving_bundle.py"), "probe", "--handler", handler,
+         "--model-dir", model_dir, "--started", repr(started)],
+        capture_output=True, text=True, env={**os.environ, **(env or {})},
+        preexec_fn=lambda: resource.setrlimit(resource.RLIMIT_AS, (limit, limit)))
+    if proc.returncode != 0:
+        return {"ok": False, "error": (proc.stderr.strip().splitlines() or ["?"])[-1][:200]}
+    return {"ok": True, **json.loads(proc.stdout)}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--model", default=None, help="train.py output dir; default: train one on synthetic rows")
+    p.add_argument("--mem", default=",".join(map(str, SERVERLESS_MEM_MB)))
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--slo-ms", type=float, default=1000, help="time-to-first-prediction SLO")
+    p.add_argument("--workdir", default=None)
+    p.add_argument("--out", default=None)
+    args = p.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-cold-start-")
+    model_dir = args.model
+    if model_dir is None:
+        model_dir, train = os.path.join(workdir, "model"), os.path.join(workdir, "train.csv")
+        make_raw_frame(20_000).to_csv(train, index=False)
+        subprocess.run([sys.executable, os.path.join(SRC, "train.py"), "--train", train, "--model-dir", model_dir],
+                       check=True, stdout=subprocess.DEVNULL, env={**os.environ, "LINEAGE": "0"})
+    bundle = os.path.join(workdir, "bundle")
+    subprocess.run([sys.executable, os.path.join(SRC, "serving_bundle.py"), "build", "--model", model_dir,
+                    "--out", bundle], check=True, stdout=subprocess.DEVNULL)
+    ubj_only = os.path.join(workdir, "ubj")  # the full handler prefers .json, so give it the ubj alone
+    os.makedirs(ubj_only, exist_ok=True)
+    for name in ("xgboost-model.ubj", "preprocessor.json"):
+        shutil.copy(os.path.join(bundle, name), ubj_only)
+    variants = {"json/inference": ("inference", model_dir, {}),
+                "ubj/inference": ("inference", ubj_only, {}),
+                "bundle/inference_lite": ("inference_lite", bundle, {}),
+                "bundle/lite-nowarmup": ("inference_lite", bundle, {"WARMUP": "0"})}
+
+    spawn_probe("inference", model_dir, max(SERVERLESS_MEM_MB))  # warm the page cache once
+    results, picks = [], {}
+    for mem in [int(m) for m in args.mem.split(",")]:
+        for name, (handler, path, env) in variants.items():
+            runs = [spawn_probe(handler, path, mem, env) for _ in range(args.repeat)]
+            ok = [r for r in runs if r["ok"]]
+            row = {"mem_mb": mem, "variant": name, "ok": len(ok) == len(runs)}
+            if ok:
+                med = lambda k: round(statistics.median(r[k] for r in ok), 1)
+                row.update({k: med(k) for k in ("ttfp_ms", "startup_ms", "import_ms", "model_fn_ms",
+                                                  "first_predict_ms", "peak_rss_mb")})
+                row["ttfp_max_ms"] = max(r["ttfp_ms"] for r in ok)
+                row["heavy_modules"] = ok[0]["heavy_modules"]
+            else:
+                row["error"] = runs[0]["error"]
+            row["meets_slo"] = row["ok"] and row["ttfp_max_ms"] <= args.slo_ms
+            if row["meets_slo"]:
+                picks.setdefault(name, mem)
+            results.append(row)
+            status = f"ttfp={row['ttfp_ms']:7.1f}ms (max {row['ttfp_max_ms']:7.1f})  rss={row['peak_rss_mb']:6.1f}MB" \
+                if ok else f"FAILED: {row['error']}"
+            print(f"mem={mem:>5}MB  {name:<22} {status}  {'✅' if row['meets_slo'] else '❌'}", flush=True)
+    print(json.dumps({"slo_ms": args.slo_ms, "smallest_mem_mb_meeting_slo": picks}, indent=2))
+    if args.out:
+        json.dump({"results": results, "smallest_mem_mb_meeting_slo": picks}, open(args.out, "w"), indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/bench_lineage.py
+# Model lookups through the SageMaker API vs the local lineage index (src/lineage.py).
+#
+# A fake SageMaker holds `--jobs` training jobs and sleeps `--latency-ms` per call.
+# scan:      "best AUC in the last 7 days" the API way: page ListTrainingJobs (100 per page)
+#            and DescribeTrainingJob every job in the window, one call after another.
+# backfill:  Lineage.backfill into a fresh index (windowed listing + threaded describes).
+# queries:   latest / best-by-metric / by-data-version against the filled index.
+#
+#   python benchmarks/bench_lineage.py --jobs 2000 --latency-ms 20 --workers 16
+import argparse, json, os, random, tempfile, threading, time
+from datetime import datetime, timedelta, timezone
+
+import synthetic  # noqa: F401  (puts src/ on sys.path)
+
+import lineage
+
+
+class FakeSageMaker:
+    def __init__(self, jobs, latency_s, seed=0):
+        rng = random.Random(seed)
+        now = datetime.now(timezone.utc)
+        self.latency = latency_s
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.jobs = {}
+        for i in range(jobs):
+            name = f"titanic-xgb-{i:06d}"
+            self.jobs[name] = {
+                "TrainingJobName": name, "TrainingJobStatus": "Completed",
+                "CreationTime": now - timedelta(days=90 * (jobs - i) / jobs),
+                "HyperParameters": {"max_depth": str(rng.randint(3, 8)), "eta": f"{rng.uniform(0.05, 0.3):.3f}"},
+                "ModelArtifacts": {"S3ModelArtifacts": f"s3://bucket/titanic/{name}/output/model.tar.gz"},
+                "InputDataConfig": [{"ChannelName": "train", "DataSource": {"S3DataSource": {
+                    "S3Uri": f"s3://bucket/titanic/data/v{i // 100}/train.csv"}}}],
+                "FinalMetricDataList": [{"MetricName": "validation:auc", "Value": rng.uniform(0.8, 0.9)}]}
+        self.order = sorted(self.jobs.values(), key=lambda j: j["CreationTime"])
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+
+    def list_training_jobs(self, SortBy="CreationTime", SortOrder="Descending", MaxResults=100, NextToken=None,
+                           CreationTimeAfter=None, CreationTimeBefore=None):
+        self._call()
+        jobs = [j for j in self.order if (CreationTimeAfter is None or j["CreationTime"] >= CreationTimeAfter)
+                and (CreationTimeBefore is None or j["CreationTime"] <= CreationTimeBefore)]
+        if SortOrder == "Descending":
+            jobs.reverse()
+        start = int(NextToken or 0)
+        page = jobs[start:start + MaxResults]
+        resp = {"TrainingJobSummaries": [{k: j[k] for k in ("TrainingJobName", "TrainingJobStatus", "CreationTime")}
+                                         for j in page]}
+        if start + MaxResults < len(jobs):
+            resp["NextToken"] = str(start + MaxResults)
+        return resp
+
+    def describe_training_job(self, TrainingJobName):
+        self._call()
+        return self.jobs[TrainingJobName]
+
+
+def api_scan_best(sm, metric, days):
+    """Newest-first listing until the window ends, describing every job in it."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    best, kw = None, {"SortBy": "CreationTime", "SortOrder": "Descending", "MaxResults": 100}
+    while True:
+        page = sm.list_training_jobs(**kw)
+        for s in page["TrainingJobSummaries"]:
+            if s["CreationTime"] < cutoff:
+                return best
+            d = sm.describe_training_job(TrainingJobName=s["TrainingJobName"])
+            value = next((m["Value"] for m in d["FinalMetricDataList"] if m["MetricName"] == metric), None)
+            if value is not None and (best is None or value > best[1]):
+                best = (s["TrainingJobName"], value)
+        if not page.get("NextToken"):
+            return best
+        kw["NextToken"] = page["NextToken"]
+
+
+def timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t0) / repeat
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--jobs", type=int, default=2000)
+    p.add_argument("--latency-ms", type=float, default=20)
+    p.add_argument("--workers", type=int, default=16)
+    p.add_argument("--days", type=float, default=7)
+    args = p.parse_args()
+
+    sm = FakeSageMaker(args.jobs, args.latency_ms / 1000)
+    scan, scan_s = timed(lambda: api_scan_best(sm, "validation:auc", args.days))
+    scan_calls, sm.calls = sm.calls, 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = lineage.Lineage(os.path.join(tmp, "lineage.sqlite"))
+        start = min(j["CreationTime"] for j in sm.jobs.values()).timestamp()
+        n, backfill_s = timed(lambda: index.backfill(sm, since=start, workers=args.workers, log=None))
+        since = time.time() - args.days * 86400
+        best, best_s = timed(lambda: index.best("validation:auc", since), repeat=200)
+        _, latest_s = timed(lambda: index.latest(), repeat=200)
+        _, data_s = timed(lambda: index.by_data("s3://bucket/titanic/data/v3/train.csv"), repeat=200)
+        assert best[0]["job_name"] == scan[0], (best[0]["job_name"], scan)
+        print(json.dumps({
+            "jobs": args.jobs, "latency_ms": args.latency_ms,
+            "api_scan_best_s": round(scan_s, 3), "api_scan_calls": scan_calls,
+            "backfill_s": round(backfill_s, 3), "backfill_calls": sm.calls, "backfill_jobs": n,
+            "backfill_serial_estimate_s": round(sm.calls * args.latency_ms / 1000, 3),
+            "index_best_ms": round(best_s * 1000, 3), "index_latest_ms": round(latest_s * 1000, 3),
+            "index_by_data_ms": round(data_s * 1000, 3)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/bench_model_host.py
+# How many model versions one process can host (src/model_host.py), and what routing costs.
+#
+# Trains --versions boosters shaped like train.py's (200 trees, depth 5, different seeds) into
+# <store>/v<i>/, then:
+# fit:          loads every version into one ModelHost and measures the RSS growth per model
+#               (from /proc/self/statm) against the estimate used for the budget; reports how
+#               many versions fit an ml.m5.large-sized budget (--budget-mb).
+# singleflight: --threads concurrent first requests for one cold version -> number of loads.
+# lru:          Zipf-distributed traffic over all versions with a budget for --resident models;
+#               hit rate, loads, evictions and mean cold-load time.
+# http:         routes requests by the target-model header through local_server.py and checks
+#               that two versions answer with their own scores.
+#
+#   python benchmarks/bench_model_host.py --versions 40 --budget-mb 6144 --resident 8
+import argparse, http.client, json, os, tempfile, threading, time
+
+import numpy as np
+
+from synthetic import make_raw_frame
+
+import inference
+import local_server
+import model_host
+from features import ARTIFACT_NAME, TARGET, TitanicTransformer
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def build_store(store, versions, rows=20_000):
+    import xgboost as xgb
+    df = make_raw_frame(rows)
+    tf = TitanicTransformer().fit(df)
+    X, y = tf.transform(df), df[TARGET].to_numpy()
+    for i in range(versions):
+        path = os.path.join(store, f"v{i}")
+        os.makedirs(path, exist_ok=True)
+        clf = xgb.XGBClassifier(n_estimators=200, max_depth=5, learning_rate=0.1, subsample=0.8,
+                                colsample_bytree=0.8, random_state=i, n_jobs=1)
+        clf.fit(X, y)
+        clf.save_model(os.path.join(path, "xgboost-model.json"))
+        tf.save(os.path.join(path, ARTIFACT_NAME))
+    return X[:64].astype(np.float32)
+
+
+def bench_fit(store, versions, budget_mb):
+    host = model_host.ModelHost(store, budget_bytes=1 << 62)
+    base = rss_bytes()
+    for i in range(versions):
+        host.get(f"v{i}")
+    grown = rss_bytes() - base
+    actual = grown / versions
+    estimate = host.stats()["loaded_bytes"] / versions
+    budget = budget_mb * 1024 * 1024
+    return {"versions": versions, "rss_growth_mb": round(grown / 2**20, 1),
+            "actual_mb_per_model": round(actual / 2**20, 3), "estimated_mb_per_model": round(estimate / 2**20, 3),
+            "estimate_over_actual": round(estimate / actual, 2) if actual > 0 else None,
+            "budget_mb": budget_mb, "versions_that_fit": int(budget // max(actual, estimate)),
+            "all_fit": versions * max(actual, estimate) <= budget}
+
+
+def bench_singleflight(store, threads):
+    host = model_host.ModelHost(store, budget_bytes=1 << 62)
+    barrier = threading.Barrier(threads)
+
+    def first_request():
+        barrier.wait()
+        host.get("v0")
+
+    workers = [threading.Thread(target=first_request) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    s = host.stats()
+    return {"threads": threads, "loads": s["loads"], "waited_on_shared_load": s["load_waits"], "hits": s["hits"]}
+
+
+def bench_lru(store, versions, resident, requests, X, seed=0):
+    per_model = model_host.estimate_bytes(inference.load_scorer(os.path.join(store, "v0")))
+    host = model_host.ModelHost(store, budget_bytes=per_model * resident * 1.05)
+    rng = np.random.default_rng(seed)
+    targets = np.minimum(rng.zipf(1.3, requests) - 1, versions - 1)  # a few hot versions, a long tail
+    t0 = time.perf_counter()
+    for t in targets:
+        host.predict(X[:1], f"v{t}")
+    s = host.stats()
+    return {"requests": requests, "resident": resident, "hit_rate": round(s["hits"] / requests, 3),
+            "loads": s["loads"], "evictions": s["evictions"], "max_loaded": s["loaded"],
+            "mean_load_ms": round(1000 * s["load_seconds"] / max(s["loads"], 1), 1),
+            "wall_s": round(time.perf_counter() - t0, 2)}
+
+
+def bench_http(store, X):
+    server = local_server.make_host_server(model_host.ModelHost(store))
+    url = local_server.start_background(server)
+    conn = http.client.HTTPConnection(url.split("//")[1])
+    body = "\n".join(",".join(repr(float(v)) for v in row) for row in X[:4])
+    scores = {}
+    for target in ("v0", "v1"):
+        conn.request("POST", "/invocations", body=body, headers={"Content-Type": "text/csv",
+                                                                  model_host.TARGET_HEADER: target})
+        scores[target] = [p["score"] for p in json.loads(conn.getresponse().read())["predictions"]]
+    conn.request("POST", "/invocations", body=body, headers={"Content-Type": "text/csv"})
+    missing = conn.getresponse()
+    missing.read()
+    server.shutdown()
+    server.server_close()
+    direct = inference.load_scorer(os.path.join(store, "v1")).booster.inplace_predict(X[:4])
+    return {"routed_differs": scores["v0"] != scores["v1"],
+            "v1_matches_direct": bool(np.allclose(scores["v1"], direct, atol=1e-6)),
+            "no_header_status": missing.status}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--versions", type=int, default=40)
+    p.add_argument("--budget-mb", type=float, default=6144, help="ml.m5.large: 8 GiB, minus OS/container headroom")
+    p.add_argument("--resident", type=int, default=8, help="lru: budget for this many models")
+    p.add_argument("--requests", type=int, default=5000)
+    p.add_argument("--threads", type=int, default=32)
+    p.add_argument("--workdir", default=None)
+    args = p.parse_args()
+
+    store = os.path.join(args.workdir or tempfile.mkdtemp(prefix="bench-model-host-"), "models")
+    X = build_store(store, args.versions)
+    results = {"fit": bench_fit(store, args.versions, args.budget_mb),
+               "singleflight": bench_singleflight(store, args.threads),
+               "lru": bench_lru(store, args.versions, args.resident, args.requests, X),
+               "http": bench_http(store, X)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
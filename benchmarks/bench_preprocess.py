@@ -0,0 +1,45 @@
+# benchmarks/bench_preprocess.py
+# In-memory vs out-of-core (--chunksize) preprocess.py on synthetic Titanic-shaped CSVs.
+# Each run is a separate process so its peak RSS (ru_maxrss) is measured in isolation.
+#
+#   python benchmarks/bench_preprocess.py --rows 100000,1000000 --chunksize 100000
+import argparse, json, os, subprocess, sys, tempfile, time
+
+from synthetic import SRC, write_raw_csv
+
+
+def run(cmd):
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - t0
+    if status != 0:
+        raise RuntimeError(f"{' '.join(cmd)} exited with status {status}")
+    return wall, usage.ru_maxrss / 1024.0  # Linux reports KiB
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", default="100000,1000000")
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.add_argument("--workdir", default=None)
+    p.add_argument("--out", default=None)
+    args = p.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-preprocess-")
+    script = os.path.join(SRC, "preprocess.py")
+    results = []
+    for n in [int(r) for r in args.rows.split(",")]:
+        train = write_raw_csv(os.path.join(workdir, f"train_{n}.csv"), n)
+        test = write_raw_csv(os.path.join(workdir, f"test_{n}.csv"), max(1, n // 2), seed=1, with_target=False)
+        for mode, extra in (("in-memory", []), ("streaming", ["--chunksize", str(args.chunksize)])):
+            out_dir = os.path.join(workdir, f"out_{mode}_{n}")
+            wall, rss = run([sys.executable, script, "--train", train, "--test", test, "--out-dir", out_dir] + extra)
+            results.append({"rows": n, "mode": mode, "wall_s": round(wall, 3), "peak_rss_mb": round(rss, 1)})
+            print(f"rows={n:>10}  {mode:<10} wall={wall:8.2f}s  peak_rss={rss:8.1f} MB", flush=True)
+    if args.out:
+        json.dump(results, open(args.out, "w"), indent=2)
+
+
+if __name__ == "__main__":
+    main()
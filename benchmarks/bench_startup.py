@@ -0,0 +1,116 @@
+# benchmarks/bench_startup.py
+# Startup cost of every `titanic-mlops` subcommand, measured with `python -X importtime`.
+#
+# Each subcommand is run as `titanic-mlops <command> [<action>] --help` in a fresh
+# interpreter: that covers the dispatcher plus the command module's own top-level imports,
+# i.e. what is paid before the command parses its arguments. Reported per subcommand:
+# wall time (median of --repeat runs), total import time (sum of importtime "self") and
+# the slowest top-level imports. Runs are appended to a history file; `compare` flags
+# subcommands whose startup grew by more than --threshold.
+#
+#   python benchmarks/bench_startup.py run
+#   python benchmarks/bench_startup.py run --commands predict,"monitor baseline"
+#   python benchmarks/bench_startup.py compare --threshold 0.2
+import argparse, datetime, json, os, statistics, subprocess, sys, time
+
+from synthetic import SRC
+
+sys.path.insert(0, SRC)
+from cli import COMMANDS  # noqa: E402
+
+LAUNCHER = os.path.abspath(os.path.join(SRC, "..", "titanic-mlops"))
+HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_history.json")
+
+
+def subcommands():
+    return [" ".join(filter(None, (c, a))) for c, actions in COMMANDS.items() for a in actions]
+
+
+def parse_importtime(stderr, top=5):
+    """-X importtime output -> (total self ms, [(package, cumulative ms)] slowest top-level imports)."""
+    total, roots = 0, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        if not name.startswith("  "):  # depth 0: imported directly by the running code
+            roots.append((name.strip(), int(cum_us) / 1000.0))
+    roots.sort(key=lambda r: -r[1])
+    return total / 1000.0, [[n, round(ms, 1)] for n, ms in roots[:top]]
+
+
+def measure(subcommand, repeat):
+    cmd = [sys.executable, "-X", "importtime", LAUNCHER, *subcommand.split(), "--help"]
+    walls, imports, slowest = [], [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        walls.append((time.perf_counter() - t0) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(cmd)} exited with {proc.returncode}:\n{proc.stderr[-2000:]}")
+        total, slowest = parse_importtime(proc.stderr)
+        imports.append(total)
+    return {"command": subcommand, "wall_ms": round(statistics.median(walls), 1),
+            "import_ms": round(statistics.median(imports), 1), "slowest_imports": slowest}
+
+
+def load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def run(args):
+    commands = [c.strip() for c in args.commands.split(",")] if args.commands else subcommands()
+    results = []
+    for c in commands:
+        r = measure(c, args.repeat)
+        results.append(r)
+        top = ", ".join(f"{n} {ms:.0f}ms" for n, ms in r["slowest_imports"][:3])
+        print(f"{c:<24} wall={r['wall_ms']:8.1f}ms  imports={r['import_ms']:8.1f}ms  ({top})", flush=True)
+    history = load_history(args.history)
+    history.append({"timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                    "label": args.label, "python": sys.version.split()[0], "results": results})
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=1)
+    print(f"Saved run #{len(history) - 1} to {args.history}")
+
+
+def compare(args):
+    history = load_history(args.history)
+    if len(history) < 2:
+        sys.exit(f"Need at least two runs in {args.history}")
+    base, head = history[args.base], history[args.head]
+    index = {r["command"]: r for r in base["results"]}
+    regressions = 0
+    for r in head["results"]:
+        b = index.get(r["command"])
+        if b is None:
+            continue
+        change = r[args.metric] / b[args.metric] - 1 if b[args.metric] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag, regressions = "  <-- REGRESSION", regressions + 1
+        print(f"{r['command']:<24} {b[args.metric]:8.1f} -> {r[args.metric]:8.1f} ms ({change:+.1%}){flag}")
+    if regressions:
+        sys.exit(f"{regressions} subcommand(s) started more than {args.threshold:.0%} slower")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--history", default=HISTORY)
+    sub = p.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("--commands", default=None, help='comma list, e.g. predict,"monitor baseline" (default: all)')
+    r.add_argument("--repeat", type=int, default=5)
+    r.add_argument("--label", default=None)
+    c = sub.add_parser("compare")
+    c.add_argument("--base", type=int, default=-2)
+    c.add_argument("--head", type=int, default=-1)
+    c.add_argument("--metric", choices=["wall_ms", "import_ms"], default="wall_ms")
+    c.add_argument("--threshold", type=float, default=0.2)
+    args = p.parse_args()
+    run(args) if args.cmd == "run" else compare(args)
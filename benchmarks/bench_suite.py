@@ -0,0 +1,319 @@
+# benchmarks/bench_suite.py
+# In-process micro-benchmarks for the train / evaluate / inference hot paths.
+#
+#   python benchmarks/bench_suite.py run --sizes 1000,100000          # appends to the history file
+#   python benchmarks/bench_suite.py run --sizes 10000000 --cases train_fit --repeat 1
+#   python benchmarks/bench_suite.py compare                           # last two runs
+#   python benchmarks/bench_suite.py compare --base 0 --head -1 --threshold 0.1
+#
+# Every case is timed `--repeat` times and reported as p50/p95/p99 plus the peak RSS growth
+# while it ran (sampled from /proc, so native xgboost allocations are included).
+import argparse, datetime, itertools, json, os, platform, resource, subprocess, sys, tempfile, threading, time
+
+import numpy as np
+
+from synthetic import make_feature_matrix, make_raw_frame
+
+import xgboost as xgb
+
+import bulk_client
+import csv_cache
+import inference
+import tree_compiler
+from features import TitanicTransformer
+
+HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.json")
+TRAIN_PARAMS = dict(objective="binary:logistic", eval_metric="logloss", n_estimators=200, max_depth=5,
+                    learning_rate=0.1, subsample=0.8, colsample_bytree=0.8, random_state=42)
+
+
+# -----------------------------
+# Measurement helpers
+# -----------------------------
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:  # not Linux: fall back to the (monotonic) high-water mark
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakRSS:
+    """Samples RSS every few ms on a background thread; .peak_mb is growth over the start."""
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+
+    def __enter__(self):
+        self.start = self.peak = _rss_bytes()
+        self._stop = threading.Event()
+        self._t = threading.Thread(target=self._sample, daemon=True)
+        self._t.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._t.join()
+        self.peak = max(self.peak, _rss_bytes())
+        self.peak_mb = (self.peak - self.start) / 1e6
+
+
+def measure(fn, repeat):
+    times = []
+    with PeakRSS() as mem:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    ms = np.asarray(times) * 1000
+    return {"repeat": repeat, "p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95)),
+            "p99_ms": float(np.percentile(ms, 99)), "peak_mem_mb": round(mem.peak_mb, 2)}
+
+
+# -----------------------------
+# Cases: each builds a zero-arg callable for the fixtures of one size
+# -----------------------------
+class Fixtures:
+    """Builds synthetic inputs lazily, once per size."""
+
+    def __init__(self, n, workdir):
+        self.n, self.workdir, self._cache = n, workdir, {}
+
+    def get(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def raw(self):
+        return self.get("raw", lambda: make_raw_frame(self.n))
+
+    @property
+    def raw_csv(self):
+        def build():
+            path = os.path.join(self.workdir, f"raw_{self.n}.csv")
+            self.raw.to_csv(path, index=False)
+            return path
+        return self.get("raw_csv", build)
+
+    @property
+    def transformer(self):
+        return self.get("tf", lambda: TitanicTransformer().fit(self.raw))
+
+    @property
+    def matrix(self):
+        return self.get("matrix", lambda: make_feature_matrix(self.n))
+
+    @property
+    def booster(self):
+        def build():
+            X, y = make_feature_matrix(min(self.n, 100_000), seed=1)
+            return xgb.XGBClassifier(**TRAIN_PARAMS).fit(X, y).get_booster()
+        return self.get("booster", build)
+
+    @property
+    def compiled(self):
+        def build():
+            path = os.path.join(self.workdir, f"model_{self.n}.json")
+            self.booster.save_model(path)
+            return tree_compiler.compile_model(path)
+        return self.get("compiled", build)
+
+
+def case_preprocess_load_warm(fx):
+    # the load preprocess/train do: csv_cache.read_csv, here with a cache private to this run
+    cache = csv_cache.CSVCache(os.path.join(fx.workdir, f"csv-cache-{fx.n}"))
+    return lambda: cache.read_csv(fx.raw_csv)
+
+
+def case_preprocess_load_cold(fx):
+    # first read of a file: hash + parse + write the column files, into a fresh cache each time
+    runs = itertools.count()
+    return lambda: csv_cache.CSVCache(os.path.join(fx.workdir, f"csv-cold-{fx.n}-{next(runs)}")).read_csv(fx.raw_csv)
+
+
+def case_preprocess_transform(fx):
+    raw = fx.raw
+    return lambda: TitanicTransformer().fit(raw).transform(raw)
+
+
+def case_train_fit(fx):
+    X, y = fx.matrix
+    return lambda: xgb.XGBClassifier(**TRAIN_PARAMS).fit(X, y)
+
+
+def case_evaluate_dmatrix(fx):
+    X, _ = fx.matrix
+    return lambda: xgb.DMatrix(X)
+
+
+def case_evaluate_predict(fx):
+    X, _ = fx.matrix
+    booster, dm = fx.booster, xgb.DMatrix(X)
+    return lambda: booster.predict(dm)
+
+
+def _roundtrip(fx, rows):
+    scorer = inference.Scorer(fx.booster, max_wait_ms=0)
+    X, _ = fx.matrix
+    lines = [",".join(repr(float(v)) for v in r) for r in X[:rows]]
+
+    def run():
+        body = "\n".join(lines).encode()                       # client serialize
+        data = inference.input_fn(body, "text/csv")            # server deserialize
+        out, _ = inference.output_fn(inference.predict_fn(data, scorer), "application/json")
+        bulk_client.parse_scores(out)                          # client deserialize
+    return run
+
+
+def case_inference_single(fx):
+    return _roundtrip(fx, 1)
+
+
+def case_inference_batch(fx):
+    return _roundtrip(fx, min(fx.n, 10_000))
+
+
+def case_inference_raw_row(fx):
+    scorer = inference.Scorer(fx.booster, max_wait_ms=0, transformer=fx.transformer)
+    record = {k: (None if v != v else v) for k, v in fx.raw.iloc[0].to_dict().items()}
+    body = json.dumps(record).encode()
+    return lambda: inference.output_fn(inference.predict_fn(inference.input_fn(body, "application/json"), scorer))
+
+
+# Engines for one row / one batch: DMatrix + predict (what evaluate.py did), inplace_predict,
+# and the compiled trees from tree_compiler.py
+def _engine(fx, engine):
+    booster = fx.booster
+    if engine == "dmatrix":
+        return lambda X: booster.predict(xgb.DMatrix(X))
+    if engine == "inplace":
+        return booster.inplace_predict
+    return tree_compiler.CompiledPredictor(fx.compiled, codegen=engine == "codegen").predict
+
+
+def _engine_case(engine, batch):
+    def case(fx):
+        X, _ = fx.matrix
+        X = np.ascontiguousarray(X[:min(fx.n, 10_000)] if batch else X[:1])
+        predict = _engine(fx, engine)
+        return lambda: predict(X)
+    return case
+
+
+CASES = {
+    "preprocess_load_warm": case_preprocess_load_warm,
+    "preprocess_load_cold": case_preprocess_load_cold,
+    "preprocess_transform": case_preprocess_transform,
+    "train_fit": case_train_fit,
+    "evaluate_dmatrix": case_evaluate_dmatrix,
+    "evaluate_predict": case_evaluate_predict,
+    "inference_single": case_inference_single,
+    "inference_batch": case_inference_batch,
+    "inference_raw_row": case_inference_raw_row,
+}
+for _engine_name in ("dmatrix", "inplace", "numpy", "codegen"):
+    CASES[f"engine_{_engine_name}_single"] = _engine_case(_engine_name, batch=False)
+    CASES[f"engine_{_engine_name}_batch"] = _engine_case(_engine_name, batch=True)
+# Per-row paths don't depend on the dataset size; run them once at the smallest size
+SIZE_INDEPENDENT = {"inference_single", "inference_raw_row"} | {c for c in CASES if c.endswith("_single")}
+
+
+def default_repeat(case, n):
+    if case in SIZE_INDEPENDENT:
+        return 1000
+    return 20 if n <= 10_000 else 5 if n <= 1_000_000 else 1
+
+
+# -----------------------------
+# Commands
+# -----------------------------
+def _git_sha():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def run(args):
+    sizes = [int(s) for s in args.sizes.split(",")]
+    cases = args.cases.split(",") if args.cases else list(CASES)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-suite-") as workdir:
+        for n in sizes:
+            fx = Fixtures(n, workdir)
+            for name in cases:
+                if name in SIZE_INDEPENDENT and n != min(sizes):
+                    continue
+                fn = CASES[name](fx)
+                fn()  # warm-up (also builds lazy fixtures outside the timed region)
+                stats = measure(fn, args.repeat or default_repeat(name, n))
+                stats.update({"case": name, "rows": n})
+                results.append(stats)
+                print(f"{name:<22} rows={n:>9}  p50={stats['p50_ms']:10.3f}ms  p95={stats['p95_ms']:10.3f}ms  "
+                      f"p99={stats['p99_ms']:10.3f}ms  mem=+{stats['peak_mem_mb']:.1f}MB", flush=True)
+    entry = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_sha(), "label": args.label, "python": platform.python_version(),
+        "xgboost": xgb.__version__, "cpus": os.cpu_count(), "results": results,
+    }
+    history = load_history(args.history)
+    history.append(entry)
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=1)
+    print(f"Saved run #{len(history) - 1} to {args.history}")
+
+
+def compare(args):
+    history = load_history(args.history)
+    if len(history) < 2:
+        sys.exit(f"Need at least two runs in {args.history}")
+    base, head = history[args.base], history[args.head]
+    index = {(r["case"], r["rows"]): r for r in base["results"]}
+    regressions = 0
+    print(f"base: {base['timestamp']} ({base.get('git')})   head: {head['timestamp']} ({head.get('git')})")
+    for r in head["results"]:
+        b = index.get((r["case"], r["rows"]))
+        if b is None:
+            continue
+        change = r[args.metric] / b[args.metric] - 1 if b[args.metric] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag, regressions = "  <-- REGRESSION", regressions + 1
+        elif change < -args.threshold:
+            flag = "  (faster)"
+        print(f"{r['case']:<22} rows={r['rows']:>9}  {b[args.metric]:10.3f} -> {r[args.metric]:10.3f} ms "
+              f"({change:+.1%}){flag}")
+    if regressions:
+        sys.exit(f"{regressions} regression(s) above {args.threshold:.0%} on {args.metric}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--history", default=HISTORY)
+    sub = p.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run")
+    r.add_argument("--sizes", default="1000,100000", help="e.g. 1000,100000,10000000")
+    r.add_argument("--cases", default=None, help=f"comma list from: {', '.join(CASES)}")
+    r.add_argument("--repeat", type=int, default=None)
+    r.add_argument("--label", default=None)
+    c = sub.add_parser("compare")
+    c.add_argument("--base", type=int, default=-2)
+    c.add_argument("--head", type=int, default=-1)
+    c.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p95_ms", "p99_ms"])
+    c.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    args = p.parse_args()
+    run(args) if args.cmd == "run" else compare(args)
@@ -0,0 +1,83 @@
+# benchmarks/bench_train_stream.py
+# train.py in file mode (whole CSV in pandas) vs stream mode (sharded input through an xgboost
+# DataIter into external memory) on synthetic Titanic-shaped data.
+#
+# For every --rows size, writes the rows once as one train.csv and once as --shards CSV shards
+# (unique PassengerIds, so the stream holdout is a true 20%), then runs each mode in its own
+# process and reports wall time, peak RSS (ru_maxrss) and holdout accuracy. With --mem-limit-mb
+# both processes run under that address-space cap (RLIMIT_AS), a stand-in for an instance
+# smaller than the data: file mode is expected to fail where stream mode finishes.
+#
+#   python benchmarks/bench_train_stream.py --rows 1000000,4000000 --chunksize 200000
+#   python benchmarks/bench_train_stream.py --rows 4000000 --mem-limit-mb 1500
+import argparse, json, os, re, resource, subprocess, sys, tempfile, time
+
+from synthetic import SRC, make_raw_frame
+
+WRITE_CHUNK = 500_000
+
+
+def write_data(workdir, n, shards):
+    """train_<n>.csv and shards_<n>/part-*.csv holding the same rows."""
+    single = os.path.join(workdir, f"train_{n}.csv")
+    shard_dir = os.path.join(workdir, f"shards_{n}")
+    os.makedirs(shard_dir, exist_ok=True)
+    per_shard = -(-n // shards)
+    for start in range(0, n, WRITE_CHUNK):
+        df = make_raw_frame(min(WRITE_CHUNK, n - start), seed=start, start_id=1 + start)
+        df.to_csv(single, mode="a" if start else "w", header=start == 0, index=False)
+        for lo in range(0, len(df), per_shard):  # shard boundaries fall on multiples of per_shard
+            i = (start + lo) // per_shard
+            part = df.iloc[lo:min(len(df), (i + 1) * per_shard - start)]
+            path = os.path.join(shard_dir, f"part-{i:04d}.csv")
+            part.to_csv(path, mode="a" if os.path.exists(path) else "w", header=not os.path.exists(path), index=False)
+    return single, shard_dir
+
+
+def run(cmd, mem_limit_mb=None):
+    limit = int(mem_limit_mb * 1024 * 1024) if mem_limit_mb else None
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                            env={**os.environ, "LINEAGE": "0", "CSV_CACHE": "0"},
+                            preexec_fn=(lambda: resource.setrlimit(resource.RLIMIT_AS, (limit, limit))) if limit else None)
+    out = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    row = {"ok": status == 0, "wall_s": round(time.perf_counter() - t0, 2),
+           "peak_rss_mb": round(usage.ru_maxrss / 1024.0, 1)}  # Linux reports KiB
+    acc = re.search(r"Validation Accuracy: ([0-9.]+)", out)
+    row["accuracy"] = float(acc.group(1)) if acc else None
+    return row
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", default="1000000,4000000")
+    p.add_argument("--shards", type=int, default=8)
+    p.add_argument("--chunksize", type=int, default=200_000)
+    p.add_argument("--mem-limit-mb", type=float, default=None, help="RLIMIT_AS for both modes")
+    p.add_argument("--workdir", default=None)
+    p.add_argument("--out", default=None)
+    args = p.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="bench-train-stream-")
+    script = os.path.join(SRC, "train.py")
+    results = []
+    for n in [int(r) for r in args.rows.split(",")]:
+        single, shard_dir = write_data(workdir, n, args.shards)
+        data_mb = round(os.path.getsize(single) / 2**20, 1)
+        modes = {"file": ["--train", single],
+                 "stream": ["--input-mode", "stream", "--train", shard_dir, "--chunksize", str(args.chunksize)]}
+        for mode, extra in modes.items():
+            row = run([sys.executable, script, "--model-dir", os.path.join(workdir, f"model_{mode}_{n}")] + extra,
+                      args.mem_limit_mb)
+            row.update({"rows": n, "mode": mode, "csv_mb": data_mb, "mem_limit_mb": args.mem_limit_mb})
+            results.append(row)
+            status = f"acc={row['accuracy']:.4f}" if row["ok"] else "FAILED"
+            print(f"rows={n:>9} ({data_mb:7.1f} MB csv)  {mode:<6} wall={row['wall_s']:8.2f}s  "
+                  f"peak_rss={row['peak_rss_mb']:8.1f} MB  {status}  {'✅' if row['ok'] else '❌'}", flush=True)
+    if args.out:
+        json.dump(results, open(args.out, "w"), indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_waiters.py
+# Fixed 30 s polling (the old deploy loops) vs src/waiters.py on simulated resource timelines.
+#
+# Each trial creates an endpoint (ready after U(--endpoint-min, --endpoint-max) s) and a
+# feature group (ready after U(20, 120) s) on a virtual clock. "fixed" waits for them one
+# after the other with a 30 s sleep between describes, as deploy_canary.py /
+# feature_store_setup.py did; "waiter" waits for both at once with backoff. Reported:
+# turnaround (until both are seen ready), dead time (seen ready - actually ready), describes.
+#
+#   python benchmarks/bench_waiters.py --trials 2000
+import argparse, json, random
+
+import synthetic  # noqa: F401  (puts src/ on sys.path)
+
+import waiters
+from local_aws import LocalSageMaker, SimClock
+
+
+def fixed_poll(sm, clock, kind, name, interval=30.0):
+    method, arg, field = waiters.SPECS[kind][:3]
+    while getattr(sm, method)(**{arg: name})[field] not in waiters.SPECS[kind][3]:
+        clock.sleep(interval)
+
+
+def trial(strategy, ep_ready, fg_ready, seed, max_delay=15.0):
+    clock = SimClock()
+    sm = LocalSageMaker(clock)
+    sm.add("endpoint", "ep", [("Creating", 0), ("InService", ep_ready)])
+    sm.add("feature-group", "fg", [("Creating", 0), ("Created", fg_ready)])
+    if strategy == "fixed":
+        fixed_poll(sm, clock, "endpoint", "ep")
+        fixed_poll(sm, clock, "feature-group", "fg")
+    else:
+        waiters.wait_for(sm, [("endpoint", "ep"), ("feature-group", "fg")], log=None, max_delay=max_delay,
+                         clock=clock, sleep=clock.sleep, rng=random.Random(seed))
+    return clock(), clock() - max(ep_ready, fg_ready), sm.calls
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--trials", type=int, default=1000)
+    p.add_argument("--endpoint-min", type=float, default=60.0)
+    p.add_argument("--endpoint-max", type=float, default=600.0)
+    p.add_argument("--max-delay", type=float, default=15.0, help="waiter backoff cap")
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    timelines = [(rng.uniform(args.endpoint_min, args.endpoint_max), rng.uniform(20, 120))
+                 for _ in range(args.trials)]
+    report = {}
+    for strategy in ("fixed", "waiter"):
+        runs = sorted(trial(strategy, ep, fg, i, args.max_delay) for i, (ep, fg) in enumerate(timelines))
+        dead = sorted(r[1] for r in runs)
+        report[strategy] = {"mean_turnaround_s": round(sum(r[0] for r in runs) / len(runs), 1),
+                            "mean_dead_s": round(sum(dead) / len(dead), 1),
+                            "p95_dead_s": round(dead[int(0.95 * (len(dead) - 1))], 1),
+                            "mean_describes": round(sum(r[2] for r in runs) / len(runs), 1)}
+        print(json.dumps({"strategy": strategy, **report[strategy]}))
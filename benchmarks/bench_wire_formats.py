@@ -0,0 +1,115 @@
+# benchmarks/bench_wire_formats.py
+# Bytes on the wire and latency of the scoring path per request/response format (payloads.py).
+#
+# Trains a booster shaped like train.py's (200 trees, depth 5) and, for every --rows batch size
+# and wire format (bulk_client.WIRE_FORMATS: csv = text/csv in / JSON out, npy, arrow,
+# recordio), measures the median over --repeat of:
+#   client_encode  rows -> request body (csv: the row formatting predict.py does)
+#   input_fn       request body -> float32 matrix (the handler's parse)
+#   predict        predict_fn on that matrix (same for every format; the yardstick)
+#   output_fn      scores -> response body
+#   client_decode  response body -> scores (bulk_client.parse_scores)
+#   http           one POST round trip through local_server.py (all of the above + the socket)
+# and checks that every format returns the same scores as csv.
+#
+#   python benchmarks/bench_wire_formats.py --rows 1000,10000 --repeat 20
+import argparse, json, os, statistics, tempfile, time
+
+import numpy as np
+
+from synthetic import make_raw_frame
+
+import bulk_client
+import inference
+import local_server
+import payloads
+from features import ARTIFACT_NAME, TARGET, TitanicTransformer
+
+
+def build_model(model_dir, rows=20_000):
+    import xgboost as xgb
+    df = make_raw_frame(rows)
+    tf = TitanicTransformer().fit(df)
+    X, y = tf.transform(df), df[TARGET].to_numpy()
+    clf = xgb.XGBClassifier(n_estimators=200, max_depth=5, learning_rate=0.1, subsample=0.8,
+                            colsample_bytree=0.8, random_state=42)
+    clf.fit(X, y)
+    os.makedirs(model_dir, exist_ok=True)
+    clf.save_model(os.path.join(model_dir, "xgboost-model.json"))
+    tf.save(os.path.join(model_dir, ARTIFACT_NAME))
+
+
+def encode_request(X, fmt):
+    content_type, _ = bulk_client.WIRE_FORMATS[fmt]
+    if fmt == "csv":
+        return "\n".join(",".join(repr(float(v)) for v in row) for row in X).encode()
+    return payloads.ENCODERS[content_type](X)
+
+
+def timed(fn, repeat):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return round(statistics.median(times) * 1000, 3), out
+
+
+def bench_format(X, fmt, model, invoke, repeat):
+    content_type, accept = bulk_client.WIRE_FORMATS[fmt]
+    row = {"rows": len(X), "format": fmt}
+    row["client_encode_ms"], body = timed(lambda: encode_request(X, fmt), repeat)
+    row["input_fn_ms"], data = timed(lambda: inference.input_fn(body, content_type), repeat)
+    row["predict_ms"], pred = timed(lambda: inference.predict_fn(data, model), repeat)
+    row["output_fn_ms"], (out, _) = timed(lambda: inference.output_fn(pred, accept), repeat)
+    out = out.encode() if isinstance(out, str) else out
+    row["client_decode_ms"], scores = timed(lambda: bulk_client.parse_scores(out, accept), repeat)
+    row["http_ms"], served = timed(lambda: bulk_client.parse_scores(invoke(body, content_type, accept), accept), repeat)
+    row["request_bytes"], row["response_bytes"] = len(body), len(out)
+    row["codec_ms"] = round(sum(row[k] for k in ("client_encode_ms", "input_fn_ms", "output_fn_ms",
+                                                  "client_decode_ms")), 3)
+    return row, served
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", default="1000,10000")
+    p.add_argument("--formats", default=",".join(bulk_client.WIRE_FORMATS))
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--workdir", default=None)
+    p.add_argument("--out", default=None)
+    args = p.parse_args()
+
+    model_dir = os.path.join(args.workdir or tempfile.mkdtemp(prefix="bench-wire-"), "model")
+    build_model(model_dir)
+    model = inference.model_fn(model_dir)
+    server = local_server.make_server(model_dir, port=0, max_batch_size=0, max_wait_ms=0)
+    invoke = bulk_client.HTTPInvoker(local_server.start_background(server))
+
+    rng = np.random.default_rng(0)
+    tf = TitanicTransformer.load(os.path.join(model_dir, ARTIFACT_NAME))
+    pool = tf.transform(make_raw_frame(max(int(r) for r in args.rows.split(",")), seed=1)).astype(np.float32)
+    pool[rng.random(pool.shape) < 0.02] = np.nan  # some missing values, as in real traffic
+    results = []
+    for n in [int(r) for r in args.rows.split(",")]:
+        X, reference = pool[:n], None
+        for fmt in args.formats.split(","):
+            try:
+                row, scores = bench_format(X, fmt, model, invoke, args.repeat)
+            except ValueError as e:  # e.g. arrow without pyarrow
+                print(f"rows={n:>6}  {fmt:<9} skipped: {e}")
+                continue
+            reference = scores if reference is None else reference
+            row["matches_csv"] = bool(np.allclose(scores, reference, atol=1e-6))
+            results.append(row)
+            print(f"rows={n:>6}  {fmt:<9} req={row['request_bytes']:>9,}B  resp={row['response_bytes']:>8,}B  "
+                  f"codec={row['codec_ms']:8.2f}ms  predict={row['predict_ms']:7.2f}ms  "
+                  f"http={row['http_ms']:8.2f}ms  {'✅' if row['matches_csv'] else '❌'}", flush=True)
+    server.shutdown()
+    server.server_close()
+    if args.out:
+        json.dump(results, open(args.out, "w"), indent=2)
+
+
+if __name__ == "__main__":
+    main()
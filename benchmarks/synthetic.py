@@ -0,0 +1,95 @@
+# benchmarks/synthetic.py
+# Titanic-shaped synthetic data for benchmarks (same columns and rough distributions as
+# data/train.csv, including missing Age/Embarked/Cabin values).
+import os, sys
+
+import numpy as np
+import pandas as pd
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+
+def make_raw_frame(n, seed=0, start_id=1, with_target=True):
+    rng = np.random.default_rng(seed)
+    pclass = rng.choice([1, 2, 3], size=n, p=[0.24, 0.21, 0.55])
+    sex = rng.choice(np.array(["male", "female"], dtype=object), size=n, p=[0.65, 0.35])
+    age = np.round(rng.gamma(4.0, 7.5, size=n), 1)
+    age[rng.random(n) < 0.2] = np.nan
+    embarked = rng.choice(np.array(["S", "C", "Q"], dtype=object), size=n, p=[0.72, 0.19, 0.09])
+    embarked[rng.random(n) < 0.002] = None
+    fare = np.round(rng.lognormal(2.6, 1.0, size=n) * (4 - pclass), 4)
+    df = pd.DataFrame({
+        "PassengerId": np.arange(start_id, start_id + n),
+        "Pclass": pclass,
+        "Name": "Doe, Mr. John",
+        "Sex": sex,
+        "Age": age,
+        "SibSp": rng.poisson(0.5, size=n),
+        "Parch": rng.poisson(0.4, size=n),
+        "Ticket": "A/5 21171",
+        "Fare": fare,
+        "Cabin": None,
+        "Embarked": embarked,
+    })
+    if with_target:
+        logit = 1.5 * (sex == "female") - 0.8 * (pclass - 2) - 0.02 * np.nan_to_num(age, nan=30) + 0.3
+        df.insert(1, "Survived", (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int))
+    return df
+
+
+def write_raw_csv(path, n, chunk=1_000_000, seed=0, with_target=True):
+    """Writes n synthetic rows to `path` in chunks so huge files never sit in memory."""
+    done = 0
+    with open(path, "w", newline="") as f:
+        while done < n:
+            m = min(chunk, n - done)
+            make_raw_frame(m, seed=seed + done, start_id=done + 1, with_target=with_target) \
+                .to_csv(f, index=False, header=done == 0)
+            done += m
+    return path
+
+
+def make_feature_matrix(n, n_features=8, seed=0):
+    """Already-encoded float32 features + binary labels, for model-only benchmarks."""
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, n_features), dtype=np.float32) * 10
+    y = (X[:, 0] + rng.normal(0, 2, n) > 5).astype(np.float32)
+    return X, y
+
+
+def write_capture_files(root, n_files, records_per_file=1000, seed=0, endpoint="titanic-xgboost-endpoint",
+                        base64_rate=0.1):
+    """SageMaker data-capture JSONL files (<endpoint>/AllTraffic/YYYY/MM/DD/HH/*.jsonl) with
+    single-row text/csv inputs and JSON outputs; `base64_rate` of the inputs are base64."""
+    import base64, json
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(n_files):
+        hour = i % 24
+        d = os.path.join(root, endpoint, "AllTraffic", "2024", "01", f"{1 + i // 24:02d}", f"{hour:02d}")
+        os.makedirs(d, exist_ok=True)
+        X, _ = make_feature_matrix(records_per_file, seed=seed + i)
+        scores = 1 / (1 + np.exp(-(X[:, 0] - 5)))
+        path = os.path.join(d, f"capture-{seed}-{i:05d}.jsonl")
+        with open(path, "w") as f:
+            for row, s in zip(X, scores):
+                data = ",".join(f"{v:.4f}" for v in row)
+                enc = "CSV"
+                if rng.random() < base64_rate:
+                    data, enc = base64.b64encode(data.encode()).decode(), "BASE64"
+                f.write(json.dumps({
+                    "captureData": {
+                        "endpointInput": {"observedContentType": "text/csv", "mode": "INPUT", "data": data,
+                                          "encoding": enc},
+                        "endpointOutput": {"observedContentType": "application/json", "mode": "OUTPUT",
+                                           "data": json.dumps({"predictions": [{"score": float(s)}]}),
+                                           "encoding": "JSON"},
+                    },
+                    "eventMetadata": {"eventId": f"{i}-{len(paths)}", "inferenceTime": f"2024-01-01T{hour:02d}:00:00Z",
+                                      "modelLatency": float(rng.gamma(2.0, 1.5))},
+                    "eventVersion": "0",
+                }) + "\n")
+        paths.append(path)
+    return paths
@@ -1,18 +1,8 @@
-import boto3
+# Same as `./titanic-mlops feature-store check --feature-group <name>` (src/check_feature_group.py)
+import os, sys
 
-# Init SageMaker client
-sm_client = boto3.client("sagemaker", region_name="us-east-1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
 
-# Replace with your actual FG name from logs
-fg_name = "titanic-feature-group-20250904144218"
-
-# Describe FG
-response = sm_client.describe_feature_group(FeatureGroupName=fg_name)
-
-print("=== Feature Group Status Check ===")
-print("Name:", response["FeatureGroupName"])
-print("Status:", response["FeatureGroupStatus"])
-print("CreationTime:", response["CreationTime"])
-print("OfflineStoreStatus:", response.get("OfflineStoreStatus", {}))
-print("OnlineStoreStatus:", response.get("OnlineStoreConfig", {}))
+from cli import main  # noqa: E402
 
+sys.exit(main(["feature-store", "check", *sys.argv[1:]]))
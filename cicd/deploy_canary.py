@@ -1,4 +1,9 @@
-import os, json, time, boto3, sagemaker
+import os, sys, json, time, sagemaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import aws_clients  # noqa: E402
+import waiters  # noqa: E402
 
 REGION      = os.getenv("AWS_REGION", "us-east-1")
 ENDPOINT    = os.environ["SAGEMAKER_ENDPOINT_NAME"]     # from GitHub secret
@@ -7,16 +12,17 @@ ROLE        = os.environ["SAGEMAKER_ROLE_ARN"]          # from secret
 VARIANT_OLD = os.getenv("VARIANT_OLD", "AllTraffic")
 VARIANT_NEW = os.getenv("VARIANT_NEW", "Canary")
 NEW_WEIGHT  = float(os.getenv("CANARY_WEIGHT", "0.1"))
+LOAD_RPS    = float(os.getenv("LOAD_TEST_RPS", "0"))         # >0: validate latency under load after the shift
+SLO_P99_MS  = float(os.getenv("SLO_P99_MS", "500"))
 
-sm = boto3.client("sagemaker", region_name=REGION)
-rt = boto3.client("sagemaker-runtime", region_name=REGION)
+sm = aws_clients.client("sagemaker", REGION)
+rt = aws_clients.client("sagemaker-runtime", REGION)
 
 # 1) Describe current endpoint
-econf_name = sm.describe_endpoint(EndpointName=ENDPOINT)["EndpointConfigName"]
-econf = sm.describe_endpoint_config(EndpointConfigName=econf_name)
-pv = econf["ProductionVariants"][0]
-old_model_name = pv["ModelName"]
-variant_name = pv["VariantName"]
+current = aws_clients.resolve_endpoint(ENDPOINT, REGION)
+pv = current["production_variant"]
+old_model_name = current["model_name"]
+variant_name = current["variant"]
 
 # 2) Create a new Model backed by MODEL_DATA
 model_name = f"{ENDPOINT}-xgb-{int(time.time())}"
@@ -50,20 +56,25 @@ sm.create_endpoint_config(EndpointConfigName=new_ec, ProductionVariants=variants
 
 # 4) Update endpoint
 sm.update_endpoint(EndpointName=ENDPOINT, EndpointConfigName=new_ec)
+aws_clients.resolver(REGION).invalidate(ENDPOINT)
 
-# 5) Wait until InService
-while True:
-    status = sm.describe_endpoint(EndpointName=ENDPOINT)["EndpointStatus"]
-    print("Endpoint status:", status, flush=True)
-    if status in ("InService", "Failed"):
-        break
-    time.sleep(30)
-
-if status != "InService":
-    raise RuntimeError("Endpoint update failed; check CloudWatch logs")
+# 5) Wait until InService (backoff polling, logs every status change)
+try:
+    waiters.wait_for(sm, [("endpoint", ENDPOINT)], deadline_s=float(os.getenv("WAIT_DEADLINE_S", "1800")))
+except waiters.WaiterError as e:
+    raise RuntimeError(f"Endpoint update failed ({e}); check CloudWatch logs")
 
 print(json.dumps({
     "new_model": model_name,
     "endpoint_config": new_ec,
     "canary_weight": NEW_WEIGHT
 }, indent=2))
+
+# 6) Optional: open-loop load test, reported per variant (old vs canary)
+if LOAD_RPS > 0:
+    import load_test
+    rc = load_test.main(["--endpoint", ENDPOINT, "--region", REGION, "--rps", str(LOAD_RPS),
+                         "--duration", os.getenv("LOAD_TEST_SECONDS", "60"), "--slo-p99-ms", str(SLO_P99_MS),
+                         "--out", "load_test_report.json"])
+    if rc != 0:
+        raise SystemExit("Canary failed its latency/error SLO under load; see load_test_report.json")
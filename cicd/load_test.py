@@ -0,0 +1,299 @@
+# cicd/load_test.py
+# Open-loop load generator for validating an endpoint (canary, serverless) under load.
+#
+# Requests are sent on a fixed arrival schedule (constant or Poisson, optionally ramped
+# in stages) no matter how slowly the endpoint answers, so a slow endpoint shows up as
+# queueing latency instead of a lower request rate (no coordinated omission: latency is
+# measured from the scheduled send time). Rows are replayed from data/X_test.csv or from
+# data-capture files. Per variant it records an HDR latency histogram and error/throttle
+# counts, then checks them against a p99 SLO.
+#
+#   python cicd/load_test.py --endpoint titanic-xgboost-endpoint --rps 20 --duration 60 --slo-p99-ms 300
+#   python cicd/load_test.py --endpoint ep --ramp 5:30,20:60,50:60 --arrival poisson --variant Canary
+#   python cicd/load_test.py --url http://127.0.0.1:8080 --rps 200 --duration 10
+import argparse, asyncio, itertools, json, os, random, sys, time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from sketches import HdrHistogram  # noqa: E402
+
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailable",
+                  "ServiceUnavailableException", "ModelNotReadyException"}
+
+
+# -----------------------------
+# Arrival schedules
+# -----------------------------
+def parse_ramp(spec):
+    """"5:30,20:60" -> [(5.0, 30.0), (20.0, 60.0)] as (rps, seconds) stages."""
+    stages = []
+    for part in spec.split(","):
+        rps, secs = part.split(":")
+        stages.append((float(rps), float(secs)))
+    return stages
+
+
+def arrivals(stages, poisson=False, seed=0):
+    """Yields send offsets (seconds from start) for the given (rps, seconds) stages."""
+    rng = random.Random(seed)
+    t0 = 0.0
+    for rps, secs in stages:
+        t, end = t0, t0 + secs
+        while rps > 0:
+            t += rng.expovariate(rps) if poisson else 1.0 / rps
+            if t >= end:
+                break
+            yield t
+        t0 = end
+
+
+# -----------------------------
+# Payload sources
+# -----------------------------
+def load_rows(path, limit=100_000):
+    """CSV lines (features only) from a CSV/JSONL file or a directory of capture files."""
+    if os.path.isdir(path):
+        from capture_analyzer import _payload, find_capture_files
+        rows = []
+        for f in find_capture_files(path):
+            with open(f) as fh:
+                for line in fh:
+                    part = json.loads(line).get("captureData", {}).get("endpointInput")
+                    if part:
+                        ct, data = _payload(part)
+                        if ct == "text/csv":
+                            rows.extend(data.strip().splitlines())
+                    if len(rows) >= limit:
+                        return rows
+        return rows
+    from bulk_client import iter_rows
+    return list(itertools.islice(iter_rows(path), limit))
+
+
+# -----------------------------
+# Targets: async send(body) -> variant name
+# -----------------------------
+class Rejected(Exception):
+    def __init__(self, kind, detail=""):
+        super().__init__(detail)
+        self.kind = kind  # "throttle" or "error"
+
+
+class SageMakerTarget:
+    """InvokeEndpoint on a thread pool (boto3 is blocking); reports InvokedProductionVariant."""
+
+    def __init__(self, endpoint, region=None, variant=None, max_inflight=256):
+        import aws_clients
+        self.client = aws_clients.client("sagemaker-runtime", region, max_pool_connections=max_inflight,
+                                         max_attempts=1)
+        self.endpoint, self.variant = endpoint, variant
+        self.pool = ThreadPoolExecutor(max_workers=max_inflight)
+
+    def _invoke(self, body):
+        from botocore.exceptions import BotoCoreError, ClientError
+        kw = {"TargetVariant": self.variant} if self.variant else {}
+        try:
+            resp = self.client.invoke_endpoint(EndpointName=self.endpoint, ContentType="text/csv",
+                                               Accept="application/json", Body=body, **kw)
+            resp["Body"].read()
+            return resp.get("InvokedProductionVariant", self.variant or "default")
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            kind = "throttle" if code in THROTTLE_CODES or status in (429, 503) else "error"
+            raise Rejected(kind, code or str(status))
+        except BotoCoreError as e:
+            raise Rejected("error", type(e).__name__)
+
+    async def send(self, body):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self._invoke, body)
+
+    async def close(self):
+        self.pool.shutdown(wait=False)
+
+
+class HTTPTarget:
+    """Minimal asyncio HTTP/1.1 client with a keep-alive connection pool, for the local
+    /invocations stand-in (src/local_server.py)."""
+
+    def __init__(self, url, variant="local", timeout=30.0):
+        from urllib.parse import urlsplit
+        u = urlsplit(url)
+        self.host, self.port = u.hostname, u.port or 80
+        self.variant = variant
+        self.timeout = timeout  # per request, connect included: a hung socket can't stall the run
+        self.idle = []
+
+    async def _request(self, reader, writer, body):
+        writer.write(b"POST /invocations HTTP/1.1\r\nHost: %s\r\nContent-Type: text/csv\r\n"
+                     b"Accept: application/json\r\nContent-Length: %d\r\n\r\n%s"
+                     % (self.host.encode(), len(body), body))
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length, variant = 0, self.variant
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            key, _, value = line.decode().partition(":")
+            key = key.strip().lower()
+            if key == "content-length":
+                length = int(value)
+            elif key == "x-amzn-invoked-production-variant":
+                variant = value.strip()
+        await reader.readexactly(length)
+        return status, variant
+
+    async def _send(self, body):
+        conn = self.idle.pop() if self.idle else None
+        try:
+            if conn is None:
+                conn = await asyncio.open_connection(self.host, self.port)
+            status, variant = await self._request(*conn, body)
+        except BaseException:  # refused, reset, malformed reply or timed out: drop the socket
+            if conn is not None:
+                conn[1].close()
+            raise
+        self.idle.append(conn)
+        return status, variant
+
+    async def send(self, body):
+        try:
+            status, variant = await asyncio.wait_for(self._send(body), self.timeout)
+        except asyncio.TimeoutError:  # checked first: it is an OSError on Python 3.11+
+            raise Rejected("error", "timeout") from None
+        except (OSError, asyncio.IncompleteReadError, IndexError, ValueError) as e:
+            raise Rejected("error", type(e).__name__) from None
+        if status in (429, 503):
+            raise Rejected("throttle", f"HTTP {status}")
+        if status != 200:
+            raise Rejected("error", f"HTTP {status}")
+        return variant
+
+    async def close(self):
+        for _, writer in self.idle:
+            writer.close()
+
+
+# -----------------------------
+# Run + report
+# -----------------------------
+class VariantStats:
+    def __init__(self):
+        self.latency = HdrHistogram()  # microseconds from scheduled send time
+        self.ok = 0
+        self.errors = 0
+        self.throttles = 0
+        self.error_kinds = {}
+
+    def report(self, duration):
+        total = self.ok + self.errors + self.throttles
+        ms = lambda p: self.latency.percentile(p) / 1000.0
+        return {"requests": total, "ok": self.ok, "errors": self.errors, "throttles": self.throttles,
+                "error_rate": (self.errors + self.throttles) / total if total else 0.0,
+                "rps": total / duration if duration else 0.0,
+                "p50_ms": ms(50), "p90_ms": ms(90), "p99_ms": ms(99), "p999_ms": ms(99.9), "max_ms": ms(100),
+                "error_kinds": self.error_kinds}
+
+
+async def run(target, rows, schedule, max_inflight=256):
+    stats, inflight, dropped = {}, set(), 0
+    rows = itertools.cycle([r.encode() if isinstance(r, str) else r for r in rows])
+    start = time.perf_counter()
+
+    async def fire(due, body):
+        try:
+            variant = await target.send(body)
+            s = stats.setdefault(variant, VariantStats())
+            s.ok += 1
+            s.latency.record((time.perf_counter() - due) * 1e6)
+        except Rejected as e:
+            s = stats.setdefault(getattr(target, "variant", None) or "unknown", VariantStats())
+            if e.kind == "throttle":
+                s.throttles += 1
+            else:
+                s.errors += 1
+            s.error_kinds[str(e)] = s.error_kinds.get(str(e), 0) + 1
+
+    for offset in schedule:
+        due = start + offset
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(inflight) >= max_inflight:  # client-side cap; counted, never silently skipped
+            dropped += 1
+            continue
+        task = asyncio.create_task(fire(due, next(rows)))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+    if inflight:
+        await asyncio.wait(inflight)
+    duration = time.perf_counter() - start
+    await target.close()
+    return stats, dropped, duration
+
+
+def evaluate(stats, dropped, duration, slo_p99_ms, max_error_rate):
+    variants = {v: s.report(duration) for v, s in sorted(stats.items())}
+    failures = []
+    for v, r in variants.items():
+        if r["ok"] and r["p99_ms"] > slo_p99_ms:
+            failures.append(f"{v}: p99 {r['p99_ms']:.1f} ms > SLO {slo_p99_ms:.1f} ms")
+        if r["error_rate"] > max_error_rate:
+            failures.append(f"{v}: error rate {r['error_rate']:.2%} > {max_error_rate:.2%}")
+    if dropped:
+        failures.append(f"{dropped} requests dropped at the client in-flight cap")
+    if not variants:
+        failures.append("no requests completed")
+    return {"duration_s": duration, "dropped": dropped, "slo_p99_ms": slo_p99_ms,
+            "max_error_rate": max_error_rate, "variants": variants, "passed": not failures,
+            "failures": failures}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Open-loop load test against an endpoint or a local stand-in")
+    p.add_argument("--endpoint", default=os.getenv("SAGEMAKER_ENDPOINT_NAME"))
+    p.add_argument("--region", default=os.getenv("AWS_REGION"))
+    p.add_argument("--variant", default=None, help="pin requests to one production variant")
+    p.add_argument("--url", default=None, help="local /invocations server instead of SageMaker")
+    p.add_argument("--rows", default="data/X_test.csv", help="CSV/JSONL of feature rows or a capture directory")
+    p.add_argument("--rps", type=float, default=10.0)
+    p.add_argument("--duration", type=float, default=30.0, help="seconds (ignored with --ramp)")
+    p.add_argument("--ramp", default=None, help="stages as rps:seconds,..., e.g. 5:30,20:60")
+    p.add_argument("--arrival", choices=["constant", "poisson"], default="constant")
+    p.add_argument("--max-inflight", type=int, default=256)
+    p.add_argument("--timeout", type=float, default=30.0, help="--url: seconds per request, connect included")
+    p.add_argument("--slo-p99-ms", type=float, default=500.0)
+    p.add_argument("--max-error-rate", type=float, default=0.01)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", default=None, help="write the JSON report here")
+    args = p.parse_args(argv)
+
+    if not args.url and not args.endpoint:
+        p.error("pass --endpoint (or SAGEMAKER_ENDPOINT_NAME) or --url")
+    rows = load_rows(args.rows)
+    if not rows:
+        p.error(f"no rows in {args.rows}")
+    stages = parse_ramp(args.ramp) if args.ramp else [(args.rps, args.duration)]
+    schedule = arrivals(stages, poisson=args.arrival == "poisson", seed=args.seed)
+    target = (HTTPTarget(args.url, timeout=args.timeout) if args.url
+              else SageMakerTarget(args.endpoint, args.region, args.variant, args.max_inflight))
+    stats, dropped, duration = asyncio.run(run(target, rows, schedule, args.max_inflight))
+    report = evaluate(stats, dropped, duration, args.slo_p99_ms, args.max_error_rate)
+
+    for v, r in report["variants"].items():
+        print(f"{v:<14} n={r['requests']:<7} rps={r['rps']:7.1f}  p50={r['p50_ms']:8.2f}ms  p99={r['p99_ms']:8.2f}ms  "
+              f"p99.9={r['p999_ms']:8.2f}ms  max={r['max_ms']:8.2f}ms  errors={r['errors']}  throttles={r['throttles']}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["passed"]:
+        print(f"✅ PASS: p99 within {args.slo_p99_ms:.0f} ms and error rate within {args.max_error_rate:.1%}")
+        return 0
+    print("❌ FAIL: " + "; ".join(report["failures"]))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
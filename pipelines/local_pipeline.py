@@ -0,0 +1,328 @@
+# pipelines/local_pipeline.py
+# Runs the TitanicXGBPipeline step graph (pipelines/pipeline_up.py) on this machine.
+#
+#   Split ──> Preprocess ──> Baseline
+#     └─────> Train ──> Evaluate ──> QualityGate (auc > AUCThreshold) ──> RegisterModel
+#
+# Processing/training steps run the repo's own scripts (src/preprocess.py, train.py,
+# evaluate.py, baseline_stats.py) as subprocesses. Split, the gate and the registration
+# run in-process. Steps start as soon as their dependencies finish, so independent branches
+# run in parallel.
+#
+# Like CacheConfig(enable_caching=True, expire_after="30d"), a cacheable step is skipped
+# when a previous run had the same cache key. The key is a hash of the step's code (the
+# script plus every src/ module it imports), the content of its input files and its
+# parameters. Outputs live under <work-dir>/steps/<step>/<key>/. Every step's timing and
+# status (ran / cached / skipped / failed) is printed as a JSON line and saved in run.json.
+#
+#   python pipelines/local_pipeline.py --input data/train.csv --auc-threshold 0.80
+#   ./titanic-mlops pipeline local --input data/train.csv --no-cache
+import argparse, ast, hashlib, inspect, json, os, shutil, subprocess, sys, tempfile, time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+SUCCESS = "_SUCCESS"
+
+
+# -----------------------------
+# Hashing
+# -----------------------------
+def _file_digest(path, h):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+
+
+def path_digest(path):
+    """Content hash of a file or a directory tree (names + bytes; the step's own marker excluded)."""
+    h = hashlib.sha256()
+    if os.path.isdir(path):
+        for dirpath, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name == SUCCESS:
+                    continue
+                full = os.path.join(dirpath, name)
+                h.update(os.path.relpath(full, path).encode())
+                _file_digest(full, h)
+    else:
+        _file_digest(path, h)
+    return h.hexdigest()
+
+
+def code_files(script, src=SRC):
+    """`script` plus every src/ module it imports, transitively."""
+    seen, todo = set(), [os.path.abspath(script)]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            names = [a.name for a in node.names] if isinstance(node, ast.Import) else \
+                [node.module] if isinstance(node, ast.ImportFrom) and node.module else []
+            for name in names:
+                candidate = os.path.join(src, name.split(".")[0] + ".py")
+                if os.path.exists(candidate):
+                    todo.append(candidate)
+    return sorted(seen)
+
+
+# -----------------------------
+# Step graph
+# -----------------------------
+class Step:
+    """One node. `run(ctx, out_dir)` does the work; it returns a dict of outputs (paths under
+    out_dir, flags) that downstream steps read from ctx[name]."""
+
+    def __init__(self, name, run, depends_on=(), code=(), inputs=None, params=None, cache=True,
+                 condition=None):
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on)
+        self.code = list(code)  # files whose content is part of the cache key
+        self.inputs = inputs or (lambda ctx: [])  # ctx -> input paths (content-hashed)
+        self.params = params or {}
+        self.cache = cache
+        self.condition = condition  # ctx -> bool; False skips this step
+
+    def cache_key(self, ctx):
+        h = hashlib.sha256(self.name.encode())
+        for path in self.code:
+            h.update(os.path.relpath(path, ROOT).encode())
+            _file_digest(path, h)
+        if not self.code:  # in-process step: its source is its code
+            h.update(inspect.getsource(self.run).encode())
+        for path in self.inputs(ctx):
+            h.update(path_digest(path).encode())
+        h.update(json.dumps(self.params, sort_keys=True, default=str).encode())
+        return h.hexdigest()[:16]
+
+
+def _print(message):
+    print(message, flush=True)  # step records show up live in CI logs
+
+
+def run_pipeline(steps, work_dir, use_cache=True, expire_after_s=30 * 86400, max_parallel=None, log=_print):
+    """Executes `steps` in dependency order, independent ones concurrently; returns the run record.
+    `log` takes one string (print, logging.info, ...). A dependency cycle raises ValueError."""
+    work_dir = os.path.abspath(work_dir)
+    by_name = {s.name: s for s in steps}
+    for s in steps:
+        missing = [d for d in s.depends_on if d not in by_name]
+        if missing:
+            raise ValueError(f"{s.name} depends on unknown step(s) {missing}")
+    ctx, records, state = {}, {}, {}  # state: name -> "done" | "failed" | "skipped"
+    t_start = time.perf_counter()
+
+    def execute(step):
+        t0 = time.perf_counter()
+        key = step.cache_key(ctx) if step.cache else None
+        out_dir = os.path.join(work_dir, "steps", step.name, key or "latest")
+        marker = os.path.join(out_dir, SUCCESS)
+        if key and use_cache and os.path.exists(marker) and time.time() - os.path.getmtime(marker) < expire_after_s:
+            with open(marker) as f:
+                return "cached", json.load(f), key, time.perf_counter() - t0
+        os.makedirs(os.path.dirname(out_dir), exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f".{step.name}-", dir=os.path.dirname(out_dir))
+        try:
+            outputs = step.run(ctx, tmp) or {}
+            outputs = {k: v.replace(tmp, out_dir) if isinstance(v, str) else v for k, v in outputs.items()}
+            with open(os.path.join(tmp, SUCCESS), "w") as f:
+                json.dump(outputs, f)
+            shutil.rmtree(out_dir, ignore_errors=True)
+            os.replace(tmp, out_dir)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return "ran", outputs, key, time.perf_counter() - t0
+
+    def finish(name, status, seconds=0.0, key=None, error=None):
+        state[name] = "failed" if status == "failed" else "skipped" if status == "skipped" else "done"
+        records[name] = {"step": name, "status": status, "seconds": round(seconds, 3), "cache_key": key}
+        if error:
+            records[name]["error"] = error
+        if log:
+            log(json.dumps(records[name]))
+
+    os.makedirs(work_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_parallel or len(steps)) as pool:
+        running = {}
+        while len(state) < len(steps):
+            settled = len(state)
+            for s in steps:
+                if s.name in state or s.name in running.values():
+                    continue
+                deps = [state.get(d) for d in s.depends_on]
+                if any(d in ("failed", "skipped") for d in deps):
+                    finish(s.name, "skipped")
+                elif all(d == "done" for d in deps):
+                    if s.condition is not None and not s.condition(ctx):
+                        finish(s.name, "skipped")
+                    else:
+                        running[pool.submit(execute, s)] = s.name
+            if not running:
+                if len(state) == settled:  # nothing can start and nothing will finish
+                    stuck = [s.name for s in steps if s.name not in state]
+                    raise ValueError(f"Dependency cycle among steps {stuck}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    status, outputs, key, seconds = fut.result()
+                except Exception as e:  # noqa: BLE001 - reported, dependents are skipped
+                    finish(name, "failed", error=f"{type(e).__name__}: {e}")
+                    continue
+                ctx[name] = outputs
+                finish(name, status, seconds, key)
+    run = {"seconds": round(time.perf_counter() - t_start, 3), "steps": [records[s.name] for s in steps],
+           "outputs": ctx, "succeeded": all(r["status"] != "failed" for r in records.values())}
+    with open(os.path.join(work_dir, "run.json"), "w") as f:
+        json.dump(run, f, indent=2)
+    return run
+
+
+# -----------------------------
+# TitanicXGBPipeline, locally
+# -----------------------------
+def _script(name, *args):
+    # LINEAGE=0: step outputs live in temp dirs; RegisterModel indexes the final artifact instead
+    proc = subprocess.run([sys.executable, os.path.join(SRC, name), *map(str, args)], capture_output=True, text=True,
+                          env={**os.environ, "LINEAGE": "0"})
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} exited with {proc.returncode}: {proc.stderr.strip()[-2000:]}")
+    return proc.stdout
+
+
+def split(input_path, test_fraction, seed):
+    def run(ctx, out):
+        import csv_cache
+        df = csv_cache.read_csv(input_path)
+        test = df.sample(frac=test_fraction, random_state=seed)
+        df.drop(test.index).to_csv(os.path.join(out, "train.csv"), index=False)
+        test.to_csv(os.path.join(out, "test.csv"), index=False)
+        return {"train": os.path.join(out, "train.csv"), "test": os.path.join(out, "test.csv")}
+    return run
+
+
+def preprocess(ctx, out):
+    _script("preprocess.py", "--train", ctx["Split"]["train"], "--test", ctx["Split"]["test"], "--out-dir", out)
+    return {"X_train": os.path.join(out, "X_train.csv"), "X_test": os.path.join(out, "X_test.csv"),
+            "preprocessor": os.path.join(out, "preprocessor.json")}
+
+
+def train(hpo_config=None):
+    def run(ctx, out):
+        _script("train.py", "--train", ctx["Split"]["train"], "--model-dir", out,
+                *(["--hpo-config", hpo_config] if hpo_config else []))
+        return {"model_dir": out}
+    return run
+
+
+def evaluate(ctx, out):
+    metrics = os.path.join(out, "metrics.json")
+    _script("evaluate.py", "--test", ctx["Split"]["test"], "--model_artifact", ctx["Train"]["model_dir"],
+            "--out", metrics)
+    return {"metrics": metrics}
+
+
+def baseline(ctx, out):
+    _script("baseline_stats.py", ctx["Preprocess"]["X_train"], "--out-dir", out)
+    return {"statistics": os.path.join(out, "statistics.json"), "constraints": os.path.join(out, "constraints.json")}
+
+
+def auc_of(ctx):
+    with open(ctx["Evaluate"]["metrics"]) as f:
+        return json.load(f)["auc"]
+
+
+def quality_gate(threshold):
+    def run(ctx, out):
+        auc = auc_of(ctx)
+        return {"auc": auc, "threshold": threshold, "passed": auc > threshold}  # ConditionGreaterThan
+    return run
+
+
+def register(registry_dir, group, input_path):
+    def run(ctx, out):
+        """Local model package group: <registry>/<group>/<version>/ with the model and its metrics."""
+        group_dir = os.path.join(registry_dir, group)
+        os.makedirs(group_dir, exist_ok=True)
+        version = 1 + max([int(v) for v in os.listdir(group_dir) if v.isdigit()], default=0)
+        dest = os.path.join(group_dir, str(version))
+        shutil.copytree(ctx["Train"]["model_dir"], dest, ignore=shutil.ignore_patterns(SUCCESS))
+        shutil.copy(ctx["Evaluate"]["metrics"], os.path.join(dest, "metrics.json"))
+        with open(os.path.join(dest, "package.json"), "w") as f:
+            json.dump({"group": group, "version": version, "approval_status": "PendingManualApproval",
+                       "auc": ctx["QualityGate"]["auc"], "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())},
+                      f, indent=2)
+        import lineage
+        with open(ctx["Evaluate"]["metrics"]) as f:
+            metrics = json.load(f)
+        job = lineage.record("record_job", f"pipeline-{group}-{version}", status="Completed", source="local-pipeline",
+                             artifact_uri=dest, data_uri=input_path, data_hash=lineage.file_hash(input_path),
+                             metrics=metrics)
+        lineage.record("record_package", f"{group}/{version}", group, dest, job_name=job)
+        return {"model_package": dest, "version": version}
+    return run
+
+
+def titanic_pipeline(input_path, auc_threshold=0.80, group="titanic-xgboost", registry_dir="model_registry",
+                     test_fraction=0.2, seed=42, hpo_config=None):
+    script = lambda name: code_files(os.path.join(SRC, name))
+    return [
+        Step("Split", split(input_path, test_fraction, seed), inputs=lambda ctx: [input_path],
+             params={"test_fraction": test_fraction, "seed": seed}),
+        Step("Preprocess", preprocess, ["Split"], code=script("preprocess.py"),
+             inputs=lambda ctx: [ctx["Split"]["train"], ctx["Split"]["test"]]),
+        Step("Train", train(hpo_config), ["Split"], code=script("train.py"),
+             inputs=lambda ctx: [ctx["Split"]["train"]] + ([hpo_config] if hpo_config else [])),
+        Step("Evaluate", evaluate, ["Train"], code=script("evaluate.py"),
+             inputs=lambda ctx: [ctx["Split"]["test"], ctx["Train"]["model_dir"]]),
+        Step("Baseline", baseline, ["Preprocess"], code=script("baseline_stats.py"),
+             inputs=lambda ctx: [ctx["Preprocess"]["X_train"]]),
+        Step("QualityGate", quality_gate(auc_threshold), ["Evaluate"], cache=False),
+        Step("RegisterModel", register(registry_dir, group, input_path), ["QualityGate"], cache=False,
+             condition=lambda ctx: ctx["QualityGate"]["passed"]),
+    ]
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Run the Titanic pipeline DAG locally with step caching")
+    p.add_argument("--input", default=os.getenv("INPUT_DATA_URI", "data/train.csv"), help="labelled raw CSV")
+    p.add_argument("--auc-threshold", type=float, default=float(os.getenv("AUC_THRESHOLD", "0.80")))
+    p.add_argument("--model-package-group", default=os.getenv("MODEL_PACKAGE_GROUP", "titanic-xgboost"))
+    p.add_argument("--registry-dir", default="model_registry")
+    p.add_argument("--work-dir", default=".pipeline")
+    p.add_argument("--hpo-config", default=None, help="best.json from hpo.py for the Train step")
+    p.add_argument("--no-cache", action="store_true", help="run every step even if a cached result exists")
+    p.add_argument("--expire-after-days", type=float, default=30, help="like CacheConfig expire_after")
+    p.add_argument("--max-parallel", type=int, default=None)
+    args = p.parse_args(argv)
+
+    steps = titanic_pipeline(args.input, args.auc_threshold, args.model_package_group, args.registry_dir,
+                             hpo_config=args.hpo_config)
+    run = run_pipeline(steps, args.work_dir, use_cache=not args.no_cache,
+                       expire_after_s=args.expire_after_days * 86400, max_parallel=args.max_parallel)
+    gate = run["outputs"].get("QualityGate", {})
+    if not run["succeeded"]:
+        failed = [r["step"] for r in run["steps"] if r["status"] == "failed"]
+        print(f"❌ Pipeline failed at {', '.join(failed)} ({run['seconds']:.1f}s)")
+        return 1
+    cached = sum(r["status"] == "cached" for r in run["steps"])
+    if gate.get("passed"):
+        print(f"✅ AUC {gate['auc']:.4f} > {gate['threshold']} -> registered "
+              f"{run['outputs']['RegisterModel']['model_package']} ({run['seconds']:.1f}s, {cached} steps cached)")
+    else:
+        print(f"⚠️ AUC {gate.get('auc', float('nan')):.4f} <= {args.auc_threshold}: not registered "
+              f"({run['seconds']:.1f}s, {cached} steps cached)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 # pipelines/pipeline_up.py
 import os
-import boto3
+import sys
 import sagemaker
 
 from sagemaker import image_uris
@@ -16,17 +16,21 @@ from sagemaker.workflow.condition_step import ConditionStep
 from sagemaker.workflow.conditions import ConditionGreaterThan
 from sagemaker.model_metrics import ModelMetrics, MetricsSource
 
-from sagemaker.sklearn.processing import SKLearnProcessor
-from sagemaker.processing import ProcessingInput, ProcessingOutput
+from sagemaker.sklearn.estimator import SKLearn
+from sagemaker.processing import FrameworkProcessor, ProcessingInput, ProcessingOutput
+from sagemaker.workflow.pipeline_context import PipelineSession
 
 # Compatible import across SDK versions
 from sagemaker.workflow.step_collections import RegisterModel
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import aws_clients  # noqa: E402
+
 
 # -------- Region / Sessions --------
 REGION = os.getenv("AWS_REGION", "us-east-1")
-sess: Session = sagemaker.Session(boto_session=boto3.Session(region_name=REGION))
-sm = boto3.client("sagemaker", region_name=REGION)
+sess: Session = aws_clients.sagemaker_session(REGION)
+sm = aws_clients.client("sagemaker", REGION)
 
 # -------- Instance types (override via env if needed) --------
 # XGBoost built-in training only supports certain types; ml.m4.xlarge is allowed.
@@ -37,11 +41,7 @@ TRAIN_INSTANCE_TYPE = os.getenv("TRAIN_INSTANCE_TYPE", "ml.m4.xlarge")
 
 def infer_role_from_endpoint(endpoint_name: str) -> str:
     """Infer the execution role from the currently deployed model behind an endpoint."""
-    ep = sm.describe_endpoint(EndpointName=endpoint_name)
-    cfg = sm.describe_endpoint_config(EndpointConfigName=ep["EndpointConfigName"])
-    model_name = cfg["ProductionVariants"][0]["ModelName"]
-    model = sm.describe_model(ModelName=model_name)
-    return model["ExecutionRoleArn"]
+    return aws_clients.resolve_endpoint(endpoint_name, REGION)["role"]
 
 
 # -------- Execution Role --------
@@ -72,33 +72,47 @@ AUCThreshold = ParameterFloat(
 # Enable caching for faster subsequent runs
 cache = CacheConfig(enable_caching=True, expire_after="30d")
 
+# Under a PipelineSession, processor.run() only builds the step arguments (no job starts)
+pipeline_sess = PipelineSession(boto_session=sess.boto_session, sagemaker_client=sm,
+                                default_bucket=sess.default_bucket())
+
+
+def src_processor(instance_type):
+    """SKLearn container that gets all of src/ (source_dir), not just the entry script: the
+    scripts import features.py, csv_cache.py, ... and src/requirements.txt is installed."""
+    return FrameworkProcessor(
+        estimator_cls=SKLearn,
+        framework_version="1.2-1",
+        role=ROLE_ARN,
+        instance_count=1,
+        instance_type=instance_type,
+        sagemaker_session=pipeline_sess,
+    )
+
+
 # -------- Step: Preprocess (uses YOUR src/preprocess.py) --------
-sk_proc = SKLearnProcessor(
-    framework_version="1.2-1",
-    role=ROLE_ARN,
-    instance_count=1,
-    instance_type=PROC_INSTANCE_TYPE,
-    sagemaker_session=sess,
-)
+sk_proc = src_processor(PROC_INSTANCE_TYPE)
 
 preprocess_step = ProcessingStep(
     name="Preprocess",
-    processor=sk_proc,
-    code="src/preprocess.py",
-    inputs=[
-        ProcessingInput(
-            source=InputDataUri,  # s3://.../titanic.csv
-            destination="/opt/ml/processing/input",
-        )
-    ],
-    job_arguments=[
-        "--input", "/opt/ml/processing/input/titanic.csv",
-        "--target", "Survived",
-    ],
-    outputs=[
-        ProcessingOutput(source="/opt/ml/processing/train", output_name="train"),
-        ProcessingOutput(source="/opt/ml/processing/test",  output_name="test"),
-    ],
+    step_args=sk_proc.run(
+        code="preprocess.py",
+        source_dir="src",
+        inputs=[
+            ProcessingInput(
+                source=InputDataUri,  # s3://.../titanic.csv
+                destination="/opt/ml/processing/input",
+            )
+        ],
+        arguments=[
+            "--input", "/opt/ml/processing/input/titanic.csv",
+            "--target", "Survived",
+        ],
+        outputs=[
+            ProcessingOutput(source="/opt/ml/processing/train", output_name="train"),
+            ProcessingOutput(source="/opt/ml/processing/test",  output_name="test"),
+        ],
+    ),
     cache_config=cache,
 )
 
@@ -141,30 +155,26 @@ train_step = TrainingStep(
 # -------- Step: Evaluate (writes metrics.json) --------
 eval_prop = PropertyFile(name="EvalMetrics", output_name="metrics", path="metrics.json")
 
-eval_proc = SKLearnProcessor(
-    framework_version="1.2-1",
-    role=ROLE_ARN,
-    instance_count=1,
-    instance_type=EVAL_INSTANCE_TYPE,
-    sagemaker_session=sess,
-)
+eval_proc = src_processor(EVAL_INSTANCE_TYPE)
 
 evaluate_step = ProcessingStep(
     name="Evaluate",
-    processor=eval_proc,
-    code="src/evaluate.py",
-    inputs=[
-        ProcessingInput(
-            source=preprocess_step.properties.ProcessingOutputConfig.Outputs["test"].S3Output.S3Uri,
-            destination="/opt/ml/processing/test",
-        )
-    ],
-    job_arguments=[
-        "--test", "/opt/ml/processing/test/test.csv",
-        "--model_artifact", train_step.properties.ModelArtifacts.S3ModelArtifacts,
-        "--out", "/opt/ml/processing/output/metrics.json",
-    ],
-    outputs=[ProcessingOutput(source="/opt/ml/processing/output", output_name="metrics")],
+    step_args=eval_proc.run(
+        code="evaluate.py",
+        source_dir="src",
+        inputs=[
+            ProcessingInput(
+                source=preprocess_step.properties.ProcessingOutputConfig.Outputs["test"].S3Output.S3Uri,
+                destination="/opt/ml/processing/test",
+            )
+        ],
+        arguments=[
+            "--test", "/opt/ml/processing/test/test.csv",
+            "--model_artifact", train_step.properties.ModelArtifacts.S3ModelArtifacts,
+            "--out", "/opt/ml/processing/output/metrics.json",
+        ],
+        outputs=[ProcessingOutput(source="/opt/ml/processing/output", output_name="metrics")],
+    ),
     property_files=[eval_prop],
 )
 
@@ -7,11 +7,16 @@ MODEL_NAME=""
 VARIANT_NAME="AllTraffic"
 MEM_MB=2048
 MAX_CONCURRENCY=5
-TEST_ROW="3,1,34,0,0,7.8292,2"
+TEST_ROW="3,34.5,0,0,7.8292,1,1,0"  # Pclass,Age,SibSp,Parch,Fare,Sex_male,Embarked_Q,Embarked_S
+LOAD_RPS=0
+SLO_P99_MS=500
 
 usage() {
   cat <<USAGE
 Usage: $0 --endpoint <name> --model <model-name> [--variant <variant-name>] [--region <aws-region>] [--mem <MB>] [--maxc <N>]
+          [--load-rps <RPS> [--slo-p99-ms <ms>]]   # open-loop load test after the smoke invoke
+Cold starts: deploy a serving bundle (src/serving_bundle.py, handler inference_lite.py) and pick
+--mem with: python benchmarks/bench_cold_start.py --model model/ --slo-ms <ttfp SLO>
 Example:
   $0 --endpoint titanic-xgboost-endpoint-1757260241 \
      --model sagemaker-xgboost-2025-09-07-15-50-46-469 \
@@ -27,6 +32,8 @@ while [[ $# -gt 0 ]]; do
     --region) REGION="$2"; shift 2 ;;
     --mem) MEM_MB="$2"; shift 2 ;;
     --maxc) MAX_CONCURRENCY="$2"; shift 2 ;;
+    --load-rps) LOAD_RPS="$2"; shift 2 ;;
+    --slo-p99-ms) SLO_P99_MS="$2"; shift 2 ;;
     -h|--help) usage; exit 0 ;;
     *) echo "Unknown arg: $1"; usage; exit 1 ;;
   esac
@@ -60,6 +67,9 @@ if [[ "$EXISTS" == "1" ]]; then
   read -r -p "Endpoint '$ENDPOINT' exists and will be DELETED before recreation. Type 'YES' to proceed: " CONFIRM
   [[ "$CONFIRM" == "YES" ]] || { echo "Aborted by user."; exit 1; }
   aws sagemaker delete-endpoint --endpoint-name "$ENDPOINT" --region "$REGION"
+  # create-endpoint with the same name fails while the old one is still Deleting
+  python "$(dirname "$0")/src/waiters.py" endpoint-deleted "$ENDPOINT" --region "$REGION" --deadline 900 \
+    || { echo "Timeout waiting for the old endpoint to be deleted."; exit 3; }
 fi
 
 aws sagemaker create-endpoint \
@@ -68,16 +78,9 @@ aws sagemaker create-endpoint \
   --region "$REGION" >/dev/null
 
 echo "Waiting for endpoint to be InService..."
-for i in {1..80}; do
-  STATUS=$(aws sagemaker describe-endpoint --endpoint-name "$ENDPOINT" --region "$REGION" \
-    --query "EndpointStatus" --output text || echo "UNKNOWN")
-  echo "  [$i/80] Status: $STATUS"
-  [[ "$STATUS" == "InService" ]] && break
-  [[ "$STATUS" == "Failed" ]] && { echo "Creation FAILED"; exit 2; }
-  sleep 30
-done
-
-[[ "$STATUS" == "InService" ]] || { echo "Timeout waiting for InService."; exit 3; }
+# exit codes: 2 = creation failed, 3 = timed out
+python "$(dirname "$0")/src/waiters.py" endpoint "$ENDPOINT" --region "$REGION" --deadline 2400 \
+  || exit $?
 
 aws sagemaker-runtime invoke-endpoint \
   --endpoint-name "$ENDPOINT" --region "$REGION" \
@@ -85,6 +88,13 @@ aws sagemaker-runtime invoke-endpoint \
   --body "$TEST_ROW" out.json >/dev/null || { echo "Invoke failed"; exit 4; }
 
 echo "Response:"; cat out.json; echo
+
+if [[ "$LOAD_RPS" != "0" ]]; then
+  echo "Load testing at ${LOAD_RPS} rps (p99 SLO ${SLO_P99_MS} ms)..."
+  python "$(dirname "$0")/cicd/load_test.py" --endpoint "$ENDPOINT" --region "$REGION" \
+    --rps "$LOAD_RPS" --duration 60 --slo-p99-ms "$SLO_P99_MS" --out load_test_report.json \
+    || { echo "Load test FAILED (see load_test_report.json)"; exit 5; }
+fi
 echo "✅ Serverless endpoint is ready: $ENDPOINT"
 [[ -n "${ECONFIG_OLD:-}" && "$ECONFIG_OLD" != "None" ]] && \
   echo "Rollback (recreate provisioned): delete endpoint, then:
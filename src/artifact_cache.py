@@ -0,0 +1,235 @@
+# src/artifact_cache.py
+# Persistent local cache for model.tar.gz artifacts.
+#
+# Entries are keyed by S3 URI + ETag, so a re-uploaded artifact gets a new entry and an
+# unchanged one is never downloaded twice. Only the model file and preprocessor.json are
+# extracted from the tarball. Downloads go to a temp dir that is renamed into place under a
+# per-entry file lock, so concurrent processes never see half-written entries. Entries are
+# evicted least-recently-used once the cache exceeds its size limit. Loaded boosters are
+# additionally memoized per process.
+#
+# Tunables (env vars):
+#   ARTIFACT_CACHE_DIR     cache location (default ~/.cache/titanic-mlops/artifacts)
+#   ARTIFACT_CACHE_MAX_MB  size limit (default 1024)
+import contextlib, hashlib, os, shutil, tarfile, tempfile, threading, time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "titanic-mlops", "artifacts"))
+MAX_BYTES = int(float(os.getenv("ARTIFACT_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+MODEL_FILENAMES = ("xgboost-model.json", "xgboost-model.ubj", "xgboost-model")
+EXTRA_MEMBERS = ("preprocessor.json", "bundle.json")
+BUNDLE_DIR = "compiled"  # serving_bundle.py's memory-mappable node tables
+COMPLETE = ".complete"
+
+
+def find_model_file(model_dir):
+    for name in MODEL_FILENAMES:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"No model file ({', '.join(MODEL_FILENAMES)}) in {model_dir}")
+
+
+def split_s3_uri(uri):
+    bucket, _, key = uri.replace("s3://", "", 1).partition("/")
+    return bucket, key
+
+
+class ArtifactCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES, s3=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        self._s3 = s3
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            import boto3
+            self._s3 = boto3.client("s3")
+        return self._s3
+
+    # -----------------------------
+    # Keys / locking
+    # -----------------------------
+    def version_of(self, uri):
+        """Artifact version: the S3 ETag, or size+mtime for local files."""
+        if uri.startswith("s3://"):
+            bucket, key = split_s3_uri(uri)
+            return self.s3.head_object(Bucket=bucket, Key=key)["ETag"].strip('"')
+        st = os.stat(uri)
+        return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+    @staticmethod
+    def entry_key(uri, version):
+        return hashlib.sha256(f"{uri}\0{version}".encode()).hexdigest()[:32]
+
+    def _lock_path(self, key):
+        return os.path.join(self.cache_dir, f".{key}.lock")
+
+    @contextlib.contextmanager
+    def _lock(self, key):
+        path = self._lock_path(key)
+        while True:
+            f = open(path, "a")
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:  # eviction may have unlinked the file while we waited: lock the current one
+                if not fcntl or os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            f.close()
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    # -----------------------------
+    # Fetch
+    # -----------------------------
+    def fetch(self, uri, version=None):
+        """Returns a local directory holding the extracted model (+ preprocessor.json).
+
+        `uri` may be s3://.../model.tar.gz, a local .tar.gz, or an already-extracted
+        directory (returned as-is).
+        """
+        if os.path.isdir(uri):
+            return uri
+        version = version or self.version_of(uri)
+        key = self.entry_key(uri, version)
+        entry = os.path.join(self.cache_dir, key)
+        if os.path.exists(os.path.join(entry, COMPLETE)):
+            self.hits += 1
+            os.utime(entry)  # LRU bookkeeping
+            return entry
+        with self._lock(key):
+            if os.path.exists(os.path.join(entry, COMPLETE)):  # another process finished it
+                self.hits += 1
+                return entry
+            self.misses += 1
+            tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=self.cache_dir)
+            try:
+                tar_path = os.path.join(tmp, "model.tar.gz")
+                if uri.startswith("s3://"):
+                    bucket, k = split_s3_uri(uri)
+                    self.s3.download_file(bucket, k, tar_path)
+                else:
+                    shutil.copyfile(uri, tar_path)
+                self._extract(tar_path, tmp)
+                os.remove(tar_path)
+                open(os.path.join(tmp, COMPLETE), "w").close()
+                shutil.rmtree(entry, ignore_errors=True)
+                os.rename(tmp, entry)
+            except BaseException:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise
+        self.evict(keep=key)
+        return entry
+
+    @staticmethod
+    def _extract(tar_path, dst):
+        wanted = set(MODEL_FILENAMES) | set(EXTRA_MEMBERS)
+        found = False
+        with tarfile.open(tar_path, "r:*") as t:
+            for m in t:
+                name = os.path.basename(m.name)
+                parent = os.path.basename(os.path.dirname(os.path.normpath(m.name)))
+                if not m.isfile() or (name not in wanted and parent != BUNDLE_DIR):
+                    continue
+                src = t.extractfile(m)
+                if parent == BUNDLE_DIR:
+                    os.makedirs(os.path.join(dst, BUNDLE_DIR), exist_ok=True)
+                    name = os.path.join(BUNDLE_DIR, name)
+                with open(os.path.join(dst, name), "wb") as out:  # basenames only: no path traversal
+                    shutil.copyfileobj(src, out)
+                found = found or name in MODEL_FILENAMES
+        if not found:
+            raise FileNotFoundError(f"No model member ({', '.join(MODEL_FILENAMES)}) in {tar_path}")
+
+    # -----------------------------
+    # Eviction
+    # -----------------------------
+    def _entries(self):
+        out = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.exists(os.path.join(path, COMPLETE)):
+                continue
+            size = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(path) for f in fs)  # + compiled/
+            out.append((os.path.getmtime(path), size, name))
+        return sorted(out)
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:  # oldest first
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            with self._lock(name):
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+                os.remove(self._lock_path(name))
+            total -= size
+
+
+_default = None
+_boosters = {}
+_boosters_lock = threading.Lock()
+
+
+def default_cache():
+    global _default
+    if _default is None:
+        _default = ArtifactCache()
+    return _default
+
+
+def fetch(uri):
+    return default_cache().fetch(uri)
+
+
+def load_booster(uri, cache=None):
+    """Booster for an artifact, memoized per process by (uri, version)."""
+    import xgboost as xgb
+    cache = cache or default_cache()
+    version = None if os.path.isdir(uri) else cache.version_of(uri)
+    key = (uri, version)
+    with _boosters_lock:
+        booster = _boosters.get(key)
+    if booster is None:
+        model_dir = cache.fetch(uri, version)
+        booster = xgb.Booster()
+        booster.load_model(find_model_file(model_dir))
+        with _boosters_lock:
+            booster = _boosters.setdefault(key, booster)
+    return booster
+
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser(description="Fetch model artifacts into the local cache")
+    p.add_argument("uris", nargs="*")
+    p.add_argument("--clear", action="store_true")
+    args = p.parse_args()
+    cache = default_cache()
+    if args.clear:
+        shutil.rmtree(cache.cache_dir, ignore_errors=True)
+        print("Cleared", cache.cache_dir)
+    for uri in args.uris:
+        t0 = time.perf_counter()
+        print(f"{uri} -> {cache.fetch(uri)} ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+    if not args.clear:
+        print(f"{cache.cache_dir}: {cache.total_bytes() / 1e6:.1f} MB (limit {cache.max_bytes / 1e6:.0f} MB)")
@@ -0,0 +1,229 @@
+# src/aws_clients.py
+# Shared boto3 sessions/clients and a cached endpoint -> config -> model resolver.
+#
+# client("sagemaker") builds a client on first use and hands the same one to every later
+# caller with the same settings. All clients of a region share one boto3 Session, so the
+# service models are loaded from disk once per process instead of once per script/module.
+# Connection-pool size and retry mode/attempts are tunable per call or by env var. Cached
+# clients are dropped in forked children (they must not share the parent's sockets).
+#
+# resolve_endpoint(name) follows DescribeEndpoint -> DescribeEndpointConfig -> DescribeModel
+# once and returns the role, image, artifact, variant, ... that register_model.py,
+# monitor_setup.py, pipeline_up.py and deploy_canary.py used to look up separately. Describe
+# results are memoized for DESCRIBE_CACHE_TTL_S; with DESCRIBE_CACHE_FILE set they are also
+# kept on disk, so consecutive CI scripts share them (keys carry the region; every write
+# re-reads the file under a lock and merges, so concurrent scripts don't drop each other's entries).
+#
+# Tunables (env vars):
+#   AWS_MAX_POOL_CONNECTIONS  urllib3 pool size per client (default 10)
+#   AWS_RETRY_MODE            legacy | standard | adaptive (default standard)
+#   AWS_MAX_ATTEMPTS          total attempts per call, including the first (default 5)
+#   DESCRIBE_CACHE_TTL_S      seconds a describe_* result is reused (default 300)
+#   DESCRIBE_CACHE_FILE       optional JSON file shared between processes
+import contextlib, json, os, threading, time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+REGION = os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION") or "us-east-1"
+MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "10"))
+RETRY_MODE = os.getenv("AWS_RETRY_MODE", "standard")
+MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "5"))
+DESCRIBE_TTL = float(os.getenv("DESCRIBE_CACHE_TTL_S", "300"))
+DESCRIBE_FILE = os.getenv("DESCRIBE_CACHE_FILE")
+
+_lock = threading.RLock()
+_sessions = {}  # region -> boto3.Session
+_clients = {}  # (service, region, endpoint_url, pool, mode, attempts, extra) -> client
+_sm_sessions = {}  # region -> sagemaker.Session
+_resolvers = {}  # region -> DescribeCache
+counters = {"clients_created": 0, "client_hits": 0}
+
+
+def _reset_after_fork():
+    global _lock
+    _lock = threading.RLock()
+    _sessions.clear()
+    _clients.clear()
+    _sm_sessions.clear()
+    _resolvers.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# -----------------------------
+# Clients
+# -----------------------------
+def session(region=None):
+    """One boto3 Session per region (its loader caches service models)."""
+    region = region or REGION
+    with _lock:
+        if region not in _sessions:
+            import boto3
+            _sessions[region] = boto3.Session(region_name=region)
+        return _sessions[region]
+
+
+def client(service, region=None, max_pool_connections=None, retry_mode=None, max_attempts=None,
+           endpoint_url=None, **config):
+    """Shared boto3 client. `config` takes extra botocore Config options (timeouts, ...)."""
+    region = region or REGION
+    pool = max(int(max_pool_connections or MAX_POOL_CONNECTIONS), 1)
+    mode = retry_mode or RETRY_MODE
+    attempts = int(max_attempts or MAX_ATTEMPTS)
+    key = (service, region, endpoint_url, pool, mode, attempts, tuple(sorted(config.items())))
+    with _lock:
+        c = _clients.get(key)
+        if c is not None:
+            counters["client_hits"] += 1
+            return c
+        from botocore.config import Config
+        cfg = Config(max_pool_connections=pool, retries={"total_max_attempts": attempts, "mode": mode}, **config)
+        kw = {}
+        if endpoint_url:  # local stand-in: any credentials will do
+            kw = {"endpoint_url": endpoint_url, "aws_access_key_id": "local", "aws_secret_access_key": "local"}
+        c = _clients[key] = session(region).client(service, config=cfg, **kw)
+        counters["clients_created"] += 1
+        return c
+
+
+def sagemaker_session(region=None):
+    """sagemaker.Session built on the shared boto3 Session and clients."""
+    region = region or REGION
+    with _lock:
+        if region not in _sm_sessions:
+            import sagemaker
+            _sm_sessions[region] = sagemaker.Session(
+                boto_session=session(region), sagemaker_client=client("sagemaker", region),
+                sagemaker_runtime_client=client("sagemaker-runtime", region))
+        return _sm_sessions[region]
+
+
+# -----------------------------
+# Cached describe_* lookups
+# -----------------------------
+class DescribeCache:
+    """TTL-memoized describe_* calls, keyed by (region, method, identifier)."""
+
+    def __init__(self, sm, ttl_seconds=DESCRIBE_TTL, path=DESCRIBE_FILE, clock=time.time, region=None):
+        self.sm = sm
+        self.region = region or getattr(getattr(sm, "meta", None), "region_name", None) or REGION
+        self.ttl = float(ttl_seconds)
+        self.path = path
+        self.clock = clock
+        self.stats = {"calls": 0, "hits": 0}
+        self._entries = {}  # "region:method:name" -> (fetched_at, response)
+        self._lock = threading.Lock()
+        if path:
+            self._entries = self._read()
+
+    def _key(self, method, name):
+        return f"{self.region}:{method}:{name}"
+
+    def describe(self, method, arg, name):
+        key = self._key(method, name)
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.stats["hits"] += 1
+                return entry[1]
+        resp = getattr(self.sm, method)(**{arg: name})
+        resp = {k: v for k, v in resp.items() if k != "ResponseMetadata"}
+        with self._lock:
+            self.stats["calls"] += 1
+            self._entries[key] = (now, resp)
+            self._save(updates={key: (now, resp)})
+        return resp
+
+    # -----------------------------
+    # Shared file
+    # -----------------------------
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return {k: tuple(v) for k, v in json.load(f).items()}
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        with open(f"{self.path}.lock", "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _save(self, updates=None, removed=()):
+        """Merge this process's changes into the file as it is now (other processes write it too)."""
+        if not self.path:
+            return
+        with self._file_lock():
+            entries = self._read()
+            for key in removed:
+                entries.pop(key, None)
+            entries.update(updates or {})
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(entries, f, default=str)  # datetimes -> str
+            os.replace(tmp, self.path)
+        for key, entry in entries.items():  # pick up what other processes fetched meanwhile
+            if key not in self._entries or entry[0] > self._entries[key][0]:
+                self._entries[key] = entry
+
+    def invalidate(self, name=None):
+        """Forget this region's entries, or every cached lookup of `name` (call after updating it)."""
+        with self._lock:
+            if self.path:  # also entries only other processes had cached
+                self._entries.update({k: v for k, v in self._read().items() if k not in self._entries})
+            prefix = f"{self.region}:"
+            removed = [key for key in self._entries
+                       if key.startswith(prefix) and (name is None or key.split(":", 2)[2] == name)]
+            for key in removed:
+                del self._entries[key]
+            self._save(removed=removed)
+
+    def endpoint(self, name):
+        return self.describe("describe_endpoint", "EndpointName", name)
+
+    def endpoint_config(self, name):
+        return self.describe("describe_endpoint_config", "EndpointConfigName", name)
+
+    def model(self, name):
+        return self.describe("describe_model", "ModelName", name)
+
+    def resolve(self, endpoint, variant=None):
+        """Endpoint -> its config, production variant, model, role, image and artifact."""
+        ep = self.endpoint(endpoint)
+        cfg = self.endpoint_config(ep["EndpointConfigName"])
+        variants = cfg["ProductionVariants"]
+        pv = next((v for v in variants if v["VariantName"] == variant), None) if variant else variants[0]
+        if pv is None:
+            raise KeyError(f"Endpoint {endpoint} has no variant {variant!r}")
+        model = self.model(pv["ModelName"])
+        container = model.get("PrimaryContainer") or model.get("Containers", [{}])[0]
+        return {"endpoint": endpoint, "endpoint_status": ep.get("EndpointStatus"),
+                "endpoint_config": ep["EndpointConfigName"], "variant": pv["VariantName"],
+                "production_variant": pv, "production_variants": variants, "model_name": pv["ModelName"],
+                "role": model.get("ExecutionRoleArn"), "image": container.get("Image"),
+                "model_data": container.get("ModelDataUrl"), "data_capture": cfg.get("DataCaptureConfig")}
+
+
+def resolver(region=None):
+    """The process-wide DescribeCache for `region`."""
+    region = region or REGION
+    with _lock:
+        if region not in _resolvers:
+            _resolvers[region] = DescribeCache(client("sagemaker", region), region=region)
+        return _resolvers[region]
+
+
+def resolve_endpoint(endpoint, region=None, variant=None):
+    return resolver(region).resolve(endpoint, variant)
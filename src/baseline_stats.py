@@ -0,0 +1,222 @@
+# src/baseline_stats.py
+# Local replacement for the Model Monitor "suggest baseline" processing job.
+#
+# Streams a CSV (e.g. data/X_train.csv, the matrix the endpoint is fed) in chunks and keeps
+# one mergeable summary per column: present/missing counts, sum/sum of squares, min/max, a
+# KLL quantile sketch and a HyperLogLog distinct count (FrequencySketch for string columns).
+# The result is written as statistics.json / constraints.json in the shapes the
+# DefaultModelMonitor job produces, so create_monitoring_schedule can use them directly.
+#
+# Columns are named _c0.._cN as the monitor names header-less captured CSV, unless
+# --keep-names is given.
+#
+#   python src/baseline_stats.py data/X_train.csv --out-dir baseline/
+import argparse, json, os, time
+
+import numpy as np
+import pandas as pd
+
+import csv_cache
+from sketches import FrequencySketch, HyperLogLog, KLLSketch
+
+KLL_K = 2048
+KLL_C = 2.0 / 3.0  # KLLSketch's capacity decay
+BUCKETS = 10
+MAX_DOMAIN = 20  # string columns with at most this many values get a domain constraint
+
+
+class ColumnStats:
+    def __init__(self, name, k=KLL_K):
+        self.name = name
+        self.present = 0
+        self.missing = 0
+        self.numeric = True
+        self.integral = True
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.kll = KLLSketch(k)
+        self.hll = HyperLogLog()
+        self.freq = None  # FrequencySketch once the column turns out to be a string column
+        self.typed = False  # the first chunk with values fixes numeric vs string
+
+    def _to_strings(self):
+        # only before any value was seen, so there is nothing but the missing count to carry
+        self.numeric = False
+        self.freq = FrequencySketch(capacity=4096)
+        self.freq.missing = self.missing
+
+    def update(self, col):
+        if self.numeric and col.dtype == object:
+            num = pd.to_numeric(col, errors="coerce")
+            if not self.typed and (num.isna() & col.notna() & (col.astype(str) != "")).any():
+                self._to_strings()
+            else:  # once numeric, stray strings count as missing (what the monitor's type check flags)
+                col = num
+        if not self.numeric:
+            self.freq.update(col.to_numpy(dtype=object))
+            self.present, self.missing = self.freq.n, self.freq.missing
+            self.typed = self.typed or self.present > 0
+            return self
+        v = col.to_numpy(dtype=np.float64)
+        nan = np.isnan(v)
+        present = v[~nan]
+        self.missing += int(nan.sum())
+        self.present += present.size
+        if present.size:
+            self.typed = True
+            self.integral = self.integral and bool(np.all(present == np.floor(present)))
+            self.sum += float(present.sum())
+            self.sumsq += float(np.dot(present, present))
+            self.kll.update(present)
+            self.hll.update(present)
+        return self
+
+    def merge(self, other):
+        if self.typed and other.typed and self.numeric != other.numeric:
+            raise ValueError(f"Column {self.name} is numeric in one part and string in another")
+        if self.numeric and not other.numeric:
+            self._to_strings()
+        self.present += other.present
+        self.missing += other.missing
+        self.integral = self.integral and other.integral
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.kll.merge(other.kll)
+        self.hll.merge(other.hll)
+        if not self.numeric:
+            if other.freq is not None:
+                self.freq = self.freq.merge(other.freq)
+            else:  # other saw only missing values
+                self.freq.missing += other.missing
+        self.typed = self.typed or other.typed
+        return self
+
+    @property
+    def inferred_type(self):
+        if not self.numeric:
+            return "String"
+        return "Integral" if self.integral else "Fractional"
+
+    def statistics(self):
+        common = {"num_present": self.present, "num_missing": self.missing}
+        if not self.numeric:
+            buckets = sorted(self.freq.counts.items(), key=lambda kv: -kv[1])
+            return {"name": self.name, "inferred_type": "String", "string_statistics": {
+                "common": common, "distinct_count": float(self.freq.distinct()),
+                "distribution": {"categorical": {"buckets": [{"value": v, "count": c} for v, c in buckets]}}}}
+        n = max(self.present, 1)
+        mean = self.sum / n
+        std = float(np.sqrt(max(self.sumsq / n - mean * mean, 0.0)))
+        lo, hi = (self.kll.min, self.kll.max) if self.present else (0.0, 0.0)
+        edges = np.linspace(lo, hi, BUCKETS + 1)
+        cdf = np.asarray([self.kll.rank(e) for e in edges[1:]]) if self.present else np.zeros(BUCKETS)
+        counts = np.diff(np.concatenate([[0.0], cdf])) * self.present
+        return {"name": self.name, "inferred_type": self.inferred_type, "numerical_statistics": {
+            "common": common, "mean": mean, "sum": self.sum, "std_dev": std, "min": lo, "max": hi,
+            "approximate_num_distinct_values": float(self.hll.count()),
+            "distribution": {"kll": {
+                "buckets": [{"lower_bound": float(a), "upper_bound": float(b), "count": float(c)}
+                            for a, b, c in zip(edges[:-1], edges[1:], counts)],
+                "sketch": {"parameters": {"c": KLL_C, "k": float(self.kll.k)},
+                           "data": [level.tolist() for level in self.kll.levels]},
+            }}}}
+
+    def constraints(self):
+        total = self.present + self.missing
+        out = {"name": self.name, "inferred_type": self.inferred_type,
+               "completeness": self.present / total if total else 1.0}
+        if self.numeric:
+            out["num_constraints"] = {"is_non_negative": bool(self.present and self.kll.min >= 0)}
+        elif self.freq.distinct() <= MAX_DOMAIN:
+            out["string_constraints"] = {"domains": self.freq.levels()}
+        return out
+
+
+class BaselineStats:
+    """Column summaries for a whole dataset; chunks (or workers) merge with merge()."""
+
+    def __init__(self, names=None):
+        self.columns = [ColumnStats(n) for n in names] if names else []
+        self.rows = 0
+
+    def update(self, df):
+        if not self.columns:
+            self.columns = [ColumnStats(str(c)) for c in df.columns]
+        for stats, col in zip(self.columns, df.columns):
+            stats.update(df[col])
+        self.rows += len(df)
+        return self
+
+    def merge(self, other):
+        if not self.columns:
+            self.columns = other.columns
+        else:
+            for mine, theirs in zip(self.columns, other.columns):
+                mine.merge(theirs)
+        self.rows += other.rows
+        return self
+
+    def statistics(self):
+        return {"version": 0.0, "dataset": {"item_count": self.rows},
+                "features": [c.statistics() for c in self.columns]}
+
+    def constraints(self):
+        return {"version": 0.0, "features": [c.constraints() for c in self.columns],
+                "monitoring_config": {
+                    "evaluate_constraints": "Enabled", "emit_metrics": "Enabled",
+                    "datatype_check_threshold": 1.0, "domain_content_threshold": 1.0,
+                    "distribution_constraints": {"perform_comparison": "Enabled", "comparison_threshold": 0.1,
+                                                 "comparison_method": "Robust"}}}
+
+
+def has_header(path):
+    with open(path) as f:
+        first = f.readline().strip().split(",")
+    try:
+        [float(v) for v in first if v != ""]
+        return False
+    except ValueError:
+        return True
+
+
+def compute(path, chunksize=500_000, keep_names=False, drop=()):
+    """CSV -> BaselineStats, streaming `chunksize` rows at a time."""
+    header = "infer" if has_header(path) else None
+    stats = None
+    for chunk in csv_cache.read_csv_chunks(path, chunksize, header=header):
+        chunk = chunk.drop(columns=[c for c in drop if c in chunk.columns])
+        if stats is None:
+            names = [str(c) for c in chunk.columns] if keep_names else [f"_c{i}" for i in range(chunk.shape[1])]
+            stats = BaselineStats(names)
+        stats.update(chunk)
+    return stats or BaselineStats()
+
+
+def write(stats, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for name, doc in (("statistics.json", stats.statistics()), ("constraints.json", stats.constraints())):
+        paths[name] = os.path.join(out_dir, name)
+        with open(paths[name], "w") as f:
+            json.dump(doc, f, indent=2)
+    return paths["statistics.json"], paths["constraints.json"]
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("input", help="CSV the endpoint is fed (features only), e.g. data/X_train.csv")
+    p.add_argument("--out-dir", default="baseline")
+    p.add_argument("--chunksize", type=int, default=500_000)
+    p.add_argument("--keep-names", action="store_true", help="use the header's names instead of _c0.._cN")
+    p.add_argument("--drop", default="", help="comma list of columns to leave out (e.g. a label)")
+    args = p.parse_args(argv)
+
+    t0 = time.perf_counter()
+    stats = compute(args.input, args.chunksize, args.keep_names, [c for c in args.drop.split(",") if c])
+    stats_path, constraints_path = write(stats, args.out_dir)
+    print(f"✅ {stats.rows} rows x {len(stats.columns)} columns in {time.perf_counter() - t0:.2f}s -> "
+          f"{stats_path}, {constraints_path}")
+
+
+if __name__ == "__main__":
+    main()
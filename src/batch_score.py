@@ -0,0 +1,164 @@
+# src/batch_score.py
+# Local batch transform: raw passenger CSV (data/test.csv layout) -> PassengerId,Survived.
+#
+# The input is memory-mapped and cut into byte-range shards that end on line boundaries
+# (records must not contain embedded newlines). A process pool scores the shards; each
+# worker loads the model and preprocessor.json once and parses, transforms and scores its
+# shard in chunks, writing a part file. The parent appends finished parts to the output in
+# shard order as soon as every earlier shard is done, so the output is ordered like the
+# input and memory stays bounded by (workers x chunk) whatever the file size.
+#
+#   python src/batch_score.py data/test.csv --model model/ --out submission.csv
+#   python src/batch_score.py big.csv --model s3://.../model.tar.gz --out scores.csv --score --workers 8
+import argparse, csv, io, json, mmap, os, shutil, tempfile, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+SHARD_BYTES = 64 << 20
+CHUNK_ROWS = 200_000
+
+
+# -----------------------------
+# Sharding
+# -----------------------------
+def shard_ranges(path, shard_bytes=SHARD_BYTES, header=True):
+    """[(start, end)] byte ranges covering the file's data lines, each ending after a newline."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = mm.find(b"\n") + 1 if header else 0
+        if header and start == 0:  # header only, no newline
+            return []
+        ranges = []
+        while start < size:
+            end = min(start + shard_bytes, size)
+            if end < size:
+                nl = mm.find(b"\n", end - 1)
+                end = size if nl == -1 else nl + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_header(path):
+    with open(path, newline="") as f:
+        return next(csv.reader([f.readline()]))
+
+
+# -----------------------------
+# Workers
+# -----------------------------
+_worker = {}
+
+
+def _init_worker(path, columns, model_path, transformer_path, engine, threshold, id_column, with_score):
+    from features import CATEGORICAL, NUMERIC, TitanicTransformer
+    from tree_compiler import make_predictor
+    booster = None
+    if engine == "xgboost":
+        import xgboost as xgb
+        booster = xgb.Booster()
+        booster.load_model(model_path)
+        booster.set_param({"nthread": 1})  # parallelism comes from the process pool
+    needed = set(NUMERIC + CATEGORICAL + [id_column])  # skip parsing Name, Ticket, Cabin, ...
+    _worker.update(path=path, columns=columns, usecols=[c for c in columns if c in needed], predict=make_predictor(engine, model_path, booster),
+                   transformer=TitanicTransformer.load(transformer_path), threshold=threshold,
+                   id_column=id_column, with_score=with_score)
+
+
+def _score_shard(index, start, end, part_path, chunk_rows=CHUNK_ROWS):
+    import numpy as np
+    import pandas as pd
+    w = _worker
+    rows = 0
+    with open(w["path"], "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            open(part_path, "w") as out:
+        reader = pd.read_csv(io.BytesIO(mm[start:end]), header=None, names=w["columns"],
+                             usecols=w["usecols"], chunksize=chunk_rows, dtype={w["id_column"]: str})
+        for chunk in reader:
+            proba = np.asarray(w["predict"](w["transformer"].transform(chunk)), dtype=np.float64)
+            cols = {w["id_column"]: chunk[w["id_column"]].to_numpy(),
+                    "Survived": (proba >= w["threshold"]).astype(np.int8)}
+            if w["with_score"]:
+                cols["score"] = np.round(proba, 6)
+            pd.DataFrame(cols).to_csv(out, header=False, index=False)
+            rows += len(chunk)
+    return index, rows
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def score_file(path, out_path, model, engine="xgboost", workers=None, shard_bytes=SHARD_BYTES, threshold=0.5,
+               id_column="PassengerId", with_score=False):
+    """Scores every row of `path` into `out_path`; returns run stats."""
+    import artifact_cache
+    from features import ARTIFACT_NAME
+
+    t0 = time.perf_counter()
+    model_dir = artifact_cache.fetch(model)
+    model_path = artifact_cache.find_model_file(model_dir)
+    transformer_path = os.path.join(model_dir, ARTIFACT_NAME)
+    if not os.path.exists(transformer_path):
+        raise FileNotFoundError(f"{model} has no {ARTIFACT_NAME}; raw CSVs need the fitted transformer")
+    columns = read_header(path)
+    if id_column not in columns:
+        raise ValueError(f"{path} has no {id_column} column (columns: {columns})")
+    ranges = shard_ranges(path, shard_bytes)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(ranges) or 1))
+
+    rows, next_index, finished = 0, 0, {}
+    part_dir = tempfile.mkdtemp(prefix=".batch-score-", dir=os.path.dirname(os.path.abspath(out_path)))
+    part = lambda i: os.path.join(part_dir, f"part-{i:06d}.csv")
+    try:
+        with open(out_path, "w") as out, ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(path, columns, model_path, transformer_path, engine, threshold, id_column, with_score)) as pool:
+            out.write(",".join([id_column, "Survived"] + (["score"] if with_score else [])) + "\n")
+            queue, pending = iter(enumerate(ranges)), set()
+            while True:
+                for i, (start, end) in queue:  # bounded read-ahead: 2 shards per worker
+                    pending.add(pool.submit(_score_shard, i, start, end, part(i)))
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i, n = fut.result()
+                    finished[i] = n
+                while next_index in finished:  # append completed parts in input order
+                    rows += finished.pop(next_index)
+                    with open(part(next_index)) as src:
+                        shutil.copyfileobj(src, out, 1 << 20)
+                    os.remove(part(next_index))
+                    next_index += 1
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+    seconds = time.perf_counter() - t0
+    return {"rows": rows, "shards": len(ranges), "workers": workers, "engine": engine,
+            "seconds": seconds, "rows_per_sec": rows / seconds if seconds else 0.0}
+
+
+def main(argv=None):
+    from tree_compiler import ENGINES
+    p = argparse.ArgumentParser(description="Score a raw passenger CSV locally -> PassengerId,Survived[,score]")
+    p.add_argument("input", help="raw CSV with a header, e.g. data/test.csv")
+    p.add_argument("--model", required=True, help="model dir, model.tar.gz or s3://.../model.tar.gz")
+    p.add_argument("--out", default="submission.csv")
+    p.add_argument("--workers", type=int, default=None, help="default: all cores")
+    p.add_argument("--shard-mb", type=float, default=SHARD_BYTES / (1 << 20))
+    p.add_argument("--engine", default="xgboost", choices=ENGINES, help="see tree_compiler.py")
+    p.add_argument("--threshold", type=float, default=0.5)
+    p.add_argument("--id-column", default="PassengerId")
+    p.add_argument("--score", action="store_true", help="also write the predicted probability")
+    args = p.parse_args(argv)
+
+    stats = score_file(args.input, args.out, args.model, args.engine, args.workers, int(args.shard_mb * (1 << 20)),
+                       args.threshold, args.id_column, args.score)
+    print(json.dumps({k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}))
+    print(f"✅ {stats['rows']} rows scored at {stats['rows_per_sec']:.0f} rows/s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
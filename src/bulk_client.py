@@ -0,0 +1,294 @@
+# src/bulk_client.py
+# Concurrent bulk scoring against a SageMaker endpoint (or a local stand-in).
+#
+# Rows are streamed from a JSONL or CSV file, packed into multi-row payloads up to the
+# endpoint's size limit, and sent with a bounded number of InvokeEndpoint calls in flight
+# over one pooled client. Throttled calls are retried with jittered exponential backoff,
+# and predictions are written back in input order.
+#
+# Wire formats (--wire-format; request / response content types, see payloads.py):
+#   csv       text/csv / application/json (default; works with any handler)
+#   npy       application/x-npy both ways, float32
+#   arrow     application/vnd.apache.arrow.stream both ways (needs pyarrow on both sides)
+#   recordio  application/x-recordio-protobuf both ways
+import csv, http.client, json, random, threading, time, urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+import payloads
+
+WIRE_FORMATS = {
+    "csv": ("text/csv", "application/json"),
+    "npy": ("application/x-npy", "application/x-npy"),
+    "arrow": ("application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.stream"),
+    "recordio": ("application/x-recordio-protobuf", "application/x-recordio-protobuf"),
+}
+MAX_PAYLOAD_BYTES = 5_000_000  # SageMaker real-time limit is 6 MB; keep headroom
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailable",
+                  "ServiceUnavailableException", "InternalServerError"}
+
+
+class Throttled(Exception):
+    """Raised by an invoker when the endpoint asks us to slow down (retryable)."""
+
+
+# -----------------------------
+# Invokers: body bytes -> response bytes
+# -----------------------------
+class SageMakerInvoker:
+    """InvokeEndpoint over one boto3 client whose connection pool fits `concurrency`."""
+
+    def __init__(self, endpoint, region=None, concurrency=8, variant=None):
+        import aws_clients
+        self.client = aws_clients.client("sagemaker-runtime", region, max_pool_connections=max(10, concurrency),
+                                         max_attempts=1)  # we retry ourselves
+        self.endpoint = endpoint
+        self.variant = variant
+
+    def __call__(self, body, content_type="text/csv", accept="application/json"):
+        from botocore.exceptions import ClientError
+        kw = {"TargetVariant": self.variant} if self.variant else {}
+        try:
+            resp = self.client.invoke_endpoint(EndpointName=self.endpoint, ContentType=content_type,
+                                               Accept=accept, Body=body, **kw)
+        except ClientError as e:
+            err = e.response.get("Error", {})
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if err.get("Code") in THROTTLE_CODES or status in (429, 503):
+                raise Throttled(str(e)) from e
+            raise
+        return resp["Body"].read()
+
+
+class HTTPInvoker:
+    """POSTs to a local /invocations server (src/local_server.py) with keep-alive per thread."""
+
+    def __init__(self, url):
+        self.netloc = urllib.parse.urlsplit(url).netloc
+        self._local = threading.local()
+
+    def __call__(self, body, content_type="text/csv", accept="application/json"):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.netloc, timeout=60)
+        try:
+            conn.request("POST", "/invocations", body=body,
+                         headers={"Content-Type": content_type, "Accept": accept})
+            resp = conn.getresponse()
+            data = resp.read()
+        except (ConnectionError, http.client.HTTPException):
+            self._local.conn = None
+            raise Throttled("connection dropped")
+        if resp.status in (429, 503):
+            raise Throttled(f"HTTP {resp.status}")
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}: {data[:200]!r}")
+        return data
+
+
+class LocalInvoker:
+    """Calls src/inference.py in-process, optionally adding latency and random throttling
+    so client-side concurrency and retry behaviour can be benchmarked offline."""
+
+    def __init__(self, model_dir, latency_ms=0.0, throttle_rate=0.0, seed=0):
+        import inference
+        self.inference = inference
+        self.model = inference.model_fn(model_dir)
+        self.latency = latency_ms / 1000.0
+        self.throttle_rate = throttle_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, body, content_type="text/csv", accept="application/json"):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            throttled = self._rng.random() < self.throttle_rate
+        if throttled:
+            raise Throttled("simulated throttle")
+        inf = self.inference
+        out, _ = inf.output_fn(inf.predict_fn(inf.input_fn(body, content_type), self.model), accept)
+        return out.encode() if isinstance(out, str) else out
+
+
+# -----------------------------
+# Input streaming and packing
+# -----------------------------
+def _format_row(values):
+    return ",".join("" if v is None or v != v else repr(float(v)) for v in values)
+
+
+def iter_rows(path, transformer=None):
+    """Yields one CSV line (numeric features, no newline) per input row.
+
+    JSONL lines may be numeric arrays, {"features": [...]}, or raw passenger records;
+    raw records (and CSVs with a raw header) need the fitted `transformer`.
+    """
+    if path.endswith((".jsonl", ".json", ".ndjson")):
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                obj = json.loads(line)
+                if isinstance(obj, dict) and "features" in obj:
+                    obj = obj["features"]
+                if isinstance(obj, dict):
+                    if transformer is None:
+                        raise ValueError("Raw records need --preprocessor (preprocessor.json)")
+                    obj = transformer.transform_row(obj).tolist()
+                yield _format_row(obj)
+        return
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return
+        header = None if _is_numeric(first) else first
+        if header is None:
+            yield ",".join(first)
+        for row in reader:
+            if header is not None and transformer is not None:
+                yield _format_row(transformer.transform_row(dict(zip(header, row))).tolist())
+            elif header is None or _is_numeric(row):  # a header over numeric rows is just skipped
+                yield ",".join(row)
+            else:  # re-joining raw fields would drop their quoting ("Braund, Mr. Owen")
+                raise ValueError("Raw records need --preprocessor (preprocessor.json)")
+
+
+def _is_numeric(row):
+    try:
+        [float(v) for v in row if v != ""]
+        return True
+    except ValueError:
+        return False
+
+
+def pack(lines, max_bytes=MAX_PAYLOAD_BYTES, max_rows=None):
+    """Groups CSV lines into payloads: yields (first_row_index, n_rows, body_bytes)."""
+    buf, size, start, i = [], 0, 0, 0
+    for i, line in enumerate(lines):
+        b = line.encode()
+        if buf and (size + len(b) + 1 > max_bytes or (max_rows and len(buf) >= max_rows)):
+            yield start, len(buf), b"\n".join(buf)
+            buf, size, start = [], 0, i
+        buf.append(b)
+        size += len(b) + 1
+    if buf:
+        yield start, len(buf), b"\n".join(buf)
+
+
+def pack_binary(lines, content_type, max_bytes=MAX_PAYLOAD_BYTES, max_rows=None):
+    """Like pack(), but each batch of CSV lines is encoded as a float32 matrix in `content_type`."""
+    encode = payloads.ENCODERS[content_type]
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    k = first.count(",") + 1
+    one, two = (len(encode(np.zeros((n, k), np.float32))) for n in (1, 2))
+    per_row, overhead = two - one, 2 * one - two  # every binary format is linear in rows
+    rows = max(1, (max_bytes - overhead) // per_row)
+    if max_rows:
+        rows = min(rows, max_rows)
+    buf, start = [first], 0
+    for i, line in enumerate(lines, 1):
+        if len(buf) >= rows:
+            yield start, len(buf), encode(payloads.parse_csv("\n".join(buf)))
+            buf, start = [], i
+        buf.append(line)
+    yield start, len(buf), encode(payloads.parse_csv("\n".join(buf)))
+
+
+def parse_scores(data, accept="application/json"):
+    """Response bytes -> float32 scores (our JSON handler, the built-in CSV output, or a binary
+    format when `accept` asked for one)."""
+    accept = payloads.negotiate(accept)
+    if accept in payloads.ENCODERS:
+        return np.asarray(payloads.PARSERS[accept](data), dtype=np.float32).ravel()
+    text = data.decode() if isinstance(data, (bytes, bytearray)) else data
+    text = text.strip()
+    if text.startswith("{"):
+        obj = json.loads(text)
+        return np.asarray([p["score"] if isinstance(p, dict) else p for p in obj["predictions"]], dtype=np.float32)
+    if text.startswith("["):
+        return np.asarray(json.loads(text), dtype=np.float32).ravel()
+    return np.fromstring(text.replace("\n", ","), dtype=np.float32, sep=",")
+
+
+# -----------------------------
+# Client
+# -----------------------------
+class BulkScorer:
+    def __init__(self, invoke, concurrency=8, max_payload_bytes=MAX_PAYLOAD_BYTES, max_rows=None,
+                 max_retries=8, base_backoff=0.05, max_backoff=5.0, wire_format="csv"):
+        self.invoke = invoke
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"Unknown wire format {wire_format!r}; expected one of {', '.join(WIRE_FORMATS)}")
+        self.wire_format = wire_format
+        self.content_type, self.accept = WIRE_FORMATS[wire_format]
+        self.concurrency = max(1, int(concurrency))
+        self.max_payload_bytes = max_payload_bytes
+        self.max_rows = max_rows
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.stats = {"rows": 0, "requests": 0, "retries": 0, "seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def _call(self, body, n_rows):
+        for attempt in range(self.max_retries + 1):
+            try:
+                scores = parse_scores(self.invoke(body, self.content_type, self.accept), self.accept)
+                break
+            except Throttled:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                # full jitter: sleep U(0, min(cap, base * 2^attempt))
+                time.sleep(random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt)))
+        if scores.size != n_rows:
+            raise RuntimeError(f"Endpoint returned {scores.size} scores for {n_rows} rows")
+        with self._lock:
+            self.stats["requests"] += 1
+        return scores
+
+    def score(self, lines):
+        """Yields score arrays in input order; at most `concurrency` calls are in flight and
+        at most 2x that many payloads are buffered, so arbitrarily large inputs stream."""
+        t0 = time.perf_counter()
+        if self.wire_format == "csv":
+            batches = pack(lines, self.max_payload_bytes, self.max_rows)
+        else:
+            batches = pack_binary(lines, self.content_type, self.max_payload_bytes, self.max_rows)
+        pending, done, next_seq = {}, {}, 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for seq, (_, n, body) in enumerate(batches):
+                pending[pool.submit(self._call, body, n)] = seq
+                while len(pending) + len(done) >= 2 * self.concurrency:
+                    next_seq = yield from self._drain(pending, done, next_seq)
+            while pending:
+                next_seq = yield from self._drain(pending, done, next_seq)
+        self.stats["seconds"] = time.perf_counter() - t0
+
+    def _drain(self, pending, done, next_seq):
+        if pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                done[pending.pop(fut)] = fut.result()
+        while next_seq in done:
+            scores = done.pop(next_seq)
+            self.stats["rows"] += scores.size
+            yield scores
+            next_seq += 1
+        return next_seq
+
+    def score_file(self, path, out_path, transformer=None):
+        with open(out_path, "w") as out:
+            out.write("score\n")
+            for scores in self.score(iter_rows(path, transformer)):
+                out.write("\n".join(repr(float(s)) for s in scores) + "\n")
+        s = self.stats
+        s["rows_per_sec"] = s["rows"] / s["seconds"] if s["seconds"] else 0.0
+        return s
@@ -0,0 +1,311 @@
+# src/capture_analyzer.py
+# Reads back the data-capture JSONL files written by an endpoint with capture enabled
+# (src/enable_data_capture.py) and aggregates what the model saw and predicted.
+#
+# Capture files are walked under a local directory (for S3, mirror the prefix first with
+# `aws s3 sync s3://<bucket>/datacapture/<endpoint>/ captures/`) and fanned out across a
+# process pool. Within a file, all CSV payloads (plain or base64) are joined and decoded in
+# one NumPy call; JSON payloads go through the handlers' parsers (payloads.py). Each worker
+# returns a mergeable CaptureStats (KLL quantile sketches per feature, an exact prediction
+# histogram, counts), and the results are merged in the parent.
+#
+# Runs are incremental: the merged state and, per file, the byte offset read up to live in
+# --state-dir, so an hourly run only reads captures (and appended lines) that arrived since
+# the last one. A file that shrank was replaced and is read again from the start.
+#
+#   python src/capture_analyzer.py captures/ --state-dir capture_state/ --out capture_report.json
+import argparse, base64, json, os, pickle, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sketches import KLLSketch
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+LATENCY_KEYS = ("modelLatency", "latencyMs", "latency")  # eventMetadata fields, if the capture has them
+STATE_FILE = "state.pkl"
+
+
+class CaptureStats:
+    """Mergeable aggregates over captured requests."""
+
+    def __init__(self, prediction_bins=20, k=200):
+        self.k = k
+        self.records = 0
+        self.rows = 0
+        self.bad_records = 0
+        self.features = []  # one KLLSketch per input column
+        self.widths = {}  # row width -> count
+        self.pred_hist = np.zeros(prediction_bins, dtype=np.int64)
+        self.predictions = KLLSketch(k)
+        self.latency = KLLSketch(k)
+        self.first_event = None
+        self.last_event = None
+
+    def update(self, X, scores=None, latencies=None):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if X.size:
+            while len(self.features) < X.shape[1]:
+                self.features.append(KLLSketch(self.k))
+            for j in range(X.shape[1]):
+                self.features[j].update(X[:, j])
+            self.widths[X.shape[1]] = self.widths.get(X.shape[1], 0) + X.shape[0]
+            self.rows += X.shape[0]
+        if scores is not None and len(scores):
+            s = np.asarray(scores, dtype=np.float64).ravel()
+            self.predictions.update(s)
+            bins = np.clip((s * self.pred_hist.size).astype(np.int64), 0, self.pred_hist.size - 1)
+            self.pred_hist += np.bincount(bins[~np.isnan(s)], minlength=self.pred_hist.size)
+        if latencies is not None and len(latencies):
+            self.latency.update(latencies)
+        return self
+
+    def seen(self, event_times):
+        if event_times:
+            lo, hi = min(event_times), max(event_times)
+            self.first_event = lo if self.first_event is None else min(self.first_event, lo)
+            self.last_event = hi if self.last_event is None else max(self.last_event, hi)
+
+    def merge(self, other):
+        self.records += other.records
+        self.rows += other.rows
+        self.bad_records += other.bad_records
+        while len(self.features) < len(other.features):
+            self.features.append(KLLSketch(self.k))
+        for mine, theirs in zip(self.features, other.features):
+            mine.merge(theirs)
+        for w, c in other.widths.items():
+            self.widths[w] = self.widths.get(w, 0) + c
+        self.pred_hist += other.pred_hist
+        self.predictions.merge(other.predictions)
+        self.latency.merge(other.latency)
+        self.seen([t for t in (other.first_event, other.last_event) if t is not None])
+        return self
+
+    @staticmethod
+    def _summary(sketch, hist_bins=None):
+        out = {"count": sketch.n, "missing": sketch.nan_count,
+               "mean": sketch.mean, "min": sketch.min if sketch.n else None,
+               "max": sketch.max if sketch.n else None,
+               "quantiles": {f"p{int(q * 100):02d}": float(v) for q, v in zip(QUANTILES, sketch.quantile(QUANTILES))}}
+        if hist_bins and sketch.n:
+            # approximate histogram from the sketch's CDF on equal-width bins
+            edges = np.linspace(sketch.min, sketch.max, hist_bins + 1)
+            cdf = np.asarray([sketch.rank(e) for e in edges[1:]])
+            counts = np.diff(np.concatenate([[0.0], cdf])) * sketch.n
+            out["histogram"] = {"edges": edges.tolist(), "counts": np.round(counts).astype(int).tolist()}
+        return out
+
+    def report(self, feature_names=None, hist_bins=10):
+        names = list(feature_names or [])
+        names += [f"f{j}" for j in range(len(names), len(self.features))]
+        edges = np.linspace(0, 1, self.pred_hist.size + 1)
+        return {
+            "records": self.records,
+            "rows": self.rows,
+            "bad_records": self.bad_records,
+            "row_widths": {str(k): v for k, v in sorted(self.widths.items())},
+            "first_event": self.first_event,
+            "last_event": self.last_event,
+            "features": {name: self._summary(s, hist_bins) for name, s in zip(names, self.features)},
+            "predictions": dict(self._summary(self.predictions),
+                                histogram={"edges": edges.tolist(), "counts": self.pred_hist.tolist()},
+                                positive_rate=float(self.pred_hist[self.pred_hist.size // 2:].sum()
+                                                    / max(1, self.pred_hist.sum()))),
+            "latency": self._summary(self.latency) if self.latency.n else None,
+        }
+
+
+# -----------------------------
+# Decoding
+# -----------------------------
+def _payload(part):
+    """captureData.endpointInput/endpointOutput -> (content type, text)."""
+    data = part.get("data", "")
+    if part.get("encoding", "CSV").upper() == "BASE64":
+        data = base64.b64decode(data).decode("utf-8")
+    return part.get("observedContentType", "text/csv").split(";")[0].strip().lower(), data
+
+
+def _parse_inputs(payloads, transformer):
+    """Decodes all input payloads of one file into one float matrix."""
+    import payloads as wire  # NumPy-only parsers; `inference` would pull xgboost into every worker
+    csv = [d for ct, d in payloads if ct == "text/csv"]
+    blocks = []
+    if csv:
+        X = wire.parse_csv("\n".join(d.strip() for d in csv))
+        blocks.append(X)
+    for ct, d in payloads:
+        if ct == "text/csv":
+            continue
+        parsed = wire.PARSERS[ct](d) if ct in wire.PARSERS else None
+        if isinstance(parsed, list):  # raw passenger records
+            parsed = transformer.transform(parsed) if transformer is not None and parsed else None
+        if parsed is not None and len(parsed):
+            blocks.append(np.asarray(parsed, dtype=np.float32))
+    widths = {b.shape[1] for b in blocks}
+    return blocks if len(widths) > 1 else [np.concatenate(blocks)] if blocks else []
+
+
+def _complete_lines(data):
+    """Bytes -> (text of the complete lines, bytes consumed). A trailing line still being
+    written is left for the next run unless it already parses."""
+    end = data.rfind(b"\n") + 1
+    tail = data[end:]
+    if tail.strip():
+        try:
+            json.loads(tail)
+            end = len(data)
+        except ValueError:
+            pass
+    return data[:end].decode("utf-8"), end
+
+
+def analyze_file(path, transformer=None, prediction_bins=20, start=0):
+    """Capture lines of one file from byte `start` on -> (CaptureStats, offset read up to)."""
+    from bulk_client import parse_scores
+    stats = CaptureStats(prediction_bins)
+    inputs, outputs, latencies, times = [], [], [], []
+    with open(path, "rb") as f:
+        f.seek(start)
+        text, consumed = _complete_lines(f.read())
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+            cap = rec["captureData"]
+            if "endpointInput" in cap:
+                inputs.append(_payload(cap["endpointInput"]))
+            if "endpointOutput" in cap:
+                outputs.append(_payload(cap["endpointOutput"])[1])
+        except (ValueError, KeyError, TypeError):
+            stats.bad_records += 1
+            continue
+        stats.records += 1
+        meta = rec.get("eventMetadata", {})
+        if meta.get("inferenceTime"):
+            times.append(meta["inferenceTime"])
+        for key in LATENCY_KEYS:
+            if key in meta:
+                latencies.append(float(meta[key]))
+                break
+    try:
+        blocks = _parse_inputs(inputs, transformer)
+    except ValueError:  # ragged CSV across records: fall back to one payload at a time
+        blocks = _parse_inputs_one_by_one(inputs, transformer)
+    scores = np.concatenate([parse_scores(o) for o in outputs]) if outputs else None
+    for X in blocks:
+        stats.update(X)
+    stats.update(np.empty((0, 0)), scores, latencies)
+    stats.seen(times)
+    return stats, start + consumed
+
+
+def _parse_inputs_one_by_one(payloads, transformer):
+    blocks = []
+    for p in payloads:
+        try:
+            blocks.extend(_parse_inputs([p], transformer))
+        except ValueError:
+            pass
+    return blocks
+
+
+# -----------------------------
+# Directory walk + incremental state
+# -----------------------------
+def find_capture_files(root):
+    out = []
+    for dirpath, _, files in os.walk(root):
+        out.extend(os.path.join(dirpath, f) for f in files if f.endswith(".jsonl"))
+    return sorted(out)
+
+
+def load_state(state_dir):
+    try:
+        with open(os.path.join(state_dir, STATE_FILE), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return {"processed": {}, "stats": None}
+
+
+def save_state(state_dir, state):
+    os.makedirs(state_dir, exist_ok=True)
+    tmp = os.path.join(state_dir, STATE_FILE + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f)
+    os.replace(tmp, os.path.join(state_dir, STATE_FILE))
+
+
+_worker = {}
+
+
+def _init_worker(transformer_path, prediction_bins):
+    from features import TitanicTransformer
+    _worker["transformer"] = TitanicTransformer.load(transformer_path) if transformer_path else None
+    _worker["bins"] = prediction_bins
+
+
+def _analyze(job):
+    path, start = job
+    return analyze_file(path, _worker["transformer"], _worker["bins"], start)
+
+
+def analyze(root, state_dir=None, transformer_path=None, workers=None, prediction_bins=20):
+    """Analyzes capture data under `root` not yet recorded in `state_dir` (new files and lines
+    appended to known ones); returns (cumulative CaptureStats, number of files read)."""
+    state = load_state(state_dir) if state_dir else {"processed": {}, "stats": None}
+    files = []
+    for path in find_capture_files(root):
+        size = os.path.getsize(path)
+        offset = state["processed"].get(path, {}).get("offset", 0)
+        if size < offset:  # truncated or replaced: nothing to resume from
+            offset = 0
+        if size > offset:
+            files.append((path, offset))
+    total = state["stats"] or CaptureStats(prediction_bins)
+    if files:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(transformer_path, prediction_bins)) as pool:
+            chunksize = max(1, len(files) // (4 * workers))
+            for (path, _), (stats, offset) in zip(files, pool.map(_analyze, files, chunksize=chunksize)):
+                total.merge(stats)
+                state["processed"][path] = {"offset": offset}
+    if state_dir:
+        state["stats"] = total
+        save_state(state_dir, state)
+    return total, len(files)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("root", help="local capture dir (e.g. an `aws s3 sync` mirror of the capture prefix)")
+    p.add_argument("--state-dir", default=None, help="remember processed files here for incremental runs")
+    p.add_argument("--preprocessor", default=None, help="preprocessor.json: feature names + raw JSON records")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--out", default="capture_report.json")
+    p.add_argument("--reset", action="store_true", help="forget the saved state and re-read everything")
+    args = p.parse_args(argv)
+
+    if args.reset and args.state_dir:
+        try:
+            os.remove(os.path.join(args.state_dir, STATE_FILE))
+        except FileNotFoundError:
+            pass
+    t0 = time.perf_counter()
+    total, n_new = analyze(args.root, args.state_dir, args.preprocessor, args.workers)
+    names = None
+    if args.preprocessor:
+        with open(args.preprocessor) as f:
+            names = json.load(f).get("feature_names")
+    report = total.report(names)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Read {n_new} new or appended capture files in {time.perf_counter() - t0:.2f}s; "
+          f"{report['records']} records / {report['rows']} rows in total -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,37 @@
-import boto3
-
-# -----------------------------
-# Step 1: Set up SageMaker client
-# -----------------------------
-region = "us-east-1"
-fg_name = "titanic-feature-group-20250904192821"  # Replace with your FG name
-sm_client = boto3.client("sagemaker", region_name=region)
-
-# -----------------------------
-# Step 2: Describe Feature Group
-# -----------------------------
-try:
-    response = sm_client.describe_feature_group(FeatureGroupName=fg_name)
-    print("=== Feature Group Status Check ===")
-    print("Name:", response["FeatureGroupName"])
-    print("Status:", response["FeatureGroupStatus"])
-    print("CreationTime:", response["CreationTime"])
-    print("OfflineStoreStatus:", response.get("OfflineStoreStatus", {}))
-    print("OnlineStoreConfig:", response.get("OnlineStoreConfig", {}))
-except sm_client.exceptions.ResourceNotFound:
-    print(f"❌ Feature Group '{fg_name}' not found in region {region}.")
+import argparse, os
 
+FEATURE_GROUP = "titanic-feature-group-20250904192821"  # Replace with your FG name
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Show a feature group's status")
+    p.add_argument("--feature-group", default=FEATURE_GROUP)
+    p.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    args = p.parse_args(argv)
+
+    import aws_clients
+
+    # -----------------------------
+    # Step 1: Set up SageMaker client
+    # -----------------------------
+    region, fg_name = args.region, args.feature_group
+    sm_client = aws_clients.client("sagemaker", region)
+
+    # -----------------------------
+    # Step 2: Describe Feature Group
+    # -----------------------------
+    try:
+        response = sm_client.describe_feature_group(FeatureGroupName=fg_name)
+        print("=== Feature Group Status Check ===")
+        print("Name:", response["FeatureGroupName"])
+        print("Status:", response["FeatureGroupStatus"])
+        print("CreationTime:", response["CreationTime"])
+        print("OfflineStoreStatus:", response.get("OfflineStoreStatus", {}))
+        print("OnlineStoreConfig:", response.get("OnlineStoreConfig", {}))
+    except sm_client.exceptions.ResourceNotFound:
+        print(f"❌ Feature Group '{fg_name}' not found in region {region}.")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
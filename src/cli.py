@@ -0,0 +1,92 @@
+# src/cli.py
+# `titanic-mlops`: one entry point for the project's scripts.
+#
+#   ./titanic-mlops train --train data/train.csv --model-dir model/
+#   ./titanic-mlops predict --input passengers.jsonl --preprocessor model/preprocessor.json
+#   ./titanic-mlops monitor baseline data/X_train.csv --out-dir baseline/
+#   ./titanic-mlops feature-store check --feature-group titanic-feature-group-XYZ
+#   ./titanic-mlops pipeline local --input data/train.csv
+#
+# Each (sub)command is a module with main(argv); the module is imported only once its
+# command has been picked, so startup costs only what that command uses (sagemaker,
+# pandas, xgboost, ... are imported inside the commands that need them). Everything after
+# the command is passed to the module's own argument parser.
+import importlib, os, sys
+
+# command -> {action: (module, summary)}; the None action runs when no action word is given
+COMMANDS = {
+    "train": {None: ("train", "train XGBoost locally (src/train.py)"),
+              "job": ("run_training", "upload data and run a SageMaker training job"),
+              "hpo": ("hpo", "successive-halving hyperparameter search")},
+    "evaluate": {None: ("evaluate", "AUC / accuracy of a model artifact on a test CSV")},
+    "deploy": {None: ("deploy", "deploy the latest training job's model as an endpoint"),
+               "delete": ("delete_endpoint", "delete an endpoint"),
+               "bundle": ("serving_bundle", "build / probe a cold-start serving bundle (inference_lite.py)")},
+    "predict": {None: ("predict", "score one passenger, a file, or PassengerIds from the Feature Store"),
+                "batch": ("batch_score", "local sharded batch transform of a raw CSV -> submission")},
+    "monitor": {"capture": ("enable_data_capture", "turn on endpoint data capture"),
+                "baseline": ("baseline_stats", "statistics.json / constraints.json from a CSV"),
+                "schedule": ("monitor_setup", "baseline + hourly data-quality schedule"),
+                "analyze": ("capture_analyzer", "aggregate captured requests"),
+                "register": ("register_model", "register the endpoint's model in the registry")},
+    "feature-store": {"create": ("feature_store_setup", "create a feature group and ingest a CSV"),
+                      "ingest": ("fs_ingest", "parallel PutRecord ingestion / dead-letter replay"),
+                      "check": ("check_feature_group", "show a feature group's status")},
+    "wait": {None: ("waiters", "wait for endpoints, feature groups or jobs")},
+    "lineage": {None: ("lineage", "latest / best / data / show / backfill over the local job index")},
+    "pipeline": {"local": ("pipelines.local_pipeline", "run the pipeline DAG locally with step caching")},
+}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def usage(command=None):
+    prog = "titanic-mlops"
+    if command:
+        lines = [f"usage: {prog} {command} <action> [args...]   ({prog} {command} <action> --help)", ""]
+        lines += [f"  {action or '(none)':<10} {summary}" for action, (_, summary) in COMMANDS[command].items()]
+    else:
+        lines = [f"usage: {prog} <command> [<action>] [args...]   ({prog} <command> --help)", ""]
+        for name, actions in COMMANDS.items():
+            for action, (_, summary) in actions.items():
+                lines.append(f"  {name + (' ' + action if action else ''):<24} {summary}")
+    return "\n".join(lines)
+
+
+def resolve(argv):
+    """argv -> (module name, prog, remaining argv), or None if only usage was asked for."""
+    if not argv or argv[0] in ("-h", "--help"):
+        return None
+    command, rest = argv[0], list(argv[1:])
+    if command not in COMMANDS:
+        raise SystemExit(f"unknown command {command!r}\n\n{usage()}")
+    actions = COMMANDS[command]
+    if rest and rest[0] in actions:
+        action = rest.pop(0)
+    elif None in actions:
+        action = None
+    elif rest and rest[0] not in ("-h", "--help"):
+        raise SystemExit(f"unknown {command} action {rest[0]!r}\n\n{usage(command)}")
+    else:
+        print(usage(command))
+        return None
+    module, _ = actions[action]
+    return module, " ".join(filter(None, ("titanic-mlops", command, action))), rest
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    target = resolve(argv)
+    if target is None:
+        if not argv or argv[0] in ("-h", "--help"):
+            print(usage())
+        return 0 if argv else 2
+    module, prog, rest = target
+    sys.argv[0] = prog  # argparse uses it as the usage prog
+    if "." in module and ROOT not in sys.path:  # modules outside src/, e.g. pipelines/
+        sys.path.insert(0, ROOT)
+    code = importlib.import_module(module).main(rest)
+    return code if isinstance(code, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
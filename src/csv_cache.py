@@ -0,0 +1,265 @@
+# src/csv_cache.py
+# Content-hashed columnar cache for the project's CSV inputs.
+#
+# The first read of a CSV parses it with pandas and stores every column as its own .npy
+# file under <cache_dir>/<key>/. Later reads memory-map those files instead of re-parsing
+# text, so numeric columns come back zero-copy. The key is a BLAKE2b hash of the file
+# contents plus the read options, so an edited file can never serve stale data; the hash
+# itself is memoized by (path, size, mtime) to avoid re-hashing unchanged files.
+#
+# Tunables (env vars):
+#   CSV_CACHE          0 disables the cache (reads go straight to pandas)
+#   CSV_CACHE_DIR      cache location (default ~/.cache/titanic-mlops/csv)
+#   CSV_CACHE_MAX_MB   size limit; least-recently-used entries are evicted (default 2048)
+import contextlib, hashlib, json, os, shutil, tempfile, time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: fall back to best-effort, unlocked index updates
+    fcntl = None
+
+ENABLED = os.getenv("CSV_CACHE", "1") != "0"
+CACHE_DIR = os.getenv("CSV_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "titanic-mlops", "csv"))
+MAX_BYTES = int(float(os.getenv("CSV_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+INDEX_NAME = "index.json"
+
+
+class CSVCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # -----------------------------
+    # Index (LRU bookkeeping + hash memo), guarded by a file lock
+    # -----------------------------
+    @contextlib.contextmanager
+    def _locked_index(self):
+        lock_path = os.path.join(self.cache_dir, ".lock")
+        with open(lock_path, "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                path = os.path.join(self.cache_dir, INDEX_NAME)
+                try:
+                    with open(path) as f:
+                        index = json.load(f)
+                except (FileNotFoundError, ValueError):
+                    index = {}
+                index.setdefault("entries", {})
+                index.setdefault("files", {})
+                before = json.dumps(index, sort_keys=True)
+                yield index
+                if json.dumps(index, sort_keys=True) != before:
+                    fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".json")
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(index, f)
+                    os.replace(tmp, path)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def file_hash(path, block=1 << 20):
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for buf in iter(lambda: f.read(block), b""):
+                h.update(buf)
+        return h.hexdigest()
+
+    def key_for(self, path, options):
+        """Content hash of `path` (memoized by size+mtime) combined with the read options."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self._locked_index() as index:
+            memo = index["files"].get(path)
+        if memo and memo["stamp"] == stamp:
+            digest = memo["hash"]
+        else:
+            digest = self.file_hash(path)
+        opts = hashlib.blake2b(json.dumps(options, sort_keys=True).encode(), digest_size=8).hexdigest()
+        key = f"{digest}-{opts}"
+        with self._locked_index() as index:
+            old = index["files"].get(path)
+            index["files"][path] = {"stamp": stamp, "hash": digest}
+            if old and old["hash"] != digest:
+                # the file changed: drop entries built from its previous contents
+                for k in [k for k in index["entries"] if k.startswith(old["hash"] + "-")]:
+                    self._remove(index, k)
+        return key
+
+    def _remove(self, index, key):
+        index["entries"].pop(key, None)
+        shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+    def _touch(self, key, nbytes=None):
+        with self._locked_index() as index:
+            entry = index["entries"].setdefault(key, {"bytes": nbytes or 0})
+            if nbytes is not None:
+                entry["bytes"] = nbytes
+            entry["last_used"] = time.time()
+            if nbytes is not None:
+                self._evict(index, keep=key)
+
+    def _evict(self, index, keep=None):
+        entries = index["entries"]
+        total = sum(e["bytes"] for e in entries.values())
+        for k in sorted(entries, key=lambda k: entries[k].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            if k == keep:
+                continue
+            total -= entries[k]["bytes"]
+            self._remove(index, k)
+
+    def total_bytes(self):
+        with self._locked_index() as index:
+            return sum(e["bytes"] for e in index["entries"].values())
+
+    # -----------------------------
+    # Entries
+    # -----------------------------
+    def _write_entry(self, key, df):
+        tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=self.cache_dir)
+        meta = {"rows": len(df), "columns": []}
+        nbytes = 0
+        for i, (name, col) in enumerate(df.items()):
+            values = col.to_numpy()
+            kind = "numeric"
+            if values.dtype == object or not (np.issubdtype(values.dtype, np.number) or values.dtype == bool):
+                # strings: dictionary-encoded as int32 codes (-1 = missing) + fixed-width levels
+                codes, levels = pd.factorize(col)
+                values = codes.astype(np.int32)
+                levels = np.asarray(levels, dtype=str)
+                np.save(os.path.join(tmp, f"{i}.levels.npy"), levels)
+                nbytes += levels.nbytes
+                kind = "string"
+            np.save(os.path.join(tmp, f"{i}.npy"), values)
+            nbytes += values.nbytes
+            meta["columns"].append({"name": name if isinstance(name, str) else int(name), "kind": kind})
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        dst = os.path.join(self.cache_dir, key)
+        try:
+            os.rename(tmp, dst)
+        except OSError:  # another process won the race; its entry is identical
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._touch(key, nbytes)
+
+    def _open_entry(self, key, usecols=None):
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry_dir, "meta.json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        cols = {}
+        for i, c in enumerate(meta["columns"]):
+            if not _wanted(c["name"], usecols):
+                continue
+            arr = np.load(os.path.join(entry_dir, f"{i}.npy"), mmap_mode="r").view(np.ndarray)
+            levels = np.load(os.path.join(entry_dir, f"{i}.levels.npy")) if c["kind"] == "string" else None
+            cols[c["name"]] = (arr, levels)
+        return meta["rows"], cols
+
+    def columns(self, path, header="infer", usecols=None):
+        """Memory-mapped columns: {name: (values, levels_or_None)}. String columns come back
+        as int32 codes into `levels` (-1 = missing). Populates the cache on a miss."""
+        options = {"header": header}
+        key = self.key_for(path, options)
+        opened = self._open_entry(key, usecols)
+        if opened is None:
+            self.misses += 1
+            self._write_entry(key, pd.read_csv(path, header=0 if header == "infer" else header))
+            opened = self._open_entry(key, usecols)
+        else:
+            self.hits += 1
+            self._touch(key)
+        return opened
+
+    def read_csv(self, path, header="infer", usecols=None):
+        _, cols = self.columns(path, header, usecols)
+        return pd.DataFrame({name: _to_series_values(arr, levels) for name, (arr, levels) in cols.items()}, copy=False)
+
+    def iter_chunks(self, path, chunksize, header="infer", usecols=None):
+        """Yields DataFrame chunks. Warm entries are sliced from the memory maps; cold ones
+        stream from pandas without populating the cache (the file may not fit in RAM)."""
+        key = self.key_for(path, {"header": header})
+        opened = self._open_entry(key, usecols)
+        if opened is None:
+            self.misses += 1
+            yield from pd.read_csv(path, header=0 if header == "infer" else header,
+                                   chunksize=chunksize, usecols=usecols)
+            return
+        self.hits += 1
+        self._touch(key)
+        rows, cols = opened
+        for start in range(0, rows, chunksize):
+            stop = min(rows, start + chunksize)
+            yield pd.DataFrame({name: _to_series_values(arr[start:stop], levels)
+                                for name, (arr, levels) in cols.items()}, index=pd.RangeIndex(start, stop), copy=False)
+
+
+def _wanted(name, usecols):
+    if usecols is None:
+        return True
+    return usecols(name) if callable(usecols) else name in usecols
+
+
+def _to_series_values(arr, levels):
+    if levels is None:
+        return arr  # zero-copy view of the memory map
+    # code -1 picks the trailing NaN, i.e. the missing value
+    return np.append(levels.astype(object), np.nan).take(arr)
+
+
+_default = None
+
+
+def default_cache():
+    global _default
+    if _default is None:
+        _default = CSVCache()
+    return _default
+
+
+def _cacheable(path):
+    return ENABLED and isinstance(path, (str, os.PathLike)) and "://" not in str(path) and os.path.isfile(path)
+
+
+def read_csv(path, header="infer", usecols=None):
+    """Drop-in for pd.read_csv(path[, header=None]) that goes through the cache."""
+    if not _cacheable(path):
+        return pd.read_csv(path, header=0 if header == "infer" else header, usecols=usecols)
+    return default_cache().read_csv(path, header, usecols)
+
+
+def read_csv_chunks(path, chunksize, header="infer", usecols=None):
+    if not _cacheable(path):
+        return pd.read_csv(path, header=0 if header == "infer" else header, chunksize=chunksize, usecols=usecols)
+    return default_cache().iter_chunks(path, chunksize, header, usecols)
+
+
+if __name__ == "__main__":
+    import argparse
+    p = argparse.ArgumentParser(description="Inspect or warm the CSV cache")
+    p.add_argument("paths", nargs="*", help="CSV files to warm")
+    p.add_argument("--no-header", action="store_true")
+    p.add_argument("--clear", action="store_true")
+    args = p.parse_args()
+    cache = default_cache()
+    if args.clear:
+        shutil.rmtree(cache.cache_dir, ignore_errors=True)
+        print("Cleared", cache.cache_dir)
+    else:
+        for path in args.paths:
+            t0 = time.perf_counter()
+            cache.read_csv(path, header=None if args.no_header else "infer")
+            print(f"{path}: {(time.perf_counter() - t0) * 1000:.1f} ms")
+        print(f"{cache.cache_dir}: {cache.total_bytes() / 1e6:.1f} MB (limit {cache.max_bytes / 1e6:.0f} MB)")
@@ -1,14 +1,28 @@
-import sagemaker
+import argparse
 
-# Initialize session
-session = sagemaker.Session()
+ENDPOINT_NAME = "titanic-xgboost-endpoint"
 
-# Name of the endpoint to delete
-endpoint_name = "titanic-xgboost-endpoint"
 
-# Delete endpoint
-print(f"🛑 Deleting endpoint: {endpoint_name}")
-session.delete_endpoint(endpoint_name=endpoint_name)
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Delete an endpoint")
+    p.add_argument("--endpoint", default=ENDPOINT_NAME)
+    p.add_argument("--wait", action="store_true", help="return only once the endpoint is gone")
+    args = p.parse_args(argv)
 
-print("✅ Endpoint deleted successfully.")
+    import aws_clients
 
+    # Initialize session
+    session = aws_clients.sagemaker_session()
+
+    # Delete endpoint
+    print(f"🛑 Deleting endpoint: {args.endpoint}")
+    session.delete_endpoint(endpoint_name=args.endpoint)
+    if args.wait:
+        import waiters
+        waiters.wait_for(session.sagemaker_client, [("endpoint-deleted", args.endpoint)], deadline_s=900)
+
+    print("✅ Endpoint deleted successfully.")
+
+
+if __name__ == "__main__":
+    main()
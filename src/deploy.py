@@ -1,56 +1,100 @@
-import sagemaker
-from sagemaker import Session
-from sagemaker.xgboost.model import XGBoostModel
-import pandas as pd
-
-# 🔹 Initialize SageMaker session
-session = Session()
-role = "arn:aws:iam::605134434521:role/SageMakerExecutionRole" 
-region = session.boto_region_name
-
-# 🔹 Get the latest completed training job
-sm_client = session.sagemaker_client
-response = sm_client.list_training_jobs(SortBy="CreationTime", SortOrder="Descending", MaxResults=1)
-latest_job_name = response["TrainingJobSummaries"][0]["TrainingJobName"]
-
-print(f"Latest training job: {latest_job_name}")
-
-# 🔹 Get model artifact S3 path from training job
-desc = sm_client.describe_training_job(TrainingJobName=latest_job_name)
-model_artifact = desc["ModelArtifacts"]["S3ModelArtifacts"]
-print(f"Model artifact: {model_artifact}")
-
-# 🔹 Create SageMaker Model object
-xgb_model = XGBoostModel(
-    model_data=model_artifact,
-    role=role,
-    framework_version="1.5-1",
-    sagemaker_session=session
-)
-
-# 🔹 Deploy model as endpoint
-predictor = xgb_model.deploy(
-    initial_instance_count=1,
-    instance_type="ml.m5.large",
-    endpoint_name="titanic-xgboost-endpoint",
-    serializer=sagemaker.serializers.CSVSerializer(),   # 👈 ensures CSV format
-    deserializer=sagemaker.deserializers.JSONDeserializer()
-)
-
-print("✅ Model deployed at endpoint: titanic-xgboost-endpoint")
-
-# 🔹 Test inference with one passenger
-test_passenger = pd.DataFrame([{
-    "Pclass": 3,
-    "Sex": 1,      # already encoded
-    "Age": 22,
-    "SibSp": 1,
-    "Parch": 0,
-    "Fare": 7.25,
-    "Embarked": 0
-}])
-
-# Convert to CSV-friendly row
-prediction = predictor.predict(test_passenger.to_csv(header=False, index=False))
-print("🔮 Prediction result:", prediction)
+import argparse, os, time
 
+DEFAULT_ROLE = "arn:aws:iam::605134434521:role/SageMakerExecutionRole"
+ENDPOINT_NAME = "titanic-xgboost-endpoint"
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Deploy the latest (or a given) training job's model as an endpoint")
+    p.add_argument("--endpoint", default=ENDPOINT_NAME)
+    p.add_argument("--training-job", default=None, help="default: the most recent training job")
+    p.add_argument("--best", default=None, metavar="METRIC",
+                   help="deploy the indexed job with the best METRIC (e.g. auc) instead of the latest")
+    p.add_argument("--since-days", type=float, default=None, help="with --best: only jobs from the last N days")
+    p.add_argument("--role", default=os.getenv("SAGEMAKER_ROLE_ARN", DEFAULT_ROLE))
+    p.add_argument("--instance-type", default="ml.m5.large")
+    p.add_argument("--model-data", default=None, help="deploy this model.tar.gz (e.g. a serving_bundle.py bundle)")
+    p.add_argument("--handler", default="inference.py", choices=("inference.py", "inference_lite.py"),
+                   help="inference_lite.py: cold-start handler for serving bundles (serverless)")
+    args = p.parse_args(argv)
+
+    import sagemaker
+    import pandas as pd
+    from sagemaker.xgboost.model import XGBoostModel
+    import aws_clients
+    import lineage
+
+    # 🔹 Initialize SageMaker session
+    session = aws_clients.sagemaker_session()
+    sm_client = session.sagemaker_client
+
+    # 🔹 Pick the training job: --best from the local lineage index (src/lineage.py); otherwise the
+    #    API's newest job (this machine's index may not have seen it), with its artifact from the
+    #    index when it is there
+    job_name, model_artifact = args.training_job, args.model_data
+    index = lineage.default_index()
+    is_s3 = lambda j: (j["artifact_uri"] or "").startswith("s3://")  # backfilled failed jobs have none
+    if model_artifact:
+        job = None
+    elif args.best:
+        since = time.time() - args.since_days * 86400 if args.since_days else None
+        job = next((j for j in index.best(args.best, since, n=20) if is_s3(j)), None)
+        if job is None:
+            raise SystemExit(f"❌ No indexed S3 artifact has a {args.best!r} metric; run lineage.py backfill or evaluate.py")
+    else:
+        if not job_name:
+            response = sm_client.list_training_jobs(SortBy="CreationTime", SortOrder="Descending", MaxResults=1)
+            job_name = response["TrainingJobSummaries"][0]["TrainingJobName"]
+        job = index.get(job_name)
+    if job and is_s3(job):
+        job_name, model_artifact = job["job_name"], job["artifact_uri"]
+    if job_name:
+        print(f"Training job: {job_name}")
+
+    # 🔹 Get model artifact S3 path from training job (unless the index already had it)
+    if model_artifact is None:
+        desc = sm_client.describe_training_job(TrainingJobName=job_name)
+        model_artifact = desc["ModelArtifacts"]["S3ModelArtifacts"]
+    print(f"Model artifact: {model_artifact}")
+
+    # 🔹 Create SageMaker Model object
+    xgb_model = XGBoostModel(
+        model_data=model_artifact,
+        role=args.role,
+        entry_point=args.handler,     # inference.py: micro-batching handler; inference_lite.py: cold-start bundle
+        source_dir="src",
+        framework_version="1.5-1",
+        sagemaker_session=session,
+        env={"MAX_BATCH_SIZE": "256", "MAX_BATCH_WAIT_MS": "2"},
+    )
+
+    # 🔹 Deploy model as endpoint
+    predictor = xgb_model.deploy(
+        initial_instance_count=1,
+        instance_type=args.instance_type,
+        endpoint_name=args.endpoint,
+        serializer=sagemaker.serializers.CSVSerializer(),   # 👈 ensures CSV format
+        deserializer=sagemaker.deserializers.JSONDeserializer()
+    )
+
+    print(f"✅ Model deployed at endpoint: {args.endpoint}")
+
+    # 🔹 Test inference with one passenger
+    test_passenger = pd.DataFrame([{
+        "Pclass": 3,
+        "Age": 22,
+        "SibSp": 1,
+        "Parch": 0,
+        "Fare": 7.25,
+        "Sex_male": 1,     # already one-hot encoded, in preprocess.py's column order
+        "Embarked_Q": 0,   # embarked at Southampton
+        "Embarked_S": 1
+    }])
+
+    # Convert to CSV-friendly row
+    prediction = predictor.predict(test_passenger.to_csv(header=False, index=False))
+    print("🔮 Prediction result:", prediction)
+
+
+if __name__ == "__main__":
+    main()
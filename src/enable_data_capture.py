@@ -1,30 +1,38 @@
 # src/enable_data_capture.py
-import os, time, boto3
+import argparse, os, time
+
+import aws_clients
 
 REGION = os.getenv("AWS_REGION", "us-east-1")
-ENDPOINT = os.environ["SAGEMAKER_ENDPOINT_NAME"]
+ENDPOINT = os.getenv("SAGEMAKER_ENDPOINT_NAME")
 BUCKET = os.getenv("ARTIFACT_BUCKET")  # optional; if not set we'll fall back to default bucket
 CAPTURE_PREFIX = os.getenv("CAPTURE_PREFIX", "datacapture")
 
-sm = boto3.client("sagemaker", region_name=REGION)
-
 def default_bucket():
-    s3 = boto3.client("s3", region_name=REGION)
-    acct = boto3.client("sts").get_caller_identity()["Account"]
+    s3 = aws_clients.client("s3", REGION)
+    acct = aws_clients.client("sts", REGION).get_caller_identity()["Account"]
     name = f"sagemaker-{REGION}-{acct}"
     # create if missing
     try: s3.head_bucket(Bucket=name)
     except: s3.create_bucket(Bucket=name, CreateBucketConfiguration={"LocationConstraint": REGION})
     return name
 
-def main():
-    print(f"Enabling data capture on endpoint: {ENDPOINT}")
-    ep = sm.describe_endpoint(EndpointName=ENDPOINT)
-    old_cfg = ep["EndpointConfigName"]
-    cfg = sm.describe_endpoint_config(EndpointConfigName=old_cfg)
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Turn on input/output data capture for an endpoint")
+    p.add_argument("--endpoint", default=ENDPOINT, required=ENDPOINT is None)
+    p.add_argument("--bucket", default=BUCKET)
+    p.add_argument("--prefix", default=CAPTURE_PREFIX)
+    args = p.parse_args(argv)
+    endpoint = args.endpoint
+
+    sm = aws_clients.client("sagemaker", REGION)
+    print(f"Enabling data capture on endpoint: {endpoint}")
+    cache = aws_clients.resolver(REGION)
+    old_cfg = cache.endpoint(endpoint)["EndpointConfigName"]
+    cfg = cache.endpoint_config(old_cfg)
 
-    bucket = BUCKET or default_bucket()
-    dest = f"s3://{bucket}/{CAPTURE_PREFIX}/{ENDPOINT}/"
+    bucket = args.bucket or default_bucket()
+    dest = f"s3://{bucket}/{args.prefix}/{endpoint}/"
 
     new_cfg_name = f"{old_cfg}-capture-{int(time.time())}"
     sm.create_endpoint_config(
@@ -39,7 +47,8 @@ def main():
         },
         Tags=cfg.get("Tags", []),
     )
-    sm.update_endpoint(EndpointName=ENDPOINT, EndpointConfigName=new_cfg_name)
+    sm.update_endpoint(EndpointName=endpoint, EndpointConfigName=new_cfg_name)
+    cache.invalidate(endpoint)
     print(f"Updated endpoint to config: {new_cfg_name}\nCapture destination: {dest}")
 
 if __name__ == "__main__":
@@ -1,41 +1,139 @@
 # src/evaluate.py
-import argparse, json, os, tarfile, tempfile, pandas as pd, xgboost as xgb
-from sklearn.metrics import roc_auc_score, accuracy_score
-import boto3
-
-def download_model_tar(s3_uri, dst_dir):
-    bucket, key = s3_uri.replace("s3://","").split("/", 1)
-    local_tar = os.path.join(dst_dir, "model.tar.gz")
-    boto3.client("s3").download_file(bucket, key, local_tar)
-    with tarfile.open(local_tar, "r:gz") as t:
-        t.extractall(dst_dir)
-    return os.path.join(dst_dir, "xgboost-model")
+import argparse, json, os, numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
-if __name__ == "__main__":
+import artifact_cache
+import csv_cache
+from features import ARTIFACT_NAME, TARGET, TitanicTransformer
+from streaming_metrics import BinaryMetricsAccumulator
+from tree_compiler import ENGINES, make_predictor
+
+def fetch_model(model_artifact):
+    """model.tar.gz (S3 or local) -> (model file, preprocessor.json or None), via the
+    persistent artifact cache so repeat evaluations skip the download and extraction."""
+    model_dir = artifact_cache.fetch(model_artifact)
+    tf_path = os.path.join(model_dir, ARTIFACT_NAME)
+    return artifact_cache.find_model_file(model_dir), tf_path if os.path.exists(tf_path) else None
+
+def local_copy(path):
+    """S3 test files are downloaded first: the readers below open local files."""
+    if not path.startswith("s3://"):
+        return path
+    import tempfile
+    import aws_clients
+    bucket, key = artifact_cache.split_s3_uri(path)
+    dst = os.path.join(tempfile.mkdtemp(prefix="evaluate-"), os.path.basename(key))
+    aws_clients.client("s3").download_file(bucket, key, dst)
+    return dst
+
+def is_raw_csv(path):
+    with open(path) as f:
+        return TARGET in f.readline().strip().split(",")
+
+def load_test(path, transformer=None):
+    """Returns (y, X). Raw CSVs (header with Survived) go through the fitted transformer;
+    preprocessed ones are label-first with no header."""
+    if is_raw_csv(path):
+        if transformer is None:
+            raise ValueError(f"{path} is a raw CSV but the model artifact has no {ARTIFACT_NAME}")
+        df = csv_cache.read_csv(path)
+        return df[TARGET].to_numpy(), transformer.transform(df)
+    df = csv_cache.read_csv(path, header=None)
+    return df.iloc[:,0], df.iloc[:,1:]
+
+# -----------------------------
+# Streaming, chunk-parallel evaluation
+# -----------------------------
+_worker = {}
+
+def _init_worker(model_path, transformer_path, engine="xgboost"):
+    # one booster (or compiled model) per worker process, loaded once
+    booster = None
+    if engine == "xgboost":
+        import xgboost as xgb
+        booster = xgb.Booster(); booster.load_model(model_path)
+        booster.set_param({"nthread": 1})  # parallelism comes from the process pool
+    _worker["predict"] = make_predictor(engine, model_path, booster)
+    _worker["transformer"] = TitanicTransformer.load(transformer_path) if transformer_path else None
+
+def _score_chunk(chunk, raw, n_bins):
+    if raw:
+        y, X = chunk[TARGET].to_numpy(), _worker["transformer"].transform(chunk)
+    else:
+        values = chunk.to_numpy(dtype="float32")
+        y, X = values[:, 0], values[:, 1:]
+    proba = _worker["predict"](X)
+    return BinaryMetricsAccumulator(n_bins).update(y, proba)
+
+def evaluate_streaming(test_path, model_path, transformer_path=None, chunksize=100_000, workers=None, n_bins=1 << 16,
+                       engine="xgboost"):
+    """Scores the test file chunk by chunk on a process pool and merges per-chunk metric
+    accumulators. At most 2 chunks per worker are in flight, so memory stays constant."""
+    raw = is_raw_csv(test_path)
+    if raw and not transformer_path:
+        raise ValueError(f"{test_path} is a raw CSV but the model artifact has no {ARTIFACT_NAME}")
+    workers = workers or os.cpu_count() or 1
+    total = BinaryMetricsAccumulator(n_bins)
+    chunks = csv_cache.read_csv_chunks(test_path, chunksize, header="infer" if raw else None)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, transformer_path if raw else None, engine)) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_score_chunk, chunk, raw, n_bins))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    total.merge(fut.result())
+        for fut in pending:
+            total.merge(fut.result())
+    return total.report()
+
+def main(argv=None):
     p = argparse.ArgumentParser()
-    p.add_argument("--test", required=True)               # S3 or local path to test.csv (label first col, no header)
-    p.add_argument("--model_artifact", required=True)     # S3 model.tar.gz from training
+    p.add_argument("--test", required=True)               # S3 or local test.csv: raw (Survived header) or label-first
+    p.add_argument("--model_artifact", required=True)     # S3 (or local) model.tar.gz from training
     p.add_argument("--out", default="/opt/ml/processing/output/metrics.json")
-    args = p.parse_args()
+    p.add_argument("--chunksize", type=int, default=0,    # >0: streaming mode (constant memory, process pool)
+                   help="rows per chunk; >0 switches to streaming, chunk-parallel evaluation")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--engine", default="xgboost", choices=ENGINES,
+                   help="numpy/codegen score with the compiled trees from tree_compiler.py")
+    args = p.parse_args(argv)
 
-    # Load test
-    df = pd.read_csv(args.test, header=None)
-    y, X = df.iloc[:,0], df.iloc[:,1:]
+    test_path = local_copy(args.test)
 
     # Load model
-    tmp = tempfile.mkdtemp()
-    model_path = download_model_tar(args.model_artifact, tmp)
-    booster = xgb.Booster(); booster.load_model(model_path)
-
-    # Predict
-    dtest = xgb.DMatrix(X)
-    proba = booster.predict(dtest)
-
-    metrics = {
-        "auc": float(roc_auc_score(y, proba)),
-        "accuracy": float(accuracy_score(y, (proba>=0.5).astype(int)))
-    }
+    model_path, tf_path = fetch_model(args.model_artifact)
+
+    if args.chunksize > 0:
+        metrics = evaluate_streaming(test_path, model_path, tf_path, args.chunksize, args.workers, engine=args.engine)
+    else:
+        transformer = TitanicTransformer.load(tf_path) if tf_path else None
+
+        # Load test
+        y, X = load_test(test_path, transformer)
+
+        # Predict
+        if args.engine == "xgboost":
+            import xgboost as xgb
+            # the fetched directory, not the artifact URI: its version is already resolved (no 2nd HEAD)
+            booster = artifact_cache.load_booster(os.path.dirname(model_path))
+            dtest = xgb.DMatrix(X)
+            proba = booster.predict(dtest)
+        else:
+            proba = make_predictor(args.engine, model_path)(np.asarray(X, dtype=np.float32))
+
+        from sklearn.metrics import accuracy_score, roc_auc_score
+        metrics = {
+            "auc": float(roc_auc_score(y, proba)),
+            "accuracy": float(accuracy_score(y, (proba>=0.5).astype(int)))
+        }
     os.makedirs(os.path.dirname(args.out), exist_ok=True)
     json.dump(metrics, open(args.out, "w"))
-    print(json.dumps(metrics))
+    print(json.dumps({k: v for k, v in metrics.items() if k != "calibration"}))
 
+    import lineage
+    lineage.record("record_metrics", metrics, artifact_uri=args.model_artifact)
+
+if __name__ == "__main__":
+    main()
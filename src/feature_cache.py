@@ -0,0 +1,210 @@
+# src/feature_cache.py
+# Read-through cache of online Feature Store records, keyed by PassengerId.
+#
+# features(ids) returns the model-ready float32 matrix for a list of PassengerIds. Encoded
+# rows are kept in an in-process LRU with a TTL, so hot passengers never touch the network.
+# All misses of one call are deduplicated and fetched together with BatchGetRecord (at most
+# 100 identifiers per call); concurrent callers asking for an id that is already being
+# fetched wait for that fetch instead of issuing their own. Ids the store does not know
+# are cached too (negatively), so they don't cause a lookup on every request.
+#
+# Tunables (env vars):
+#   FEATURE_CACHE_MAX_ENTRIES  LRU size limit (default 100000)
+#   FEATURE_CACHE_TTL_S        seconds a record stays fresh (default 300)
+import os, random, threading, time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+MAX_ENTRIES = int(os.getenv("FEATURE_CACHE_MAX_ENTRIES", "100000"))
+TTL_SECONDS = float(os.getenv("FEATURE_CACHE_TTL_S", "300"))
+BATCH_GET_LIMIT = 100  # BatchGetRecord service limit
+RETRYABLE = {"ThrottlingException", "ServiceUnavailable", "InternalFailure"}
+_NOT_FOUND = object()
+
+
+class FeatureCache:
+    def __init__(self, client, feature_group, transformer, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS,
+                 batch_size=BATCH_GET_LIMIT, max_retries=5, base_backoff=0.05, clock=time.monotonic):
+        self.client = client
+        self.feature_group = feature_group
+        self.transformer = transformer
+        self.max_entries = int(max_entries)
+        self.ttl = float(ttl_seconds)
+        self.batch_size = min(int(batch_size), BATCH_GET_LIMIT)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "not_found": 0,
+                      "coalesced": 0, "batch_calls": 0, "retries": 0}
+        self._entries = OrderedDict()  # id -> (expires_at, row or _NOT_FOUND)
+        self._inflight = {}  # id -> Future of a fetch another caller started
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def features(self, passenger_ids, missing="raise"):
+        """PassengerIds -> (n, n_features) float32. Unknown ids raise KeyError, or become
+        NaN rows with missing="nan"."""
+        rows = self.rows(passenger_ids)
+        unknown = [pid for pid, r in zip(passenger_ids, rows) if r is None]
+        if unknown and missing == "raise":
+            raise KeyError(f"PassengerIds not in feature group {self.feature_group}: {unknown[:10]}")
+        nan_row = np.full(len(self.transformer.feature_names), np.nan, dtype=np.float32)
+        if not rows:
+            return np.empty((0, len(nan_row)), dtype=np.float32)
+        return np.stack([nan_row if r is None else r for r in rows])
+
+    def rows(self, passenger_ids):
+        """Encoded row (or None if unknown) per id, in order."""
+        ids = [str(p) for p in passenger_ids]
+        found, to_fetch, waiting = {}, [], {}
+        now = self.clock()
+        with self._lock:
+            for pid in dict.fromkeys(ids):  # dedupe, keep order
+                entry = self._entries.get(pid)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(pid)
+                    found[pid] = entry[1]
+                    self.stats["hits"] += 1
+                    continue
+                if entry is not None:
+                    del self._entries[pid]
+                    self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                if pid in self._inflight:
+                    waiting[pid] = self._inflight[pid]
+                    self.stats["coalesced"] += 1
+                else:
+                    self._inflight[pid] = Future()
+                    to_fetch.append(pid)
+        if to_fetch:
+            found.update(self._fetch(to_fetch))
+        for pid, fut in waiting.items():
+            found[pid] = fut.result()
+        return [None if found[pid] is _NOT_FOUND else found[pid] for pid in ids]
+
+    def invalidate(self, passenger_ids=None):
+        with self._lock:
+            if passenger_ids is None:
+                self._entries.clear()
+            for pid in passenger_ids or ():
+                self._entries.pop(str(pid), None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    # -----------------------------
+    # Fetching
+    # -----------------------------
+    def _fetch(self, ids):
+        """BatchGetRecord for `ids` (all registered in _inflight by us) -> {id: row}."""
+        result = {}
+        try:
+            for start in range(0, len(ids), self.batch_size):
+                batch = ids[start:start + self.batch_size]
+                for value, record in self._batch_get(batch).items():
+                    result[value] = self.transformer.transform_row(
+                        {f["FeatureName"]: f.get("ValueAsString") for f in record})
+                for pid in batch:
+                    result.setdefault(pid, _NOT_FOUND)
+        except BaseException as e:  # waiters get the same error; nothing is cached
+            with self._lock:
+                for pid in ids:
+                    self._inflight.pop(pid).set_exception(e)
+            raise
+        expires = self.clock() + self.ttl
+        with self._lock:
+            for pid in ids:
+                row = result[pid]
+                if row is _NOT_FOUND:
+                    self.stats["not_found"] += 1
+                self._entries[pid] = (expires, row)
+                self._entries.move_to_end(pid)
+                self._inflight.pop(pid).set_result(row)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return result
+
+    def _batch_get(self, ids):
+        """One logical BatchGetRecord: retries throttles and re-requests UnprocessedIdentifiers."""
+        from botocore.exceptions import ClientError
+        pending, records = list(ids), {}
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._lock:
+                    self.stats["batch_calls"] += 1
+                resp = self.client.batch_get_record(Identifiers=[
+                    {"FeatureGroupName": self.feature_group, "RecordIdentifiersValueAsString": pending}])
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in RETRYABLE or attempt == self.max_retries:
+                    raise
+            else:
+                for r in resp.get("Records", []):
+                    records[r["RecordIdentifierValueAsString"]] = r["Record"]
+                pending = [v for u in resp.get("UnprocessedIdentifiers", [])
+                           for v in u["RecordIdentifiersValueAsString"]]
+                if not pending:
+                    return records
+            with self._lock:
+                self.stats["retries"] += 1
+            time.sleep(random.uniform(0, self.base_backoff * 2 ** attempt))  # full jitter
+        raise RuntimeError(f"BatchGetRecord left {len(pending)} identifiers unprocessed")
+
+
+def make_cache(feature_group, transformer, region=None, endpoint_url=None, **kw):
+    """FeatureCache over a pooled featurestore-runtime client (see fs_ingest.make_client)."""
+    from fs_ingest import make_client
+    return FeatureCache(make_client(region, endpoint_url), feature_group, transformer, **kw)
+
+
+if __name__ == "__main__":
+    # Reproducible hit-rate / latency run against the in-memory fake runtime:
+    #   python src/feature_cache.py --features data/train.csv --preprocessor data/preprocessor.json
+    import argparse, json
+    import csv_cache
+    from features import TitanicTransformer
+    from fs_ingest import to_records
+    from local_aws import LocalFeatureStore
+
+    p = argparse.ArgumentParser()
+    p.add_argument("--features", default="data/train.csv", help="CSV loaded into the fake online store")
+    p.add_argument("--preprocessor", default="data/preprocessor.json")
+    p.add_argument("--requests", type=int, default=20000)
+    p.add_argument("--ids-per-request", type=int, default=8)
+    p.add_argument("--zipf", type=float, default=1.2, help="popularity skew of requested ids")
+    p.add_argument("--latency-ms", type=float, default=5.0, help="simulated BatchGetRecord latency")
+    p.add_argument("--max-entries", type=int, default=256)
+    p.add_argument("--ttl", type=float, default=TTL_SECONDS)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+
+    df = csv_cache.read_csv(args.features)
+    store = LocalFeatureStore(latency_ms=args.latency_ms)
+    for record in to_records(df):
+        store.put_record(FeatureGroupName="titanic", Record=record)
+    store.calls["put_record"] = 0
+    cache = FeatureCache(store, "titanic", TitanicTransformer.load(args.preprocessor),
+                         max_entries=args.max_entries, ttl_seconds=args.ttl)
+
+    rng = np.random.default_rng(args.seed)
+    ids = df["PassengerId"].astype(str).to_numpy()
+    ranks = np.minimum(rng.zipf(args.zipf, size=(args.requests, args.ids_per_request)), len(ids)) - 1
+    lat = []
+    for req in ranks:
+        t0 = time.perf_counter()
+        cache.features(ids[req])
+        lat.append(time.perf_counter() - t0)
+    lat = np.asarray(lat) * 1000
+    print(json.dumps({"hit_rate": round(cache.hit_rate, 4), **cache.stats, "entries": len(cache),
+                      "p50_ms": round(float(np.percentile(lat, 50)), 4),
+                      "p99_ms": round(float(np.percentile(lat, 99)), 4),
+                      "store_calls": store.calls["batch_get_record"]}))
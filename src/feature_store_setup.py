@@ -1,79 +1,99 @@
-import boto3
-import sagemaker
-from sagemaker.feature_store.feature_group import FeatureGroup
-import pandas as pd
+import argparse, os
 from time import strftime, gmtime
-import time
-
-# -----------------------------
-# Step 1: Session & Role
-# -----------------------------
-session = sagemaker.Session()
-region = session.boto_region_name
-print("SageMaker session region:", region)
-
-# Replace with your IAM role ARN
-role = "arn:aws:iam::605134434521:role/SageMakerExecutionRole"
-
-bucket = "mlops-sagemaker-project-meerasa"
-s3_prefix = "titanic-feature-store"
-
-# -----------------------------
-# Step 2: Load Titanic dataset
-# -----------------------------
-df = pd.read_csv("data/train.csv")
-
-# Add EventTime column (mandatory for Feature Store)
-df["EventTime"] = pd.Timestamp.now().strftime("%Y-%m-%dT%H:%M:%SZ")
-
-# Ensure PassengerId is string (for record identifier)
-df["PassengerId"] = df["PassengerId"].astype(str)
-
-# -----------------------------
-# Step 3: Define Feature Group
-# -----------------------------
-feature_group_name = f"titanic-feature-group-{strftime('%Y%m%d%H%M%S', gmtime())}"
-feature_group = FeatureGroup(name=feature_group_name, sagemaker_session=session)
-print(f"Creating Feature Group: {feature_group_name}")
-
-# ✅ Load feature definitions from DataFrame
-feature_group.load_feature_definitions(data_frame=df)
-
-# -----------------------------
-# Step 4: Create Feature Group
-# -----------------------------
-feature_group.create(
-    s3_uri=f"s3://{bucket}/{s3_prefix}",
-    record_identifier_name="PassengerId",
-    event_time_feature_name="EventTime",
-    role_arn=role,
-    enable_online_store=True
-)
-
-# -----------------------------
-# Step 5: Wait for ACTIVE
-# -----------------------------
-sm_client = boto3.client("sagemaker", region_name=region)
-print("Waiting for Feature Group to become ACTIVE...")
-
-for i in range(30):  # wait up to 15 minutes
-    desc = sm_client.describe_feature_group(FeatureGroupName=feature_group_name)
-    status = desc["FeatureGroupStatus"]
-    print(f"Attempt {i+1}: Status = {status}")
-    if status == "Created":
+
+# Replace with your IAM role ARN / bucket
+DEFAULT_ROLE = "arn:aws:iam::605134434521:role/SageMakerExecutionRole"
+DEFAULT_BUCKET = "mlops-sagemaker-project-meerasa"
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Create an online + offline feature group from a CSV and ingest it")
+    p.add_argument("--input", default="data/train.csv")
+    p.add_argument("--feature-group", default=None, help="default: titanic-feature-group-<UTC timestamp>")
+    p.add_argument("--role", default=os.getenv("SAGEMAKER_ROLE_ARN", DEFAULT_ROLE))
+    p.add_argument("--bucket", default=DEFAULT_BUCKET)
+    p.add_argument("--prefix", default="titanic-feature-store")
+    p.add_argument("--processes", type=int, default=4)
+    p.add_argument("--threads", type=int, default=16)
+    args = p.parse_args(argv)
+
+    import pandas as pd
+    from sagemaker.feature_store.feature_group import FeatureGroup
+
+    import aws_clients
+    import csv_cache
+    import fs_ingest
+    import waiters
+
+    # -----------------------------
+    # Step 1: Session & Role
+    # -----------------------------
+    session = aws_clients.sagemaker_session()
+    region = session.boto_region_name
+    print("SageMaker session region:", region)
+
+    role = args.role
+    bucket = args.bucket
+    s3_prefix = args.prefix
+
+    # -----------------------------
+    # Step 2: Load Titanic dataset
+    # -----------------------------
+    df = csv_cache.read_csv(args.input).copy()  # copy: columns are modified below
+
+    # Add EventTime column (mandatory for Feature Store)
+    df["EventTime"] = pd.Timestamp.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    # Ensure PassengerId is string (for record identifier)
+    df["PassengerId"] = df["PassengerId"].astype(str)
+
+    # -----------------------------
+    # Step 3: Define Feature Group
+    # -----------------------------
+    feature_group_name = args.feature_group or f"titanic-feature-group-{strftime('%Y%m%d%H%M%S', gmtime())}"
+    feature_group = FeatureGroup(name=feature_group_name, sagemaker_session=session)
+    print(f"Creating Feature Group: {feature_group_name}")
+
+    # ✅ Load feature definitions from DataFrame
+    feature_group.load_feature_definitions(data_frame=df)
+
+    # -----------------------------
+    # Step 4: Create Feature Group
+    # -----------------------------
+    feature_group.create(
+        s3_uri=f"s3://{bucket}/{s3_prefix}",
+        record_identifier_name="PassengerId",
+        event_time_feature_name="EventTime",
+        role_arn=role,
+        enable_online_store=True
+    )
+
+    # -----------------------------
+    # Step 5: Wait for ACTIVE
+    # -----------------------------
+    sm_client = aws_clients.client("sagemaker", region)
+    print("Waiting for Feature Group to become ACTIVE...")
+
+    try:
+        waiters.wait_for(sm_client, [("feature-group", feature_group_name)], deadline_s=900)
         print("✅ Feature Group is ACTIVE!")
-        break
-    elif status == "CreateFailed":
-        raise RuntimeError(f"❌ Feature Group creation failed: {desc}")
-    time.sleep(30)
-else:
-    raise TimeoutError("❌ Feature Group did not become ACTIVE within 15 minutes.")
+    except waiters.WaiterError as e:
+        raise RuntimeError(f"❌ Feature Group did not become ACTIVE: {e}")
+
+    # -----------------------------
+    # Step 6: Ingest Data
+    # -----------------------------
+    print("Ingesting records into Feature Store...")
+    stats = fs_ingest.ingest(df, feature_group_name, region=region, processes=args.processes, threads=args.threads,
+                             dead_letter_path=f"{feature_group_name}-dead-letter.jsonl")
+    print(f"Ingested {stats['records'] - stats['failed']}/{stats['records']} records "
+          f"at {stats['records_per_sec']:.0f} rec/s ({stats['retries']} throttled retries)")
+    if stats["failed"]:
+        raise RuntimeError(f"❌ {stats['failed']} records failed; replay them with "
+                           f"python src/fs_ingest.py --replay {stats['dead_letter']} --feature-group {feature_group_name}")
 
-# -----------------------------
-# Step 6: Ingest Data
-# -----------------------------
-print("Ingesting records into Feature Store...")
-feature_group.ingest(data_frame=df, max_workers=3, wait=True)
+    print(f"✅ Feature Group {feature_group_name} created and data ingested!")
 
-print(f"✅ Feature Group {feature_group_name} created and data ingested!")
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# src/features.py
+# Fitted preprocessing shared by preprocess.py, train.py, evaluate.py and inference.py.
+#
+# fit() learns medians, modes and category levels once; transform() maps raw passenger rows
+# to a fixed-order float32 matrix with plain NumPy (no per-call get_dummies), so train and
+# serve always agree on the columns. The fitted state is a small JSON file saved next to
+# the model as preprocessor.json.
+import json, math
+
+import numpy as np
+
+NUMERIC = ["Pclass", "Age", "SibSp", "Parch", "Fare"]
+CATEGORICAL = ["Sex", "Embarked"]
+TARGET = "Survived"
+ARTIFACT_NAME = "preprocessor.json"
+
+
+def _is_missing(v):
+    return v is None or (isinstance(v, float) and math.isnan(v)) or v == ""
+
+
+class TitanicTransformer:
+    """Raw Titanic rows -> float32 features in `feature_names` order.
+
+    Categoricals are one-hot encoded with the first (sorted) level dropped, which matches
+    what pd.get_dummies(drop_first=True) produced before. Levels never seen at fit time
+    encode as all zeros.
+    """
+
+    def __init__(self, medians=None, modes=None, levels=None):
+        self.medians = dict(medians or {})
+        self.modes = dict(modes or {})
+        self.levels = {k: list(v) for k, v in (levels or {}).items()}
+        self._index = {}
+        self._build()
+
+    # -----------------------------
+    # Fitting
+    # -----------------------------
+    def fit(self, df):
+        """Learns imputation values and category levels from a raw DataFrame."""
+        medians, modes, levels = {}, {}, {}
+        for col in NUMERIC:
+            medians[col] = float(df[col].astype("float64").median())
+        for col in CATEGORICAL:
+            vals = df[col].dropna().astype(str)
+            modes[col] = str(vals.mode().iloc[0])
+            levels[col] = sorted(vals.unique().tolist())
+        return self._set(medians, modes, levels)
+
+    @classmethod
+    def from_stats(cls, medians, modes, levels):
+        """Builds a fitted transformer from precomputed (e.g. streamed) statistics."""
+        return cls(medians, modes, levels)
+
+    def _set(self, medians, modes, levels):
+        self.medians, self.modes, self.levels = medians, modes, levels
+        self._build()
+        return self
+
+    def _build(self):
+        # Dropped-first indicator levels and the resulting column layout
+        self.encoded = {c: self.levels.get(c, [])[1:] for c in CATEGORICAL}
+        self.feature_names = list(NUMERIC) + [f"{c}_{lvl}" for c in CATEGORICAL for lvl in self.encoded[c]]
+        self._index = {c: {lvl: i for i, lvl in enumerate(self.encoded[c])} for c in CATEGORICAL}
+
+    @property
+    def fitted(self):
+        return bool(self.medians)
+
+    # -----------------------------
+    # Transform
+    # -----------------------------
+    def transform(self, data):
+        """DataFrame / dict of columns / list of row dicts -> (n, n_features) float32."""
+        if not self.fitted:
+            raise RuntimeError("TitanicTransformer is not fitted")
+        if isinstance(data, dict) and all(np.ndim(v) == 0 for v in data.values()):  # one raw row
+            return self.transform_row(data)[None, :]
+        if isinstance(data, (list, tuple)):
+            data = {c: [r.get(c) for r in data] for c in NUMERIC + CATEGORICAL}
+        n = len(data[NUMERIC[0]])
+        out = np.empty((n, len(self.feature_names)), dtype=np.float32)
+        j = 0
+        for col in NUMERIC:
+            v = np.asarray(_values(data[col]), dtype=np.float32)
+            out[:, j] = np.where(np.isnan(v), np.float32(self.medians[col]), v)
+            j += 1
+        for col in CATEGORICAL:
+            levels = self.encoded[col]
+            if not levels:
+                continue
+            v = np.asarray(_values(data[col]), dtype=object)
+            missing = np.fromiter((_is_missing(x) for x in v), dtype=bool, count=n)
+            v = np.where(missing, self.modes[col], v).astype(str)
+            out[:, j:j + len(levels)] = v[:, None] == np.asarray(levels, dtype=str)[None, :]
+            j += len(levels)
+        return out
+
+    def transform_row(self, row):
+        """Single raw row (dict) -> 1-D float32 vector; pure-Python fast path for serving."""
+        vec = [0.0] * len(self.feature_names)
+        for j, col in enumerate(NUMERIC):
+            v = row.get(col)
+            vec[j] = self.medians[col] if _is_missing(v) else float(v)
+        j = len(NUMERIC)
+        for col in CATEGORICAL:
+            v = row.get(col)
+            v = self.modes[col] if _is_missing(v) else str(v)
+            k = self._index[col].get(v)
+            if k is not None:
+                vec[j + k] = 1.0
+            j += len(self.encoded[col])
+        return np.asarray(vec, dtype=np.float32)
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def to_dict(self):
+        return {"medians": self.medians, "modes": self.modes, "levels": self.levels,
+                "feature_names": self.feature_names}
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            d = json.load(f)
+        return cls(d["medians"], d["modes"], d["levels"])
+
+
+def _values(col):
+    """pandas Series -> ndarray without going through pandas' per-element paths."""
+    return col.to_numpy() if hasattr(col, "to_numpy") else col
@@ -0,0 +1,232 @@
+# src/fs_ingest.py
+# Bulk ingestion into a SageMaker Feature Store online group with PutRecord.
+#
+# Rows are streamed (a DataFrame or CSV, read in chunks) as partitions to a process pool.
+# Each worker process holds one pooled featurestore-runtime client and a thread pool that
+# issues PutRecord calls concurrently over it. Throttled calls are retried with full-jitter
+# exponential backoff; records that still fail (or are rejected outright) are appended to a
+# JSONL dead-letter file that can be replayed with --replay.
+#
+#   python src/fs_ingest.py --input data/train.csv --feature-group titanic-feature-group-XYZ
+#   python src/fs_ingest.py --replay dead_letter.jsonl --feature-group titanic-feature-group-XYZ
+#   python src/fs_ingest.py --input data/train.csv --feature-group local --local --processes 4 --threads 16
+import argparse, json, os, random, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+RETRYABLE = {"ThrottlingException", "ServiceUnavailable", "InternalFailure", "RequestTimeout",
+             "RequestTimeoutException"}
+
+
+# -----------------------------
+# DataFrame -> PutRecord records
+# -----------------------------
+def to_records(df):
+    """Rows -> Feature Store records (lists of FeatureName/ValueAsString). Nulls are
+    omitted, as in FeatureGroup.ingest."""
+    cols = list(df.columns)
+    values = [df[c].astype(object).where(df[c].notna(), None).tolist() for c in cols]
+    return [[{"FeatureName": c, "ValueAsString": str(v)} for c, v in zip(cols, row) if v is not None]
+            for row in zip(*values)]
+
+
+def make_client(region=None, endpoint_url=None, max_connections=10):
+    """featurestore-runtime client with a connection pool sized for the thread pool and
+    botocore retries off (we retry ourselves, with jitter)."""
+    import aws_clients
+    return aws_clients.client("sagemaker-featurestore-runtime", region, max_pool_connections=max(10, max_connections),
+                              max_attempts=1, endpoint_url=endpoint_url)
+
+
+# -----------------------------
+# Per-process worker state
+# -----------------------------
+_worker = {}
+
+
+def _init_worker(feature_group, region, endpoint_url, threads, max_retries, base_backoff, max_backoff):
+    _worker.update(
+        group=feature_group, max_retries=max_retries, base_backoff=base_backoff, max_backoff=max_backoff,
+        client=make_client(region, endpoint_url, threads),
+        pool=ThreadPoolExecutor(max_workers=threads, thread_name_prefix="put-record"),
+    )
+
+
+def _put(record):
+    """PutRecord with retries -> (retries, None) or (retries, dead-letter entry)."""
+    from botocore.exceptions import BotoCoreError, ClientError
+    w = _worker
+    for attempt in range(w["max_retries"] + 1):
+        try:
+            w["client"].put_record(FeatureGroupName=w["group"], Record=record)
+            return attempt, None
+        except ClientError as e:
+            code, message = e.response.get("Error", {}).get("Code"), str(e)
+            if code not in RETRYABLE:
+                break
+        except BotoCoreError as e:  # connection reset / timeout
+            code, message = type(e).__name__, str(e)
+        if attempt < w["max_retries"]:
+            # full jitter: sleep U(0, min(cap, base * 2^attempt))
+            time.sleep(random.uniform(0, min(w["max_backoff"], w["base_backoff"] * 2 ** attempt)))
+    return attempt, {"FeatureGroupName": w["group"], "Record": record, "ErrorCode": code, "ErrorMessage": message}
+
+
+def _ingest_partition(records):
+    """-> (n_ok, n_retries, dead-letter entries) for one partition."""
+    ok, retries, failed = 0, 0, []
+    for n_retries, dead in _worker["pool"].map(_put, records):
+        retries += n_retries
+        if dead is None:
+            ok += 1
+        else:
+            failed.append(dead)
+    return ok, retries, failed
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+def _with_event_time(chunk, event_time):
+    """EventTime column for a chunk without one; the copy is one partition, not the file."""
+    if event_time is None or "EventTime" in chunk.columns:
+        return chunk
+    return chunk.assign(EventTime=event_time)
+
+
+def iter_partitions(source, partition_size, event_time=None):
+    """DataFrame, CSV path or an iterable of records -> lists of records. Rows of a DataFrame
+    or CSV without an EventTime column get `event_time`."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), partition_size):
+            yield to_records(_with_event_time(source.iloc[start:start + partition_size], event_time))
+    elif isinstance(source, str):
+        import csv_cache
+        for chunk in csv_cache.read_csv_chunks(source, partition_size):
+            yield to_records(_with_event_time(chunk, event_time))
+    else:
+        buf = []
+        for record in source:
+            buf.append(record)
+            if len(buf) == partition_size:
+                yield buf
+                buf = []
+        if buf:
+            yield buf
+
+
+def read_dead_letter(path):
+    """Records from a dead-letter file, for replay."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)["Record"]
+
+
+def ingest(source, feature_group, region=None, endpoint_url=None, processes=None, threads=16,
+           partition_size=1000, dead_letter_path="dead_letter.jsonl", max_retries=8, base_backoff=0.05,
+           max_backoff=5.0, log_every=10, event_time=None):
+    """Streams `source` into `feature_group` and returns throughput stats. processes=0 runs
+    everything in this process (one thread pool, no partition pickling). `event_time` fills
+    EventTime per partition when the source has no such column."""
+    processes = (os.cpu_count() or 1) if processes is None else processes
+    init_args = (feature_group, region, endpoint_url, threads, max_retries, base_backoff, max_backoff)
+    stats = {"records": 0, "failed": 0, "retries": 0, "partitions": 0}
+    t0 = time.perf_counter()
+    dead_letter = None
+
+    def collect(result):
+        nonlocal dead_letter
+        ok, retries, failed = result
+        stats["records"] += ok + len(failed)
+        stats["failed"] += len(failed)
+        stats["retries"] += retries
+        stats["partitions"] += 1
+        if failed:
+            if dead_letter is None:
+                dead_letter = open(dead_letter_path, "a")
+            dead_letter.write("".join(json.dumps(d) + "\n" for d in failed))
+            dead_letter.flush()
+        if log_every and stats["partitions"] % log_every == 0:
+            elapsed = time.perf_counter() - t0
+            print(f"{stats['records']} records ({stats['failed']} failed), {stats['records'] / elapsed:.0f} rec/s",
+                  flush=True)
+
+    try:
+        if processes == 0:
+            _init_worker(*init_args)
+            try:
+                for part in iter_partitions(source, partition_size, event_time):
+                    collect(_ingest_partition(part))
+            finally:
+                _worker["pool"].shutdown()
+        else:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=init_args) as pool:
+                pending = set()
+                for part in iter_partitions(source, partition_size, event_time):
+                    pending.add(pool.submit(_ingest_partition, part))
+                    if len(pending) >= 2 * processes:  # bounded: at most 2 partitions per process in flight
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for fut in done:
+                            collect(fut.result())
+                for fut in pending:
+                    collect(fut.result())
+    finally:
+        if dead_letter is not None:
+            dead_letter.close()
+    stats["seconds"] = time.perf_counter() - t0
+    stats["records_per_sec"] = stats["records"] / stats["seconds"] if stats["seconds"] else 0.0
+    stats["dead_letter"] = dead_letter_path if stats["failed"] else None
+    return stats
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--input", default=None, help="CSV to ingest")
+    p.add_argument("--replay", default=None, help="dead-letter JSONL to re-ingest")
+    p.add_argument("--feature-group", required=True)
+    p.add_argument("--region", default=os.getenv("AWS_REGION"))
+    p.add_argument("--processes", type=int, default=None, help="default: all cores; 0 = in-process")
+    p.add_argument("--threads", type=int, default=16, help="concurrent PutRecord calls per process")
+    p.add_argument("--partition-size", type=int, default=1000)
+    p.add_argument("--dead-letter", default="dead_letter.jsonl")
+    p.add_argument("--max-retries", type=int, default=8)
+    p.add_argument("--event-time", default=None, help="EventTime for rows without one (default: now)")
+    p.add_argument("--endpoint-url", default=None, help="e.g. a LocalFeatureStoreServer url")
+    # Offline benchmarking against src/local_aws.py's PutRecord stand-in
+    p.add_argument("--local", action="store_true", help="start a local PutRecord server and ingest into it")
+    p.add_argument("--local-latency-ms", type=float, default=0.0)
+    p.add_argument("--local-throttle-rate", type=float, default=0.0)
+    args = p.parse_args(argv)
+    if bool(args.input) == bool(args.replay):
+        p.error("pass exactly one of --input / --replay")
+
+    server = None
+    if args.local:
+        from local_aws import LocalFeatureStore, LocalFeatureStoreServer
+        server = LocalFeatureStoreServer(LocalFeatureStore(latency_ms=args.local_latency_ms,
+                                                           throttle_rate=args.local_throttle_rate)).start()
+        args.endpoint_url = server.url
+        print("Local PutRecord server at", server.url)
+
+    if args.replay:
+        source = list(read_dead_letter(args.replay))
+        os.replace(args.replay, args.replay + ".replayed")  # failures of this run go to a fresh file
+        print(f"Replaying {len(source)} records from {args.replay}")
+    else:
+        source = args.input  # streamed in partitions; EventTime is added per partition if missing
+    event_time = args.event_time or pd.Timestamp.now(tz="UTC").strftime("%Y-%m-%dT%H:%M:%SZ")
+    stats = ingest(source, args.feature_group, region=args.region, endpoint_url=args.endpoint_url,
+                   processes=args.processes, threads=args.threads, partition_size=args.partition_size,
+                   dead_letter_path=args.dead_letter, max_retries=args.max_retries, event_time=event_time)
+    print(json.dumps(stats))
+    if server is not None:
+        print(f"Server saw {server.store.calls} and holds {len(server.store.records)} records")
+        server.stop()
+    if stats["failed"]:
+        print(f"⚠️ {stats['failed']} records failed; replay with --replay {stats['dead_letter']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# src/hpo.py
+# Local hyperparameter search for train.py: random configurations scheduled with ASHA
+# (asynchronous successive halving) on a process pool, plus XGBoost early stopping.
+#
+# The encoded train/validation matrices are placed in shared memory once; every worker
+# attaches to them and builds its QuantileDMatrix a single time, so trials never re-read
+# or re-copy the data. Each trial trains for the budget of its rung and continues from
+# its previous booster when promoted, so only the best 1/eta of configurations reach
+# the larger budgets.
+#
+#   python src/hpo.py --train data/train.csv --trials 64 --out-dir hpo/
+#   python src/train.py --train data/train.csv --model-dir model/ --hpo-config hpo/best.json
+import argparse, json, math, os, random, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+
+import csv_cache
+from features import TARGET, TitanicTransformer
+
+BASE_PARAMS = {"objective": "binary:logistic", "eval_metric": "auc", "tree_method": "hist", "nthread": 1}
+# XGBClassifier keyword for each searched xgb.train parameter (what train.py consumes)
+SKLEARN_NAMES = {"eta": "learning_rate", "max_depth": "max_depth", "subsample": "subsample",
+                 "colsample_bytree": "colsample_bytree", "min_child_weight": "min_child_weight",
+                 "lambda": "reg_lambda"}
+
+
+def sample_config(rng):
+    return {
+        "eta": math.exp(rng.uniform(math.log(0.01), math.log(0.3))),
+        "max_depth": rng.randint(2, 8),
+        "subsample": rng.uniform(0.5, 1.0),
+        "colsample_bytree": rng.uniform(0.5, 1.0),
+        "min_child_weight": math.exp(rng.uniform(0.0, math.log(10.0))),
+        "lambda": math.exp(rng.uniform(math.log(0.1), math.log(10.0))),
+    }
+
+
+# -----------------------------
+# Shared-memory data, attached once per worker
+# -----------------------------
+def _to_shared(arr):
+    shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+_worker = {}
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    _worker.setdefault("shm", []).append(shm)  # keep the mapping alive
+    return np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+
+
+def _init_worker(specs):
+    X_tr, y_tr, X_va, y_va = (_attach(s) for s in specs)
+    _worker["dtrain"] = xgb.QuantileDMatrix(X_tr, label=y_tr)
+    _worker["dvalid"] = xgb.QuantileDMatrix(X_va, label=y_va, ref=_worker["dtrain"])
+
+
+def _run_trial(trial_id, config, rounds, prev_model, early_stopping):
+    """Trains `rounds` more boosting rounds (continuing prev_model) and returns the result."""
+    t0 = time.perf_counter()
+    params = dict(BASE_PARAMS, **config)
+    booster = None
+    if prev_model is not None:
+        booster = xgb.Booster(params)
+        booster.load_model(bytearray(prev_model))
+    res = {}
+    booster = xgb.train(params, _worker["dtrain"], num_boost_round=rounds, xgb_model=booster,
+                        evals=[(_worker["dvalid"], "valid")], early_stopping_rounds=early_stopping,
+                        evals_result=res, verbose_eval=False)
+    aucs = res["valid"]["auc"]
+    best = int(np.argmax(aucs))
+    done_before = booster.num_boosted_rounds() - len(aucs)
+    return {
+        "trial": trial_id,
+        "auc": float(aucs[best]),
+        "best_round": done_before + best + 1,
+        "total_rounds": booster.num_boosted_rounds(),
+        "stopped_early": len(aucs) < rounds,
+        "seconds": time.perf_counter() - t0,
+        "model": bytes(booster.save_raw("ubj")),
+    }
+
+
+# -----------------------------
+# ASHA scheduler
+# -----------------------------
+class ASHA:
+    """Asynchronous successive halving (Li et al. 2018). Rung k trains to
+    min_rounds * eta**k rounds; a trial is promoted from rung k once it ranks in the
+    top 1/eta of everything that has finished rung k so far."""
+
+    def __init__(self, min_rounds=10, max_rounds=400, eta=3):
+        self.eta = eta
+        self.budgets = []
+        r = min_rounds
+        while r < max_rounds:
+            self.budgets.append(r)
+            r *= eta
+        self.budgets.append(max_rounds)
+        self.rungs = [dict() for _ in self.budgets]  # trial -> auc
+        self.promoted = [set() for _ in self.budgets]
+
+    def record(self, rung, trial, auc):
+        self.rungs[rung][trial] = auc
+
+    def next_promotion(self, finished):
+        """(trial, rung) to promote next, or None. `finished` trials never advance."""
+        for k in range(len(self.budgets) - 2, -1, -1):
+            results = self.rungs[k]
+            n_top = len(results) // self.eta
+            if n_top == 0:
+                continue
+            top = sorted(results, key=results.get, reverse=True)[:n_top]
+            for t in top:
+                if t not in self.promoted[k] and t not in finished:
+                    self.promoted[k].add(t)
+                    return t, k + 1
+        return None
+
+
+def search(X_tr, y_tr, X_va, y_va, n_trials=64, workers=None, min_rounds=10, max_rounds=400, eta=3,
+           early_stopping=20, seed=0, log=None):
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    asha = ASHA(min_rounds, max_rounds, eta)
+    shms, specs = zip(*(_to_shared(np.ascontiguousarray(a)) for a in (X_tr, y_tr, X_va, y_va)))
+    trials, models, finished, wall = {}, {}, set(), {}
+    best = None
+    t_start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(specs,)) as pool:
+            running = {}
+
+            def launch():
+                promo = asha.next_promotion(finished)
+                if promo:
+                    tid, rung = promo
+                    extra = asha.budgets[rung] - trials[tid]["rounds_done"]
+                    fut = pool.submit(_run_trial, tid, trials[tid]["config"], extra, models[tid], early_stopping)
+                elif len(trials) < n_trials:
+                    tid, rung = len(trials), 0
+                    trials[tid] = {"config": sample_config(rng), "rounds_done": 0}
+                    fut = pool.submit(_run_trial, tid, trials[tid]["config"], asha.budgets[0], None, early_stopping)
+                else:
+                    return False
+                running[fut] = rung
+                return True
+
+            while len(running) < workers and launch():
+                pass
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    rung = running.pop(fut)
+                    r = fut.result()
+                    tid = r["trial"]
+                    prev = trials[tid].get("best")
+                    if prev and prev[0] >= r["auc"]:  # earlier rounds were better; keep them
+                        r["auc"], r["best_round"] = prev
+                    trials[tid]["best"] = (r["auc"], r["best_round"])
+                    models[tid] = r.pop("model")
+                    trials[tid]["rounds_done"] = r["total_rounds"]
+                    wall[tid] = wall.get(tid, 0.0) + r["seconds"]
+                    asha.record(rung, tid, r["auc"])
+                    if r["stopped_early"] or rung == len(asha.budgets) - 1:
+                        finished.add(tid)
+                        models[tid] = None  # no further training; free the bytes
+                    entry = dict(r, rung=rung, budget=asha.budgets[rung], config=trials[tid]["config"],
+                                 trial_seconds=wall[tid])
+                    if log:
+                        log.write(json.dumps(entry) + "\n")
+                        log.flush()
+                    if best is None or r["auc"] > best["auc"]:
+                        best = entry
+                    print(f"trial {tid:>3} rung {rung} ({asha.budgets[rung]:>4} rounds)  auc={r['auc']:.4f}  "
+                          f"best_round={r['best_round']:>4}  {r['seconds']:.2f}s", flush=True)
+                while len(running) < workers and launch():
+                    pass
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+    total = time.perf_counter() - t_start
+    return best, {"trials": len(trials), "total_seconds": total, "workers": workers,
+                  "trial_seconds": wall, "budgets": asha.budgets}
+
+
+def to_train_config(best):
+    """best trial -> the XGBClassifier kwargs train.py reads via --hpo-config."""
+    cfg = {SKLEARN_NAMES[k]: v for k, v in best["config"].items()}
+    cfg["n_estimators"] = best["best_round"]
+    return cfg
+
+
+def load_data(train_path):
+    """Same split and fitted transform as train.py."""
+    df = csv_cache.read_csv(train_path)
+    train_df, val_df = train_test_split(df, test_size=0.2, random_state=42)
+    tf = TitanicTransformer().fit(train_df)
+    return (tf.transform(train_df), train_df[TARGET].to_numpy(np.float32),
+            tf.transform(val_df), val_df[TARGET].to_numpy(np.float32))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--train", default="data/train.csv")
+    p.add_argument("--out-dir", default="hpo")
+    p.add_argument("--trials", type=int, default=64)
+    p.add_argument("--workers", type=int, default=None, help="default: all cores")
+    p.add_argument("--min-rounds", type=int, default=10)
+    p.add_argument("--max-rounds", type=int, default=400)
+    p.add_argument("--eta", type=int, default=3, help="ASHA reduction factor")
+    p.add_argument("--early-stopping", type=int, default=20)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    data = load_data(args.train)
+    with open(os.path.join(args.out_dir, "trials.jsonl"), "w") as log:
+        best, summary = search(*data, n_trials=args.trials, workers=args.workers, min_rounds=args.min_rounds,
+                               max_rounds=args.max_rounds, eta=args.eta, early_stopping=args.early_stopping,
+                               seed=args.seed, log=log)
+    result = {"params": to_train_config(best), "valid_auc": best["auc"], "trial": best["trial"],
+              "search_seconds": summary["total_seconds"], "trials": summary["trials"],
+              "workers": summary["workers"], "budgets": summary["budgets"]}
+    with open(os.path.join(args.out_dir, "best.json"), "w") as f:
+        json.dump(result, f, indent=2)
+    per_trial = list(summary["trial_seconds"].values())
+    print(f"Best trial {best['trial']}: auc={best['auc']:.4f} params={result['params']}")
+    print(f"{summary['trials']} trials on {summary['workers']} workers in {summary['total_seconds']:.1f}s "
+          f"(per trial: mean {np.mean(per_trial):.2f}s, max {np.max(per_trial):.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
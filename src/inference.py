@@ -0,0 +1,193 @@
+# src/inference.py
+# Custom scoring handler for the SageMaker XGBoost container (script mode).
+#
+# The container calls model_fn once per worker and then input_fn -> predict_fn -> output_fn
+# for every request. Requests arriving concurrently on the same worker are merged into
+# micro-batches so the booster sees a few large arrays instead of many one-row calls.
+#
+# Numeric rows (CSV or JSON arrays) are scored as-is. JSON records with raw passenger fields,
+# e.g. {"Pclass": 3, "Sex": "male", "Age": 22, ...}, are encoded with the fitted
+# preprocessor.json that train.py saves next to the model. Request parsing and response
+# serialization live in payloads.py (shared with the cold-start handler inference_lite.py).
+#
+# Tunables (env vars, set them on the Model's Environment):
+#   MAX_BATCH_SIZE     max rows per merged batch        (default 256)
+#   MAX_BATCH_WAIT_MS  max time a request waits to batch (default 2; 0 disables batching)
+#   PREDICT_ENGINE     xgboost (default), numpy or codegen; the latter two score with the
+#                      compiled trees from tree_compiler.py instead of calling the booster
+import os, queue, threading, time
+from concurrent.futures import Future
+
+import numpy as np
+import xgboost as xgb
+
+from artifact_cache import find_model_file
+from payloads import PARSERS, input_fn, output_fn, parse_csv, parse_json, parse_jsonl  # noqa: F401  (handler API)
+from features import ARTIFACT_NAME, TitanicTransformer
+from tree_compiler import make_predictor
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "256"))
+MAX_BATCH_WAIT_MS = float(os.getenv("MAX_BATCH_WAIT_MS", "2"))
+PREDICT_ENGINE = os.getenv("PREDICT_ENGINE", "xgboost")
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+# -----------------------------
+# Micro-batching
+# -----------------------------
+class MicroBatcher:
+    """Merges concurrent predict calls into one booster call.
+
+    submit() blocks the calling thread until its rows are scored. A single background
+    thread drains the queue until either max_batch_size rows are collected or
+    max_wait_ms has passed since the first request of the batch arrived.
+    """
+
+    def __init__(self, predict, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_BATCH_WAIT_MS):
+        self.predict = predict
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, X):
+        if self.max_wait == 0:
+            return self.predict(X)
+        fut = Future()
+        with self._lock:
+            if self._closed:  # evicted while this request held it: score inline
+                return self.predict(X)
+            # Start the thread before queueing, under the lock close() takes: a close() right
+            # after this puts its sentinel behind our item, so the item is still scored.
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+                self._thread.start()
+            self._queue.put((X, fut))
+        return fut.result()
+
+    def close(self):
+        """Stops the batching thread once the requests already queued are scored."""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+
+    def _loop(self):
+        pending = None
+        while True:
+            first = pending or self._queue.get()
+            pending = None
+            if first is None:  # close()
+                return
+            items, n_rows = [first], first[0].shape[0]
+            deadline = time.perf_counter() + self.max_wait
+            while n_rows < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:  # close(): score what we have, then stop
+                    self._run(items)
+                    return
+                if n_rows + item[0].shape[0] > self.max_batch_size:
+                    pending = item  # starts the next batch
+                    break
+                items.append(item)
+                n_rows += item[0].shape[0]
+            self._run(items)
+
+    def _run(self, items):
+        groups = {}  # rows of different widths cannot share one array
+        for item in items:
+            groups.setdefault(item[0].shape[1:], []).append(item)
+        for group in groups.values():
+            self._run_group(group)
+
+    def _run_group(self, items):
+        try:
+            X = items[0][0] if len(items) == 1 else np.concatenate([x for x, _ in items])
+            scores = self.predict(X)
+        except Exception as e:
+            if len(items) == 1:
+                items[0][1].set_exception(e)
+                return
+            for item in items:  # score each alone, so only the bad request gets the error
+                self._run_group([item])
+            return
+        self.batches += 1
+        self.rows += X.shape[0]
+        offset = 0
+        for x, fut in items:
+            fut.set_result(scores[offset:offset + x.shape[0]])
+            offset += x.shape[0]
+
+
+class Scorer:
+    """Loaded booster, optional fitted transformer and the micro-batcher; this is what
+    model_fn hands to predict_fn."""
+
+    def __init__(self, booster, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_BATCH_WAIT_MS, transformer=None,
+                 predictor=None):
+        self.booster = booster
+        self.transformer = transformer
+        self.predictor = predictor  # compiled-tree engine; None scores with the booster
+        self.batcher = MicroBatcher(self._predict, max_batch_size, max_wait_ms)
+
+    def encode(self, records):
+        """Raw passenger dicts -> float32 features via the fitted transformer."""
+        if self.transformer is None:
+            raise ValueError(f"Raw records need {ARTIFACT_NAME} next to the model")
+        if len(records) == 1:
+            return self.transformer.transform_row(records[0])[None, :]
+        return self.transformer.transform(records)
+
+    def _predict(self, X):
+        if self.predictor is not None:
+            return self.predictor(X)
+        # inplace_predict skips the DMatrix build and is safe to call from any thread
+        return self.booster.inplace_predict(X)
+
+    def predict(self, X):
+        return self.batcher.submit(X)
+
+    def close(self):
+        self.batcher.close()
+
+
+# -----------------------------
+# SageMaker handler functions
+# -----------------------------
+def load_scorer(model_dir, engine=PREDICT_ENGINE):
+    """Booster (+ preprocessor.json, if any) saved by train.py -> a new Scorer."""
+    model_path = find_model_file(model_dir)
+    booster = xgb.Booster()
+    booster.load_model(model_path)
+    tf_path = os.path.join(model_dir, ARTIFACT_NAME)
+    transformer = TitanicTransformer.load(tf_path) if os.path.exists(tf_path) else None
+    predictor = None if engine == "xgboost" else make_predictor(engine, model_path)
+    return Scorer(booster, transformer=transformer, predictor=predictor)
+
+
+def model_fn(model_dir):
+    """Loads the model saved by train.py. Cached, so repeat calls never re-parse the model."""
+    with _models_lock:
+        if model_dir not in _models:
+            _models[model_dir] = load_scorer(model_dir)
+        return _models[model_dir]
+
+
+def predict_fn(input_data, model):
+    if isinstance(input_data, list):
+        input_data = model.encode(input_data) if input_data else np.empty((0, 0), dtype=np.float32)
+    if input_data.shape[0] == 0:
+        return np.empty(0, dtype=np.float32)
+    return model.predict(input_data)
@@ -0,0 +1,76 @@
+# src/inference_lite.py
+# Cold-start handler for serverless endpoints: same request/response formats as inference.py,
+# but built for the first request rather than the thousandth.
+#
+# It scores a serving bundle (src/serving_bundle.py): the trees pre-flattened into .npy node
+# tables that are memory-mapped, not parsed, plus preprocessor.json. The only imports are
+# NumPy and the project's NumPy-only modules (payloads, tree_compiler, features); xgboost,
+# pandas and sklearn are never loaded, and there is no micro-batching thread (serverless
+# MaxConcurrency is small). An artifact without a bundle falls back to inference.py.
+#
+# Tunables (env vars):
+#   WARMUP  1 (default) scores one synthetic row in model_fn, so the first real request does
+#           not pay for page faults and NumPy's first-call setup; 0 skips it
+import os
+
+import numpy as np
+
+from payloads import input_fn, output_fn  # noqa: F401  (handler API)
+
+BUNDLE_DIR = "compiled"
+WARMUP = os.getenv("WARMUP", "1") != "0"
+
+_models = {}
+
+
+class LiteScorer:
+    """Memory-mapped compiled trees + optional transformer; what model_fn hands to predict_fn."""
+
+    def __init__(self, model, transformer=None):
+        self.model = model
+        self.transformer = transformer
+
+    def encode(self, records):
+        if self.transformer is None:
+            raise ValueError("Raw records need preprocessor.json in the bundle")
+        if len(records) == 1:
+            return self.transformer.transform_row(records[0])[None, :]
+        return self.transformer.transform(records)
+
+    def predict(self, X):
+        return self.model.predict(X)  # raises ValueError on a row width the model wasn't trained on
+
+    def warm_up(self):
+        self.predict(np.zeros((1, self.model.num_feature), dtype=np.float32))
+
+
+def load(model_dir, warm_up=WARMUP):
+    from tree_compiler import CompiledModel
+    model = CompiledModel.load(os.path.join(model_dir, BUNDLE_DIR), mmap=True)
+    transformer = None
+    tf_path = os.path.join(model_dir, "preprocessor.json")
+    if os.path.exists(tf_path):
+        from features import TitanicTransformer
+        transformer = TitanicTransformer.load(tf_path)
+    scorer = LiteScorer(model, transformer)
+    if warm_up:
+        scorer.warm_up()
+    return scorer
+
+
+def model_fn(model_dir):
+    if model_dir not in _models:
+        if os.path.isdir(os.path.join(model_dir, BUNDLE_DIR)):
+            _models[model_dir] = load(model_dir)
+        else:  # plain training artifact: full handler
+            import inference
+            _models[model_dir] = inference.model_fn(model_dir)
+    return _models[model_dir]
+
+
+def predict_fn(input_data, model):
+    if isinstance(input_data, list):
+        input_data = model.encode(input_data) if input_data else np.empty((0, 0), dtype=np.float32)
+    if input_data.shape[0] == 0:
+        return np.empty(0, dtype=np.float32)
+    return model.predict(input_data)
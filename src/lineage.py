@@ -0,0 +1,325 @@
+# src/lineage.py
+# Local lineage index: training jobs, their hyperparameters, artifacts, metrics and data.
+#
+# train.py, run_training.py, evaluate.py and register_model.py record what they produced in
+# a SQLite file, so "which artifact is the latest / has the best AUC this week / was trained
+# on this data" is an indexed query instead of a paginated ListTrainingJobs +
+# DescribeTrainingJob scan. `backfill` imports existing SageMaker training jobs: the listing
+# is split into creation-time windows that are paged concurrently, and the describes run on
+# a thread pool.
+#
+#   python src/lineage.py latest
+#   python src/lineage.py best --metric auc --since-days 7
+#   python src/lineage.py data data/train.csv        # jobs trained on this exact file
+#   python src/lineage.py backfill --since-days 90 --workers 16
+#
+# Tunables (env vars):
+#   LINEAGE_DB   index location (default ~/.cache/titanic-mlops/lineage.sqlite)
+#   LINEAGE      0 turns recording off (queries still work)
+import argparse, contextlib, hashlib, json, os, sqlite3, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+DB_PATH = os.getenv("LINEAGE_DB", os.path.join(os.path.expanduser("~"), ".cache", "titanic-mlops", "lineage.sqlite"))
+ENABLED = os.getenv("LINEAGE", "1") != "0"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_name        TEXT PRIMARY KEY,
+    created         REAL NOT NULL,
+    status          TEXT,
+    source          TEXT,
+    hyperparameters TEXT,
+    artifact_uri    TEXT,
+    data_uri        TEXT,
+    data_hash       TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (status, created);
+CREATE INDEX IF NOT EXISTS jobs_artifact ON jobs (artifact_uri);
+CREATE INDEX IF NOT EXISTS jobs_data_hash ON jobs (data_hash, created);
+CREATE INDEX IF NOT EXISTS jobs_data_uri ON jobs (data_uri, created);
+CREATE TABLE IF NOT EXISTS metrics (
+    job_name TEXT NOT NULL REFERENCES jobs (job_name),
+    name     TEXT NOT NULL,
+    value    REAL NOT NULL,
+    recorded REAL NOT NULL,
+    PRIMARY KEY (job_name, name)
+);
+CREATE INDEX IF NOT EXISTS metrics_by_value ON metrics (name, value);
+CREATE TABLE IF NOT EXISTS packages (
+    package_arn  TEXT PRIMARY KEY,
+    job_name     TEXT,
+    group_name   TEXT,
+    artifact_uri TEXT,
+    endpoint     TEXT,
+    created      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS packages_job ON packages (job_name);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+NON_TERMINAL = ("InProgress", "Stopping")  # training job statuses backfill has to look at again
+
+
+def file_hash(path, block=1 << 20):
+    """Content hash of a local file (same BLAKE2b digest csv_cache uses)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for buf in iter(lambda: f.read(block), b""):
+            h.update(buf)
+    return h.hexdigest()
+
+
+def normalize_uri(uri):
+    """s3:// URIs as given; local paths made absolute so train.py and evaluate.py agree."""
+    return uri if uri is None or "://" in uri else os.path.abspath(uri)
+
+
+# -----------------------------
+# Index
+# -----------------------------
+class Lineage:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with contextlib.suppress(sqlite3.OperationalError):  # WAL: readers don't block the writer
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # --- writes -------------------------------------------------------
+    def record_job(self, job_name, created=None, status=None, source=None, hyperparameters=None,
+                   artifact_uri=None, data_uri=None, data_hash=None, metrics=None):
+        """Inserts or updates a job; fields left as None keep their stored value."""
+        params = None if hyperparameters is None else json.dumps(hyperparameters, sort_keys=True, default=str)
+        with self._lock, self.db:
+            self.db.execute(
+                """INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (job_name) DO UPDATE SET
+                     status = COALESCE(excluded.status, status), source = COALESCE(excluded.source, source),
+                     hyperparameters = COALESCE(excluded.hyperparameters, hyperparameters),
+                     artifact_uri = COALESCE(excluded.artifact_uri, artifact_uri),
+                     data_uri = COALESCE(excluded.data_uri, data_uri),
+                     data_hash = COALESCE(excluded.data_hash, data_hash)""",
+                (job_name, created or time.time(), status, source, params, normalize_uri(artifact_uri),
+                 normalize_uri(data_uri), data_hash))
+            self._put_metrics(job_name, metrics or {})
+        return job_name
+
+    def _put_metrics(self, job_name, metrics):
+        now = time.time()
+        self.db.executemany("INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?)",
+                            [(job_name, k, float(v), now) for k, v in metrics.items()
+                             if isinstance(v, (int, float)) and not isinstance(v, bool)])
+
+    def record_metrics(self, metrics, job_name=None, artifact_uri=None):
+        """Attaches metrics to a job, found by name or by its artifact. An artifact no job produced
+        gets a job row named after the artifact, so evaluations of foreign models are kept too."""
+        artifact_uri = normalize_uri(artifact_uri)
+        if job_name is None:
+            job = self.by_artifact(artifact_uri)
+            job_name = job["job_name"] if job else self.record_job(artifact_uri, source="artifact",
+                                                                   artifact_uri=artifact_uri)
+        with self._lock, self.db:
+            self._put_metrics(job_name, metrics)
+        return job_name
+
+    def record_package(self, package_arn, group, artifact_uri, endpoint=None, job_name=None):
+        artifact_uri = normalize_uri(artifact_uri)
+        if job_name is None:
+            job = self.by_artifact(artifact_uri)
+            job_name = job["job_name"] if job else None
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO packages VALUES (?, ?, ?, ?, ?, ?)",
+                            (package_arn, job_name, group, artifact_uri, endpoint, time.time()))
+
+    # --- queries ------------------------------------------------------
+    def _jobs(self, where="1", args=(), order="j.created DESC", limit=1, extra_from=""):
+        rows = self.db.execute(f"SELECT j.* FROM jobs j {extra_from} WHERE {where} ORDER BY {order} LIMIT ?",
+                               (*args, limit)).fetchall()
+        return [self._expand(r) for r in rows]
+
+    def _expand(self, row):
+        job = dict(row)
+        job["hyperparameters"] = json.loads(job["hyperparameters"]) if job["hyperparameters"] else {}
+        job["metrics"] = {r["name"]: r["value"] for r in
+                          self.db.execute("SELECT name, value FROM metrics WHERE job_name = ?", (job["job_name"],))}
+        return job
+
+    def get(self, job_name):
+        jobs = self._jobs("j.job_name = ?", (job_name,))
+        return jobs[0] if jobs else None
+
+    def by_artifact(self, artifact_uri):
+        jobs = self._jobs("j.artifact_uri = ?", (normalize_uri(artifact_uri),))
+        return jobs[0] if jobs else None
+
+    def latest(self, n=1, status="Completed", with_artifact=True):
+        """Most recently created jobs (any status when `status` is None)."""
+        where, args = ["1"], []
+        if status:
+            where.append("j.status = ?")
+            args.append(status)
+        if with_artifact:
+            where.append("j.artifact_uri IS NOT NULL")
+        return self._jobs(" AND ".join(where), args, limit=n)
+
+    def best(self, metric="auc", since=None, n=1, higher_is_better=True):
+        """Jobs with the best value of `metric`, optionally only those created after `since` (epoch s)."""
+        where, args = "m.name = ? AND j.created >= ? AND j.artifact_uri IS NOT NULL", (metric, since or 0)
+        order = f"m.value {'DESC' if higher_is_better else 'ASC'}, j.created DESC"
+        return self._jobs(where, args, order, n, "JOIN metrics m ON m.job_name = j.job_name")
+
+    def by_data(self, version, n=20):
+        """Jobs trained on a data version: a content hash, a data URI, or a local file (hashed)."""
+        if os.path.isfile(version):
+            version = file_hash(version)
+        return self._jobs("j.data_hash = ? OR j.data_uri = ?", (version, normalize_uri(version)), limit=n)
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    # --- backfill -----------------------------------------------------
+    def backfill(self, sm, since=None, until=None, workers=8, windows=None, log=print):
+        """Imports SageMaker training jobs created in [since, until) (epoch s). With since=None it
+        continues where the last backfill ended, or from the oldest indexed job that was still
+        running, whichever is earlier. Returns the number of jobs recorded."""
+        from datetime import datetime, timezone
+        until = until or time.time()
+        if since is None:
+            since = self._resume_point()
+            if since is None:
+                first = sm.list_training_jobs(SortBy="CreationTime", SortOrder="Ascending",
+                                              MaxResults=1)["TrainingJobSummaries"]
+                if not first:
+                    return 0
+                since = first[0]["CreationTime"].timestamp()
+        windows = max(1, windows or workers)
+        step = (until - since) / windows
+        edges = [since + i * step for i in range(windows)] + [until]
+        ts = lambda t: datetime.fromtimestamp(t, timezone.utc)
+
+        def list_window(lo, hi):
+            names, kw = [], {"CreationTimeAfter": ts(lo), "CreationTimeBefore": ts(hi), "MaxResults": 100}
+            while True:
+                page = sm.list_training_jobs(**kw)
+                names += [(s["TrainingJobName"], s["TrainingJobStatus"]) for s in page["TrainingJobSummaries"]
+                          if lo <= s["CreationTime"].timestamp() < hi]  # window edges are inclusive in the API
+                if not page.get("NextToken"):
+                    return names
+                kw["NextToken"] = page["NextToken"]
+
+        def import_job(name):
+            d = sm.describe_training_job(TrainingJobName=name)
+            channels = {c["ChannelName"]: c["DataSource"].get("S3DataSource", {}).get("S3Uri")
+                        for c in d.get("InputDataConfig", [])}
+            self.record_job(
+                name, created=d["CreationTime"].timestamp(), status=d["TrainingJobStatus"], source="sagemaker",
+                hyperparameters={k: v for k, v in d.get("HyperParameters", {}).items() if not k.startswith("sagemaker_")},
+                artifact_uri=d.get("ModelArtifacts", {}).get("S3ModelArtifacts"),
+                data_uri=channels.get("train") or next(iter(channels.values()), None),
+                metrics={m["MetricName"]: m["Value"] for m in d.get("FinalMetricDataList", [])})
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            listed = [job for names in pool.map(list_window, edges[:-1], edges[1:]) for job in names]
+            known = {r[0]: r[1] for r in self.db.execute("SELECT job_name, status FROM jobs WHERE source = 'sagemaker'")}
+            todo = [name for name, status in listed if known.get(name) != status]  # new or changed status
+            list(pool.map(import_job, todo))
+        with self._lock, self.db:
+            self.db.execute("""INSERT INTO meta VALUES ('backfill_until', ?)
+                               ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)""", (until,))
+        if log:
+            log(f"✅ {len(todo)} of {len(listed)} training jobs imported from {windows} windows "
+                f"in {time.perf_counter() - t0:.1f}s")
+        return len(todo)
+
+    def _resume_point(self):
+        """Where an incremental backfill starts. Not MAX(created): run_training.py records its own
+        job, and jobs created before it elsewhere (CI, another laptop) would be skipped."""
+        until = self.db.execute("SELECT value FROM meta WHERE key = 'backfill_until'").fetchone()
+        marks = ",".join("?" * len(NON_TERMINAL))
+        running = self.db.execute(f"SELECT MIN(created) FROM jobs WHERE status IN ({marks})", NON_TERMINAL).fetchone()[0]
+        points = [t for t in (until and until[0], running) if t is not None]
+        return min(points) if points else None
+
+
+# -----------------------------
+# Best-effort hooks for the scripts
+# -----------------------------
+_default = None
+
+
+def default_index():
+    global _default
+    if _default is None:
+        _default = Lineage()
+    return _default
+
+
+def record(method, *args, **kwargs):
+    """Calls Lineage.<method> on the default index; lineage problems never fail the caller."""
+    if not ENABLED:
+        return None
+    try:
+        return getattr(default_index(), method)(*args, **kwargs)
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠️ lineage: {method} not recorded ({e})", file=sys.stderr)
+        return None
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Query or backfill the local training lineage index")
+    p.add_argument("--db", default=DB_PATH)
+    sub = p.add_subparsers(dest="action", required=True)
+    q = sub.add_parser("latest", help="most recent completed jobs")
+    q.add_argument("-n", type=int, default=1)
+    q = sub.add_parser("best", help="best jobs by a metric")
+    q.add_argument("--metric", default="auc")
+    q.add_argument("--since-days", type=float, default=None)
+    q.add_argument("--lower-is-better", action="store_true")
+    q.add_argument("-n", type=int, default=1)
+    q = sub.add_parser("data", help="jobs trained on a data version (hash, URI or local file)")
+    q.add_argument("version")
+    q = sub.add_parser("show", help="one job, by name or artifact URI")
+    q.add_argument("name")
+    q = sub.add_parser("backfill", help="import SageMaker training jobs")
+    q.add_argument("--since-days", type=float, default=None, help="default: continue from the last import")
+    q.add_argument("--workers", type=int, default=8)
+    q.add_argument("--region", default=None)
+    args = p.parse_args(argv)
+
+    index = Lineage(args.db)
+    if args.action == "backfill":
+        import aws_clients
+        sm = aws_clients.client("sagemaker", args.region, max_pool_connections=args.workers)
+        since = time.time() - args.since_days * 86400 if args.since_days else None
+        index.backfill(sm, since, workers=args.workers)
+        return 0
+    if args.action == "latest":
+        jobs = index.latest(args.n)
+    elif args.action == "best":
+        since = time.time() - args.since_days * 86400 if args.since_days else None
+        jobs = index.best(args.metric, since, args.n, higher_is_better=not args.lower_is_better)
+    elif args.action == "data":
+        jobs = index.by_data(args.version)
+    else:
+        job = index.get(args.name) or index.by_artifact(args.name)
+        jobs = [job] if job else []
+    for job in jobs:
+        print(json.dumps(job, default=str))
+    if not jobs:
+        print("❌ No matching jobs", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
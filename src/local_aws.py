@@ -0,0 +1,285 @@
+# src/local_aws.py
+# Filesystem/in-memory stand-ins for the AWS APIs this project calls, so the caches,
+# clients and waiters can be exercised and benchmarked offline. Each class implements
+# only the boto3 methods the project uses, with the same names and response shapes.
+import os, shutil, threading
+
+from botocore.exceptions import ClientError
+
+
+def _client_error(code, message, op, status=400):
+    return ClientError({"Error": {"Code": code, "Message": message},
+                        "ResponseMetadata": {"HTTPStatusCode": status}}, op)
+
+
+class LocalS3:
+    """s3://bucket/key maps to <root>/bucket/key. ETag changes whenever the object does."""
+
+    def __init__(self, root):
+        self.root = root
+        self.calls = {"head_object": 0, "download_file": 0, "upload_file": 0}
+        self._lock = threading.Lock()
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, key)
+
+    def _count(self, op):
+        with self._lock:
+            self.calls[op] += 1
+
+    def head_object(self, Bucket, Key):
+        self._count("head_object")
+        path = self._path(Bucket, Key)
+        if not os.path.isfile(path):
+            raise _client_error("404", "Not Found", "HeadObject", 404)
+        st = os.stat(path)
+        return {"ETag": f'"{st.st_size:x}-{st.st_mtime_ns:x}"', "ContentLength": st.st_size}
+
+    def download_file(self, Bucket, Key, Filename):
+        self._count("download_file")
+        path = self._path(Bucket, Key)
+        if not os.path.isfile(path):
+            raise _client_error("404", "Not Found", "GetObject", 404)
+        shutil.copyfile(path, Filename)
+
+    def upload_file(self, Filename, Bucket, Key):
+        self._count("upload_file")
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(Filename, path)
+
+
+# -----------------------------
+# sagemaker-featurestore-runtime
+# -----------------------------
+BATCH_GET_LIMIT = 100
+
+
+class LocalFeatureStore:
+    """In-memory online store with the featurestore-runtime record calls. Records are keyed
+    by (feature group, record identifier value); the identifier feature defaults to
+    `record_identifier` unless registered per group with create_group()."""
+
+    def __init__(self, record_identifier="PassengerId", latency_ms=0.0, throttle_rate=0.0, seed=0):
+        import random
+        self.record_identifier = record_identifier
+        self.identifiers = {}
+        self.records = {}
+        self.latency = latency_ms / 1000.0
+        self.throttle_rate = throttle_rate
+        self.calls = {"put_record": 0, "get_record": 0, "batch_get_record": 0, "throttled": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create_group(self, name, record_identifier):
+        self.identifiers[name] = record_identifier
+
+    def _enter(self, op):
+        import time
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[op] += 1
+            throttled = self._rng.random() < self.throttle_rate
+            if throttled:
+                self.calls["throttled"] += 1
+        if throttled:
+            raise _client_error("ThrottlingException", "Rate exceeded", op, 400)
+
+    def put_record(self, FeatureGroupName, Record, **kw):
+        self._enter("put_record")
+        ident = self.identifiers.get(FeatureGroupName, self.record_identifier)
+        values = {f["FeatureName"]: f.get("ValueAsString") for f in Record}
+        if ident not in values:
+            raise _client_error("ValidationError", f"Record is missing identifier {ident}", "PutRecord")
+        with self._lock:
+            self.records[(FeatureGroupName, values[ident])] = Record
+        return {}
+
+    def get_record(self, FeatureGroupName, RecordIdentifierValueAsString, FeatureNames=None, **kw):
+        self._enter("get_record")
+        record = self.records.get((FeatureGroupName, RecordIdentifierValueAsString))
+        if record is None:
+            return {}
+        if FeatureNames:
+            record = [f for f in record if f["FeatureName"] in FeatureNames]
+        return {"Record": record}
+
+    def batch_get_record(self, Identifiers, **kw):
+        """Identifiers not in the store are simply absent from Records, as in the service."""
+        if sum(len(i["RecordIdentifiersValueAsString"]) for i in Identifiers) > BATCH_GET_LIMIT:
+            raise _client_error("ValidationError", f"At most {BATCH_GET_LIMIT} identifiers per call",
+                                "BatchGetRecord")
+        self._enter("batch_get_record")
+        out = []
+        for ident in Identifiers:
+            group, names = ident["FeatureGroupName"], ident.get("FeatureNames")
+            for value in ident["RecordIdentifiersValueAsString"]:
+                record = self.records.get((group, value))
+                if record is None:
+                    continue
+                if names:
+                    record = [f for f in record if f["FeatureName"] in names]
+                out.append({"FeatureGroupName": group, "RecordIdentifierValueAsString": value, "Record": record})
+        return {"Records": out, "Errors": [], "UnprocessedIdentifiers": []}
+
+
+class LocalFeatureStoreServer:
+    """Serves a LocalFeatureStore over the featurestore-runtime REST protocol, so a real
+    boto3 client (endpoint_url=server.url) can be pointed at it, e.g. for throughput runs:
+
+        server = LocalFeatureStoreServer(LocalFeatureStore(throttle_rate=0.01)).start()
+        boto3.client("sagemaker-featurestore-runtime", endpoint_url=server.url, ...)
+    """
+
+    def __init__(self, store, host="127.0.0.1", port=0):
+        import json, socket, urllib.parse
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, obj, error_type=None):
+                body = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if error_type:
+                    self.send_header("x-amzn-ErrorType", error_type)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _dispatch(self, call):
+                try:
+                    self._reply(200, call())
+                except ClientError as e:
+                    err = e.response["Error"]
+                    self._reply(e.response["ResponseMetadata"]["HTTPStatusCode"], {"message": err["Message"]},
+                                err["Code"])
+
+            def _group(self):
+                url = urllib.parse.urlsplit(self.path)
+                prefix = "/FeatureGroup/"
+                if not url.path.startswith(prefix):
+                    return None, None
+                return urllib.parse.unquote(url.path[len(prefix):]), urllib.parse.parse_qs(url.query)
+
+            def do_PUT(self):
+                group, _ = self._group()
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if group is None:
+                    return self._reply(404, {"message": "not found"}, "ResourceNotFound")
+                self._dispatch(lambda: store.put_record(FeatureGroupName=group, Record=body.get("Record", [])))
+
+            def do_GET(self):
+                group, query = self._group()
+                if group is None:
+                    return self._reply(404, {"message": "not found"}, "ResourceNotFound")
+                ident = query.get("RecordIdentifierValueAsString", [""])[0]
+                self._dispatch(lambda: store.get_record(FeatureGroupName=group, RecordIdentifierValueAsString=ident,
+                                                        FeatureNames=query.get("FeatureName")))
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if urllib.parse.urlsplit(self.path).path != "/BatchGetRecord":
+                    return self._reply(404, {"message": "not found"}, "ResourceNotFound")
+                self._dispatch(lambda: store.batch_get_record(Identifiers=body.get("Identifiers", [])))
+
+        self.store = store
+        server_cls = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 1024, "daemon_threads": True})
+        self.httpd = server_cls((host, port), Handler)
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="local-featurestore", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# -----------------------------
+# sagemaker describe_* calls on a simulated clock
+# -----------------------------
+class SimClock:
+    """Virtual time: sleep() advances now() instantly, so hour-long waits run in microseconds."""
+
+    def __init__(self, start=0.0):
+        self.t = float(start)
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.t += max(0.0, seconds)
+
+
+class LocalSageMaker:
+    """describe_* for resources that follow scripted timelines, e.g.
+
+        sm = LocalSageMaker(clock)
+        sm.add("endpoint", "ep", [("Creating", 0), ("InService", 240)])
+
+    Each timeline is a list of (status, seconds after add()); the last status sticks. A
+    "NotFound" status raises the same ClientError the real API does.
+    """
+
+    FIELDS = {
+        "endpoint": ("DescribeEndpoint", "EndpointName", "EndpointStatus", "ValidationException"),
+        "feature-group": ("DescribeFeatureGroup", "FeatureGroupName", "FeatureGroupStatus", "ResourceNotFound"),
+        "training-job": ("DescribeTrainingJob", "TrainingJobName", "TrainingJobStatus", "ValidationException"),
+        "processing-job": ("DescribeProcessingJob", "ProcessingJobName", "ProcessingJobStatus",
+                           "ValidationException"),
+        "pipeline-execution": ("DescribePipelineExecution", "PipelineExecutionArn", "PipelineExecutionStatus",
+                               "ResourceNotFound"),
+    }
+
+    def __init__(self, clock=None):
+        import time
+        self.clock = clock or time.monotonic
+        self.resources = {}
+        self.calls = 0
+
+    def add(self, kind, name, timeline, failure_reason=None):
+        self.resources[(kind, name)] = (self.clock(), sorted(timeline, key=lambda s: s[1]), failure_reason)
+
+    def _describe(self, kind, name):
+        op, arg, field, not_found = self.FIELDS[kind]
+        self.calls += 1
+        entry = self.resources.get((kind, name))
+        status = "NotFound"
+        if entry is not None:
+            t0, timeline, reason = entry
+            elapsed = self.clock() - t0
+            for s, at in timeline:
+                if at <= elapsed:
+                    status = s
+        if status == "NotFound":
+            raise _client_error(not_found, f"Could not find {kind} \"{name}\".", op)
+        out = {arg: name, field: status}
+        if entry[2] and "Fail" in status:
+            out["FailureReason"] = entry[2]
+        return out
+
+    def describe_endpoint(self, EndpointName):
+        return self._describe("endpoint", EndpointName)
+
+    def describe_feature_group(self, FeatureGroupName, **kw):
+        return self._describe("feature-group", FeatureGroupName)
+
+    def describe_training_job(self, TrainingJobName):
+        return self._describe("training-job", TrainingJobName)
+
+    def describe_processing_job(self, ProcessingJobName):
+        return self._describe("processing-job", ProcessingJobName)
+
+    def describe_pipeline_execution(self, PipelineExecutionArn):
+        return self._describe("pipeline-execution", PipelineExecutionArn)
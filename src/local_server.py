@@ -0,0 +1,196 @@
+# src/local_server.py
+# Local stand-in for a SageMaker endpoint: serves src/inference.py over HTTP with the same
+# /ping and /invocations routes the container exposes, plus a load harness to measure
+# throughput and tail latency for different micro-batch settings on a laptop.
+#
+#   python src/local_server.py serve --model-dir /tmp/model --port 8080
+#   python src/local_server.py serve --model-store /tmp/models --budget-mb 6144   # multi-model, see model_host.py
+#   python src/local_server.py bench --model-dir /tmp/model --batch-sizes 1,16,64,256
+import argparse, http.client, json, socket, threading, time, urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import inference
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    model = None  # set per server class in make_server
+    host = None  # model_host.ModelHost when serving many models
+
+    def setup(self):
+        super().setup()
+        # headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):  # keep the benchmark output readable
+        pass
+
+    def _reply(self, status, body, content_type="application/json"):
+        body = body.encode() if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/ping":
+            self._reply(200, "")
+        elif self.path == "/models" and self.host is not None:
+            self._reply(200, json.dumps({"stats": self.host.stats(), "loaded": self.host.loaded()}))
+        else:
+            self._reply(404, json.dumps({"error": "not found"}))
+
+    def do_POST(self):
+        if self.path != "/invocations":
+            return self._reply(404, json.dumps({"error": "not found"}))
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            content_type, accept = self.headers.get("Content-Type", "text/csv"), self.headers.get("Accept", "application/json")
+            if self.host is not None:
+                import model_host
+                out, content_type = self.host.invoke(body, content_type, accept, self.headers.get(model_host.TARGET_HEADER))
+            else:
+                pred = inference.predict_fn(inference.input_fn(body, content_type), self.model)
+                out, content_type = inference.output_fn(pred, accept)
+        except ValueError as e:
+            return self._reply(400, json.dumps({"error": str(e)}))
+        except FileNotFoundError as e:  # unknown target model
+            return self._reply(404, json.dumps({"error": str(e)}))
+        except Exception as e:
+            return self._reply(500, json.dumps({"error": str(e)}))
+        self._reply(200, out, content_type)
+
+
+def make_server(model_dir, host="127.0.0.1", port=8080, max_batch_size=None, max_wait_ms=None):
+    """Builds (but does not start) a threaded server. port=0 picks a free port."""
+    model = inference.model_fn(model_dir)
+    if max_batch_size is not None or max_wait_ms is not None:
+        model = inference.Scorer(
+            model.booster,
+            max_batch_size if max_batch_size is not None else inference.MAX_BATCH_SIZE,
+            max_wait_ms if max_wait_ms is not None else inference.MAX_BATCH_WAIT_MS,
+            transformer=model.transformer,
+            predictor=model.predictor,
+        )
+    handler = type("Handler", (_Handler,), {"model": model})
+    server_cls = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+    server = server_cls((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def make_host_server(host_obj, host="127.0.0.1", port=8080):
+    """Threaded server routing /invocations by the target-model header to a ModelHost."""
+    handler = type("Handler", (_Handler,), {"host": host_obj})
+    server_cls = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+    server = server_cls((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_background(server):
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    return f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(np.asarray(latencies) * 1000.0, q)) if latencies else float("nan")
+
+
+def run_load(url, rows, n_requests, concurrency, rows_per_request=1):
+    """Fires n_requests CSV payloads from `concurrency` client threads; returns stats."""
+    lines = [",".join(repr(float(v)) for v in r) for r in rows]
+    payloads = ["\n".join(lines[i:i + rows_per_request]).encode()
+                for i in range(0, len(lines) - rows_per_request + 1, rows_per_request)]
+    netloc = urllib.parse.urlsplit(url).netloc
+    latencies = []
+    lock = threading.Lock()
+    local = threading.local()  # one keep-alive connection per client thread
+
+    def one(i):
+        if not hasattr(local, "conn"):
+            local.conn = http.client.HTTPConnection(netloc)
+        t0 = time.perf_counter()
+        local.conn.request("POST", "/invocations", body=payloads[i % len(payloads)],
+                           headers={"Content-Type": "text/csv", "Accept": "application/json"})
+        resp = local.conn.getresponse()
+        resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}")
+        with lock:
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n_requests)))
+    wall = time.perf_counter() - t0
+    return {
+        "requests": n_requests,
+        "throughput_rps": n_requests / wall,
+        "p50_ms": percentile_ms(latencies, 50),
+        "p99_ms": percentile_ms(latencies, 99),
+    }
+
+
+def bench(args):
+    n_features = inference.model_fn(args.model_dir).booster.num_features()
+    rng = np.random.default_rng(0)
+    rows = rng.random((512, n_features), dtype=np.float32) * 10
+    results = []
+    for bs in [int(b) for b in args.batch_sizes.split(",")]:
+        server = make_server(args.model_dir, port=0, max_batch_size=bs,
+                             max_wait_ms=args.max_wait_ms if bs > 1 else 0)
+        url = start_background(server)
+        run_load(url, rows, min(50, args.requests), args.concurrency, args.rows_per_request)  # warm up
+        stats = run_load(url, rows, args.requests, args.concurrency, args.rows_per_request)
+        server.shutdown()
+        server.server_close()
+        stats.update({"max_batch_size": bs, "max_wait_ms": args.max_wait_ms if bs > 1 else 0,
+                      "concurrency": args.concurrency, "rows_per_request": args.rows_per_request})
+        results.append(stats)
+        print(f"batch={bs:>4}  rps={stats['throughput_rps']:8.1f}  "
+              f"p50={stats['p50_ms']:6.2f}ms  p99={stats['p99_ms']:6.2f}ms", flush=True)
+    if args.out:
+        json.dump(results, open(args.out, "w"), indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    sub = p.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve")
+    s.add_argument("--model-dir", default=None)
+    s.add_argument("--model-store", default=None, help="serve every model under this prefix (model_host.py)")
+    s.add_argument("--budget-mb", type=float, default=None, help="with --model-store: memory budget for loaded models")
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=8080)
+    b = sub.add_parser("bench")
+    b.add_argument("--model-dir", required=True)
+    b.add_argument("--batch-sizes", default="1,16,64,256")
+    b.add_argument("--max-wait-ms", type=float, default=2.0)
+    b.add_argument("--concurrency", type=int, default=32)
+    b.add_argument("--requests", type=int, default=2000)
+    b.add_argument("--rows-per-request", type=int, default=1)
+    b.add_argument("--out", default=None)
+    args = p.parse_args()
+
+    if args.cmd == "serve" and args.model_store:
+        import model_host
+        budget = args.budget_mb * 1024 * 1024 if args.budget_mb else model_host.BUDGET_BYTES
+        srv = make_host_server(model_host.ModelHost(args.model_store, budget), args.host, args.port)
+        print(f"Serving models under {args.model_store} on http://{args.host}:{args.port} "
+              f"(/ping, /invocations with {model_host.TARGET_HEADER}, /models)")
+        srv.serve_forever()
+    elif args.cmd == "serve":
+        if not args.model_dir:
+            p.error("serve needs --model-dir or --model-store")
+        srv = make_server(args.model_dir, args.host, args.port)
+        print(f"Serving {args.model_dir} on http://{args.host}:{args.port} (/ping, /invocations)")
+        srv.serve_forever()
+    else:
+        bench(args)
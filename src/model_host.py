@@ -0,0 +1,159 @@
+# src/model_host.py
+# Multi-model host: many model versions behind one endpoint process.
+#
+# Requests name their model with the X-Amzn-SageMaker-Target-Model header (the header a
+# SageMaker multi-model endpoint forwards; InvokeEndpoint's TargetModel sets it), e.g.
+# "v7/model.tar.gz", resolved against MODEL_STORE (an s3:// prefix or a local directory).
+# Requests without it go to MODEL_HOST_DEFAULT. Models are loaded on first use through
+# artifact_cache (downloaded/extracted once per machine), into inference.Scorer objects, so
+# every version gets the usual micro-batching and raw-record encoding.
+#
+# Loaded models are kept in LRU order and evicted once their estimated memory exceeds the
+# budget. A booster's footprint is estimated as its serialized (UBJSON) size times
+# MODEL_HOST_MEMORY_FACTOR, calibrated with benchmarks/bench_model_host.py. Concurrent
+# requests for a model that is not loaded yet share a single load (single-flight).
+#
+#   python src/local_server.py serve --model-store s3://bucket/titanic/models/ --budget-mb 6144
+#   curl -H "X-Amzn-SageMaker-Target-Model: v7/model.tar.gz" --data-binary @rows.csv localhost:8080/invocations
+#
+# Tunables (env vars):
+#   MODEL_STORE               prefix that target names are resolved against
+#   MODEL_HOST_DEFAULT        target for requests without the header (default: none -> 400)
+#   MODEL_HOST_BUDGET_MB      memory budget for loaded models (default 6144, an ml.m5.large minus headroom)
+#   MODEL_HOST_MEMORY_FACTOR  in-memory bytes per serialized byte (default 3)
+import os, threading, time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+TARGET_HEADER = "X-Amzn-SageMaker-Target-Model"
+MODEL_STORE = os.getenv("MODEL_STORE", "")
+DEFAULT_TARGET = os.getenv("MODEL_HOST_DEFAULT") or None
+BUDGET_BYTES = int(float(os.getenv("MODEL_HOST_BUDGET_MB", "6144")) * 1024 * 1024)
+MEMORY_FACTOR = float(os.getenv("MODEL_HOST_MEMORY_FACTOR", "3"))
+
+
+class TargetError(ValueError):
+    """Bad or missing target model name (a client error, HTTP 400)."""
+
+
+def estimate_bytes(scorer, factor=MEMORY_FACTOR):
+    """Approximate resident size of a loaded Scorer."""
+    return int(len(scorer.booster.save_raw("ubj")) * factor)
+
+
+class ModelHost:
+    def __init__(self, store=MODEL_STORE, budget_bytes=BUDGET_BYTES, default_target=DEFAULT_TARGET,
+                 loader=None, sizer=estimate_bytes):
+        self.store = store
+        self.budget = int(budget_bytes)
+        self.default_target = default_target
+        self.loader = loader or self._load  # target -> Scorer
+        self.sizer = sizer
+        self.counters = {"hits": 0, "loads": 0, "load_waits": 0, "evictions": 0, "load_errors": 0,
+                         "load_seconds": 0.0}
+        self._models = OrderedDict()  # target -> (scorer, bytes), least recently used first
+        self._loading = {}  # target -> Future shared by everyone waiting for that load
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # Resolution / loading
+    # -----------------------------
+    def resolve(self, target):
+        """Target name -> artifact URI under the store. Names may not climb out of it."""
+        target = (target or self.default_target or "").strip()
+        if not target:
+            raise TargetError(f"No target model: set the {TARGET_HEADER} header")
+        if target.startswith("/") or ".." in target.split("/") or "://" in target:
+            raise TargetError(f"Invalid target model {target!r}")
+        return target, (self.store.rstrip("/") + "/" + target if self.store else target)
+
+    def _load(self, target):
+        import artifact_cache
+        import inference
+        _, uri = self.resolve(target)
+        return inference.load_scorer(artifact_cache.fetch(uri))
+
+    def get(self, target=None):
+        """The loaded Scorer for `target`, loading (and evicting others) if needed."""
+        target, _ = self.resolve(target)
+        with self._lock:
+            entry = self._models.get(target)
+            if entry is not None:
+                self._models.move_to_end(target)
+                self.counters["hits"] += 1
+                return entry[0]
+            fut = self._loading.get(target)
+            leader = fut is None
+            if leader:
+                fut = self._loading[target] = Future()
+            else:
+                self.counters["load_waits"] += 1
+        if not leader:
+            return fut.result()
+        t0 = time.perf_counter()
+        try:
+            scorer = self.loader(target)
+            size = self.sizer(scorer)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[target]
+                self.counters["load_errors"] += 1
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[target]
+            self._models[target] = (scorer, size)
+            self._bytes += size
+            self.counters["loads"] += 1
+            self.counters["load_seconds"] += time.perf_counter() - t0
+            evicted = self._evict_over_budget(keep=target)
+        for old in evicted:
+            old.close()
+        fut.set_result(scorer)
+        return scorer
+
+    def _evict_over_budget(self, keep):
+        evicted = []
+        while self._bytes > self.budget and len(self._models) > 1:
+            target = next(iter(self._models))
+            if target == keep:
+                break
+            evicted.append(self._pop(target))
+        return evicted
+
+    def _pop(self, target):
+        scorer, size = self._models.pop(target)
+        self._bytes -= size
+        self.counters["evictions"] += 1
+        return scorer
+
+    def evict(self, target):
+        """Unloads `target`; returns False if it was not loaded."""
+        with self._lock:
+            scorer = self._pop(target) if target in self._models else None
+        if scorer is not None:
+            scorer.close()  # requests that already hold it still finish
+        return scorer is not None
+
+    # -----------------------------
+    # Serving
+    # -----------------------------
+    def predict(self, X, target=None):
+        import inference
+        return inference.predict_fn(X, self.get(target))
+
+    def invoke(self, body, content_type="text/csv", accept="application/json", target=None):
+        """One /invocations request: parse, route, score, serialize."""
+        import inference
+        data = inference.input_fn(body, content_type)
+        return inference.output_fn(self.predict(data, target), accept)
+
+    def loaded(self):
+        with self._lock:
+            return {t: size for t, (_, size) in self._models.items()}
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "loaded": len(self._models), "loaded_bytes": self._bytes,
+                    "budget_bytes": self.budget, "loading": len(self._loading)}
@@ -1,21 +1,20 @@
 # src/monitor_setup.py
-import os, json, boto3, pathlib, tempfile
-from sagemaker import Session
-from sagemaker.model_monitor import DefaultModelMonitor, DatasetFormat, EndpointInput
+import argparse, os, json, pathlib, tempfile
+
+import aws_clients
 
 REGION = os.getenv("AWS_REGION", "us-east-1")
-ENDPOINT = os.environ["SAGEMAKER_ENDPOINT_NAME"]
+ENDPOINT = os.getenv("SAGEMAKER_ENDPOINT_NAME")
 BUCKET = os.getenv("ARTIFACT_BUCKET")  # optional
 ROLE_ARN = os.getenv("SAGEMAKER_ROLE_ARN")  # optional; will be inferred if empty
-SCHEDULE_NAME = os.getenv("MONITOR_SCHEDULE_NAME", f"{ENDPOINT}-dataquality")
-BASELINE_LOCAL = os.getenv("BASELINE_LOCAL", "data/baseline.csv")
-
-b3 = boto3.Session(region_name=REGION)
-sm = b3.client("sagemaker")
-s3 = b3.client("s3")
-sess = Session(boto_session=b3)
+SCHEDULE_NAME = os.getenv("MONITOR_SCHEDULE_NAME")  # default: <endpoint>-dataquality
+BASELINE_LOCAL = os.getenv("BASELINE_LOCAL", "data/X_train.csv")  # features the endpoint is fed
+# local: statistics/constraints computed here (src/baseline_stats.py); job: suggest_baseline processing job
+BASELINE_MODE = os.getenv("BASELINE_MODE", "local")
 
 def ensure_bucket(name=None):
+    s3 = aws_clients.client("s3", REGION)
+    sess = aws_clients.sagemaker_session(REGION)
     if name:
         try: s3.head_bucket(Bucket=name)
         except: s3.create_bucket(Bucket=name, CreateBucketConfiguration={"LocationConstraint": REGION})
@@ -27,31 +26,32 @@ def ensure_bucket(name=None):
     return name
 
 def infer_role_from_endpoint(endpoint):
-    ep = sm.describe_endpoint(EndpointName=endpoint)
-    cfg = sm.describe_endpoint_config(EndpointConfigName=ep["EndpointConfigName"])
-    model_name = cfg["ProductionVariants"][0]["ModelName"]
-    model = sm.describe_model(ModelName=model_name)
-    return model.get("ExecutionRoleArn")
+    return aws_clients.resolve_endpoint(endpoint, REGION)["role"]
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Compute a data-quality baseline and schedule hourly monitoring")
+    p.add_argument("--endpoint", default=ENDPOINT, required=ENDPOINT is None)
+    p.add_argument("--baseline", default=BASELINE_LOCAL, help="CSV the endpoint is fed")
+    p.add_argument("--baseline-mode", choices=["local", "job"], default=BASELINE_MODE)
+    p.add_argument("--schedule-name", default=SCHEDULE_NAME)
+    args = p.parse_args(argv)
+    endpoint = args.endpoint
+    schedule_name = args.schedule_name or f"{endpoint}-dataquality"
+
+    from sagemaker.model_monitor import DefaultModelMonitor, DatasetFormat, EndpointInput
+    import baseline_stats
 
-def main():
+    sm = aws_clients.client("sagemaker", REGION)
+    sess = aws_clients.sagemaker_session(REGION)
     bucket = ensure_bucket(BUCKET)
-    role = ROLE_ARN or infer_role_from_endpoint(ENDPOINT)
+    role = ROLE_ARN or infer_role_from_endpoint(endpoint)
     print("Using role:", role)
     print("Using bucket:", bucket)
 
     # Prepare a baseline dataset
-    local_path = pathlib.Path(BASELINE_LOCAL)
+    local_path = pathlib.Path(args.baseline)
     if not local_path.exists():
-        print(f"{BASELINE_LOCAL} not found. Creating a tiny CSV baseline matching inference shape.")
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
-        with open(tmp.name, "w") as f:
-            row = "3,1,34,0,0,7.8292,2\n"
-            f.writelines([row for _ in range(50)])
-        local_path = pathlib.Path(tmp.name)
-
-    baseline_s3 = f"s3://{bucket}/monitoring/baseline/{ENDPOINT}/baseline.csv"
-    sess.upload_data(str(local_path), bucket, f"monitoring/baseline/{ENDPOINT}/baseline.csv")
-    print("Baseline uploaded to:", baseline_s3)
+        raise FileNotFoundError(f"{args.baseline} not found; run src/preprocess.py (or set BASELINE_LOCAL)")
 
     mon = DefaultModelMonitor(
         role=role,
@@ -60,30 +60,41 @@ def main():
         volume_size_in_gb=20,
         max_runtime_in_seconds=3600,
         sagemaker_session=sess,
-        base_job_name=f"{ENDPOINT}-dq",
-    )
-
-    baseline_job = mon.suggest_baseline(
-        baseline_dataset=baseline_s3,
-        dataset_format=DatasetFormat.csv(header=False),
-        output_s3_uri=f"s3://{bucket}/monitoring/baseline/{ENDPOINT}/outputs",
-        wait=True,
+        base_job_name=f"{endpoint}-dq",
     )
 
-    stats = baseline_job.baseline_statistics()
-    constraints = baseline_job.suggested_constraints()
+    outputs = f"monitoring/baseline/{endpoint}/outputs"
+    if args.baseline_mode == "job":
+        baseline_s3 = sess.upload_data(str(local_path), bucket, f"monitoring/baseline/{endpoint}")
+        print("Baseline uploaded to:", baseline_s3)
+        baseline_job = mon.suggest_baseline(
+            baseline_dataset=baseline_s3,
+            dataset_format=DatasetFormat.csv(header=baseline_stats.has_header(str(local_path))),
+            output_s3_uri=f"s3://{bucket}/{outputs}",
+            wait=True,
+        )
+        stats = baseline_job.baseline_statistics()
+        constraints = baseline_job.suggested_constraints()
+    else:
+        # Same statistics.json / constraints.json the job would write, computed locally in seconds
+        local = baseline_stats.compute(str(local_path))
+        out_dir = tempfile.mkdtemp(prefix="baseline-")
+        stats_path, constraints_path = baseline_stats.write(local, out_dir)
+        stats = sess.upload_data(stats_path, bucket, outputs)
+        constraints = sess.upload_data(constraints_path, bucket, outputs)
+        print(f"Local baseline over {local.rows} rows uploaded to s3://{bucket}/{outputs}")
     print("Stats:", stats)
     print("Constraints:", constraints)
 
     mon.create_monitoring_schedule(
-        monitor_schedule_name=SCHEDULE_NAME,
-        endpoint_input=EndpointInput(endpoint_name=ENDPOINT),
-        output_s3_uri=f"s3://{bucket}/monitoring/reports/{ENDPOINT}",
+        monitor_schedule_name=schedule_name,
+        endpoint_input=EndpointInput(endpoint_name=endpoint),
+        output_s3_uri=f"s3://{bucket}/monitoring/reports/{endpoint}",
         statistics=stats,
         constraints=constraints,
         schedule_cron_expression="cron(0 * * * ? *)",  # hourly
     )
-    desc = sm.describe_monitoring_schedule(MonitoringScheduleName=SCHEDULE_NAME)
+    desc = sm.describe_monitoring_schedule(MonitoringScheduleName=schedule_name)
     print("Monitoring schedule status:", desc["MonitoringScheduleStatus"])
 
 if __name__ == "__main__":
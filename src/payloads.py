@@ -0,0 +1,340 @@
+# src/payloads.py
+# Request parsing and response serialization shared by the inference handlers
+# (inference.py, inference_lite.py). Imports only NumPy, so it adds nothing to cold start.
+#
+# Content types (requests and, through Accept, responses):
+#   text/csv, application/json, application/jsonlines   text formats; CSV in / JSON out is the default
+#   application/x-npy                                   .npy bytes; parsed with np.frombuffer, no copy
+#   application/vnd.apache.arrow.stream                 Arrow IPC stream (needs pyarrow); requests are
+#                                                       a fixed-size-list column (zero-copy) or one
+#                                                       numeric column per feature
+#   application/x-recordio-protobuf                     SageMaker's RecordIO-wrapped Record protobuf,
+#                                                       dense float32 tensors (the built-in algorithms'
+#                                                       format); uniform records are read as one
+#                                                       strided view
+# Binary responses are float32 scores: a 1-D .npy array, an Arrow "score" column, or one
+# record per row with the score under label["score"].
+import io, json, struct
+
+import numpy as np
+
+
+# -----------------------------
+# Payload parsing
+# -----------------------------
+def parse_csv(body):
+    """Multi-row CSV (no header) -> C-contiguous float32 matrix. Empty fields become NaN."""
+    text = body.decode("utf-8") if isinstance(body, (bytes, bytearray)) else body
+    text = text.strip().replace("\r\n", "\n")
+    if not text:
+        return np.empty((0, 0), dtype=np.float32)
+    n_rows = text.count("\n") + 1
+    n_cols = text[: text.find("\n")].count(",") + 1 if n_rows > 1 else text.count(",") + 1
+    try:
+        flat = np.fromstring(text.replace("\n", ","), dtype=np.float32, sep=",")
+    except ValueError:
+        flat = np.empty(0, dtype=np.float32)
+    if flat.size == n_rows * n_cols:
+        return flat.reshape(n_rows, n_cols)
+    # Slow path: blank fields (missing values) or ragged rows
+    X = np.genfromtxt(io.StringIO(text), delimiter=",", dtype=np.float32)
+    return np.ascontiguousarray(np.atleast_2d(X))
+
+
+def _json_row(obj):
+    if isinstance(obj, dict):
+        for key in ("features", "instance", "values"):
+            if key in obj:
+                return obj[key]
+    return obj  # numeric list, or a raw record dict
+
+
+def _rows_to_input(rows):
+    """Numeric rows -> float32 matrix; raw record dicts are kept for the transformer."""
+    if rows and isinstance(rows[0], dict):
+        return rows
+    return np.asarray(rows, dtype=np.float32).reshape(len(rows), -1)
+
+
+def parse_jsonl(body):
+    """One JSON array, {"features": [...]} or raw record per line."""
+    text = body.decode("utf-8") if isinstance(body, (bytes, bytearray)) else body
+    return _rows_to_input([_json_row(json.loads(line)) for line in text.splitlines() if line.strip()])
+
+
+def parse_json(body):
+    """{"instances": [...]}, a bare list of rows, a single row or a single raw record."""
+    obj = json.loads(body)
+    if isinstance(obj, dict):
+        obj = obj.get("instances", obj.get("features", [obj]))
+    rows = [_json_row(r) for r in obj]
+    if rows and not isinstance(rows[0], (list, tuple, dict)):
+        rows = [rows]
+    return _rows_to_input(rows)
+
+
+def _as_matrix(X):
+    """Binary payload array -> 2-D float32 rows; a 1-D array is one row. Copies only to convert."""
+    if X.ndim == 1:
+        X = X[None, :]
+    if X.ndim != 2:
+        raise ValueError(f"Expected a 1-D or 2-D array, got shape {X.shape}")
+    return X if X.dtype == np.float32 else X.astype(np.float32)
+
+
+def parse_npy(body):
+    """.npy bytes -> float32 matrix viewing the request buffer (read-only; no copy for float32)."""
+    f = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+    except ValueError as e:
+        raise ValueError(f"Bad application/x-npy payload: {e}") from None
+    if dtype.hasobject:
+        raise ValueError("application/x-npy payloads must be numeric (no pickled objects)")
+    count = int(np.prod(shape))
+    X = np.frombuffer(body, dtype=dtype, count=count, offset=f.tell())
+    return _as_matrix(X.reshape(shape, order="F" if fortran_order else "C"))
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ValueError("application/vnd.apache.arrow.stream needs pyarrow (pip install pyarrow)") from None
+    return pa
+
+
+def parse_arrow(body):
+    """Arrow IPC stream -> float32 matrix. A fixed-size-list column is reshaped in place; one
+    numeric column per feature is stacked (one copy, into row-major order)."""
+    pa = _pyarrow()
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    if table.num_rows == 0:
+        return np.empty((0, 0), dtype=np.float32)
+    col = table.column(0)
+    if table.num_columns == 1 and pa.types.is_fixed_size_list(col.type):
+        flat = [c.flatten().to_numpy(zero_copy_only=False) for c in col.chunks]
+        X = (flat[0] if len(flat) == 1 else np.concatenate(flat)).reshape(-1, col.type.list_size)
+        return _as_matrix(X)
+    cols = [table.column(i).to_numpy() for i in range(table.num_columns)]  # nulls -> NaN
+    return np.column_stack(cols).astype(np.float32, copy=False)
+
+
+# -----------------------------
+# RecordIO-protobuf
+# -----------------------------
+# Record { map<string, Value> features = 1; map<string, Value> label = 2; ... }
+# Value { Float32Tensor float32_tensor = 2; ... }   Float32Tensor { repeated float values = 1 [packed]; ... }
+# Each record is framed as <u4 magic, <u4 length, data padded to 4 bytes.
+RECORDIO_MAGIC = 0xCED7230A
+
+
+def _varint(n):
+    out = bytearray()
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _read_varint(buf, pos):
+    result = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _field(number, payload):  # length-delimited protobuf field
+    return _varint(number << 3 | 2) + _varint(len(payload)) + payload
+
+
+def _fields(buf, start, end):
+    """(field number, start, end) of each length-delimited field in buf[start:end]."""
+    pos = start
+    while pos < end:
+        tag, pos = _read_varint(buf, pos)
+        wire = tag & 7
+        if wire == 2:
+            n, pos = _read_varint(buf, pos)
+            yield tag >> 3, pos, pos + n
+            pos += n
+        elif wire == 0:
+            _, pos = _read_varint(buf, pos)
+        elif wire in (1, 5):
+            pos += 8 if wire == 1 else 4
+        else:
+            raise ValueError(f"Bad RecordIO-protobuf payload: wire type {wire}")
+
+
+def _record_values(buf, start, end):
+    """(start, end) of the packed float32 values of a record's first feature (or label) tensor."""
+    tensors = {}
+    for number, s, e in _fields(buf, start, end):  # features / label map entries
+        for entry_field, vs, ve in _fields(buf, s, e):
+            if entry_field != 2:
+                continue
+            for value_field, ts, te in _fields(buf, vs, ve):
+                if value_field != 2:
+                    raise ValueError("RecordIO-protobuf: only float32 tensors are supported")
+                for tensor_field, fs, fe in _fields(buf, ts, te):
+                    if tensor_field == 2:
+                        raise ValueError("RecordIO-protobuf: sparse tensors are not supported")
+                    if tensor_field == 1:
+                        tensors.setdefault(number, (fs, fe))
+    if not tensors:
+        raise ValueError("RecordIO-protobuf record has no float32 tensor")
+    return tensors.get(1, tensors.get(2))
+
+
+def parse_recordio(body):
+    """RecordIO-protobuf -> float32 matrix, one row per record."""
+    try:
+        return _parse_recordio(memoryview(body).cast("B"))
+    except (struct.error, IndexError):  # truncated record or varint
+        raise ValueError("Bad RecordIO-protobuf payload: truncated") from None
+
+
+def _parse_recordio(buf):
+    if not len(buf):
+        return np.empty((0, 0), dtype=np.float32)
+    magic, length = struct.unpack_from("<II", buf, 0)
+    if magic != RECORDIO_MAGIC:
+        raise ValueError("Bad RecordIO-protobuf payload: missing record magic")
+    length &= (1 << 29) - 1
+    stride = 8 + length + (-length % 4)
+    vs, ve = _record_values(buf, 8, 8 + length)
+    n = len(buf) // stride
+    if len(buf) == n * stride and (ve - vs) % 4 == 0:
+        # Fast path: a uniform writer makes every record the same bytes apart from the values,
+        # so the whole payload is one strided float32 view.
+        records = np.ndarray((n, stride), np.uint8, buf)
+        fixed = np.r_[0:vs, ve:stride]
+        if (records[:, fixed] == records[0, fixed]).all():
+            k = (ve - vs) // 4
+            return np.ndarray((n, k), "<f4", buf, offset=vs, strides=(stride, 4))
+    rows, pos = [], 0
+    while pos < len(buf):
+        magic, length = struct.unpack_from("<II", buf, pos)
+        if magic != RECORDIO_MAGIC:
+            raise ValueError("Bad RecordIO-protobuf payload: missing record magic")
+        length &= (1 << 29) - 1
+        s, e = _record_values(buf, pos + 8, pos + 8 + length)
+        rows.append(np.frombuffer(buf[s:e], dtype="<f4"))
+        pos += 8 + length + (-length % 4)
+    if len({r.size for r in rows}) > 1:
+        raise ValueError("RecordIO-protobuf records have different numbers of features")
+    return np.stack(rows)
+
+
+PARSERS = {
+    "text/csv": parse_csv,
+    "application/jsonlines": parse_jsonl,
+    "application/x-jsonlines": parse_jsonl,
+    "application/json": parse_json,
+    "application/x-npy": parse_npy,
+    "application/vnd.apache.arrow.stream": parse_arrow,
+    "application/x-recordio-protobuf": parse_recordio,
+}
+
+
+def input_fn(request_body, request_content_type="text/csv"):
+    content_type = (request_content_type or "text/csv").split(";")[0].strip().lower()
+    if content_type not in PARSERS:
+        raise ValueError(f"Unsupported content type: {request_content_type}")
+    return PARSERS[content_type](request_body)
+
+
+# -----------------------------
+# Responses
+# -----------------------------
+def encode_npy(X):
+    buf = io.BytesIO()
+    np.save(buf, np.ascontiguousarray(X, dtype=np.float32), allow_pickle=False)
+    return buf.getvalue()
+
+
+def encode_arrow(X, name="features"):
+    """2-D rows -> one fixed-size-list column; 1-D -> a plain float32 column."""
+    pa = _pyarrow()
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    col = pa.array(X) if X.ndim == 1 else pa.FixedSizeListArray.from_arrays(pa.array(X.ravel()), X.shape[1])
+    table = pa.table({name: col})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_recordio(X, key="values", label=False):
+    """One dense float32 record per row, under features[key] (or label[key])."""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    X = X.reshape(len(X), -1)
+    n, k = X.shape
+    # Every row has the same framing; only the values differ, so write it once and broadcast.
+    values_tag = _varint(1 << 3 | 2) + _varint(4 * k)
+    value = _field(2, values_tag + bytes(4 * k))
+    record = _field(2 if label else 1, _field(1, key.encode()) + _field(2, value))
+    length = len(record)
+    head = struct.pack("<II", RECORDIO_MAGIC, length)
+    stride = 8 + length + (-length % 4)
+    out = np.zeros((n, stride), np.uint8)
+    out[:, :8] = np.frombuffer(head, np.uint8)
+    out[:, 8:8 + length] = np.frombuffer(record, np.uint8)
+    vs = 8 + length - 4 * k
+    out[:, vs:vs + 4 * k] = X.view(np.uint8)
+    return out.tobytes()
+
+
+ENCODERS = {
+    "application/x-npy": encode_npy,
+    "application/vnd.apache.arrow.stream": encode_arrow,
+    "application/x-recordio-protobuf": encode_recordio,
+}
+
+
+TEXT_OUTPUTS = ("text/csv", "application/json", "application/jsonlines", "application/x-jsonlines")
+
+
+def negotiate(accept, default="application/json"):
+    """Media type from an Accept header that output_fn can produce: highest q first, header
+    order among equal q; q=0 excludes a type. `default` when nothing listed is supported."""
+    ranked = []
+    for i, entry in enumerate((accept or "").split(",")):
+        media, *params = [part.strip() for part in entry.split(";")]
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media = media.lower()
+        if q > 0 and (media in ENCODERS or media in TEXT_OUTPUTS):
+            ranked.append((-q, i, media))
+    return min(ranked)[2] if ranked else default
+
+
+def output_fn(prediction, accept="application/json"):
+    accept = negotiate(accept)
+    if accept in ENCODERS:
+        scores = np.asarray(prediction, dtype=np.float32).ravel()
+        if accept == "application/vnd.apache.arrow.stream":
+            return encode_arrow(scores, "score"), accept
+        if accept == "application/x-recordio-protobuf":
+            return encode_recordio(scores, "score", label=True), accept
+        return encode_npy(scores), accept
+    scores = np.asarray(prediction, dtype=np.float32).ravel().tolist()
+    if accept == "text/csv":
+        return "\n".join(repr(s) for s in scores), accept
+    if accept in ("application/jsonlines", "application/x-jsonlines"):
+        return "\n".join(json.dumps({"score": s}) for s in scores), accept
+    return json.dumps({"predictions": [{"score": s} for s in scores]}), "application/json"
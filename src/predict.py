@@ -1,28 +1,128 @@
-import sagemaker
-import pandas as pd
-
-# Connect to existing endpoint
-session = sagemaker.Session()
-predictor = sagemaker.predictor.Predictor(
-    endpoint_name="titanic-xgboost-endpoint",
-    sagemaker_session=session,
-    serializer=sagemaker.serializers.CSVSerializer(),
-    deserializer=sagemaker.deserializers.JSONDeserializer()
-)
-
-# Example passenger data (already encoded as numeric)
-test_passenger = pd.DataFrame([{
-    "Pclass": 3,
-    "Sex": 1,      # male=1, female=0 (based on preprocessing)
-    "Age": 22,
-    "SibSp": 1,
-    "Parch": 0,
-    "Fare": 7.25,
-    "Embarked": 0
-}])
-
-# Convert to CSV row
-prediction = predictor.predict(test_passenger.to_csv(header=False, index=False))
-
-print("🔮 Prediction result:", prediction)
+import argparse
+import json
 
+ENDPOINT_NAME = "titanic-xgboost-endpoint"
+
+
+def predict_one(endpoint_name=ENDPOINT_NAME):
+    import sagemaker
+    import pandas as pd
+
+    # Connect to existing endpoint
+    session = sagemaker.Session()
+    predictor = sagemaker.predictor.Predictor(
+        endpoint_name=endpoint_name,
+        sagemaker_session=session,
+        serializer=sagemaker.serializers.CSVSerializer(),
+        deserializer=sagemaker.deserializers.JSONDeserializer()
+    )
+
+    # Example passenger, encoded like data/X_test.csv (8 features)
+    test_passenger = pd.DataFrame([{
+        "Pclass": 3,
+        "Age": 22,
+        "SibSp": 1,
+        "Parch": 0,
+        "Fare": 7.25,
+        "Sex_male": 1,     # one-hot encoded like preprocess.py (same column order)
+        "Embarked_Q": 0,   # embarked at Southampton
+        "Embarked_S": 1
+    }])
+
+    # Convert to CSV row
+    prediction = predictor.predict(test_passenger.to_csv(header=False, index=False))
+
+    print("🔮 Prediction result:", prediction)
+
+
+def _make_invoker(args):
+    from bulk_client import HTTPInvoker, LocalInvoker, SageMakerInvoker
+
+    if args.local_model_dir:
+        return LocalInvoker(args.local_model_dir, args.local_latency_ms, args.local_throttle_rate)
+    if args.local_url:
+        return HTTPInvoker(args.local_url)
+    return SageMakerInvoker(args.endpoint, args.region, args.concurrency)
+
+
+def predict_passengers(args):
+    """Scores PassengerIds: features come from the online Feature Store (through the
+    read-through cache) instead of being encoded by the caller."""
+    from bulk_client import WIRE_FORMATS, parse_scores
+    from feature_cache import FeatureCache, make_cache
+    from features import TitanicTransformer
+
+    if not args.preprocessor or not args.feature_group:
+        raise SystemExit("--passenger-ids needs --feature-group and --preprocessor (preprocessor.json)")
+    transformer = TitanicTransformer.load(args.preprocessor)
+    if args.local_features:
+        import csv_cache
+        from fs_ingest import to_records
+        from local_aws import LocalFeatureStore
+        store = LocalFeatureStore()
+        for record in to_records(csv_cache.read_csv(args.local_features)):
+            store.put_record(FeatureGroupName=args.feature_group, Record=record)
+        cache = FeatureCache(store, args.feature_group, transformer)
+    else:
+        cache = make_cache(args.feature_group, transformer, region=args.region)
+
+    ids = [i.strip() for i in args.passenger_ids.split(",") if i.strip()]
+    X = cache.features(ids)
+    content_type, accept = WIRE_FORMATS[args.wire_format]
+    if args.wire_format == "csv":
+        body = "\n".join(",".join(repr(float(v)) for v in row) for row in X).encode()
+    else:
+        import payloads
+        body = payloads.ENCODERS[content_type](X)
+    scores = parse_scores(_make_invoker(args)(body, content_type, accept), accept)
+    for pid, score in zip(ids, scores):
+        print(f"🔮 PassengerId {pid}: {float(score):.4f}")
+
+
+def predict_bulk(args):
+    from bulk_client import BulkScorer
+
+    invoke = _make_invoker(args)
+
+    transformer = None
+    if args.preprocessor:
+        from features import TitanicTransformer
+        transformer = TitanicTransformer.load(args.preprocessor)
+
+    scorer = BulkScorer(invoke, concurrency=args.concurrency, max_payload_bytes=args.max_payload_bytes,
+                        max_rows=args.max_rows, wire_format=args.wire_format)
+    stats = scorer.score_file(args.input, args.output, transformer)
+    print(json.dumps({k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Score one example passenger, or a whole file with --input")
+    p.add_argument("--endpoint", default=ENDPOINT_NAME)
+    p.add_argument("--region", default=None)
+    p.add_argument("--input", help="JSONL or CSV file of passengers (bulk mode)")
+    p.add_argument("--output", default="predictions.csv")
+    p.add_argument("--preprocessor", help="preprocessor.json to encode raw records client-side")
+    p.add_argument("--concurrency", type=int, default=8, help="max in-flight InvokeEndpoint calls")
+    p.add_argument("--max-payload-bytes", type=int, default=5_000_000)
+    p.add_argument("--max-rows", type=int, default=None, help="optional cap on rows per request")
+    p.add_argument("--wire-format", default="csv", choices=("csv", "npy", "arrow", "recordio"),
+                   help="request/response encoding; binary formats need the inference.py handler")
+    p.add_argument("--passenger-ids", help="comma list of PassengerIds; features are read from the Feature Store")
+    p.add_argument("--feature-group", default=None, help="online feature group holding the passengers")
+    p.add_argument("--local-features", help="CSV to serve as an in-memory feature group instead (offline)")
+    p.add_argument("--local-url", help="score against a local /invocations server instead")
+    p.add_argument("--local-model-dir", help="score in-process with src/inference.py instead")
+    p.add_argument("--local-latency-ms", type=float, default=0.0, help="simulated per-call latency (local)")
+    p.add_argument("--local-throttle-rate", type=float, default=0.0, help="simulated throttle rate (local)")
+    args = p.parse_args(argv)
+
+    if args.passenger_ids:
+        predict_passengers(args)
+    elif args.input:
+        predict_bulk(args)
+    else:
+        predict_one(args.endpoint)
+
+
+if __name__ == "__main__":
+    main()
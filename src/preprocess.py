@@ -1,26 +1,100 @@
+import argparse
+import os
+
 import pandas as pd
 
-# Load dataset
-train = pd.read_csv("data/train.csv")
-test = pd.read_csv("data/test.csv")
+import csv_cache
+from features import CATEGORICAL, NUMERIC, TARGET, TitanicTransformer
+from sketches import FrequencySketch, KLLSketch
+
+
+def main(train_path="data/train.csv", test_path="data/test.csv", out_dir="data"):
+    # Load dataset
+    train = csv_cache.read_csv(train_path)
+    test = csv_cache.read_csv(test_path)
+
+    # Learn medians / modes / category levels on the training set only,
+    # then apply the same fitted transform to both splits
+    tf = TitanicTransformer().fit(train)
+    X_train = pd.DataFrame(tf.transform(train), columns=tf.feature_names)
+    y_train = train[TARGET]
+    X_test = pd.DataFrame(tf.transform(test), columns=tf.feature_names)
+
+    # Save preprocessed data + the fitted transformer
+    os.makedirs(out_dir, exist_ok=True)
+    X_train.to_csv(os.path.join(out_dir, "X_train.csv"), index=False)
+    y_train.to_csv(os.path.join(out_dir, "y_train.csv"), index=False)
+    X_test.to_csv(os.path.join(out_dir, "X_test.csv"), index=False)
+    tf.save(os.path.join(out_dir, "preprocessor.json"))
+    return tf
+
+
+# -----------------------------
+# Out-of-core mode
+# -----------------------------
+def _read_chunks(path, chunksize):
+    usecols = lambda c: c in NUMERIC or c in CATEGORICAL or c == TARGET
+    return csv_cache.read_csv_chunks(path, chunksize, usecols=usecols)
+
+
+def fit_streaming(train_path, chunksize=100_000, k=200):
+    """Pass 1: builds mergeable sketches chunk by chunk and returns a fitted transformer.
+
+    Medians come from a KLL sketch (rank error ~1.7/k), modes and levels from a
+    frequency sketch, so memory is bounded by the chunk size, not the file size.
+    """
+    return fit_chunks(_read_chunks(train_path, chunksize), k)
+
+
+def fit_chunks(chunks, k=200):
+    """fit_streaming over any iterable of raw DataFrames (e.g. train.py's sharded input)."""
+    quantiles = {c: KLLSketch(k=k, seed=0) for c in NUMERIC}
+    freqs = {c: FrequencySketch() for c in CATEGORICAL}
+    for chunk in chunks:
+        for c in NUMERIC:
+            quantiles[c].update(chunk[c].to_numpy(dtype="float64", na_value=float("nan")))
+        for c in CATEGORICAL:
+            freqs[c].update(chunk[c].to_numpy(dtype=object))
+    return TitanicTransformer.from_stats(
+        medians={c: quantiles[c].quantile(0.5) for c in NUMERIC},
+        modes={c: freqs[c].mode() for c in CATEGORICAL},
+        levels={c: freqs[c].levels() for c in CATEGORICAL},
+    )
+
 
-# Fill missing values
-train['Age'].fillna(train['Age'].median(), inplace=True)
-test['Age'].fillna(test['Age'].median(), inplace=True)
-train['Embarked'].fillna(train['Embarked'].mode()[0], inplace=True)
-test['Fare'].fillna(test['Fare'].median(), inplace=True)
+def _transform_to_csv(tf, src, x_out, y_out=None, chunksize=100_000):
+    """Pass 2: transforms chunk by chunk and appends to the output CSVs."""
+    rows = 0
+    with open(x_out, "w", newline="") as fx, (open(y_out, "w", newline="") if y_out else open(os.devnull, "w")) as fy:
+        for i, chunk in enumerate(_read_chunks(src, chunksize)):
+            pd.DataFrame(tf.transform(chunk), columns=tf.feature_names).to_csv(fx, index=False, header=i == 0)
+            if y_out:
+                chunk[[TARGET]].to_csv(fy, index=False, header=i == 0)
+            rows += len(chunk)
+    return rows
 
-# Encode categorical variables
-train = pd.get_dummies(train, columns=['Sex', 'Embarked'], drop_first=True)
-test = pd.get_dummies(test, columns=['Sex', 'Embarked'], drop_first=True)
 
-# Separate features and target
-X_train = train.drop(['Survived', 'Name', 'Ticket', 'Cabin', 'PassengerId'], axis=1)
-y_train = train['Survived']
-X_test = test.drop(['Name', 'Ticket', 'Cabin', 'PassengerId'], axis=1)
+def main_streaming(train_path="data/train.csv", test_path="data/test.csv", out_dir="data", chunksize=100_000):
+    tf = fit_streaming(train_path, chunksize)
+    os.makedirs(out_dir, exist_ok=True)
+    n_train = _transform_to_csv(tf, train_path, os.path.join(out_dir, "X_train.csv"),
+                                os.path.join(out_dir, "y_train.csv"), chunksize)
+    n_test = _transform_to_csv(tf, test_path, os.path.join(out_dir, "X_test.csv"), chunksize=chunksize) \
+        if test_path else 0
+    tf.save(os.path.join(out_dir, "preprocessor.json"))
+    print(f"Streamed {n_train} train / {n_test} test rows in chunks of {chunksize}")
+    return tf
 
-# Save preprocessed data
-X_train.to_csv("data/X_train.csv", index=False)
-y_train.to_csv("data/y_train.csv", index=False)
-X_test.to_csv("data/X_test.csv", index=False)
 
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--train", default="data/train.csv")
+    p.add_argument("--test", default="data/test.csv")
+    p.add_argument("--out-dir", default="data")
+    p.add_argument("--chunksize", type=int, default=0,
+                   help="rows per chunk; >0 switches to the two-pass out-of-core mode")
+    args, _ = p.parse_known_args()
+    if args.chunksize > 0:
+        main_streaming(args.train, args.test, args.out_dir, args.chunksize)
+    else:
+        main(args.train, args.test, args.out_dir)
@@ -1,13 +1,15 @@
 # src/register_model.py
-import os, boto3, time, botocore
+import argparse, os, time
+
+import aws_clients
 
 REGION = os.getenv("AWS_REGION", "us-east-1")
-ENDPOINT = os.environ["SAGEMAKER_ENDPOINT_NAME"]
+ENDPOINT = os.getenv("SAGEMAKER_ENDPOINT_NAME")
 GROUP = os.getenv("MODEL_PACKAGE_GROUP", "titanic-xgboost")
 
-sm = boto3.client("sagemaker", region_name=REGION)
-
 def ensure_group(name):
+    import botocore
+    sm = aws_clients.client("sagemaker", REGION)
     try:
         sm.describe_model_package_group(ModelPackageGroupName=name)
     except botocore.exceptions.ClientError as e:
@@ -19,20 +21,22 @@ def ensure_group(name):
         else:
             raise
 
-def main():
-    ep = sm.describe_endpoint(EndpointName=ENDPOINT)
-    cfg = sm.describe_endpoint_config(EndpointConfigName=ep["EndpointConfigName"])
-    model_name = cfg["ProductionVariants"][0]["ModelName"]
-    model = sm.describe_model(ModelName=model_name)
-    container = model["PrimaryContainer"]
-    image_uri = container["Image"]
-    model_data = container["ModelDataUrl"]
-
-    ensure_group(GROUP)
-    print("Registering model to group:", GROUP)
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Register the model behind an endpoint in a model package group")
+    p.add_argument("--endpoint", default=ENDPOINT, required=ENDPOINT is None)
+    p.add_argument("--group", default=GROUP)
+    args = p.parse_args(argv)
+
+    sm = aws_clients.client("sagemaker", REGION)
+    deployed = aws_clients.resolve_endpoint(args.endpoint, REGION)
+    image_uri = deployed["image"]
+    model_data = deployed["model_data"]
+
+    ensure_group(args.group)
+    print("Registering model to group:", args.group)
     resp = sm.create_model_package(
-        ModelPackageGroupName=GROUP,
-        ModelPackageDescription=f"From endpoint {ENDPOINT} at {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        ModelPackageGroupName=args.group,
+        ModelPackageDescription=f"From endpoint {args.endpoint} at {time.strftime('%Y-%m-%d %H:%M:%S')}",
         InferenceSpecification={
             "Containers": [{"Image": image_uri, "ModelDataUrl": model_data}],
             "SupportedContentTypes": ["text/csv"],
@@ -43,6 +47,9 @@ def main():
     )
     print("ModelPackageArn:", resp["ModelPackageArn"])
 
+    import lineage
+    lineage.record("record_package", resp["ModelPackageArn"], args.group, model_data, endpoint=args.endpoint)
+
 if __name__ == "__main__":
     main()
 
@@ -1,41 +1,81 @@
-import sagemaker
-from sagemaker.session import Session
-from sagemaker.xgboost import XGBoost
-import boto3
-
-# SageMaker session & role
-session = sagemaker.Session()
-role = "arn:aws:iam::605134434521:role/SageMakerExecutionRole"
-
-# S3 bucket & prefix
-bucket = session.default_bucket()  # or hardcode: "sagemaker-us-east-1-605134434521"
-prefix = "titanic-xgboost"
-
-# Upload local data to S3
-s3 = boto3.Session().resource("s3")
-s3.Bucket(bucket).upload_file("data/train.csv", f"{prefix}/data/train.csv")
-s3.Bucket(bucket).upload_file("data/test.csv", f"{prefix}/data/test.csv")
-
-# XGBoost Estimator
-xgb_estimator = XGBoost(
-    entry_point="src/train.py",
-    framework_version="1.5-1",
-    role=role,
-    instance_count=1,
-    instance_type="ml.m5.xlarge",
-    output_path=f"s3://{bucket}/{prefix}/output",
-    sagemaker_session=session,
-    hyperparameters={
+import argparse, os
+
+DEFAULT_ROLE = "arn:aws:iam::605134434521:role/SageMakerExecutionRole"
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Upload data/train.csv + data/test.csv and run a SageMaker training job")
+    p.add_argument("--role", default=os.getenv("SAGEMAKER_ROLE_ARN", DEFAULT_ROLE))
+    p.add_argument("--bucket", default=None, help="default: the session's default bucket")
+    p.add_argument("--prefix", default="titanic-xgboost")
+    p.add_argument("--instance-type", default="ml.m5.xlarge")
+    p.add_argument("--train-s3", default=None,
+                   help="s3:// prefix of sharded CSV/Parquet training data; trains with --input-mode stream "
+                        "over a FastFile channel instead of uploading data/train.csv")
+    p.add_argument("--chunksize", type=int, default=200_000, help="with --train-s3: rows per streamed chunk")
+    args = p.parse_args(argv)
+
+    from sagemaker.xgboost import XGBoost
+    import aws_clients
+
+    # SageMaker session & role
+    session = aws_clients.sagemaker_session()
+    role = args.role
+
+    # S3 bucket & prefix
+    bucket = args.bucket or session.default_bucket()  # or hardcode: "sagemaker-us-east-1-605134434521"
+    prefix = args.prefix
+
+    # Upload local data to S3 (sharded data under --train-s3 is already there)
+    s3 = aws_clients.client("s3")
+    if not args.train_s3:
+        s3.upload_file("data/train.csv", bucket, f"{prefix}/data/train.csv")
+    s3.upload_file("data/test.csv", bucket, f"{prefix}/data/test.csv")
+
+    # XGBoost Estimator
+    hyperparameters = {
         "max_depth": 5,
         "eta": 0.2,
         "objective": "binary:logistic",
         "num_round": 100,
-    },
-)
+    }
+    train_channel = f"s3://{bucket}/{prefix}/data/train.csv"
+    if args.train_s3:
+        # FastFile mounts the shards and streams them on read; train.py reads them chunk by chunk
+        # into external memory, so the dataset can be several times the instance's RAM
+        from sagemaker.inputs import TrainingInput
+        hyperparameters.update({"input-mode": "stream", "train": "/opt/ml/input/data/train",
+                                "chunksize": args.chunksize})
+        train_channel = TrainingInput(args.train_s3, input_mode="FastFile")
+    xgb_estimator = XGBoost(
+        entry_point="train.py",
+        source_dir="src",   # train.py imports the shared transformer from features.py
+        framework_version="1.5-1",
+        role=role,
+        instance_count=1,
+        instance_type=args.instance_type,
+        output_path=f"s3://{bucket}/{prefix}/output",
+        sagemaker_session=session,
+        hyperparameters=hyperparameters,
+    )
+
+    # Launch training job
+    xgb_estimator.fit({
+        "train": train_channel,
+        "validation": f"s3://{bucket}/{prefix}/data/test.csv"
+    })
+
+    # Index the job locally (src/lineage.py): deploy.py reuses its artifact without describing the job
+    import lineage
+    job = xgb_estimator.latest_training_job.name
+    desc = xgb_estimator.latest_training_job.describe()  # the job's CreationTime, as backfill records it
+    lineage.record("record_job", job, created=desc["CreationTime"].timestamp(), status=desc["TrainingJobStatus"],
+                   source="sagemaker", hyperparameters=hyperparameters,
+                   artifact_uri=xgb_estimator.model_data,
+                   data_uri=args.train_s3 or f"s3://{bucket}/{prefix}/data/train.csv",
+                   data_hash=None if args.train_s3 else lineage.file_hash("data/train.csv"))
+    print(f"✅ {job} -> {xgb_estimator.model_data}")
 
-# Launch training job
-xgb_estimator.fit({
-    "train": f"s3://{bucket}/{prefix}/data/train.csv",
-    "validation": f"s3://{bucket}/{prefix}/data/test.csv"
-})
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# src/serving_bundle.py
+# Builds the cold-start serving bundle that inference_lite.py scores, and probes how fast a
+# handler answers its first request.
+#
+# A bundle is a model directory (or model.tar.gz) holding:
+#   compiled/*.npy, compiled/meta.json  trees flattened by tree_compiler.py, memory-mapped at load
+#   xgboost-model.ubj                   binary UBJSON booster for the xgboost fallback (no JSON parse)
+#   preprocessor.json                   fitted transformer for raw-record requests
+#   bundle.json                         manifest: sizes, tree counts, max |compiled - booster| error
+#
+#   python src/serving_bundle.py build --model s3://.../model.tar.gz --out bundle/ --tar bundle.tar.gz
+#   python src/serving_bundle.py build --model model/ --out bundle/ --upload s3://bucket/titanic/bundle.tar.gz
+#   python src/serving_bundle.py probe --handler inference_lite --model-dir bundle/
+#
+# Deploy with `python src/deploy.py --model-data s3://.../bundle.tar.gz --handler inference_lite.py`;
+# pick MemorySizeInMB for serverless_recreate.sh with benchmarks/bench_cold_start.py.
+import argparse, json, os, shutil, sys, tarfile, time
+
+TEST_RECORD = '{"Pclass": 3, "Sex": "male", "Age": 34, "SibSp": 0, "Parch": 0, "Fare": 7.8292, "Embarked": "Q"}'
+
+
+# -----------------------------
+# Build
+# -----------------------------
+def build(model, out_dir, tar_path=None, check_rows=1000):
+    """Model dir / model.tar.gz / s3 URI -> bundle directory (and optional tarball); returns the manifest."""
+    import numpy as np
+    import xgboost as xgb
+
+    import artifact_cache
+    from features import ARTIFACT_NAME
+    from tree_compiler import compile_model
+
+    src_dir = artifact_cache.fetch(model)
+    model_path = artifact_cache.find_model_file(src_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    compiled = compile_model(model_path)
+    compiled.save(os.path.join(out_dir, "compiled"))
+    booster = xgb.Booster()
+    booster.load_model(model_path)
+    booster.save_model(os.path.join(out_dir, "xgboost-model.ubj"))
+    if os.path.exists(os.path.join(src_dir, ARTIFACT_NAME)):
+        shutil.copy(os.path.join(src_dir, ARTIFACT_NAME), os.path.join(out_dir, ARTIFACT_NAME))
+
+    rng = np.random.default_rng(0)  # the bundle must score exactly like the booster it came from
+    X = rng.normal(0, 20, size=(check_rows, compiled.num_feature)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    err = float(np.abs(compiled.predict(X) - booster.inplace_predict(X)).max())
+    if err > 1e-5:
+        raise RuntimeError(f"Compiled trees disagree with the booster (max |diff| {err:.2e})")
+
+    size = lambda p: os.path.getsize(p) if os.path.isfile(p) else sum(
+        os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(p) for f in fs)
+    manifest = {"source": model, "n_trees": compiled.n_trees, "nodes": len(compiled.feature),
+                "max_depth": compiled.max_depth, "num_feature": compiled.num_feature, "max_abs_error": err,
+                "bytes": {"source_model": size(model_path), "compiled": size(os.path.join(out_dir, "compiled")),
+                          "ubj": size(os.path.join(out_dir, "xgboost-model.ubj"))}}
+    with open(os.path.join(out_dir, "bundle.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    if tar_path:
+        with tarfile.open(tar_path, "w:gz") as t:
+            for name in sorted(os.listdir(out_dir)):  # SageMaker extracts the archive into /opt/ml/model
+                t.add(os.path.join(out_dir, name), arcname=name)
+    return manifest
+
+
+# -----------------------------
+# Probe (run in a fresh process)
+# -----------------------------
+def peak_rss_mb():
+    """Peak RSS since exec (VmHWM); ru_maxrss would include the forking parent's pages."""
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def probe(handler, model_dir, record=TEST_RECORD, started=None):
+    """Import the handler, model_fn, then one request: per-phase ms and peak RSS of this process."""
+    import importlib
+    t0 = time.time()
+    mod = importlib.import_module(handler)
+    t1 = time.time()
+    model = mod.model_fn(model_dir)
+    t2 = time.time()
+    out, _ = mod.output_fn(mod.predict_fn(mod.input_fn(record, "application/json"), model), "application/json")
+    t3 = time.time()
+    started = started or t0
+    return {"handler": handler, "startup_ms": round((t0 - started) * 1000, 1),
+            "import_ms": round((t1 - t0) * 1000, 1), "model_fn_ms": round((t2 - t1) * 1000, 1),
+            "first_predict_ms": round((t3 - t2) * 1000, 1), "ttfp_ms": round((t3 - started) * 1000, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "heavy_modules": sorted(m for m in ("xgboost", "pandas", "sklearn", "scipy") if m in sys.modules),
+            "prediction": json.loads(out)["predictions"][0]["score"]}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Build / probe the cold-start serving bundle")
+    sub = p.add_subparsers(dest="action", required=True)
+    b = sub.add_parser("build", help="model artifact -> bundle directory (+ tarball)")
+    b.add_argument("--model", required=True, help="model dir, model.tar.gz or s3://.../model.tar.gz")
+    b.add_argument("--out", required=True, help="bundle directory")
+    b.add_argument("--tar", default=None, help="also write a model.tar.gz-style archive here")
+    b.add_argument("--upload", default=None, help="s3://bucket/key.tar.gz to upload the archive to")
+    q = sub.add_parser("probe", help="time-to-first-prediction of a handler in this process")
+    q.add_argument("--handler", default="inference_lite", choices=("inference_lite", "inference"))
+    q.add_argument("--model-dir", required=True)
+    q.add_argument("--record", default=TEST_RECORD, help="JSON request body")
+    q.add_argument("--started", type=float, default=None, help="epoch seconds the process was spawned at")
+    args = p.parse_args(argv)
+
+    if args.action == "probe":
+        print(json.dumps(probe(args.handler, args.model_dir, args.record, args.started)))
+        return 0
+    tar_path = args.tar or (os.path.join(args.out, os.pardir, "bundle.tar.gz") if args.upload else None)
+    manifest = build(args.model, args.out, tar_path)
+    print(json.dumps(manifest))
+    if args.upload:
+        import aws_clients
+        from artifact_cache import split_s3_uri
+        aws_clients.client("s3").upload_file(tar_path, *split_s3_uri(args.upload))
+        print(f"✅ Uploaded {tar_path} -> {args.upload}")
+    print(f"✅ Bundle: {args.out} ({manifest['n_trees']} trees, max |error| {manifest['max_abs_error']:.1e})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+# src/sketches.py
+# Small mergeable summaries for streaming statistics over data that does not fit in RAM.
+#
+# KLLSketch       approximate quantiles (median etc.) with O(k log n) memory
+# FrequencySketch top-k frequent values (Misra-Gries / space-saving style) for modes/levels
+# HyperLogLog     approximate distinct counts in 2**p bytes
+# HdrHistogram    log-linear latency histogram with bounded relative error
+#
+# Both take whole NumPy chunks in update() and support merge(), so per-chunk or per-worker
+# sketches can be combined in any order.
+import numpy as np
+
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang, Liberty 2016) over float values.
+
+    Level h holds items of weight 2**h. When a level grows past its capacity it is sorted
+    and every other item (random offset) is promoted to level h+1. Rank error is roughly
+    1.7/k with high probability, i.e. ~0.8% for the default k=200. NaNs are not added to
+    the sketch but are counted in `nan_count`.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = int(k)
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self.n = 0
+        self.nan_count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sum = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values):
+        v = np.asarray(values, dtype=np.float64).ravel()
+        nan = np.isnan(v)
+        if nan.any():
+            self.nan_count += int(nan.sum())
+            v = v[~nan]
+        if v.size == 0:
+            return self
+        self.n += v.size
+        self.min = min(self.min, float(v.min()))
+        self.max = max(self.max, float(v.max()))
+        self.sum += float(v.sum())
+        self.levels[0] = np.concatenate([self.levels[0], v])
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if level.size > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                level = np.sort(level)
+                # an odd item stays behind so the total weight is preserved exactly
+                keep = level[-1:] if level.size % 2 else level[:0]
+                pairs = level[: level.size - keep.size]
+                promoted = pairs[int(self._rng.integers(2))::2]
+                self.levels[h] = keep
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self.nan_count += other.nan_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(l.size, 2.0 ** h) for h, l in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Approximate q-quantile(s); q may be a scalar or an array. NaN if empty."""
+        scalar = np.ndim(q) == 0
+        qs = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.n == 0:
+            out = np.full(qs.shape, np.nan)
+        else:
+            items, cum = self._weighted()
+            idx = np.searchsorted(cum, qs * cum[-1], side="left")
+            out = items[np.clip(idx, 0, items.size - 1)]
+            out = np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, out))
+        return float(out[0]) if scalar else out
+
+    def rank(self, x):
+        """Approximate fraction of values <= x."""
+        if self.n == 0:
+            return float("nan")
+        items, cum = self._weighted()
+        i = np.searchsorted(items, x, side="right")
+        return float(cum[i - 1] / cum[-1]) if i else 0.0
+
+    @property
+    def mean(self):
+        return self.sum / self.n if self.n else float("nan")
+
+    def size(self):
+        return sum(l.size for l in self.levels)
+
+
+class FrequencySketch:
+    """Bounded counter of the most frequent values (space-saving).
+
+    Exact while the number of distinct values stays <= capacity, which is always the case
+    for low-cardinality columns such as Sex/Embarked. Beyond that, counts of the heavy
+    hitters are overestimated by at most n/capacity.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = int(capacity)
+        self.counts = {}
+        self.n = 0
+        self.missing = 0
+
+    def update(self, values):
+        v = np.asarray(values, dtype=object).ravel()
+        missing = np.fromiter((x is None or x != x or x == "" for x in v), dtype=bool, count=v.size)
+        self.missing += int(missing.sum())
+        v = v[~missing]
+        if v.size == 0:
+            return self
+        uniq, cnt = np.unique(v.astype(str), return_counts=True)
+        self.n += int(cnt.sum())
+        for val, c in zip(uniq.tolist(), cnt.tolist()):
+            self._add(val, c)
+        return self
+
+    def _add(self, val, c):
+        if val in self.counts or len(self.counts) < self.capacity:
+            self.counts[val] = self.counts.get(val, 0) + c
+            return
+        # evict the current minimum and inherit its count (space-saving)
+        victim = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(victim)
+        self.counts[val] = floor + c
+
+    def merge(self, other):
+        self.n += other.n
+        self.missing += other.missing
+        for val, c in other.counts.items():
+            self._add(val, c)
+        return self
+
+    def mode(self):
+        # ties resolve to the smallest value, matching pandas' Series.mode()[0]
+        return min(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[0] if self.counts else None
+
+    def levels(self):
+        return sorted(self.counts)
+
+    def distinct(self):
+        return len(self.counts)
+
+
+class HyperLogLog:
+    """Approximate distinct count (Flajolet et al. 2007) with 2**p registers.
+
+    Values are hashed from their float64 bit patterns with a vectorized splitmix64 finalizer,
+    so a whole chunk is absorbed with a few NumPy ops. Relative error is about 1.04/sqrt(2**p)
+    (1.6% for p=12); small cardinalities use linear counting and are near-exact.
+    """
+
+    def __init__(self, p=12):
+        self.p = int(p)
+        self.registers = np.zeros(1 << self.p, dtype=np.uint8)
+
+    @staticmethod
+    def _hash(values):
+        v = np.asarray(values, dtype=np.float64).ravel()
+        v = v + 0.0  # -0.0 -> 0.0 so both hash alike
+        x = v.view(np.uint64).copy()
+        with np.errstate(over="ignore"):
+            x ^= x >> np.uint64(30)
+            x *= np.uint64(0xBF58476D1CE4E5B9)
+            x ^= x >> np.uint64(27)
+            x *= np.uint64(0x94D049BB133111EB)
+            x ^= x >> np.uint64(31)
+        return x
+
+    def update(self, values):
+        v = np.asarray(values, dtype=np.float64).ravel()
+        v = v[~np.isnan(v)]
+        if v.size == 0:
+            return self
+        h = self._hash(v)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = (h << np.uint64(self.p)) | np.uint64(1 << 11)  # sentinel bit: rank <= 53, top > 0
+        # rank = leading zeros of `rest` + 1, via the float64 exponent of the top 53 bits
+        top = (rest >> np.uint64(11)).astype(np.float64)
+        rank = (53 - np.floor(np.log2(top))).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+        return self
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLogs with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = float(self.registers.size)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        est = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int((self.registers == 0).sum())
+        if est <= 2.5 * m and zeros:
+            est = m * np.log(m / zeros)  # linear counting
+        return int(round(est))
+
+
+class HdrHistogram:
+    """High-dynamic-range histogram of non-negative integers (e.g. latencies in microseconds).
+
+    Values below 2**sub_bits are counted exactly; above that each power of two is split into
+    2**(sub_bits-1) linear sub-buckets, so every recorded value is reported within a relative
+    error of 2**-(sub_bits-1) (0.8% for the default 8). Fixed size, merge by addition.
+    """
+
+    def __init__(self, sub_bits=8, max_bits=40):
+        self.sub_bits = int(sub_bits)
+        self.half = 1 << (self.sub_bits - 1)
+        self.counts = np.zeros((1 << self.sub_bits) + (max_bits - self.sub_bits + 1) * self.half, dtype=np.int64)
+        self.n = 0
+        self.max = 0
+        self.min = None
+
+    def _index(self, v):
+        shift = v.bit_length() - self.sub_bits
+        if shift <= 0:
+            return v
+        return (1 << self.sub_bits) + (shift - 1) * self.half + ((v >> shift) - self.half)
+
+    def _lower(self, idx):
+        base = 1 << self.sub_bits
+        if idx < base:
+            return idx, idx + 1
+        shift, sub = divmod(idx - base, self.half)
+        shift += 1
+        lo = (sub + self.half) << shift
+        return lo, lo + (1 << shift)
+
+    def record(self, value, count=1):
+        v = max(0, int(value))
+        self.counts[min(self._index(v), self.counts.size - 1)] += count
+        self.n += count
+        self.max = max(self.max, v)
+        self.min = v if self.min is None else min(self.min, v)
+        return self
+
+    def update(self, values):
+        for v in np.asarray(values).ravel().tolist():
+            self.record(v)
+        return self
+
+    def merge(self, other):
+        if other.counts.size != self.counts.size or other.sub_bits != self.sub_bits:
+            raise ValueError("Cannot merge HdrHistograms with different layouts")
+        self.counts += other.counts
+        self.n += other.n
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        return self
+
+    def percentile(self, p):
+        """Value at percentile p (0-100): midpoint of its bucket, clamped to [min, max]."""
+        if self.n == 0:
+            return float("nan")
+        if p >= 100:
+            return float(self.max)
+        target = max(1, int(np.ceil(p / 100.0 * self.n)))
+        idx = int(np.searchsorted(np.cumsum(self.counts), target))
+        lo, hi = self._lower(idx)
+        return float(min(max((lo + hi - 1) / 2.0, self.min), self.max))
+
+    @property
+    def mean(self):
+        if self.n == 0:
+            return float("nan")
+        mids = np.asarray([sum(self._lower(i)) / 2.0 for i in np.flatnonzero(self.counts)])
+        return float((mids * self.counts[self.counts > 0]).sum() / self.n)
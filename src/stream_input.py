@@ -0,0 +1,166 @@
+# src/stream_input.py
+# Streaming training input for train.py (--input-mode stream): trains on data larger than RAM.
+#
+# The training channel is a CSV/Parquet file or a directory of shards, as SageMaker FastFile
+# mode (or File mode with a sharded S3 prefix) mounts it. Nothing is read whole:
+#   pass 1     fits the transformer from mergeable sketches (preprocess.fit_chunks)
+#   DataIter   re-reads the shards chunk by chunk, encodes each chunk and hands it to an
+#              xgboost ExtMemQuantileDMatrix (a DMatrix on xgboost < 3.0), which keeps its
+#              pages in a disk cache
+#   holdout    rows whose hashed key falls in the first `val_fraction` of the hash space; the
+#              split is the same whatever the shard layout or order, and those rows are scored
+#              chunk by chunk after training
+# Peak memory is bounded by the chunk size plus xgboost's working set of pages.
+#
+# Tunables (env vars):
+#   STREAM_CHUNK_ROWS  rows per chunk (default 200000)
+#   EXTMEM_CACHE_DIR   where the external-memory pages go (default: a temp dir, removed after)
+import hashlib, os, shutil, tempfile
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from features import CATEGORICAL, NUMERIC, TARGET
+
+CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "200000"))
+CACHE_DIR = os.getenv("EXTMEM_CACHE_DIR")
+SHARD_SUFFIXES = (".csv", ".csv.gz", ".parquet", ".pq")
+HASH_BUCKETS = 1_000_000
+
+
+# -----------------------------
+# Shards and chunks
+# -----------------------------
+def list_shards(path):
+    """A file, or every CSV/Parquet shard under a directory (sorted, hidden files skipped)."""
+    if os.path.isfile(path):
+        return [path]
+    shards = sorted(os.path.join(d, f) for d, _, fs in os.walk(path) for f in fs
+                    if f.endswith(SHARD_SUFFIXES) and not f.startswith((".", "_")))
+    if not shards:
+        raise FileNotFoundError(f"No {'/'.join(SHARD_SUFFIXES)} shards under {path}")
+    return shards
+
+
+def shards_hash(shards):
+    """Fingerprint of a shard set for lineage: names and sizes, not contents (that would be
+    one more full pass over a dataset this mode exists to avoid re-reading)."""
+    h = hashlib.blake2b(digest_size=16)
+    for s in shards:
+        h.update(f"{os.path.basename(s)}:{os.path.getsize(s)}\n".encode())
+    return h.hexdigest()
+
+
+def iter_chunks(shards, chunksize=CHUNK_ROWS, key=None):
+    """Raw DataFrames of at most `chunksize` rows, shard after shard. Reads go straight to
+    pandas/pyarrow: the CSV cache materialises whole files, which is what this avoids."""
+    wanted = set(NUMERIC) | set(CATEGORICAL) | {TARGET} | ({key} if key else set())
+    for shard in shards:
+        if shard.endswith((".parquet", ".pq")):
+            import pyarrow.parquet as pq
+            f = pq.ParquetFile(shard)
+            columns = [c for c in f.schema_arrow.names if c in wanted]
+            for batch in f.iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(shard, chunksize=chunksize, usecols=lambda c: c in wanted)
+
+
+def holdout_mask(chunk, key, val_fraction):
+    """True for held-out rows: hash of the row key, so a row is always on the same side."""
+    if key not in chunk.columns:
+        raise ValueError(f"Split key '{key}' not found (pass --split-key). Available: {list(chunk.columns)}")
+    values = chunk[key].to_numpy()
+    if values.dtype.kind not in "iu":  # CSV and Parquet must agree on the key's hash
+        values = values.astype(str).astype(object)
+    return pd.util.hash_array(values) % HASH_BUCKETS < int(val_fraction * HASH_BUCKETS)
+
+
+def split_chunks(shards, chunksize, key, val_fraction, holdout=False):
+    """Training (or held-out) rows of each chunk; chunks left empty are skipped."""
+    for chunk in iter_chunks(shards, chunksize, key):
+        mask = holdout_mask(chunk, key, val_fraction)
+        part = chunk[mask if holdout else ~mask]
+        if len(part):
+            yield part
+
+
+# -----------------------------
+# External-memory training
+# -----------------------------
+class ChunkIter(xgb.DataIter):
+    """Feeds encoded training chunks to xgboost; reset() starts again from the first shard."""
+
+    def __init__(self, shards, transformer, chunksize, key, val_fraction, cache_prefix):
+        self.shards, self.transformer = shards, transformer
+        self.chunksize, self.key, self.val_fraction = chunksize, key, val_fraction
+        self.rows = 0
+        self._chunks = None
+        try:
+            super().__init__(cache_prefix=cache_prefix, on_host=False)
+        except TypeError:  # xgboost < 2.0 (e.g. the 1.5-1 training container): always on disk
+            super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks, self.rows = split_chunks(self.shards, self.chunksize, self.key, self.val_fraction), 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        self.rows += len(chunk)
+        input_data(data=self.transformer.transform(chunk), label=chunk[TARGET].to_numpy(np.float32))
+        return True
+
+    def reset(self):
+        self._chunks = None
+
+
+def to_train_params(params):
+    """train.py's XGBClassifier kwargs -> xgb.train params and number of rounds."""
+    params = dict(params)
+    rounds = params.pop("n_estimators", 100)
+    if "random_state" in params:
+        params["seed"] = params.pop("random_state")
+    params.setdefault("tree_method", "hist")
+    return params, rounds
+
+
+def train(shards, params, chunksize=CHUNK_ROWS, key="PassengerId", val_fraction=0.2, cache_dir=CACHE_DIR):
+    """Fits the transformer and an external-memory booster; returns (booster, transformer, stats)."""
+    from preprocess import fit_chunks
+    tf = fit_chunks(split_chunks(shards, chunksize, key, val_fraction))
+    work = tempfile.mkdtemp(prefix="xgb-extmem-", dir=cache_dir)
+    try:
+        it = ChunkIter(shards, tf, chunksize, key, val_fraction, os.path.join(work, "cache"))
+        # ExtMemQuantileDMatrix (xgboost >= 3.0) quantises once; older versions page raw CSR
+        dtrain = xgb.ExtMemQuantileDMatrix(it) if hasattr(xgb, "ExtMemQuantileDMatrix") else xgb.DMatrix(it)
+        xgb_params, rounds = to_train_params(params)
+        booster = xgb.train(xgb_params, dtrain, num_boost_round=rounds)
+        stats = {"shards": len(shards), "train_rows": it.rows,
+                 "cache_mb": round(sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(work)
+                                       for f in fs) / 2**20, 1)}
+        del dtrain, it  # xgboost removes its page files when the DMatrix goes away
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return booster, tf, stats
+
+
+def holdout_accuracy(booster, transformer, shards, chunksize=CHUNK_ROWS, key="PassengerId", val_fraction=0.2):
+    """Accuracy on the held-out rows, scored chunk by chunk; returns (accuracy, rows)."""
+    correct = rows = 0
+    for chunk in split_chunks(shards, chunksize, key, val_fraction, holdout=True):
+        pred = booster.inplace_predict(transformer.transform(chunk)) > 0.5
+        correct += int((pred == (chunk[TARGET].to_numpy() == 1)).sum())
+        rows += len(chunk)
+    return (correct / rows if rows else float("nan")), rows
+
+
+def peak_rss_mb():
+    """Peak RSS of this process (VmHWM), or ru_maxrss where /proc is unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:")) / 1024
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
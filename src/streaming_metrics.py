@@ -0,0 +1,101 @@
+# src/streaming_metrics.py
+# Mergeable, constant-memory binary classification metrics.
+#
+# Scores are bucketed into a fixed number of histogram bins per class, so AUC can be
+# computed from two histograms and accumulators from different chunks/workers merge by
+# simple addition. Accuracy and logloss are accumulated exactly.
+#
+# Tolerance vs sklearn: accuracy is exact; logloss matches log_loss within ~1e-6 (only the
+# clipping epsilon and summation order differ). AUC differs only through score pairs that
+# fall into the same bin, which are counted as ties (half credit); `auc_error_bound()`
+# returns the worst case of that error for the data seen. With the default 2**16 bins it
+# is typically < 1e-4.
+import numpy as np
+
+EPS = 1e-15
+
+
+class BinaryMetricsAccumulator:
+    def __init__(self, n_bins=1 << 16, threshold=0.5, calibration_bins=10):
+        self.n_bins = int(n_bins)
+        self.threshold = float(threshold)
+        self.calibration_bins = int(calibration_bins)
+        self.pos = np.zeros(self.n_bins, dtype=np.int64)
+        self.neg = np.zeros(self.n_bins, dtype=np.int64)
+        self.correct = 0
+        self.logloss_sum = 0.0
+        self.cal_count = np.zeros(self.calibration_bins, dtype=np.int64)
+        self.cal_pred = np.zeros(self.calibration_bins, dtype=np.float64)
+        self.cal_label = np.zeros(self.calibration_bins, dtype=np.float64)
+
+    @property
+    def n(self):
+        return int(self.pos.sum() + self.neg.sum())
+
+    def update(self, y, proba):
+        y = np.asarray(y).ravel().astype(bool)
+        p = np.asarray(proba, dtype=np.float64).ravel()
+        bins = np.clip((p * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+        self.pos += np.bincount(bins[y], minlength=self.n_bins)
+        self.neg += np.bincount(bins[~y], minlength=self.n_bins)
+        self.correct += int(((p >= self.threshold) == y).sum())
+        pc = np.clip(p, EPS, 1 - EPS)
+        self.logloss_sum += float(-(np.log(pc[y]).sum() + np.log1p(-pc[~y]).sum()))
+        cb = np.clip((p * self.calibration_bins).astype(np.int64), 0, self.calibration_bins - 1)
+        self.cal_count += np.bincount(cb, minlength=self.calibration_bins)
+        self.cal_pred += np.bincount(cb, weights=p, minlength=self.calibration_bins)
+        self.cal_label += np.bincount(cb, weights=y.astype(np.float64), minlength=self.calibration_bins)
+        return self
+
+    def merge(self, other):
+        if (other.n_bins, other.calibration_bins, other.threshold) != (self.n_bins, self.calibration_bins, self.threshold):
+            raise ValueError("Cannot merge accumulators with different bin settings")
+        self.pos += other.pos
+        self.neg += other.neg
+        self.correct += other.correct
+        self.logloss_sum += other.logloss_sum
+        self.cal_count += other.cal_count
+        self.cal_pred += other.cal_pred
+        self.cal_label += other.cal_label
+        return self
+
+    def auc(self):
+        P, N = float(self.pos.sum()), float(self.neg.sum())
+        if P == 0 or N == 0:
+            return float("nan")
+        neg_below = np.cumsum(self.neg) - self.neg
+        return float((self.pos * neg_below).sum() + 0.5 * (self.pos * self.neg).sum()) / (P * N)
+
+    def auc_error_bound(self):
+        P, N = float(self.pos.sum()), float(self.neg.sum())
+        if P == 0 or N == 0:
+            return float("nan")
+        return float(0.5 * (self.pos * self.neg).sum() / (P * N))
+
+    def accuracy(self):
+        return self.correct / self.n if self.n else float("nan")
+
+    def logloss(self):
+        return self.logloss_sum / self.n if self.n else float("nan")
+
+    def calibration(self):
+        table = []
+        for i in range(self.calibration_bins):
+            c = int(self.cal_count[i])
+            table.append({
+                "bin": [i / self.calibration_bins, (i + 1) / self.calibration_bins],
+                "count": c,
+                "mean_pred": float(self.cal_pred[i] / c) if c else None,
+                "frac_pos": float(self.cal_label[i] / c) if c else None,
+            })
+        return table
+
+    def report(self):
+        return {
+            "auc": self.auc(),
+            "accuracy": self.accuracy(),
+            "logloss": self.logloss(),
+            "n": self.n,
+            "auc_error_bound": self.auc_error_bound(),
+            "calibration": self.calibration(),
+        }
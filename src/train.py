@@ -1,64 +1,116 @@
 # train.py
+# Trains the XGBoost model and saves it with the fitted transformer (preprocessor.json).
+#
+# Input modes (--input-mode):
+#   file    reads the whole train.csv and splits 80/20 in memory (default)
+#   stream  --train is a CSV/Parquet file or a directory of shards (SageMaker FastFile mode);
+#           chunks go through an xgboost DataIter into an external-memory DMatrix, and rows
+#           whose hashed --split-key lands in the first --val-fraction are held out
+#           (src/stream_input.py)
+# Both report the process's peak RSS.
+#
+#   python src/train.py --train data/train.csv --model-dir model/
+#   python src/train.py --input-mode stream --train data/shards/ --model-dir model/ --chunksize 200000
 import argparse
+import json
 import os
-import pandas as pd
-import xgboost as xgb
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+import time
 
-if __name__ == "__main__":
-    # SageMaker input directories
-    input_path = os.path.join("/opt/ml/input/data/train", "train.csv")
-    model_path = os.path.join("/opt/ml/model")
-
-    # Load dataset
-    df = pd.read_csv(input_path)
-
-    # Ensure target column exists
-    if "Survived" not in df.columns:
-        raise ValueError(f"'Survived' column not found. Available: {df.columns}")
 
-    # Drop irrelevant columns
-    drop_cols = ["Name", "Ticket", "Cabin"]
-    df = df.drop(columns=[c for c in drop_cols if c in df.columns])
+def main(argv=None):
+    p = argparse.ArgumentParser()
+    p.add_argument("--train", default=os.path.join(os.getenv("SM_CHANNEL_TRAIN", "/opt/ml/input/data/train"), "train.csv"))
+    p.add_argument("--model-dir", default=os.getenv("SM_MODEL_DIR", "/opt/ml/model"))
+    p.add_argument("--hpo-config", default=None, help="best.json written by hpo.py; overrides the defaults below")
+    p.add_argument("--input-mode", default="file", choices=("file", "stream"))
+    p.add_argument("--chunksize", type=int, default=None, help="stream: rows per chunk (default STREAM_CHUNK_ROWS)")
+    p.add_argument("--split-key", default="PassengerId", help="stream: column hashed for the holdout split")
+    p.add_argument("--val-fraction", type=float, default=0.2, help="stream: share of rows held out")
+    args, _ = p.parse_known_args(argv)  # SageMaker also passes the estimator hyperparameters
 
-    # Handle categorical features (Sex, Embarked)
-    df = pd.get_dummies(df, columns=["Sex", "Embarked"], drop_first=True)
+    # heavy imports only once there is work to do (keeps `--help` / CLI startup fast)
+    import xgboost as xgb
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
 
-    # Fill missing values with median
-    df = df.fillna(df.median(numeric_only=True))
+    import csv_cache
+    import stream_input
+    from features import ARTIFACT_NAME, TARGET, TitanicTransformer
 
-    # Features and labels
-    y = df["Survived"]
-    X = df.drop("Survived", axis=1)
-
-    # Train/test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    # SageMaker input directories
+    input_path = args.train
+    model_path = args.model_dir
 
-    # Train XGBoost classifier
-    clf = xgb.XGBClassifier(
-        objective="binary:logistic",
-        eval_metric="logloss",
-        use_label_encoder=False,
+    # XGBoost hyperparameters
+    params = dict(
         n_estimators=200,
         max_depth=5,
         learning_rate=0.1,
         subsample=0.8,
         colsample_bytree=0.8,
-        random_state=42
     )
-    clf.fit(X_train, y_train)
+    if args.hpo_config:
+        with open(args.hpo_config) as f:
+            params.update(json.load(f)["params"])
+        print(f"Using HPO params: {params}")
+    model_params = dict(objective="binary:logistic", eval_metric="logloss", random_state=42, **params)
+
+    if args.input_mode == "stream":
+        # Shards are read chunk by chunk: transformer from sketches, booster from external memory
+        shards = stream_input.list_shards(input_path)
+        chunksize = args.chunksize or stream_input.CHUNK_ROWS
+        booster, tf, stats = stream_input.train(shards, model_params, chunksize, args.split_key, args.val_fraction)
+        acc, holdout_rows = stream_input.holdout_accuracy(booster, tf, shards, chunksize, args.split_key,
+                                                          args.val_fraction)
+        print(f"Streamed {stats['train_rows']} train / {holdout_rows} holdout rows from {stats['shards']} "
+              f"shard(s), external-memory cache {stats['cache_mb']} MB")
+        save_model, data_hash = booster.save_model, stream_input.shards_hash(shards)
+    else:
+        # Load dataset
+        df = csv_cache.read_csv(input_path)
 
-    # Evaluate
-    y_pred = clf.predict(X_test)
-    acc = accuracy_score(y_test, y_pred)
+        # Ensure target column exists
+        if TARGET not in df.columns:
+            raise ValueError(f"'{TARGET}' column not found. Available: {df.columns}")
+
+        # Train/test split on raw rows, so imputation stats come from the training part only
+        train_df, val_df = train_test_split(df, test_size=0.2, random_state=42)
+
+        # Fit the shared transformer (medians, modes, category levels) and encode both splits
+        tf = TitanicTransformer().fit(train_df)
+        X_train, y_train = tf.transform(train_df), train_df[TARGET].to_numpy()
+        X_test, y_test = tf.transform(val_df), val_df[TARGET].to_numpy()
+
+        # Train XGBoost classifier
+        clf = xgb.XGBClassifier(**model_params)
+        clf.fit(X_train, y_train)
+
+        # Evaluate
+        y_pred = clf.predict(X_test)
+        acc = accuracy_score(y_test, y_pred)
+        save_model, data_hash = clf.save_model, None
     print(f"Validation Accuracy: {acc:.4f}")
+    print(f"Peak RSS: {stream_input.peak_rss_mb():.1f} MB")
 
-    # Save model
+    # Save model + the fitted transformer the inference handler needs
     os.makedirs(model_path, exist_ok=True)
     model_file = os.path.join(model_path, "xgboost-model.json")
-    clf.save_model(model_file)
+    save_model(model_file)
+    tf.save(os.path.join(model_path, ARTIFACT_NAME))
     print(f"Model saved at: {model_file}")
 
+    # Index the run locally (src/lineage.py) so deploy/registry can find it without API scans.
+    # Not inside a SageMaker training container: its $HOME is discarded with it, and
+    # `lineage.py backfill` picks the job up from the API instead.
+    if os.getenv("SM_TRAINING_ENV") or os.path.isdir("/opt/ml"):
+        return
+    import lineage
+    job_name = os.getenv("TRAINING_JOB_NAME") or f"local-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    lineage.record("record_job", job_name, status="Completed", source="local", hyperparameters=params,
+                   artifact_uri=model_path, data_uri=input_path,
+                   data_hash=data_hash or lineage.file_hash(input_path),
+                   metrics={"validation:accuracy": acc})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# src/tree_compiler.py
+# Compiles the xgboost-model.json written by train.py into flat NumPy node tables, so
+# predictions need neither a DMatrix nor a call into libxgboost.
+#
+# All trees are concatenated into one set of arrays (feature, threshold, left, right,
+# default_left, value). Leaves point at themselves, so a batch is traversed by stepping
+# every (row, tree) cursor `max_depth` times with fancy indexing. For single rows,
+# `to_python()` emits the ensemble as straight-line nested if/else source, which
+# `compile_python()` turns into a plain Python function.
+#
+# Split semantics follow xgboost: go left when x < threshold (float32 compare); a missing
+# value (NaN) follows default_left. Only numerical splits and the binary:logistic /
+# binary:logitraw / reg:squarederror objectives are supported.
+#
+#   python src/tree_compiler.py model/xgboost-model.json --emit model/compiled_model.py
+import json, math, os
+
+import numpy as np
+
+LINKS = {
+    "binary:logistic": "logistic",
+    "reg:logistic": "logistic",
+    "binary:logitraw": "identity",
+    "reg:squarederror": "identity",
+}
+MAX_CODEGEN_DEPTH = 64  # deeper trees exceed the Python parser's nesting limits
+ROW_CHUNK = 1024  # rows traversed together; keeps the (rows x trees) cursors cache-sized
+
+
+def _load_json_model(path):
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)
+    import xgboost as xgb  # ubj / legacy binary: let xgboost convert it
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return json.loads(bytes(booster.save_raw("json")))
+
+
+def _base_margin(base_score, link):
+    base = float(str(base_score).strip("[]"))
+    if link == "logistic":
+        return math.log(base / (1.0 - base))
+    return base
+
+
+class CompiledModel:
+    def __init__(self, feature, threshold, left, right, default_left, value, roots, base_margin,
+                 link="logistic", max_depth=0, num_feature=None, children=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.base_margin = float(base_margin)
+        self.link = link
+        self.max_depth = int(max_depth)
+        self.num_feature = num_feature
+        # [2 * node + went_left]
+        self._children = np.stack([right, left], axis=1).ravel() if children is None else children
+        self._row_fn = None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_json(cls, model):
+        """Flattens a parsed xgboost JSON model (dict) into node tables."""
+        learner = model["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in LINKS:
+            raise NotImplementedError(f"Unsupported objective: {objective}")
+        params = learner["learner_model_param"]
+        if int(params.get("num_class", "0")) > 1 or int(params.get("num_target", "1")) > 1:
+            raise NotImplementedError("Multi-class / multi-target models are not supported")
+        gb = learner["gradient_booster"]
+        if gb.get("name") != "gbtree":
+            raise NotImplementedError(f"Unsupported booster: {gb.get('name')}")
+        trees = gb["model"]["trees"]
+        feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+        max_depth, offset = 0, 0
+        for t in trees:
+            if any(t.get("split_type", [])):
+                raise NotImplementedError("Categorical splits are not supported")
+            lc = np.asarray(t["left_children"], dtype=np.int64)
+            rc = np.asarray(t["right_children"], dtype=np.int64)
+            n = len(lc)
+            idx = np.arange(n)
+            leaf = lc == -1
+            cond = np.asarray(t["split_conditions"], dtype=np.float32)
+            feature.append(np.where(leaf, 0, np.asarray(t["split_indices"], dtype=np.int64)))
+            threshold.append(np.where(leaf, np.float32(0), cond))
+            left.append(np.where(leaf, idx, lc) + offset)
+            right.append(np.where(leaf, idx, rc) + offset)
+            default_left.append(np.asarray(t["default_left"], dtype=bool) & ~leaf)
+            value.append(np.where(leaf, cond, np.float32(0)))  # leaf value is stored in split_conditions
+            roots.append(offset)
+            max_depth = max(max_depth, _depth(lc, rc))
+            offset += n
+        cat = lambda parts, dtype: np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype)
+        link = LINKS[objective]
+        return cls(cat(feature, np.intp), cat(threshold, np.float32), cat(left, np.intp), cat(right, np.intp),
+                   cat(default_left, bool), cat(value, np.float32), np.asarray(roots, dtype=np.intp),
+                   _base_margin(params["base_score"], link), link, max_depth, int(params["num_feature"]))
+
+    # -----------------------------
+    # Flat-array storage
+    # -----------------------------
+    ARRAYS = ("feature", "threshold", "left", "right", "default_left", "value", "roots")
+
+    def save(self, out_dir):
+        """Writes every node table as .npy (int32 indices) plus meta.json; see load()."""
+        os.makedirs(out_dir, exist_ok=True)
+        index_dtype = np.int32 if len(self.feature) < 2**31 else np.int64
+        for name in self.ARRAYS:
+            arr = getattr(self, name)
+            np.save(os.path.join(out_dir, f"{name}.npy"), arr.astype(index_dtype) if arr.dtype == np.intp else arr)
+        np.save(os.path.join(out_dir, "children.npy"), self._children.astype(index_dtype))
+        with open(os.path.join(out_dir, "meta.json"), "w") as f:
+            json.dump({"base_margin": self.base_margin, "link": self.link, "max_depth": self.max_depth,
+                       "num_feature": self.num_feature, "n_trees": self.n_trees, "nodes": len(self.feature)}, f)
+
+    @classmethod
+    def load(cls, model_dir, mmap=True):
+        """Model saved by save(). With mmap the tables are mapped, not read: loading costs
+        no parsing and pages are faulted in as traversal touches them."""
+        with open(os.path.join(model_dir, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(model_dir, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                  for name in cls.ARRAYS + ("children",)}
+        return cls(**arrays, base_margin=meta["base_margin"], link=meta["link"], max_depth=meta["max_depth"],
+                   num_feature=meta["num_feature"])
+
+    # -----------------------------
+    # Vectorized traversal
+    # -----------------------------
+    def _check_width(self, X):
+        # wider rows would be scored on the wrong columns, narrower ones index past the row
+        if self.num_feature is not None and X.shape[1] != self.num_feature:
+            raise ValueError(f"expected {self.num_feature} features, got {X.shape[1]}")
+        return X
+
+    def predict_margin(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        self._check_width(X)
+        n_features = X.shape[1]
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_CHUNK):
+            chunk = X[start:start + ROW_CHUNK]
+            n = chunk.shape[0]
+            flat = chunk.ravel()
+            row_base = (np.arange(n, dtype=np.intp) * n_features)[:, None]
+            nodes = np.broadcast_to(self.roots, (n, self.n_trees))
+            for _ in range(self.max_depth):
+                x = flat[row_base + self.feature[nodes]]
+                go_left = (x < self.threshold[nodes]) | (np.isnan(x) & self.default_left[nodes])
+                nodes = self._children[2 * nodes + go_left]
+            # summed in float64; xgboost's float32 accumulation differs by ~1e-7
+            out[start:start + n] = self.value[nodes].sum(axis=1, dtype=np.float64)
+        return out + self.base_margin
+
+    def _transform(self, margin):
+        if self.link == "logistic":
+            return 1.0 / (1.0 + np.exp(-margin))
+        return margin
+
+    def predict(self, X, output_margin=False):
+        """Same scores as Booster.predict / inplace_predict (float32, within ~1e-6)."""
+        margin = self.predict_margin(X)
+        return (margin if output_margin else self._transform(margin)).astype(np.float32)
+
+    # -----------------------------
+    # Straight-line Python
+    # -----------------------------
+    def to_python(self, name="predict_row"):
+        """Generated source of `name(x) -> score` for one row given as a list of floats."""
+        if self.max_depth > MAX_CODEGEN_DEPTH:
+            raise ValueError(f"Trees are {self.max_depth} deep; codegen supports up to {MAX_CODEGEN_DEPTH}")
+        lines = [f"def {name}(x):", f"    m = {self.base_margin!r}"]
+
+        def emit(node, indent):
+            pad = "    " * indent
+            if self.left[node] == node:
+                lines.append(f"{pad}m += {float(self.value[node])!r}")
+                return
+            f, t = int(self.feature[node]), float(self.threshold[node])
+            # NaN compares False both ways, so the spelling picks the missing-value branch
+            cond = f"not x[{f}] >= {t!r}" if self.default_left[node] else f"x[{f}] < {t!r}"
+            lines.append(f"{pad}if {cond}:")
+            emit(self.left[node], indent + 1)
+            lines.append(f"{pad}else:")
+            emit(self.right[node], indent + 1)
+
+        for root in self.roots:
+            emit(int(root), 1)
+        if self.link == "logistic":
+            lines.append("    return 1.0 / (1.0 + exp(-m))")
+        else:
+            lines.append("    return m")
+        return "from math import exp\n\n\n" + "\n".join(lines) + "\n"
+
+    def compile_python(self):
+        """The generated row function, compiled once and cached."""
+        if self._row_fn is None:
+            ns = {}
+            exec(compile(self.to_python(), "<compiled xgboost model>", "exec"), ns)
+            self._row_fn = ns["predict_row"]
+        return self._row_fn
+
+    def predict_rows(self, X):
+        """Scores rows one by one with the generated function (fastest for a handful of rows)."""
+        fn = self.compile_python()
+        X = self._check_width(np.atleast_2d(np.asarray(X, dtype=np.float32)))
+        return np.asarray([fn(r) for r in X.tolist()], dtype=np.float32)
+
+
+def _depth(left, right):
+    depth, frontier = 0, [0]
+    while frontier:
+        frontier = [c for n in frontier for c in (left[n], right[n]) if c != -1]
+        depth += 1 if frontier else 0
+    return depth
+
+
+def compile_model(path):
+    """xgboost model file (JSON preferred) -> CompiledModel."""
+    return CompiledModel.from_json(_load_json_model(path))
+
+
+# -----------------------------
+# Engines: what inference.py / evaluate.py call
+# -----------------------------
+ENGINES = ("xgboost", "numpy", "codegen")
+CODEGEN_MAX_ROWS = 16  # above this, vectorized traversal beats the per-row Python function
+
+
+class CompiledPredictor:
+    """predict(X) for a compiled model: generated Python for tiny batches (codegen engine),
+    vectorized NumPy traversal otherwise."""
+
+    def __init__(self, model, codegen=False):
+        self.model = model
+        self.codegen = codegen
+        if codegen:
+            model.compile_python()
+
+    def predict(self, X):
+        if self.codegen and X.shape[0] <= CODEGEN_MAX_ROWS:
+            return self.model.predict_rows(X)
+        return self.model.predict(X)
+
+
+def make_predictor(engine, model_path, booster=None):
+    """A callable X -> scores for `engine` ("xgboost", "numpy" or "codegen")."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    if engine == "xgboost":
+        if booster is None:
+            import xgboost as xgb
+            booster = xgb.Booster()
+            booster.load_model(model_path)
+        return booster.inplace_predict
+    return CompiledPredictor(compile_model(model_path), codegen=engine == "codegen").predict
+
+
+if __name__ == "__main__":
+    import argparse, time
+    p = argparse.ArgumentParser(description="Compile an xgboost model and check it against Booster.predict")
+    p.add_argument("model", help="xgboost-model.json (or .ubj)")
+    p.add_argument("--emit", default=None, help="write the generated Python source here")
+    p.add_argument("--check-rows", type=int, default=1000)
+    args = p.parse_args()
+
+    t0 = time.perf_counter()
+    model = compile_model(args.model)
+    print(f"Compiled {model.n_trees} trees, {len(model.feature)} nodes, depth {model.max_depth} "
+          f"in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    if args.emit:
+        os.makedirs(os.path.dirname(os.path.abspath(args.emit)), exist_ok=True)
+        with open(args.emit, "w") as f:
+            f.write(model.to_python())
+        print("Wrote", args.emit)
+    if args.check_rows:
+        import xgboost as xgb
+        booster = xgb.Booster()
+        booster.load_model(args.model)
+        rng = np.random.default_rng(0)
+        X = rng.normal(0, 20, size=(args.check_rows, model.num_feature)).astype(np.float32)
+        X[rng.random(X.shape) < 0.1] = np.nan
+        ref = booster.inplace_predict(X)
+        err_np = float(np.abs(model.predict(X) - ref).max())
+        err_py = float(np.abs(model.predict_rows(X[:100]) - ref[:100]).max())
+        print(f"max |diff| vs Booster: numpy={err_np:.2e}  codegen={err_py:.2e}")
@@ -0,0 +1,175 @@
+# src/waiters.py
+# Waits for SageMaker resources (endpoints, feature groups, jobs) to reach a terminal state.
+#
+# Replaces fixed `sleep 30` polling: each resource is polled on its own schedule with
+# exponential backoff and full jitter (starting at ~1 s, capped at `max_delay`), the
+# schedule restarts whenever the status changes, and any number of resources are waited on
+# together under one overall deadline. Every status transition is recorded with the time it
+# was first observed, so deploy logs show where the time went.
+#
+#   python src/waiters.py endpoint my-endpoint feature-group my-fg --deadline 1800
+#   python src/waiters.py endpoint-deleted my-endpoint
+import argparse, heapq, json, os, random, sys, time
+
+from botocore.exceptions import ClientError
+
+# kind -> (describe method, name argument, status field, success states, failure states)
+SPECS = {
+    "endpoint": ("describe_endpoint", "EndpointName", "EndpointStatus", {"InService"}, {"Failed"}),
+    "endpoint-deleted": ("describe_endpoint", "EndpointName", "EndpointStatus", {"NotFound"}, {"Failed"}),
+    "feature-group": ("describe_feature_group", "FeatureGroupName", "FeatureGroupStatus", {"Created"},
+                      {"CreateFailed"}),
+    "feature-group-deleted": ("describe_feature_group", "FeatureGroupName", "FeatureGroupStatus", {"NotFound"},
+                              {"DeleteFailed"}),
+    "training-job": ("describe_training_job", "TrainingJobName", "TrainingJobStatus", {"Completed"},
+                     {"Failed", "Stopped"}),
+    "processing-job": ("describe_processing_job", "ProcessingJobName", "ProcessingJobStatus", {"Completed"},
+                       {"Failed", "Stopped"}),
+    "transform-job": ("describe_transform_job", "TransformJobName", "TransformJobStatus", {"Completed"},
+                      {"Failed", "Stopped"}),
+    "pipeline-execution": ("describe_pipeline_execution", "PipelineExecutionArn", "PipelineExecutionStatus",
+                           {"Succeeded"}, {"Failed", "Stopped"}),
+    "monitoring-schedule": ("describe_monitoring_schedule", "MonitoringScheduleName", "MonitoringScheduleStatus",
+                            {"Scheduled"}, {"Failed"}),
+}
+NOT_FOUND = "NotFound"
+
+
+class WaiterError(RuntimeError):
+    """A resource failed or the deadline passed; `results` has every resource's outcome."""
+
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+class Resource:
+    def __init__(self, kind, name):
+        if kind not in SPECS:
+            raise ValueError(f"Unknown resource kind {kind!r}; expected one of {', '.join(SPECS)}")
+        self.kind, self.name = kind, name
+        self.method, self.arg, self.field, self.success, self.failure = SPECS[kind]
+        self.status = None
+        self.transitions = []  # (status, seconds since start)
+        self.polls = 0
+        self.attempt = 0  # backoff step since the last status change
+        self.detail = None
+
+    @property
+    def key(self):
+        return f"{self.kind}/{self.name}"
+
+    @property
+    def done(self):
+        return self.status in self.success or self.status in self.failure
+
+    def describe(self, client):
+        try:
+            desc = getattr(client, self.method)(**{self.arg: self.name})
+        except ClientError as e:
+            err = e.response.get("Error", {})
+            msg = err.get("Message", "").lower()
+            # describe_feature_group: ResourceNotFound; describe_endpoint & jobs: ValidationException
+            if err.get("Code") == "ResourceNotFound" or (err.get("Code") == "ValidationException"
+                                                         and ("could not find" in msg or "not found" in msg)):
+                return NOT_FOUND, None
+            raise
+        return desc[self.field], desc.get("FailureReason")
+
+    def result(self):
+        return {"kind": self.kind, "name": self.name, "status": self.status,
+                "ok": self.status in self.success, "polls": self.polls, "failure_reason": self.detail,
+                "transitions": [{"status": s, "at_s": round(t, 3)} for s, t in self.transitions]}
+
+
+def _print(message):
+    print(message, flush=True)  # transitions show up live in CI logs
+
+
+def wait_for(client, resources, deadline_s=1800, initial_delay=1.0, max_delay=15.0, factor=2.0,
+             raise_on_failure=True, log=_print, clock=time.monotonic, sleep=time.sleep, rng=None):
+    """Polls every (kind, name) in `resources` until all are terminal or `deadline_s` passes.
+
+    Returns {"kind/name": result}. Raises WaiterError if a resource ends in a failure state
+    or the deadline passes (unless raise_on_failure=False). `log` takes one string
+    (print, logging.info, ...); None silences it.
+    """
+    rng = rng or random.Random()
+    items = [Resource(kind, name) for kind, name in resources]
+    start = clock()
+    heap = [(0.0, i) for i in range(len(items))]  # (due time since start, index)
+    while heap:
+        due, i = heapq.heappop(heap)
+        now = clock() - start
+        if due > deadline_s:
+            if now >= deadline_s:
+                heapq.heappush(heap, (due, i))
+                break
+            due = deadline_s  # one last look at the deadline
+        if due > now:
+            sleep(due - now)
+        r = items[i]
+        status, detail = r.describe(client)
+        r.polls += 1
+        t = clock() - start
+        if status != r.status:
+            if log:
+                prev = f"{r.status} -> " if r.status else ""
+                log(f"{r.key}: {prev}{status} at {t:.1f}s")
+            r.status, r.detail, r.attempt = status, detail, 0
+            r.transitions.append((status, t))
+        else:
+            r.attempt += 1
+        if r.done:
+            continue
+        # full jitter: next poll in U(0, min(cap, base * factor^attempt)), never below 10% of it
+        delay = min(max_delay, initial_delay * factor ** r.attempt)
+        heapq.heappush(heap, (t + rng.uniform(0.1 * delay, delay), i))
+
+    results = {r.key: r.result() for r in items}
+    pending = [r.key for r in items if not r.done]
+    failed = [r.key for r in items if r.status in r.failure]
+    if raise_on_failure and (pending or failed):
+        reasons = [f"{k} {results[k]['status']}" + (f" ({results[k]['failure_reason']})"
+                                                   if results[k]["failure_reason"] else "") for k in failed]
+        if pending:
+            reasons.append(f"deadline of {deadline_s:.0f}s passed waiting for {', '.join(pending)}")
+        raise WaiterError("; ".join(reasons), results)
+    return results
+
+
+def parse_targets(tokens):
+    """["endpoint", "a", "feature-group", "b"] -> [("endpoint", "a"), ("feature-group", "b")]"""
+    if len(tokens) % 2:
+        raise ValueError("expected <kind> <name> pairs")
+    return list(zip(tokens[::2], tokens[1::2]))
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Wait for SageMaker resources: <kind> <name> [<kind> <name> ...]",
+                                epilog=f"kinds: {', '.join(SPECS)}")
+    p.add_argument("targets", nargs="+")
+    p.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    p.add_argument("--deadline", type=float, default=1800, help="overall seconds before giving up")
+    p.add_argument("--max-delay", type=float, default=15.0, help="cap on the time between polls")
+    p.add_argument("--out", default=None, help="write per-resource timings (JSON) here")
+    args = p.parse_args(argv)
+
+    import aws_clients
+    client = aws_clients.client("sagemaker", args.region)
+    try:
+        results = wait_for(client, parse_targets(args.targets), args.deadline, max_delay=args.max_delay)
+        code = 0
+    except WaiterError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        results = e.results
+        # same exit codes serverless_recreate.sh used: 2 = failed, 3 = timeout
+        code = 2 if any(r["status"] in SPECS[r["kind"]][4] for r in results.values()) else 3
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+# tests/conftest.py
+# Puts src/ (flat modules, as the scripts import them) and the repo root (pipelines/) on sys.path.
+import os, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "src"), ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
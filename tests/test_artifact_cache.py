@@ -0,0 +1,87 @@
+# tests/test_artifact_cache.py
+import io, os, tarfile, threading, time
+
+import pytest
+
+from artifact_cache import ArtifactCache
+from local_aws import LocalS3
+
+
+def put_artifact(s3, key, model=b"{}", compiled=None):
+    """Writes a model.tar.gz to the local bucket; `compiled` adds compiled/<name> members."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as t:
+        for name, data in [("xgboost-model.json", model)] + [(f"compiled/{n}", d) for n, d in (compiled or {}).items()]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            t.addfile(info, io.BytesIO(data))
+    path = os.path.join(s3.root, "bucket", key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(buf.getvalue())
+    return f"s3://bucket/{key}"
+
+
+@pytest.fixture
+def s3(tmp_path):
+    return LocalS3(str(tmp_path / "s3"))
+
+
+def test_hit_does_not_download_again(tmp_path, s3):
+    cache = ArtifactCache(str(tmp_path / "cache"), s3=s3)
+    uri = put_artifact(s3, "a/model.tar.gz")
+    first = cache.fetch(uri)
+    assert cache.fetch(uri) == first
+    assert open(os.path.join(first, "xgboost-model.json"), "rb").read() == b"{}"
+    assert (cache.hits, cache.misses, s3.calls["download_file"]) == (1, 1, 1)
+
+
+def test_changed_etag_gets_a_new_entry(tmp_path, s3):
+    cache = ArtifactCache(str(tmp_path / "cache"), s3=s3)
+    uri = put_artifact(s3, "a/model.tar.gz")
+    first = cache.fetch(uri)
+    put_artifact(s3, "a/model.tar.gz", model=b'{"retrained": true}')
+    second = cache.fetch(uri)
+    assert second != first and s3.calls["download_file"] == 2
+    assert open(os.path.join(second, "xgboost-model.json"), "rb").read() == b'{"retrained": true}'
+
+
+def test_lru_eviction_counts_bundles_and_removes_locks(tmp_path, s3):
+    cache_dir = str(tmp_path / "cache")
+    blob = os.urandom(4000)  # incompressible, so sizes are predictable
+    uris = [put_artifact(s3, f"{name}/model.tar.gz", compiled={"value.npy": blob}) for name in "abc"]
+    cache = ArtifactCache(cache_dir, max_bytes=9000, s3=s3)
+    a, b = cache.fetch(uris[0]), cache.fetch(uris[1])
+    assert cache.total_bytes() > 8000  # the compiled/ tables count against the budget
+    time.sleep(0.01)
+    cache.fetch(uris[0])  # a is now more recent than b
+    time.sleep(0.01)
+    c = cache.fetch(uris[2])
+    assert os.path.isdir(a) and os.path.isdir(c) and not os.path.exists(b)
+    assert cache.total_bytes() <= 9000
+    locks = sorted(f for f in os.listdir(cache_dir) if f.endswith(".lock"))
+    assert locks == sorted(f".{os.path.basename(p)}.lock" for p in (a, c))
+
+
+def test_concurrent_fetches_download_once(tmp_path):
+    class SlowS3(LocalS3):
+        def download_file(self, Bucket, Key, Filename):
+            time.sleep(0.2)
+            super().download_file(Bucket, Key, Filename)
+
+    s3 = SlowS3(str(tmp_path / "s3"))
+    uri = put_artifact(s3, "a/model.tar.gz")
+    cache = ArtifactCache(str(tmp_path / "cache"), s3=s3)
+    results, barrier = [], threading.Barrier(8)
+
+    def fetch():
+        barrier.wait()
+        results.append(cache.fetch(uri))
+
+    threads = [threading.Thread(target=fetch) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    assert len(results) == 8 and len(set(results)) == 1
+    assert s3.calls["download_file"] == 1 and (cache.hits, cache.misses) == (7, 1)
@@ -0,0 +1,35 @@
+# tests/test_aws_clients.py
+import json, os
+
+from aws_clients import DescribeCache
+
+
+class FakeSageMaker:
+    def __init__(self, region):
+        self.region, self.calls = region, 0
+
+    def describe_endpoint(self, EndpointName):
+        self.calls += 1
+        return {"EndpointName": EndpointName, "Region": self.region, "ResponseMetadata": {}}
+
+
+def test_disk_cache_is_per_region(tmp_path):
+    path = str(tmp_path / "describe_cache.json")
+    east, west = FakeSageMaker("us-east-1"), FakeSageMaker("eu-west-1")
+    assert DescribeCache(east, path=path, region="us-east-1").endpoint("ep")["Region"] == "us-east-1"
+    assert DescribeCache(west, path=path, region="eu-west-1").endpoint("ep")["Region"] == "eu-west-1"
+    assert DescribeCache(east, path=path, region="us-east-1").endpoint("ep")["Region"] == "us-east-1"
+    assert (east.calls, west.calls) == (1, 1)
+
+
+def test_writes_merge_with_entries_of_other_processes(tmp_path):
+    path = str(tmp_path / "describe_cache.json")
+    sm = FakeSageMaker("us-east-1")
+    a, b = DescribeCache(sm, path=path, region="us-east-1"), DescribeCache(sm, path=path, region="us-east-1")
+    a.endpoint("one")
+    b.endpoint("two")  # b loaded the file before a wrote "one"
+    with open(path) as f:
+        assert sorted(json.load(f)) == ["us-east-1:describe_endpoint:one", "us-east-1:describe_endpoint:two"]
+    a.invalidate("two")  # also drops what only b had fetched
+    assert list(DescribeCache(sm, path=path, region="us-east-1")._entries) == ["us-east-1:describe_endpoint:one"]
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
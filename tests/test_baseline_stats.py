@@ -0,0 +1,30 @@
+# tests/test_baseline_stats.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline_stats import ColumnStats
+
+
+def obj(values):
+    return pd.Series(values, dtype=object)
+
+
+def test_type_is_fixed_by_the_first_chunk_with_values():
+    c = ColumnStats("x").update(obj(["1", "2", None])).update(obj(["3", "oops"]))
+    assert c.numeric and (c.present, c.missing) == (3, 2)  # the stray string counts as missing
+    assert c.sum == 6.0 and c.kll.n == 3
+
+
+def test_missing_only_chunks_carry_over_to_a_string_column():
+    c = ColumnStats("x").update(pd.Series([np.nan, np.nan])).update(obj(["a", "b", None]))
+    assert not c.numeric and (c.present, c.missing) == (2, 3)
+
+
+def test_merge_keeps_counts_and_rejects_mixed_types():
+    strings = ColumnStats("x").update(obj(["a", "b"]))
+    empty = ColumnStats("x").update(pd.Series([np.nan]))
+    merged = empty.merge(strings)
+    assert not merged.numeric and (merged.present, merged.missing) == (2, 1)
+    with pytest.raises(ValueError):
+        ColumnStats("x").update(pd.Series([1.0])).merge(strings)
@@ -0,0 +1,29 @@
+# tests/test_bulk_client.py
+import os
+
+import pytest
+
+from bulk_client import iter_rows
+from features import TitanicTransformer
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def test_raw_csv_without_preprocessor_raises():
+    with pytest.raises(ValueError, match="--preprocessor"):
+        next(iter_rows(os.path.join(DATA, "test.csv")))
+
+
+def test_raw_csv_with_preprocessor_keeps_quoted_fields():
+    tf = TitanicTransformer.load(os.path.join(DATA, "preprocessor.json"))
+    rows = list(iter_rows(os.path.join(DATA, "test.csv"), tf))
+    assert len(rows) == 418
+    assert all(len(r.split(",")) == len(tf.feature_names) for r in rows)
+
+
+def test_header_over_numeric_rows_is_skipped(tmp_path):
+    path = tmp_path / "x.csv"
+    path.write_text("a,b\n1,2.5\n3,\n")
+    assert list(iter_rows(str(path))) == ["1,2.5", "3,"]
+    path.write_text("1,2.5\n3,4\n")
+    assert list(iter_rows(str(path))) == ["1,2.5", "3,4"]
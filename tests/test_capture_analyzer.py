@@ -0,0 +1,54 @@
+# tests/test_capture_analyzer.py
+import json, os
+
+import capture_analyzer
+
+
+def _record(i):
+    return json.dumps({
+        "captureData": {
+            "endpointInput": {"observedContentType": "text/csv", "data": f"{i},1,22,1,0,7.25,0,1", "encoding": "CSV"},
+            "endpointOutput": {"observedContentType": "application/json", "encoding": "JSON",
+                               "data": json.dumps({"predictions": [{"score": 0.25}]})},
+        },
+        "eventMetadata": {"inferenceTime": "2024-01-01T00:00:00Z", "modelLatency": 1.5},
+    }) + "\n"
+
+
+def _write(path, start, n, mode="a"):
+    with open(path, mode) as f:
+        f.writelines(_record(i) for i in range(start, start + n))
+
+
+def test_appended_lines_are_counted_once(tmp_path):
+    root, state = tmp_path / "captures", str(tmp_path / "state")
+    root.mkdir()
+    a, b = str(root / "a.jsonl"), str(root / "b.jsonl")
+    _write(a, 0, 10, "w")
+    _write(b, 0, 5, "w")
+    total, n = capture_analyzer.analyze(str(root), state, workers=1)
+    assert (total.records, total.rows, n) == (15, 15, 2)
+
+    _write(a, 10, 7)  # the endpoint appended to a file already analyzed
+    total, n = capture_analyzer.analyze(str(root), state, workers=1)
+    assert (total.records, total.rows, n) == (22, 22, 1)
+
+    os.utime(b)  # a re-synced mirror touches files without changing them
+    total, n = capture_analyzer.analyze(str(root), state, workers=1)
+    assert (total.records, n) == (22, 0)
+    assert total.records == capture_analyzer.analyze(str(root), workers=1)[0].records
+
+
+def test_partial_trailing_line_waits_for_the_next_run(tmp_path):
+    root, state = tmp_path / "captures", str(tmp_path / "state")
+    root.mkdir()
+    path = str(root / "a.jsonl")
+    _write(path, 0, 3, "w")
+    line = _record(3)
+    with open(path, "a") as f:
+        f.write(line[:20])  # still being written
+    assert capture_analyzer.analyze(str(root), state, workers=1)[0].records == 3
+    with open(path, "a") as f:
+        f.write(line[20:])
+    total = capture_analyzer.analyze(str(root), state, workers=1)[0]
+    assert (total.records, total.bad_records) == (4, 0)
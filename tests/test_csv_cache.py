@@ -0,0 +1,69 @@
+# tests/test_csv_cache.py
+import os, time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from csv_cache import CSVCache
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CSVCache(str(tmp_path / "cache"))
+
+
+def test_warm_read_equals_pandas(cache):
+    path = os.path.join(DATA, "train.csv")
+    cold, warm = cache.read_csv(path), cache.read_csv(path)
+    assert (cache.misses, cache.hits) == (1, 1)
+    expected = pd.read_csv(path)
+    pd.testing.assert_frame_equal(cold, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(warm, expected, check_dtype=False)
+    assert list(warm.dtypes) == list(expected.dtypes)
+
+
+def test_changed_content_invalidates_the_entry(cache, tmp_path):
+    path = tmp_path / "x.csv"
+    path.write_text("a,b\n1,x\n2,y\n")
+    assert cache.read_csv(str(path))["a"].tolist() == [1, 2]
+    entries = {e for e in os.listdir(cache.cache_dir) if not e.startswith((".", "index"))}
+    path.write_text("a,b\n7,x\n8,z\n")
+    df = cache.read_csv(str(path))
+    assert df["a"].tolist() == [7, 8] and df["b"].tolist() == ["x", "z"]
+    assert cache.misses == 2
+    after = {e for e in os.listdir(cache.cache_dir) if not e.startswith((".", "index"))}
+    assert not entries & after  # the stale entry was dropped
+
+
+def test_header_none_and_header_row_are_distinct_entries(cache, tmp_path):
+    path = tmp_path / "x.csv"
+    path.write_text("1,2.5\n3,4.5\n")
+    with_header = cache.read_csv(str(path))
+    no_header = cache.read_csv(str(path), header=None)
+    assert cache.misses == 2
+    assert list(with_header.columns) == ["1", "2.5"] and len(with_header) == 1
+    pd.testing.assert_frame_equal(no_header, pd.read_csv(str(path), header=None))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.csv"
+        pd.DataFrame({"v": np.arange(1000, dtype=np.float64)}).assign(k=name).to_csv(path, index=False)
+        paths.append(str(path))
+    cache = CSVCache(str(tmp_path / "cache"), max_bytes=2 * 1000 * (8 + 4) + 100)  # room for two entries
+    for path in paths[:2]:
+        cache.read_csv(path)
+        time.sleep(0.01)
+    cache.read_csv(paths[0])  # a is now more recent than b
+    time.sleep(0.01)
+    cache.read_csv(paths[2])
+    assert cache.total_bytes() <= cache.max_bytes
+    misses = cache.misses
+    cache.read_csv(paths[0]), cache.read_csv(paths[2])
+    assert cache.misses == misses  # a and c are still cached
+    cache.read_csv(paths[1])
+    assert cache.misses == misses + 1  # b was evicted
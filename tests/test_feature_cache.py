@@ -0,0 +1,110 @@
+# tests/test_feature_cache.py
+import os, threading
+
+import numpy as np
+import pytest
+
+import csv_cache
+from feature_cache import FeatureCache
+from features import TitanicTransformer
+from fs_ingest import to_records
+from local_aws import LocalFeatureStore, SimClock
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@pytest.fixture(scope="module")
+def train_df():
+    return csv_cache.read_csv(os.path.join(DATA, "train.csv"))
+
+
+@pytest.fixture(scope="module")
+def transformer():
+    return TitanicTransformer.load(os.path.join(DATA, "preprocessor.json"))
+
+
+def make_store(df, store=None):
+    store = store or LocalFeatureStore()
+    for record in to_records(df):
+        store.put_record(FeatureGroupName="titanic", Record=record)
+    store.calls["put_record"] = 0
+    return store
+
+
+def test_rows_match_the_batch_transform(train_df, transformer):
+    cache = FeatureCache(make_store(train_df.head(20)), "titanic", transformer)
+    ids = train_df["PassengerId"].head(20).tolist()
+    np.testing.assert_allclose(cache.features(ids), transformer.transform(train_df.head(20)), rtol=1e-6)
+
+
+def test_hits_misses_and_lru_size_limit(train_df, transformer):
+    store = make_store(train_df.head(10))
+    cache = FeatureCache(store, "titanic", transformer, max_entries=3)
+    cache.features([1, 2, 3])
+    cache.features([1])  # 1 becomes most recently used; 2 is now the oldest
+    cache.features([4])
+    assert list(cache._entries) == ["3", "1", "4"] and len(cache) == 3
+    cache.features([2, 1])  # 2 was evicted, 1 is still cached
+    s = cache.stats
+    assert (s["hits"], s["misses"], s["evictions"]) == (2, 5, 2)
+    assert cache.hit_rate == pytest.approx(2 / 7)
+    assert store.calls["batch_get_record"] == 3
+
+
+def test_ttl_expiry_on_a_simulated_clock(train_df, transformer):
+    clock, store = SimClock(), make_store(train_df.head(5))
+    cache = FeatureCache(store, "titanic", transformer, ttl_seconds=60, clock=clock)
+    cache.features([1, 2])
+    clock.sleep(59)
+    cache.features([1, 2])
+    assert (cache.stats["hits"], store.calls["batch_get_record"]) == (2, 1)
+    clock.sleep(2)
+    cache.features([1])
+    assert (cache.stats["expired"], cache.stats["misses"], store.calls["batch_get_record"]) == (1, 3, 2)
+
+
+def test_unknown_ids_are_cached_negatively(train_df, transformer):
+    store = make_store(train_df.head(5))
+    cache = FeatureCache(store, "titanic", transformer)
+    with pytest.raises(KeyError):
+        cache.features([1, 999999])
+    X = cache.features([1, 999999], missing="nan")
+    assert np.isnan(X[1]).all() and not np.isnan(X[0]).any()
+    assert (cache.stats["not_found"], store.calls["batch_get_record"]) == (1, 1)
+
+
+def test_misses_are_split_into_batches_of_100(train_df, transformer):
+    store = make_store(train_df.head(250))
+    cache = FeatureCache(store, "titanic", transformer, batch_size=500)  # capped at the service limit
+    X = cache.features(train_df["PassengerId"].head(250).tolist() * 2)  # duplicates fetched once
+    assert X.shape == (500, len(transformer.feature_names))
+    assert store.calls["batch_get_record"] == cache.stats["batch_calls"] == 3
+
+
+def test_concurrent_misses_share_one_batch_get(train_df, transformer):
+    started, release = threading.Event(), threading.Event()
+
+    class SlowStore(LocalFeatureStore):
+        def batch_get_record(self, Identifiers, **kw):
+            started.set()
+            release.wait(5)
+            return super().batch_get_record(Identifiers, **kw)
+
+    store = make_store(train_df.head(5), SlowStore())
+    cache = FeatureCache(store, "titanic", transformer)
+    results, threads_n = [], 8
+    leader = threading.Thread(target=lambda: results.append(cache.features([1, 2])))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(cache.features([2, 1])))
+                 for _ in range(threads_n - 1)]
+    for t in followers:
+        t.start()
+    while cache.stats["coalesced"] < 2 * (threads_n - 1):  # every follower waits on the leader's fetch
+        threading.Event().wait(0.01)
+    release.set()
+    for t in [leader] + followers:
+        t.join(timeout=5)
+    assert store.calls["batch_get_record"] == 1
+    assert len(results) == threads_n
+    assert all(np.array_equal(r, results[0]) or np.array_equal(r, results[0][::-1]) for r in results)
@@ -0,0 +1,34 @@
+# tests/test_features.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import CATEGORICAL, NUMERIC, TitanicTransformer
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+@pytest.fixture(scope="module")
+def train_df():
+    return pd.read_csv(os.path.join(DATA, "train.csv")).head(50)
+
+
+@pytest.fixture(scope="module")
+def transformer(train_df):
+    return TitanicTransformer().fit(train_df)
+
+
+@pytest.mark.parametrize("container", [lambda s: s, lambda s: s.to_numpy(), lambda s: s.tolist(),
+                                       lambda s: tuple(s), lambda s: pd.array(s)])
+def test_dict_of_columns_gives_one_row_per_value(train_df, transformer, container):
+    cols = {c: container(train_df[c]) for c in NUMERIC + CATEGORICAL}
+    np.testing.assert_array_equal(transformer.transform(cols), transformer.transform(train_df))
+
+
+def test_dict_of_scalars_is_one_row(train_df, transformer):
+    row = train_df.iloc[3].to_dict()
+    X = transformer.transform(row)
+    assert X.shape == (1, len(transformer.feature_names))
+    np.testing.assert_array_equal(X[0], transformer.transform(train_df)[3])
@@ -0,0 +1,24 @@
+# tests/test_fs_ingest.py
+import os
+
+import fs_ingest
+from local_aws import LocalFeatureStore, LocalFeatureStoreServer
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def test_csv_without_event_time_is_streamed_with_one_added(tmp_path, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    server = LocalFeatureStoreServer(LocalFeatureStore()).start()
+    try:
+        stats = fs_ingest.ingest(os.path.join(DATA, "train.csv"), "titanic", region="us-east-1",
+                                 endpoint_url=server.url, processes=0, threads=4, partition_size=100,
+                                 dead_letter_path=str(tmp_path / "dead.jsonl"), log_every=0,
+                                 event_time="2024-01-01T00:00:00Z")
+        records = server.store.records
+    finally:
+        server.stop()
+    assert (stats["records"], stats["failed"], stats["partitions"]) == (891, 0, 9)
+    assert len(records) == 891
+    assert all({"FeatureName": "EventTime", "ValueAsString": "2024-01-01T00:00:00Z"} in r for r in records.values())
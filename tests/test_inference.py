@@ -0,0 +1,85 @@
+# tests/test_inference.py
+import threading
+
+import numpy as np
+
+import inference
+
+
+def _submit_concurrently(batcher, arrays):
+    """Submits every array from its own thread at once; returns result or exception per index."""
+    results, barrier = {}, threading.Barrier(len(arrays))
+
+    def call(i, X):
+        barrier.wait()
+        try:
+            results[i] = batcher.submit(X)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i, X)) for i, X in enumerate(arrays)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    return results
+
+
+def test_wrong_width_fails_only_its_own_request():
+    def predict(X):
+        if X.shape[1] != 8:
+            raise ValueError("expected 8 features")
+        return X.sum(axis=1)
+
+    batcher = inference.MicroBatcher(predict, max_batch_size=64, max_wait_ms=50)
+    arrays = [np.ones((1, 8 if i % 2 == 0 else 7), np.float32) for i in range(6)]
+    results = _submit_concurrently(batcher, arrays)
+    for i in range(6):
+        if i % 2 == 0:
+            np.testing.assert_array_equal(results[i], [8.0])
+        else:
+            assert isinstance(results[i], ValueError)
+    batcher.close()
+
+
+def test_failed_merged_batch_is_retried_per_request():
+    def predict(X):
+        if np.isnan(X).any():
+            raise ValueError("NaN row")
+        return X.sum(axis=1)
+
+    batcher = inference.MicroBatcher(predict, max_batch_size=64, max_wait_ms=50)
+    arrays = [np.full((2, 8), np.nan if i == 0 else i, np.float32) for i in range(4)]
+    results = _submit_concurrently(batcher, arrays)
+    assert isinstance(results[0], ValueError)
+    for i in range(1, 4):
+        np.testing.assert_array_equal(results[i], [8.0 * i, 8.0 * i])
+    batcher.close()
+
+
+def test_close_right_after_enqueue_still_scores_the_request():
+    # A ModelHost eviction can close() the batcher between a request being queued and the
+    # batching thread starting; the request must still complete rather than wait forever.
+    batcher = inference.MicroBatcher(lambda X: X.sum(axis=1), max_batch_size=64, max_wait_ms=5)
+    real_put, closers = batcher._queue.put, []
+
+    def put_then_close(item, *args, **kwargs):
+        real_put(item, *args, **kwargs)
+        if item is not None:
+            closer = threading.Thread(target=batcher.close)
+            closers.append(closer)
+            closer.start()  # blocks on the batcher lock until submit() releases it
+            closer.join(timeout=0.05)
+
+    batcher._queue.put = put_then_close
+    result = {}
+    t = threading.Thread(target=lambda: result.setdefault("scores", batcher.submit(np.ones((1, 8), np.float32))),
+                         daemon=True)
+    t.start()
+    t.join(timeout=5)
+    assert not t.is_alive(), "submit() hung after close()"
+    np.testing.assert_array_equal(result["scores"], [8.0])
+    closers[0].join(timeout=5)  # the request may be scored before close() gets the lock
+    assert batcher._closed
+    # Later requests are scored inline
+    np.testing.assert_array_equal(batcher.submit(np.ones((1, 8), np.float32)), [8.0])
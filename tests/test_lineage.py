@@ -0,0 +1,59 @@
+# tests/test_lineage.py
+from datetime import datetime, timedelta, timezone
+
+import lineage
+
+NOW = datetime.now(timezone.utc)
+
+
+class FakeSageMaker:
+    def __init__(self):
+        self.jobs = {}
+        self.described = []
+
+    def add(self, name, hours_ago, status="Completed"):
+        self.jobs[name] = {"TrainingJobName": name, "TrainingJobStatus": status,
+                           "CreationTime": NOW - timedelta(hours=hours_ago),
+                           "ModelArtifacts": {"S3ModelArtifacts": f"s3://bucket/{name}/model.tar.gz"}}
+
+    def list_training_jobs(self, SortOrder="Descending", MaxResults=100, CreationTimeAfter=None,
+                           CreationTimeBefore=None, **kw):
+        jobs = sorted((j for j in self.jobs.values()
+                       if (CreationTimeAfter is None or j["CreationTime"] >= CreationTimeAfter)
+                       and (CreationTimeBefore is None or j["CreationTime"] <= CreationTimeBefore)),
+                      key=lambda j: j["CreationTime"], reverse=SortOrder == "Descending")
+        return {"TrainingJobSummaries": [dict(j) for j in jobs[:MaxResults]]}
+
+    def describe_training_job(self, TrainingJobName):
+        self.described.append(TrainingJobName)
+        return self.jobs[TrainingJobName]
+
+
+def backfill(index, sm, hours_ago=0):
+    sm.described.clear()
+    index.backfill(sm, until=(NOW - timedelta(hours=hours_ago)).timestamp(), workers=2, log=None)
+    return sorted(sm.described)
+
+
+def test_incremental_backfill_keeps_jobs_created_before_a_recorded_run():
+    index, sm = lineage.Lineage(":memory:"), FakeSageMaker()
+    sm.add("old", hours_ago=48)
+    assert backfill(index, sm, hours_ago=1) == ["old"]
+    sm.add("ci", hours_ago=0.5)  # started elsewhere, never recorded here
+    sm.add("mine", hours_ago=0.2)  # run_training.py records it with its CreationTime
+    index.record_job("mine", created=sm.jobs["mine"]["CreationTime"].timestamp(), status="Completed",
+                     source="sagemaker", artifact_uri="s3://bucket/mine/model.tar.gz")
+    assert backfill(index, sm) == ["ci"]
+    assert backfill(index, sm) == []
+
+
+def test_incremental_backfill_rescans_jobs_still_running():
+    index, sm = lineage.Lineage(":memory:"), FakeSageMaker()
+    sm.add("done", hours_ago=24)
+    sm.add("running", hours_ago=30, status="InProgress")
+    assert backfill(index, sm, hours_ago=2) == ["done", "running"]
+    sm.add("new", hours_ago=1)
+    sm.jobs["running"]["TrainingJobStatus"] = "Completed"
+    assert backfill(index, sm) == ["new", "running"]
+    assert index.get("running")["status"] == "Completed"
+    assert backfill(index, sm) == []
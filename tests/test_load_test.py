@@ -0,0 +1,71 @@
+# tests/test_load_test.py
+import asyncio, socket
+
+from cicd import load_test
+
+
+async def _serve(status):
+    """Stub /invocations server answering every request with `status` (None: never answers)."""
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                              if line.lower().startswith(b"content-length"))
+                await reader.readexactly(length)
+                if status is None:
+                    await asyncio.sleep(3600)
+                body = b'{"predictions": [{"score": 0.5}]}'
+                writer.write(b"HTTP/1.1 %d X\r\nContent-Length: %d\r\n\r\n%s" % (status, len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def _load(status=200, port=None, n=20, timeout=5.0):
+    async def go():
+        server = await _serve(status) if port is None else None
+        url = f"http://127.0.0.1:{port or server.sockets[0].getsockname()[1]}"
+        try:
+            schedule = load_test.arrivals([(200.0, (n + 0.5) / 200.0)])
+            stats, dropped, duration = await load_test.run(load_test.HTTPTarget(url, timeout=timeout),
+                                                           ["1,2,3"], schedule)
+        finally:
+            if server is not None:
+                server.close()
+        return load_test.evaluate(stats, dropped, duration, slo_p99_ms=1000, max_error_rate=0.01)
+    return asyncio.run(go())
+
+
+def _closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_ok_run_passes():
+    report = _load(200)
+    r = report["variants"]["local"]
+    assert report["passed"] and (r["requests"], r["ok"], r["error_rate"]) == (20, 20, 0.0)
+
+
+def test_throttles_are_counted_and_fail_the_run():
+    report = _load(429)
+    r = report["variants"]["local"]
+    assert (r["requests"], r["throttles"], r["error_rate"]) == (20, 20, 1.0)
+    assert not report["passed"] and "error rate" in report["failures"][0]
+
+
+def test_refused_connections_are_counted_as_errors():
+    report = _load(port=_closed_port())
+    r = report["variants"]["local"]
+    assert (r["requests"], r["errors"], r["error_rate"]) == (20, 20, 1.0)
+    assert r["error_kinds"] == {"ConnectionRefusedError": 20}
+    assert "no requests completed" not in report["failures"]
+
+
+def test_hung_server_times_out():
+    report = _load(None, n=4, timeout=0.2)
+    assert report["variants"]["local"]["error_kinds"] == {"timeout": 4}
@@ -0,0 +1,25 @@
+# tests/test_local_pipeline.py
+import logging
+
+import pytest
+
+from pipelines.local_pipeline import Step, run_pipeline
+
+
+def noop(ctx, out):
+    return {}
+
+
+def test_dependency_cycle_raises(tmp_path):
+    steps = [Step("A", noop, cache=False), Step("B", noop, ["A", "C"], cache=False),
+             Step("C", noop, ["B"], cache=False)]
+    with pytest.raises(ValueError, match=r"cycle.*\['B', 'C'\]"):
+        run_pipeline(steps, str(tmp_path), log=None)
+
+
+def test_log_accepts_any_one_argument_logger(tmp_path, caplog):
+    steps = [Step("A", noop, cache=False), Step("B", noop, ["A"], cache=False)]
+    with caplog.at_level(logging.INFO):
+        run = run_pipeline(steps, str(tmp_path), log=logging.getLogger("pipeline").info)
+    assert run["succeeded"] and [r["status"] for r in run["steps"]] == ["ran", "ran"]
+    assert '"step": "B"' in caplog.text
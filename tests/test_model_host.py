@@ -0,0 +1,133 @@
+# tests/test_model_host.py
+import threading
+
+import numpy as np
+import pytest
+
+import model_host
+
+MB = 1024 * 1024
+
+
+class FakeScorer:
+    def __init__(self, target):
+        self.target = target
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_host(budget_bytes, size=100, loader=None):
+    loaded = []
+
+    def load(target):
+        loaded.append(target)
+        return FakeScorer(target)
+
+    host = model_host.ModelHost("", budget_bytes, loader=loader or load, sizer=lambda s: size)
+    return host, loaded
+
+
+def test_lru_eviction_order_and_budget():
+    host, loaded = make_host(budget_bytes=300)
+    a, b, c = host.get("a"), host.get("b"), host.get("c")
+    assert list(host.loaded()) == ["a", "b", "c"]
+    host.get("a")  # a becomes most recently used; b is now the oldest
+    host.get("d")
+    assert list(host.loaded()) == ["c", "a", "d"]
+    assert b.closed and not (a.closed or c.closed)
+    host.get("e")
+    assert list(host.loaded()) == ["a", "d", "e"] and c.closed
+    s = host.stats()
+    assert s["loaded_bytes"] == 300 <= s["budget_bytes"]
+    assert (s["loads"], s["hits"], s["evictions"]) == (5, 1, 2)
+    assert loaded == ["a", "b", "c", "d", "e"]
+
+
+def test_model_larger_than_budget_stays_loaded_alone():
+    host, _ = make_host(budget_bytes=50)
+    host.get("a")
+    host.get("b")
+    assert list(host.loaded()) == ["b"]
+    assert host.stats()["evictions"] == 1
+
+
+def test_concurrent_cold_gets_share_one_load():
+    release, threads_n = threading.Event(), 16
+    calls = []
+
+    def slow_load(target):
+        calls.append(target)
+        release.wait(5)
+        return FakeScorer(target)
+
+    host, _ = make_host(budget_bytes=1000, loader=slow_load)
+    results, barrier = [], threading.Barrier(threads_n)
+
+    def first_request():
+        barrier.wait()
+        results.append(host.get("v1"))
+
+    threads = [threading.Thread(target=first_request) for _ in range(threads_n)]
+    for t in threads:
+        t.start()
+    while host.stats()["load_waits"] < threads_n - 1:  # everyone but the leader is waiting
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join(timeout=5)
+    assert calls == ["v1"]
+    assert len(results) == threads_n and all(r is results[0] for r in results)
+    s = host.stats()
+    assert (s["loads"], s["load_waits"], s["hits"], s["loading"]) == (1, threads_n - 1, 0, 0)
+    host.get("v1")
+    assert host.stats()["hits"] == 1
+
+
+def test_failed_load_is_counted_and_retried():
+    attempts = []
+
+    def flaky(target):
+        attempts.append(target)
+        if len(attempts) == 1:
+            raise FileNotFoundError(target)
+        return FakeScorer(target)
+
+    host, _ = make_host(budget_bytes=1000, loader=flaky)
+    with pytest.raises(FileNotFoundError):
+        host.get("v1")
+    assert host.stats()["load_errors"] == 1 and host.loaded() == {}
+    assert host.get("v1").target == "v1"
+    assert host.stats()["loads"] == 1
+
+
+def test_bad_target_names_are_rejected():
+    host, loaded = make_host(budget_bytes=1000)
+    for target in (None, "", "/etc/passwd", "../v1", "s3://other/v1"):
+        with pytest.raises(model_host.TargetError):
+            host.get(target)
+    assert loaded == []
+
+
+def test_versions_fit_an_ml_m5_large_budget():
+    # 40 versions of a train.py-shaped booster (200 trees, depth 5) sized with the real estimate
+    # must all stay resident within the default 6 GiB budget.
+    xgb = pytest.importorskip("xgboost")
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 8)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(scale=0.5, size=2000) > 0).astype(int)
+    clf = xgb.XGBClassifier(n_estimators=200, max_depth=5, n_jobs=1).fit(X, y)
+
+    class BoosterScorer(FakeScorer):
+        booster = clf.get_booster()
+
+    versions = 40
+    host = model_host.ModelHost("", 6144 * MB, loader=BoosterScorer, sizer=model_host.estimate_bytes)
+    for i in range(versions):
+        host.get(f"v{i}")
+    s = host.stats()
+    assert s["loaded"] == versions and s["evictions"] == 0
+    assert s["loaded_bytes"] <= s["budget_bytes"]
+    per_model = s["loaded_bytes"] / versions
+    assert int(s["budget_bytes"] // per_model) >= versions
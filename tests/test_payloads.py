@@ -0,0 +1,17 @@
+# tests/test_payloads.py
+import pytest
+
+import payloads
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, "application/json"),
+    ("application/x-npy", "application/x-npy"),
+    ("application/x-npy;q=0.1, application/json", "application/json"),
+    ("text/csv;q=0.5, application/x-npy;q=0.9", "application/x-npy"),
+    ("text/csv, application/x-npy", "text/csv"),  # equal q: header order
+    ("application/x-npy;q=0, image/png", "application/json"),
+    ("Application/X-NPY; charset=binary; q=1.0", "application/x-npy"),
+])
+def test_negotiate_honors_q_values(accept, expected):
+    assert payloads.negotiate(accept) == expected
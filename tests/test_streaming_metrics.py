@@ -0,0 +1,55 @@
+# tests/test_streaming_metrics.py
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+
+from streaming_metrics import BinaryMetricsAccumulator
+
+
+def data(n=20000, seed=0, ties=False):
+    rng = np.random.default_rng(seed)
+    y = rng.random(n) < 0.4
+    p = 1 / (1 + np.exp(-(rng.normal(size=n) + 1.5 * y)))
+    if ties:  # heavy exact ties, as a shallow model's discrete scores produce
+        p = np.round(p, 2)
+    return y.astype(int), p
+
+
+def merged(y, p, chunks, n_bins=1 << 16):
+    total = BinaryMetricsAccumulator(n_bins)
+    for yc, pc in zip(np.array_split(y, chunks), np.array_split(p, chunks)):
+        total.merge(BinaryMetricsAccumulator(n_bins).update(yc, pc))
+    return total
+
+
+@pytest.mark.parametrize("ties", [False, True])
+@pytest.mark.parametrize("chunks", [1, 7])
+def test_merged_chunks_match_sklearn(ties, chunks):
+    y, p = data(ties=ties)
+    acc = merged(y, p, chunks)
+    assert acc.n == len(y)
+    assert acc.accuracy() == accuracy_score(y, p >= 0.5)
+    assert acc.logloss() == pytest.approx(log_loss(y, p), abs=1e-6)
+    bound = acc.auc_error_bound()
+    assert abs(acc.auc() - roc_auc_score(y, p)) <= bound + 1e-12
+    if ties:  # exact ties share a bin and get half credit in both
+        assert acc.auc() == pytest.approx(roc_auc_score(y, p), abs=1e-12)
+    else:
+        assert bound < 1e-4  # documented default-bin tolerance
+
+
+def test_merge_is_order_independent():
+    y, p = data(seed=1)
+    forward, backward = BinaryMetricsAccumulator(), BinaryMetricsAccumulator()
+    parts = list(zip(np.array_split(y, 5), np.array_split(p, 5)))
+    for yc, pc in parts:
+        forward.merge(BinaryMetricsAccumulator().update(yc, pc))
+    for yc, pc in reversed(parts):
+        backward.merge(BinaryMetricsAccumulator().update(yc, pc))
+    assert forward.auc() == backward.auc() and forward.correct == backward.correct
+    assert forward.logloss() == pytest.approx(backward.logloss(), rel=1e-12)
+
+
+def test_merge_rejects_different_bins():
+    with pytest.raises(ValueError):
+        BinaryMetricsAccumulator(1024).merge(BinaryMetricsAccumulator(2048))
@@ -0,0 +1,49 @@
+# tests/test_tree_compiler.py
+import json
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+import tree_compiler
+
+
+@pytest.fixture(scope="module")
+def model():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(3000, 8)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan  # trees learn default directions for missing values
+    y = (np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 1]) * X[:, 2].clip(-1, 1) > 0).astype(int)
+    booster = xgb.XGBClassifier(n_estimators=60, max_depth=5, n_jobs=1).fit(X, y).get_booster()
+    compiled = tree_compiler.CompiledModel.from_json(json.loads(bytes(booster.save_raw("json"))))
+    return booster, compiled
+
+
+def rows(n, seed=1):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 8)).astype(np.float32)
+    X[rng.random(X.shape) < 0.2] = np.nan
+    X[0] = np.nan  # every feature missing
+    return X
+
+
+@pytest.mark.parametrize("engine", ["numpy", "codegen"])
+def test_engines_match_booster_predict(model, engine):
+    booster, compiled = model
+    predictor = tree_compiler.CompiledPredictor(compiled, codegen=engine == "codegen")
+    for X in (rows(2000), rows(tree_compiler.CODEGEN_MAX_ROWS, seed=2), rows(1, seed=3)):
+        expected = booster.predict(xgb.DMatrix(X, missing=np.nan))
+        np.testing.assert_allclose(predictor.predict(X), expected, rtol=0, atol=1e-6)
+    X = rows(50, seed=4)
+    np.testing.assert_allclose(compiled.predict_rows(X), compiled.predict(X), rtol=0, atol=1e-6)
+    np.testing.assert_allclose(compiled.predict(X, output_margin=True),
+                               booster.predict(xgb.DMatrix(X), output_margin=True), rtol=0, atol=1e-5)
+
+
+@pytest.mark.parametrize("width", [6, 10])
+@pytest.mark.parametrize("engine", ["numpy", "codegen"])
+def test_wrong_row_width_raises(model, engine, width):
+    predictor = tree_compiler.CompiledPredictor(model[1], codegen=engine == "codegen")
+    with pytest.raises(ValueError, match=f"expected 8 features, got {width}"):
+        predictor.predict(np.ones((2, width), dtype=np.float32))
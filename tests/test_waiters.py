@@ -0,0 +1,103 @@
+# tests/test_waiters.py
+import logging, random
+
+import pytest
+
+import aws_clients
+import waiters
+from local_aws import LocalSageMaker, SimClock
+
+
+class RecordingSageMaker(LocalSageMaker):
+    """LocalSageMaker that remembers when each resource was described."""
+
+    def __init__(self, clock):
+        super().__init__(clock)
+        self.polls = {}
+
+    def _describe(self, kind, name):
+        self.polls.setdefault(name, []).append(self.clock())
+        return super()._describe(kind, name)
+
+
+def run(timelines, seed=0, **kw):
+    clock = SimClock()
+    sm = RecordingSageMaker(clock)
+    for kind, name, timeline in timelines:
+        sm.add(kind, name, timeline, failure_reason="capacity" if kind == "training-job" else None)
+    kw.setdefault("log", None)
+    results = waiters.wait_for(sm, [(k, n) for k, n, _ in timelines], clock=clock, sleep=clock.sleep,
+                               rng=random.Random(seed), **kw)
+    return results, sm, clock
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_backoff_grows_to_the_cap_within_jitter_bounds(seed):
+    _, sm, _ = run([("endpoint", "ep", [("Creating", 0), ("InService", 600)])], seed=seed,
+                   initial_delay=1.0, max_delay=15.0)
+    polls = sm.polls["ep"]
+    gaps = [b - a for a, b in zip(polls, polls[1:])]
+    for attempt, gap in enumerate(gaps):
+        bound = min(15.0, 1.0 * 2.0 ** attempt)
+        assert 0.1 * bound - 1e-9 <= gap <= bound + 1e-9
+    assert max(gaps) > 8.0  # reached the cap region, not stuck at the initial delay
+    assert len(polls) < 150  # ~600/8.25 on average at the cap; fixed 1 s polling would need ~600
+
+
+def test_status_change_restarts_the_schedule():
+    _, sm, _ = run([("endpoint", "ep", [("Creating", 0), ("Updating", 200), ("InService", 400)])],
+                   max_delay=15.0)
+    polls = sm.polls["ep"]
+    first_updating = next(t for t in polls if t >= 200)
+    next_poll = polls[polls.index(first_updating) + 1]
+    assert next_poll - first_updating <= 1.0  # back to the initial delay
+
+
+def test_transition_timings_per_resource():
+    results, _, clock = run([("endpoint", "ep", [("Creating", 0), ("InService", 240)]),
+                             ("feature-group", "fg", [("Creating", 0), ("Created", 60)])], max_delay=15.0)
+    ep, fg = results["endpoint/ep"], results["feature-group/fg"]
+    assert ep["ok"] and fg["ok"]
+    assert [t["status"] for t in ep["transitions"]] == ["Creating", "InService"]
+    assert [t["status"] for t in fg["transitions"]] == ["Creating", "Created"]
+    assert 240 <= ep["transitions"][-1]["at_s"] <= 255
+    assert 60 <= fg["transitions"][-1]["at_s"] <= 75
+    assert clock() <= 255  # waited on together, not one after the other
+
+
+def test_failure_state_raises_with_reason():
+    with pytest.raises(waiters.WaiterError) as e:
+        run([("training-job", "job", [("InProgress", 0), ("Failed", 30)])])
+    result = e.value.results["training-job/job"]
+    assert result["status"] == "Failed" and not result["ok"]
+    assert "capacity" in str(e.value)
+
+
+def test_deadline_raises_for_pending_resources():
+    with pytest.raises(waiters.WaiterError) as e:
+        run([("endpoint", "ep", [("Creating", 0), ("InService", 10_000)])], deadline_s=120)
+    assert e.value.results["endpoint/ep"]["status"] == "Creating"
+    assert "deadline" in str(e.value)
+
+
+def test_deleted_resource_waits_for_not_found():
+    results, _, _ = run([("endpoint-deleted", "ep", [("Deleting", 0), ("NotFound", 45)])])
+    assert results["endpoint-deleted/ep"]["ok"]
+
+
+def test_log_accepts_any_one_argument_logger(caplog):
+    with caplog.at_level(logging.INFO):
+        run([("endpoint", "ep", [("Creating", 0), ("InService", 5)])], log=logging.getLogger("waiters").info)
+    assert "endpoint/ep: Creating -> InService" in caplog.text
+
+
+@pytest.mark.parametrize("timeline, deadline, code", [
+    ([("InService", 0)], "60", 0),
+    ([("Creating", 0), ("Failed", 0.01)], "60", 2),
+    ([("Creating", 0)], "0.05", 3),
+])
+def test_cli_exit_codes(monkeypatch, timeline, deadline, code):
+    sm = LocalSageMaker()
+    sm.add("endpoint", "ep", timeline)
+    monkeypatch.setattr(aws_clients, "client", lambda *a, **kw: sm)
+    assert waiters.main(["endpoint", "ep", "--deadline", deadline]) == code